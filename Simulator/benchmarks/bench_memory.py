@@ -0,0 +1,246 @@
+"""
+Memory Benchmarks - Peak traced memory and allocations per simulated step
+
+Uses tracemalloc to measure:
+- Simulation.run (step loop + result compilation)
+- Simulation.iter_steps consumed without retaining records (streaming)
+- Simulation._compile_results on its own
+- DataLogger.save_all
+- The full strategy + season comparison (compare_strategies.py)
+
+Each record reports peak traced memory, bytes per simulated step (lower
+is better, used for regression checks) and the top allocation sites.
+"""
+
+import gc
+import os
+import shutil
+import tempfile
+import tracemalloc
+
+from bench_utils import load_base_config, make_config, quiet, SIMULATOR_DIR
+
+from src.Simulation import Simulation
+from src.DataLogger import DataLogger
+
+PROFILES = {
+    'quick': {
+        'simulation': {'days': 30, 'minutes': 15},
+        'comparison': {'days': 7, 'minutes': 60},
+        'top_sites': 10,
+    },
+    'full': {
+        'simulation': {'days': 365, 'minutes': 15},
+        'comparison': {'days': 30, 'minutes': 60},
+        'top_sites': 20,
+    },
+}
+
+SEED = 519425893
+
+# Allocation sites inside these files are measurement noise
+_IGNORED_FILES = (tracemalloc.__file__, '<frozen importlib._bootstrap>',
+                  '<frozen importlib._bootstrap_external>')
+
+
+def traced(function, top_sites=10):
+    """
+    Run a function under tracemalloc.
+
+    Args:
+        function (callable): Zero-argument callable to measure
+        top_sites (int): Number of allocation sites to report
+
+    Returns:
+        tuple: (peak_bytes, retained_bytes, sites, value returned by function)
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        value = function()
+        retained, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    return peak, retained, top_allocation_sites(snapshot, top_sites), value
+
+
+def top_allocation_sites(snapshot, limit):
+    """
+    Summarize the largest allocation sites of a snapshot.
+
+    Args:
+        snapshot (tracemalloc.Snapshot): Snapshot to analyse
+        limit (int): Number of sites to return
+
+    Returns:
+        list: Dicts with location, size in bytes and allocation count
+    """
+    snapshot = snapshot.filter_traces(
+        [tracemalloc.Filter(False, filename) for filename in _IGNORED_FILES]
+    )
+    sites = []
+    for stat in snapshot.statistics('lineno')[:limit]:
+        frame = stat.traceback[0]
+        filename = frame.filename
+        if filename.startswith(SIMULATOR_DIR):
+            filename = os.path.relpath(filename, SIMULATOR_DIR)
+        sites.append({
+            'location': f"{filename}:{frame.lineno}",
+            'size_bytes': stat.size,
+            'count': stat.count
+        })
+    return sites
+
+
+def _memory_record(name, steps, peak, retained, sites, params=None):
+    """Build a memory benchmark record."""
+    return {
+        'name': name,
+        'group': 'memory',
+        'params': params or {},
+        'steps': steps,
+        'peak_bytes': peak,
+        'retained_bytes': retained,
+        'metric': 'bytes_per_step',
+        'higher_is_better': False,
+        'bytes_per_step': peak / steps if steps else 0,
+        'top_allocation_sites': sites
+    }
+
+
+def _config(base_config, days, minutes):
+    """Build a reproducible benchmark configuration."""
+    return make_config(
+        base_config,
+        simulation={'duration_days': days, 'time_step_minutes': minutes, 'random_seed': SEED}
+    )
+
+
+def bench_simulation_run(config, top_sites):
+    """Peak memory of Simulation.run (construction excluded)."""
+    with quiet():
+        sim = Simulation(config=config)
+        peak, retained, sites, results = traced(sim.run, top_sites)
+    steps = len(results['data']['hourly_data'])
+    params = {'duration_days': config['simulation']['duration_days'],
+              'time_step_minutes': config['simulation']['time_step_minutes']}
+    name = f"memory/simulation.run/step={params['time_step_minutes']}m/days={params['duration_days']}"
+    return _memory_record(name, steps, peak, retained, sites, params), results
+
+
+def bench_iter_steps(config, top_sites):
+    """Peak memory of streaming a run with Simulation.iter_steps (records dropped)."""
+    def consume():
+        steps = 0
+        for _ in sim.iter_steps():
+            steps += 1
+        return steps
+
+    with quiet():
+        sim = Simulation(config=config)
+        peak, retained, sites, steps = traced(consume, top_sites)
+    params = {'duration_days': config['simulation']['duration_days'],
+              'time_step_minutes': config['simulation']['time_step_minutes']}
+    name = f"memory/simulation.iter_steps/step={params['time_step_minutes']}m/days={params['duration_days']}"
+    return _memory_record(name, steps, peak, retained, sites, params)
+
+
+def bench_compile_results(config, top_sites):
+    """Peak memory of Simulation._compile_results after an untraced step loop."""
+    with quiet():
+        sim = Simulation(config=config)
+        sim.hourly_data.extend(sim.iter_steps())
+        peak, retained, sites, _ = traced(sim._compile_results, top_sites)
+    steps = len(sim.hourly_data)
+    params = {'duration_days': config['simulation']['duration_days'],
+              'time_step_minutes': config['simulation']['time_step_minutes']}
+    name = f"memory/simulation._compile_results/step={params['time_step_minutes']}m/days={params['duration_days']}"
+    return _memory_record(name, steps, peak, retained, sites, params)
+
+
+def bench_save_all(results, config, top_sites):
+    """Peak memory of DataLogger.save_all for existing results."""
+    output_dir = tempfile.mkdtemp(prefix='greengrid_bench_')
+    try:
+        with quiet():
+            logger = DataLogger(results, config, output_dir=output_dir)
+            peak, retained, sites, _ = traced(logger.save_all, top_sites)
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+    steps = len(results['data']['hourly_data'])
+    params = {'duration_days': config['simulation']['duration_days'],
+              'time_step_minutes': config['simulation']['time_step_minutes']}
+    name = f"memory/datalogger.save_all/step={params['time_step_minutes']}m/days={params['duration_days']}"
+    return _memory_record(name, steps, peak, retained, sites, params)
+
+
+def bench_comparison(config, top_sites):
+    """
+    Peak memory of the full comparison (3 strategies + 1 full-year seasonal run + report).
+
+    Bytes per step are relative to the steps of all four simulations. The
+    seasonal run only returns its per-season breakdown, so its steps are
+    counted from the days of each season.
+    """
+    import compare_strategies
+
+    def run():
+        strategy_results = compare_strategies.run_strategy_comparison(config)
+        season_results = compare_strategies.run_season_comparison(config)
+        compare_strategies.generate_comparison_report(strategy_results, season_results, config)
+        return strategy_results, season_results
+
+    with quiet():
+        peak, retained, sites, (strategy_results, season_results) = traced(run, top_sites)
+
+    steps_per_day = 24 * 60 // config['simulation']['time_step_minutes']
+    steps = (sum(len(r['data']['hourly_data']) for r in strategy_results.values())
+             + sum(breakdown['days'] for breakdown in season_results.values()) * steps_per_day)
+    params = {'duration_days': config['simulation']['duration_days'],
+              'time_step_minutes': config['simulation']['time_step_minutes'],
+              'simulations': len(strategy_results) + 1}
+    name = f"memory/compare_strategies/step={params['time_step_minutes']}m/days={params['duration_days']}"
+    return _memory_record(name, steps, peak, retained, sites, params)
+
+
+def _print_record(record):
+    """Print one memory record with its largest allocation sites."""
+    print(f"  {record['name']:<55} peak {record['peak_bytes']/1e6:>8.2f} MB "
+          f"| {record['bytes_per_step']:>9,.0f} B/step")
+    for site in record['top_allocation_sites'][:3]:
+        print(f"      {site['size_bytes']/1e6:>8.2f} MB  {site['count']:>8} blocks  {site['location']}")
+
+
+def run(profile_name='quick'):
+    """
+    Run the complete memory suite.
+
+    Args:
+        profile_name (str): 'quick' or 'full'
+
+    Returns:
+        list: Benchmark records
+    """
+    profile = PROFILES[profile_name]
+    base_config = load_base_config()
+    top_sites = profile['top_sites']
+
+    sim_config = _config(base_config, profile['simulation']['days'], profile['simulation']['minutes'])
+    comparison_config = _config(base_config, profile['comparison']['days'], profile['comparison']['minutes'])
+
+    print("Peak traced memory (tracemalloc):")
+    run_record, results = bench_simulation_run(sim_config, top_sites)
+    records = [
+        run_record,
+        bench_iter_steps(sim_config, top_sites),
+        bench_compile_results(sim_config, top_sites),
+        bench_save_all(results, sim_config, top_sites),
+        bench_comparison(comparison_config, top_sites),
+    ]
+
+    for record in records:
+        _print_record(record)
+
+    return records
@@ -0,0 +1,88 @@
+"""
+Startup Benchmarks - Wall time of the entry scripts until they answer
+
+Measures, in fresh interpreter processes:
+- `main.py --help`, `main.py --check` and `compare_strategies.py --help`,
+  which must not import the simulation modules (simpy, numpy)
+- `import src.Simulation`, the cost those commands avoid
+- The bare interpreter start, as a floor for the numbers above
+
+Each record reports the best wall time in milliseconds (lower is better)
+and whether simpy was imported, so an eager import sneaking back into the
+command line path shows up as a regression.
+"""
+
+import subprocess
+import sys
+import time
+
+from bench_utils import SIMULATOR_DIR
+
+PROFILES = {
+    'quick': {'repeat': 5},
+    'full': {'repeat': 20},
+}
+
+# Record name -> interpreter arguments (run in SIMULATOR_DIR)
+COMMANDS = {
+    'startup/python': ['-c', 'pass'],
+    'startup/main.py --help': ['main.py', '--help'],
+    'startup/main.py --check': ['main.py', '--check'],
+    'startup/compare_strategies.py --help': ['compare_strategies.py', '--help'],
+    'startup/import src.Simulation': ['-c', 'import src.Simulation'],
+}
+
+
+def bench_command(name, arguments, repeat):
+    """
+    Time a command in fresh interpreters (best of repeat).
+
+    Returns:
+        dict: Benchmark record (milliseconds)
+    """
+    command = [sys.executable] + arguments
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=SIMULATOR_DIR, check=True, stdout=subprocess.DEVNULL)
+        best = min(best, time.perf_counter() - start)
+
+    # One more run with -X importtime to see what was imported
+    traced = subprocess.run([sys.executable, '-X', 'importtime'] + arguments, cwd=SIMULATOR_DIR,
+                            check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    modules = [line.rsplit('|', 1)[-1].strip() for line in traced.stderr.splitlines()
+               if line.startswith('import time:')]
+
+    return {
+        'name': name,
+        'group': 'startup',
+        'params': {'command': ' '.join(arguments)},
+        'seconds': best,
+        'metric': 'milliseconds',
+        'higher_is_better': False,
+        'milliseconds': best * 1000,
+        'modules_imported': len(modules),
+        'imports_simpy': 'simpy' in modules
+    }
+
+
+def run(profile_name='quick'):
+    """
+    Run the complete startup suite.
+
+    Args:
+        profile_name (str): 'quick' or 'full'
+
+    Returns:
+        list: Benchmark records
+    """
+    profile = PROFILES[profile_name]
+
+    print("Entry script startup (fresh interpreter, best wall time):")
+    records = []
+    for name, arguments in COMMANDS.items():
+        record = bench_command(name, arguments, profile['repeat'])
+        simpy = "simpy loaded" if record['imports_simpy'] else ""
+        print(f"  {name:<55} {record['milliseconds']:>9,.0f} ms  {simpy}")
+        records.append(record)
+    return records
@@ -0,0 +1,649 @@
+"""
+Throughput Benchmarks - Steps per second of the simulation engine
+
+Measures:
+- Simulation.run across time steps, durations, strategies and component counts
+- FleetSimulation.run (home-steps per second) for growing fleet sizes
+- Micro-benchmarks for EnergyManagementSystem.distribute_energy,
+  Battery.charge/discharge, Load.generate, InverterBank steps for 1 to
+  1000 units, DataLogger.save_all (plain and
+  gzip-compressed CSVs), re-billing a run under many tariffs, the
+  optimal dispatch solver and cloud series generation over multi-year
+  horizons (daily draws, step-by-step Markov chain, vectorized Markov)
+- Simulate-and-export pipelines: DataLogger.save_all after each run versus
+  AsyncExporter with thread or process writers (runs per second), on the
+  local disk and on simulated slow storage
+
+Each benchmark produces a record with a `metric` (higher is better) so
+results from different runs can be compared with run_benchmarks.py.
+"""
+
+import contextlib
+import importlib
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from bench_utils import load_base_config, make_config, quiet, best_of
+
+from src.Simulation import Simulation
+from src.FleetSimulation import FleetSimulation
+from src.Battery import Battery
+from src.Grid import Grid
+from src.Load import Load
+from src.InverterBank import InverterBank
+from src.CloudCoverage import CloudCoverage
+from src.MarkovCloudCoverage import MarkovCloudCoverage
+from src.EnergyManagementSystem import EnergyManagementSystem
+from src.DataLogger import DataLogger
+from src.AsyncExporter import AsyncExporter
+from src.Tariff import bill_results
+from src.OptimalDispatch import optimal_results
+
+STRATEGIES = ['LOAD_PRIORITY', 'CHARGE_PRIORITY', 'PRODUCE_PRIORITY']
+
+# Benchmark matrices. 'quick' is meant for every change, 'full' for releases.
+PROFILES = {
+    'quick': {
+        'repeat': 3,
+        'time_steps': {'minutes': [1, 5, 15, 60], 'days': 1},
+        'durations': {'days': [1, 30, 365], 'minutes': 60},
+        'strategies': {'days': 30, 'minutes': 60},
+        'counts': {'counts': [1, 4, 16], 'days': 30, 'minutes': 60},
+        'adaptive': {'minutes': [1, 5], 'days': 1},
+        'fleet': {'homes': [100, 1000, 10000], 'days': 30, 'minutes': 60},
+        'micro_calls': 20000,
+        'logger_days': 30,
+        'cloud_years': [1, 10],
+        'export': {'runs': 6, 'days': 30, 'minutes': 15, 'storage_mb_per_s': 5},
+    },
+    'full': {
+        'repeat': 3,
+        'time_steps': {'minutes': [1, 5, 15, 60], 'days': 30},
+        'durations': {'days': [1, 30, 365, 3650], 'minutes': 60},
+        'strategies': {'days': 365, 'minutes': 60},
+        'counts': {'counts': [1, 4, 16, 64], 'days': 365, 'minutes': 60},
+        'adaptive': {'minutes': [1, 5], 'days': 30},
+        'fleet': {'homes': [100, 1000, 10000], 'days': 365, 'minutes': 60},
+        'micro_calls': 200000,
+        'logger_days': 365,
+        'cloud_years': [1, 10, 30],
+        'export': {'runs': 12, 'days': 365, 'minutes': 15, 'storage_mb_per_s': 5},
+    },
+}
+
+SEED = 519425893
+
+
+def _simulation_config(base_config, days, minutes, strategy='LOAD_PRIORITY', count=1, adaptive=False):
+    """Build a reproducible config for one simulation benchmark."""
+    return make_config(
+        base_config,
+        simulation={'duration_days': days, 'time_step_minutes': minutes, 'random_seed': SEED,
+                    'adaptive_stepping': adaptive},
+        energy_management={'strategy': strategy},
+        battery={'count': count},
+        solar={'count': count},
+        inverter={'count': count}
+    )
+
+
+def bench_simulation(config, repeat):
+    """
+    Time Simulation.run for one configuration.
+
+    Construction is excluded; only run() (loop + result compilation) is timed.
+
+    Args:
+        config (dict): Simulation configuration
+        repeat (int): Number of timed runs (fastest is kept)
+
+    Returns:
+        dict: Benchmark record
+    """
+    days = config['simulation']['duration_days']
+    minutes = config['simulation']['time_step_minutes']
+    strategy = config['energy_management']['strategy']
+    count = config['battery']['count']
+    adaptive = config['simulation'].get('adaptive_stepping', False)
+    steps = (days * 24 * 60) // minutes
+
+    best = float('inf')
+    for _ in range(repeat):
+        with quiet():
+            sim = Simulation(config=config)
+            start = time.perf_counter()
+            sim.run()
+            best = min(best, time.perf_counter() - start)
+
+    return {
+        'name': f"simulation/step={minutes}m/days={days}/{strategy}/count={count}"
+                + ("/adaptive" if adaptive else ""),
+        'group': 'simulation',
+        'params': {'time_step_minutes': minutes, 'duration_days': days,
+                   'strategy': strategy, 'component_count': count, 'adaptive_stepping': adaptive},
+        'steps': steps,
+        'seconds': best,
+        'metric': 'steps_per_second',
+        'higher_is_better': True,
+        'steps_per_second': steps / best
+    }
+
+
+def simulation_benchmarks(profile, base_config=None):
+    """
+    Run the Simulation.run benchmark matrix for a profile.
+
+    Args:
+        profile (dict): Entry of PROFILES
+        base_config (dict, optional): Base configuration (config.json if None)
+
+    Returns:
+        list: Benchmark records
+    """
+    base_config = base_config or load_base_config()
+    repeat = profile['repeat']
+    configs = []
+
+    for minutes in profile['time_steps']['minutes']:
+        configs.append(_simulation_config(base_config, profile['time_steps']['days'], minutes))
+
+    for days in profile['durations']['days']:
+        configs.append(_simulation_config(base_config, days, profile['durations']['minutes']))
+
+    for strategy in STRATEGIES:
+        configs.append(_simulation_config(base_config, profile['strategies']['days'],
+                                          profile['strategies']['minutes'], strategy=strategy))
+
+    for count in profile['counts']['counts']:
+        configs.append(_simulation_config(base_config, profile['counts']['days'],
+                                          profile['counts']['minutes'], count=count))
+
+    for minutes in profile['adaptive']['minutes']:
+        configs.append(_simulation_config(base_config, profile['adaptive']['days'], minutes, adaptive=True))
+
+    # The matrices overlap (e.g. 30 days / 60 min / LOAD_PRIORITY / count 1)
+    records = {}
+    for config in configs:
+        record = bench_simulation(config, repeat)
+        if record['name'] not in records:
+            records[record['name']] = record
+            print(f"  {record['name']:<55} {record['steps_per_second']:>12,.0f} steps/s")
+
+    return list(records.values())
+
+
+def bench_fleet(base_config, homes, days, minutes, repeat):
+    """
+    Time FleetSimulation.run for one fleet size (construction excluded).
+
+    Uses a mixed-strategy fleet with the feeder cap at half the homes' own
+    export limits so the capped dispatch path is exercised.
+
+    Returns:
+        dict: Benchmark record (home-steps per second)
+    """
+    config = make_config(
+        base_config,
+        simulation={'duration_days': days, 'time_step_minutes': minutes, 'random_seed': SEED},
+        fleet={'homes': homes,
+               'feeder_export_limit_kw': homes * base_config['grid']['export_limit_kw'] / 2,
+               'strategy_mix': {'LOAD_PRIORITY': 0.6, 'CHARGE_PRIORITY': 0.3, 'PRODUCE_PRIORITY': 0.1},
+               'size_variation': 0.2, 'cloud_variation': 0.05}
+    )
+    steps = (days * 24 * 60) // minutes
+
+    best = float('inf')
+    for _ in range(repeat):
+        with quiet():
+            fleet = FleetSimulation(config=config)
+            start = time.perf_counter()
+            fleet.run()
+            best = min(best, time.perf_counter() - start)
+
+    return {
+        'name': f"fleet/homes={homes}/step={minutes}m/days={days}",
+        'group': 'fleet',
+        'params': {'homes': homes, 'time_step_minutes': minutes, 'duration_days': days},
+        'steps': steps,
+        'seconds': best,
+        'metric': 'home_steps_per_second',
+        'higher_is_better': True,
+        'home_steps_per_second': homes * steps / best
+    }
+
+
+def fleet_benchmarks(profile, base_config=None):
+    """
+    Run the FleetSimulation.run benchmarks for a profile.
+
+    Args:
+        profile (dict): Entry of PROFILES
+        base_config (dict, optional): Base configuration (config.json if None)
+
+    Returns:
+        list: Benchmark records
+    """
+    base_config = base_config or load_base_config()
+    fleet = profile['fleet']
+    records = []
+    for homes in fleet['homes']:
+        record = bench_fleet(base_config, homes, fleet['days'], fleet['minutes'], profile['repeat'])
+        print(f"  {record['name']:<55} {record['home_steps_per_second']:>12,.0f} home-steps/s")
+        records.append(record)
+    return records
+
+
+def _micro_record(name, calls, seconds, params=None):
+    """Build a record for a micro-benchmark."""
+    return {
+        'name': name,
+        'group': 'micro',
+        'params': params or {},
+        'calls': calls,
+        'seconds': seconds,
+        'metric': 'calls_per_second',
+        'higher_is_better': True,
+        'calls_per_second': calls / seconds
+    }
+
+
+def bench_distribute_energy(strategy, calls, repeat):
+    """Micro-benchmark EnergyManagementSystem.distribute_energy."""
+    rng = random.Random(SEED)
+    inputs = [(rng.uniform(0, 6), rng.uniform(0.5, 4)) for _ in range(calls)]
+
+    def run():
+        battery = Battery(capacity_kwh=13.5, efficiency=0.9, min_soc=0.05)
+        grid = Grid(import_cost_per_kwh=0.0075, export_revenue_per_kwh=0.009, export_limit_kw=20.0)
+        ems = EnergyManagementSystem(strategy=strategy)
+        distribute = ems.distribute_energy
+        for solar_kw, load_kw in inputs:
+            distribute(solar_kw, load_kw, battery, grid, 0.25)
+
+    seconds, _ = best_of(run, repeat)
+    return _micro_record(f"micro/ems.distribute_energy/{strategy}", calls, seconds,
+                         {'strategy': strategy})
+
+
+def bench_battery(calls, repeat):
+    """Micro-benchmark alternating Battery.charge / Battery.discharge calls."""
+    def run():
+        battery = Battery(capacity_kwh=13.5, efficiency=0.9, min_soc=0.05)
+        charge = battery.charge
+        discharge = battery.discharge
+        for _ in range(calls // 2):
+            charge(1.5)
+            discharge(1.2)
+
+    seconds, _ = best_of(run, repeat)
+    return _micro_record("micro/battery.charge_discharge", calls, seconds)
+
+
+def bench_load(calls, repeat):
+    """Micro-benchmark Load.generate over all hours of the day."""
+    hours = [(i % 96) / 4.0 for i in range(calls)]
+
+    def run():
+        random.seed(SEED)
+        load = Load(base_load_kw=0.5, peak_hours_max_kw=3.0, peak_hours_start=18, peak_hours_end=21)
+        generate = load.generate
+        for hour in hours:
+            generate(hour)
+
+    seconds, _ = best_of(run, repeat)
+    return _micro_record("micro/load.generate", calls, seconds)
+
+
+def bench_inverter_bank(units, calls, repeat):
+    """Micro-benchmark InverterBank steps (apply_limit + update, daily check_failure)."""
+    def run():
+        bank = InverterBank(unit_max_output_kw=4.0, count=units, failure_rate=0.005, rng=random.Random(SEED))
+        apply_limit = bank.apply_limit
+        update = bank.update
+        for step in range(calls):
+            apply_limit(5.0)
+            update(0.25)
+            if step % 96 == 95:
+                bank.check_failure()
+
+    seconds, _ = best_of(run, repeat)
+    return _micro_record(f"micro/inverter_bank.step/{units}", calls, seconds, {'units': units})
+
+
+def bench_data_logger(base_config, days, repeat, compression=None):
+    """
+    Benchmark DataLogger.save_all on the results of a 60-minute run,
+    optionally with compressed CSVs.
+
+    Metric is exported hourly rows per second.
+    """
+    config = _simulation_config(base_config, days, 60)
+    with quiet():
+        results = Simulation(config=config).run()
+    config['output'] = {'compression': compression}
+    rows = len(results['data']['hourly_data'])
+
+    def run():
+        output_dir = tempfile.mkdtemp(prefix='greengrid_bench_')
+        try:
+            with quiet():
+                DataLogger(results, config, output_dir=output_dir).save_all()
+        finally:
+            shutil.rmtree(output_dir, ignore_errors=True)
+
+    seconds, _ = best_of(run, repeat)
+    suffix = f"/compression={compression}" if compression else ""
+    return {
+        'name': f"micro/datalogger.save_all/days={days}{suffix}",
+        'group': 'micro',
+        'params': {'duration_days': days, 'compression': compression},
+        'rows': rows,
+        'seconds': seconds,
+        'metric': 'rows_per_second',
+        'higher_is_better': True,
+        'rows_per_second': rows / seconds
+    }
+
+
+def bench_tariff_billing(base_config, days, tariffs, repeat):
+    """
+    Benchmark re-billing the results of a 15-minute run under many
+    time-of-use tariffs with tiers and a demand charge.
+
+    Metric is tariffs billed per second.
+    """
+    config = _simulation_config(base_config, days, 15)
+    with quiet():
+        results = Simulation(config=config).run()
+
+    candidates = [{
+        'name': f"candidate {i}",
+        'import': {
+            'default_rate': 0.0075,
+            'periods': [{'rate': 0.01 + i * 0.001, 'start_hour': 18, 'end_hour': 22, 'days': 'weekday'}],
+            'tiers': [{'up_to_kwh': 300, 'adder': 0.0}, {'up_to_kwh': None, 'adder': 0.002}]
+        },
+        'export': {'default_rate': 0.009},
+        'demand_charges': [{'rate_per_kw': 0.5, 'start_hour': 18, 'end_hour': 22}]
+    } for i in range(tariffs)]
+
+    seconds, _ = best_of(lambda: bill_results(candidates, results, config), repeat)
+    return {
+        'name': f"micro/tariff.bill_results/tariffs={tariffs}/days={days}",
+        'group': 'micro',
+        'params': {'duration_days': days, 'tariffs': tariffs},
+        'steps': len(results['data']['hourly_data']),
+        'seconds': seconds,
+        'metric': 'tariffs_per_second',
+        'higher_is_better': True,
+        'tariffs_per_second': tariffs / seconds
+    }
+
+
+def bench_optimal_dispatch(base_config, days, repeat):
+    """
+    Benchmark the perfect-foresight dynamic program over an hourly run.
+
+    Metric is time steps solved per second.
+    """
+    config = _simulation_config(base_config, days, 60)
+    with quiet():
+        results = Simulation(config=config).run()
+
+    seconds, _ = best_of(lambda: optimal_results(results, config), repeat)
+    steps = len(results['data']['hourly_data'])
+    return {
+        'name': f"micro/optimal_dispatch.solve/days={days}",
+        'group': 'micro',
+        'params': {'duration_days': days},
+        'steps': steps,
+        'seconds': seconds,
+        'metric': 'steps_per_second',
+        'higher_is_better': True,
+        'steps_per_second': steps / seconds
+    }
+
+
+def bench_cloud_generation(model, years, repeat, resolution_minutes=15):
+    """
+    Benchmark generating a cloud series over a multi-year horizon.
+
+    Models: 'daily' (CloudCoverage, one draw per day), 'markov_loop' (the
+    Markov chain sampled period by period in Python, the reference) and
+    'markov' (MarkovCloudCoverage, vectorized). Metric is periods of
+    resolution_minutes generated per second.
+    """
+    days = 365 * years
+    periods = days * (1440 // resolution_minutes)
+
+    def run():
+        rng = random.Random(SEED)
+        if model == 'daily':
+            clouds = CloudCoverage(season='spring', rng=rng)
+            for _ in range(days):
+                clouds.get_daily_coverage()
+        elif model == 'markov_loop':
+            clouds = MarkovCloudCoverage(season='spring', rng=rng, resolution_minutes=resolution_minutes)
+            rows = clouds.transition_matrices[0].tolist()
+            levels = range(MarkovCloudCoverage.LEVELS)
+            level = 0
+            for _ in range(periods):
+                level = rng.choices(levels, weights=rows[level])[0]
+                low, high = CloudCoverage.COVERAGE_RANGES[level]
+                rng.uniform(low, high)
+        else:
+            MarkovCloudCoverage(season='spring', rng=rng, resolution_minutes=resolution_minutes).generate(periods)
+
+    seconds, _ = best_of(run, repeat)
+    return {
+        'name': f"micro/clouds.generate/{model}/years={years}",
+        'group': 'micro',
+        'params': {'model': model, 'years': years, 'resolution_minutes': resolution_minutes},
+        'periods': periods,
+        'seconds': seconds,
+        'metric': 'periods_per_second',
+        'higher_is_better': True,
+        'periods_per_second': periods / seconds
+    }
+
+
+class _SlowStorageFile:
+    """
+    File whose close() waits as long as its bytes take to write at a given
+    rate, like a network filesystem that flushes on close. The wait releases
+    the GIL, as a blocking write would.
+    """
+
+    def __init__(self, path, mode, mb_per_s, **kwargs):
+        self._path = path
+        self._file = open(path, mode, **kwargs)
+        self._mb_per_s = mb_per_s
+
+    def __getattr__(self, name):
+        return getattr(self._file, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        if self._file.closed:
+            return
+        self._file.close()
+        time.sleep(os.path.getsize(self._path) / (self._mb_per_s * 1e6))
+
+
+@contextlib.contextmanager
+def _slow_storage(mb_per_s):
+    """Route the files DataLogger writes through _SlowStorageFile (None = local disk)."""
+    if mb_per_s is None:
+        yield
+        return
+
+    def slow_open(path, mode='r', **kwargs):
+        return _SlowStorageFile(path, mode, mb_per_s, **kwargs)
+
+    # Module globals shadow the builtin; forked writer processes inherit them
+    modules = [importlib.import_module(name) for name in ('src.CompressedIO', 'src.DataLogger')]
+    for module in modules:
+        module.open = slow_open
+    try:
+        yield
+    finally:
+        for module in modules:
+            del module.open
+
+
+def bench_export_pipeline(base_config, runs, days, minutes, mode, repeat, storage_mb_per_s=None):
+    """
+    Time simulating and exporting a batch of runs (like a sweep that keeps
+    every run folder).
+
+    mode is 'sync' (DataLogger.save_all after each run), 'thread' or
+    'process' (AsyncExporter with two writers, so the next run overlaps the
+    export).
+
+    Most of an export is CSV formatting, which is CPU work: threads cannot
+    overlap it with the simulation (GIL), and processes only can on spare
+    cores. On a local disk the writes land in the page cache, so the
+    background modes are no faster than sync (slightly slower on one core).
+    storage_mb_per_s simulates slow storage (e.g. a network share) where the
+    export waits on I/O; that wait is what the background writers overlap.
+
+    Returns:
+        dict: Benchmark record (runs per second)
+    """
+    configs = [_simulation_config(base_config, days, minutes) for _ in range(runs)]
+    for seed, config in enumerate(configs):
+        config['simulation']['random_seed'] = SEED + seed
+
+    def run():
+        output_dir = tempfile.mkdtemp(prefix='greengrid_bench_')
+        try:
+            with quiet(), _slow_storage(storage_mb_per_s):
+                if mode == 'sync':
+                    for config in configs:
+                        results = Simulation(config=config).run()
+                        DataLogger(results, config, output_dir=output_dir).save_all()
+                else:
+                    with AsyncExporter(workers=2, max_pending=2, processes=mode == 'process',
+                                       output_dir=output_dir) as exporter:
+                        for config in configs:
+                            exporter.submit(Simulation(config=config).run(), config)
+        finally:
+            shutil.rmtree(output_dir, ignore_errors=True)
+
+    seconds, _ = best_of(run, repeat)
+    storage = f"/storage={storage_mb_per_s}MBps" if storage_mb_per_s is not None else ""
+    return {
+        'name': f"export/{mode}{storage}/runs={runs}/step={minutes}m/days={days}",
+        'group': 'export',
+        'params': {'mode': mode, 'runs': runs, 'time_step_minutes': minutes, 'duration_days': days,
+                   'storage_mb_per_s': storage_mb_per_s},
+        'runs': runs,
+        'seconds': seconds,
+        'metric': 'runs_per_second',
+        'higher_is_better': True,
+        'runs_per_second': runs / seconds
+    }
+
+
+def export_benchmarks(profile, base_config=None):
+    """
+    Run the simulate-and-export pipeline benchmarks for a profile.
+
+    Args:
+        profile (dict): Entry of PROFILES
+        base_config (dict, optional): Base configuration (config.json if None)
+
+    Returns:
+        list: Benchmark records
+    """
+    base_config = base_config or load_base_config()
+    export = profile['export']
+    records = []
+    for storage_mb_per_s in [None, export['storage_mb_per_s']]:
+        for mode in ['sync', 'thread', 'process']:
+            record = bench_export_pipeline(base_config, export['runs'], export['days'], export['minutes'],
+                                           mode, profile['repeat'], storage_mb_per_s)
+            print(f"  {record['name']:<55} {record['runs_per_second']:>12,.2f} runs/s")
+            records.append(record)
+    return records
+
+
+def micro_benchmarks(profile, base_config=None):
+    """
+    Run all component micro-benchmarks for a profile.
+
+    Args:
+        profile (dict): Entry of PROFILES
+        base_config (dict, optional): Base configuration (config.json if None)
+
+    Returns:
+        list: Benchmark records
+    """
+    base_config = base_config or load_base_config()
+    repeat = profile['repeat']
+    calls = profile['micro_calls']
+
+    records = [bench_distribute_energy(strategy, calls, repeat) for strategy in STRATEGIES]
+    records.append(bench_battery(calls, repeat))
+    records.append(bench_load(calls, repeat))
+    records.extend(bench_inverter_bank(units, calls, repeat) for units in [1, 100, 1000])
+
+    for record in records:
+        print(f"  {record['name']:<55} {record['calls_per_second']:>12,.0f} calls/s")
+
+    for compression in [None, 'gzip']:
+        logger_record = bench_data_logger(base_config, profile['logger_days'], repeat, compression)
+        print(f"  {logger_record['name']:<55} {logger_record['rows_per_second']:>12,.0f} rows/s")
+        records.append(logger_record)
+
+    tariff_record = bench_tariff_billing(base_config, profile['logger_days'], 50, repeat)
+    print(f"  {tariff_record['name']:<55} {tariff_record['tariffs_per_second']:>12,.0f} tariffs/s")
+    records.append(tariff_record)
+
+    optimal_record = bench_optimal_dispatch(base_config, profile['logger_days'], repeat)
+    print(f"  {optimal_record['name']:<55} {optimal_record['steps_per_second']:>12,.0f} steps/s")
+    records.append(optimal_record)
+
+    for years in profile['cloud_years']:
+        for model in ['daily', 'markov_loop', 'markov']:
+            cloud_record = bench_cloud_generation(model, years, repeat)
+            print(f"  {cloud_record['name']:<55} {cloud_record['periods_per_second']:>12,.0f} periods/s")
+            records.append(cloud_record)
+
+    return records
+
+
+def run(profile_name='quick'):
+    """
+    Run the complete throughput suite.
+
+    Args:
+        profile_name (str): 'quick' or 'full'
+
+    Returns:
+        list: Benchmark records
+    """
+    profile = PROFILES[profile_name]
+    base_config = load_base_config()
+
+    print("Simulation.run throughput:")
+    records = simulation_benchmarks(profile, base_config)
+
+    print("\nFleetSimulation.run throughput:")
+    records.extend(fleet_benchmarks(profile, base_config))
+
+    print("\nComponent micro-benchmarks:")
+    records.extend(micro_benchmarks(profile, base_config))
+
+    print("\nSimulate-and-export pipelines:")
+    records.extend(export_benchmarks(profile, base_config))
+
+    return records
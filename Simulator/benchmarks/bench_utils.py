@@ -0,0 +1,219 @@
+"""
+Benchmark Utilities - Shared helpers for the GreenGrid benchmark suite
+
+Provides machine information, quiet execution of the (chatty) simulation
+components, JSON result files and baseline comparison.
+"""
+
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SIMULATOR_DIR = os.path.dirname(BENCH_DIR)
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+
+# Make `src` importable when benchmarks are run as scripts
+if SIMULATOR_DIR not in sys.path:
+    sys.path.insert(0, SIMULATOR_DIR)
+
+
+def load_base_config():
+    """Load the default configuration (config.json) used as benchmark base."""
+    with open(os.path.join(SIMULATOR_DIR, 'config.json'), 'r') as f:
+        return json.load(f)
+
+
+def make_config(base_config, **sections):
+    """
+    Build a benchmark configuration from a base config.
+
+    Args:
+        base_config (dict): Configuration to start from (not modified)
+        **sections: Section name -> dict of keys to override,
+            e.g. simulation={'duration_days': 1}
+
+    Returns:
+        dict: New configuration dict
+    """
+    config = json.loads(json.dumps(base_config))  # Deep copy
+    for section, values in sections.items():
+        config.setdefault(section, {}).update(values)
+    return config
+
+
+@contextlib.contextmanager
+def quiet():
+    """Silence stdout (Simulation and DataLogger print progress)."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def best_of(function, repeat):
+    """
+    Time a function several times and keep the fastest run.
+
+    Args:
+        function (callable): Zero-argument callable to time
+        repeat (int): Number of timed runs
+
+    Returns:
+        tuple: (best_seconds, value returned by the last call)
+    """
+    best = float('inf')
+    value = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = function()
+        best = min(best, time.perf_counter() - start)
+    return best, value
+
+
+def machine_info():
+    """
+    Describe the machine and software the benchmark ran on.
+
+    Returns:
+        dict: Machine information
+    """
+    info = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'python_version': platform.python_version(),
+        'python_implementation': platform.python_implementation(),
+    }
+
+    for module_name in ('simpy', 'numpy'):
+        try:
+            module = __import__(module_name)
+            info[f'{module_name}_version'] = getattr(module, '__version__', 'unknown')
+        except ImportError:
+            info[f'{module_name}_version'] = None
+
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=SIMULATOR_DIR, capture_output=True, text=True, timeout=5
+        )
+        info['git_commit'] = commit.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        info['git_commit'] = None
+
+    return info
+
+
+def write_results(suite, records, output_path=None):
+    """
+    Write benchmark records to a JSON file together with machine info.
+
+    Args:
+        suite (str): Suite name (used in the default file name)
+        records (list): Benchmark records
+        output_path (str, optional): Destination file
+
+    Returns:
+        str: Path to the written file
+    """
+    if output_path is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        output_path = os.path.join(RESULTS_DIR, f"{suite}_{timestamp}.json")
+
+    document = {
+        'suite': suite,
+        'machine': machine_info(),
+        'benchmarks': records
+    }
+
+    with open(output_path, 'w') as f:
+        json.dump(document, f, indent=2)
+
+    return output_path
+
+
+def load_results(path):
+    """Load a benchmark results JSON file."""
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def compare_results(baseline, current, threshold=0.10):
+    """
+    Compare two benchmark documents record by record.
+
+    Records are matched by name. Each record declares its metric and
+    whether higher values are better; a change worse than `threshold`
+    (relative) is flagged as a regression.
+
+    Args:
+        baseline (dict): Baseline results document
+        current (dict): Current results document
+        threshold (float): Allowed relative slowdown (0.10 = 10%)
+
+    Returns:
+        list: Comparison rows (dicts) for every benchmark present in both
+    """
+    baseline_records = {r['name']: r for r in baseline['benchmarks']}
+    rows = []
+
+    for record in current['benchmarks']:
+        reference = baseline_records.get(record['name'])
+        if reference is None:
+            continue
+
+        metric = record['metric']
+        old_value = reference.get(metric)
+        new_value = record.get(metric)
+        if not old_value or new_value is None:
+            continue
+
+        change = (new_value - old_value) / old_value
+        higher_is_better = record.get('higher_is_better', True)
+        worse = -change if higher_is_better else change
+
+        rows.append({
+            'name': record['name'],
+            'metric': metric,
+            'baseline': old_value,
+            'current': new_value,
+            'change': change,
+            'regression': worse > threshold
+        })
+
+    return rows
+
+
+def format_comparison(rows, threshold):
+    """
+    Format comparison rows as a text table.
+
+    Args:
+        rows (list): Output of compare_results()
+        threshold (float): Threshold used (for the header)
+
+    Returns:
+        str: Formatted table
+    """
+    lines = []
+    lines.append("=" * 100)
+    lines.append(f"BENCHMARK COMPARISON (regression threshold: {threshold*100:.1f}%)")
+    lines.append("=" * 100)
+    lines.append(f"{'Benchmark':<52} | {'Baseline':>12} | {'Current':>12} | {'Change':>8} | Status")
+    lines.append("-" * 100)
+    for row in rows:
+        status = "REGRESSION" if row['regression'] else "ok"
+        lines.append(f"{row['name']:<52} | {row['baseline']:>12.4g} | {row['current']:>12.4g} | "
+                     f"{row['change']*100:>+7.1f}% | {status}")
+    lines.append("-" * 100)
+    regressions = sum(1 for row in rows if row['regression'])
+    lines.append(f"{len(rows)} benchmarks compared, {regressions} regression(s)")
+    return "\n".join(lines)
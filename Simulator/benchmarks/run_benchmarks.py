@@ -0,0 +1,104 @@
+"""
+GreenGrid Simulation - Benchmark Suite
+
+Measures simulation throughput, memory use and entry script startup time
+so changes can be checked for speed and memory regressions, and compares
+result files against a baseline.
+
+Usage:
+    python3 benchmarks/run_benchmarks.py run [--suite all|throughput|memory|startup] [--profile quick|full] [--output FILE]
+    python3 benchmarks/run_benchmarks.py compare BASELINE.json CURRENT.json [--threshold 0.10]
+
+`compare` exits with status 1 when any benchmark regressed by more than
+the threshold (steps/second dropped, bytes/step or startup time grew), so
+it can be used in CI.
+
+Author: Team 3 - GreenGrid Project
+"""
+
+import argparse
+import sys
+
+import bench_utils
+
+
+def command_run(args):
+    """Run the benchmark suite and write results JSON."""
+    print("=" * 70)
+    print(f"GREENGRID BENCHMARKS - suite: {args.suite}, profile: {args.profile}")
+    print("=" * 70)
+
+    records = []
+    if args.suite in ('all', 'throughput'):
+        import bench_throughput
+        records.extend(bench_throughput.run(args.profile))
+
+    if args.suite in ('all', 'memory'):
+        import bench_memory
+        if records:
+            print("")
+        records.extend(bench_memory.run(args.profile))
+
+    if args.suite in ('all', 'startup'):
+        import bench_startup
+        if records:
+            print("")
+        records.extend(bench_startup.run(args.profile))
+
+    path = bench_utils.write_results(args.suite, records, args.output)
+
+    print(f"\nResults saved to: {path}")
+
+    if args.baseline:
+        return _compare(bench_utils.load_results(args.baseline),
+                        bench_utils.load_results(path), args.threshold)
+    return 0
+
+
+def command_compare(args):
+    """Compare two result files and flag regressions."""
+    return _compare(bench_utils.load_results(args.baseline),
+                    bench_utils.load_results(args.current), args.threshold)
+
+
+def _compare(baseline, current, threshold):
+    """Print the comparison table; return 1 if anything regressed."""
+    rows = bench_utils.compare_results(baseline, current, threshold)
+    print(bench_utils.format_comparison(rows, threshold))
+    return 1 if any(row['regression'] for row in rows) else 0
+
+
+def build_parser():
+    """Build the command line parser."""
+    parser = argparse.ArgumentParser(description="GreenGrid simulation benchmark suite")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help="Run benchmarks and save results JSON")
+    run_parser.add_argument('--suite', choices=['all', 'throughput', 'memory', 'startup'], default='all',
+                            help="Which benchmarks to run (default: all)")
+    run_parser.add_argument('--profile', choices=['quick', 'full'], default='quick',
+                            help="Benchmark matrix size (default: quick)")
+    run_parser.add_argument('--output', help="Output JSON path (default: benchmarks/results/)")
+    run_parser.add_argument('--baseline', help="Compare against this results file after running")
+    run_parser.add_argument('--threshold', type=float, default=0.10,
+                            help="Relative change counted as regression (default: 0.10)")
+    run_parser.set_defaults(handler=command_run)
+
+    compare_parser = subparsers.add_parser('compare', help="Compare two results files")
+    compare_parser.add_argument('baseline', help="Baseline results JSON")
+    compare_parser.add_argument('current', help="Current results JSON")
+    compare_parser.add_argument('--threshold', type=float, default=0.10,
+                                help="Relative change counted as regression (default: 0.10)")
+    compare_parser.set_defaults(handler=command_compare)
+
+    return parser
+
+
+def main(argv=None):
+    """Main execution function."""
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,7 +3,9 @@ GreenGrid Simulation - Strategy & Season Comparison Tool
 
 Automatically runs multiple simulations to compare:
 - Energy management strategies (LOAD, CHARGE, PRODUCE)
-- Seasonal effects (spring, summer, fall, winter)
+- Seasonal effects (spring, summer, fall, winter), from one full-year run
+  whose seasons follow the calendar
+- Optimality gap of each strategy vs. the offline optimal dispatch (DP)
 
 Uses the same random seed for fair comparisons.
 
@@ -11,17 +13,35 @@ Generates a comprehensive comparison report.
 
 Usage:
     python3 compare_strategies.py
+    python3 compare_strategies.py --yes --set simulation.duration_days=7
+    python3 compare_strategies.py --quiet --output-format json
 
 Author: Team 3 - GreenGrid Project
 """
 
-from src.Simulation import Simulation
+import argparse
 import json
 import os
+import sys
 from datetime import datetime
 
+from src.CommandLine import add_arguments, confirm, load_config, progress_output
+from src.ConfigSchema import check_config
+
+# Simulation modules are imported where they are used, so --help and
+# --check do not load simpy and numpy
+
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
+# Strategy result sections in the --output-format json document
+RESULT_SECTIONS = ['summary', 'financial', 'battery', 'reliability']
+
+def build_parser():
+    """Build the command line parser."""
+    parser = argparse.ArgumentParser(description="Compare energy management strategies and seasons")
+    add_arguments(parser, os.path.join(BASE_DIR, 'config.json'))
+    return parser
+
 def print_header():
     """Print comparison tool header."""
     print("\n" + "=" * 70)
@@ -33,9 +53,9 @@ def print_header():
     print("")
     print("    Strategy & Season Comparison Tool")
     print("=" * 70)
-    print("\nThis will run 7 simulations total:")
+    print("\nThis will run 4 simulations total:")
     print("  - 3 strategies x 1 season = 3 simulations (Strategy comparison)")
-    print("  - 1 strategy x 4 seasons = 4 simulations (Season comparison)")
+    print("  - 1 strategy x 1 year (4 seasons) = 1 simulation (Season comparison)")
     print("")
     print("WARNING: All comparisons use the SAME random seed for fair comparison.")
     print("   (Same weather, same load patterns, same failures)")
@@ -43,10 +63,9 @@ def print_header():
     print("This will take several minutes. Please be patient.")
     print("=" * 70)
 
-def load_base_config():
-    """Load base configuration from config.json."""
-    with open(os.path.join(BASE_DIR, 'config.json'), 'r') as f:
-        return json.load(f)
+def load_base_config(path=None, overrides=()):
+    """Load base configuration from config.json (or path) with --set overrides."""
+    return load_config(path or os.path.join(BASE_DIR, 'config.json'), overrides)
 
 def run_strategy_comparison(base_config):
     """
@@ -86,6 +105,8 @@ def run_strategy_comparison(base_config):
     print(f"  - Random Seed: {comparison_seed}")
     print("-" * 70)
     
+    from src.Simulation import Simulation
+    
     strategies = ['LOAD_PRIORITY', 'CHARGE_PRIORITY', 'PRODUCE_PRIORITY']
     results = {}
     
@@ -117,14 +138,56 @@ def run_strategy_comparison(base_config):
     print("\nStrategy comparison complete!")
     return results
 
+def run_optimal_dispatch(strategy_results, base_config):
+    """
+    Compute the cost-optimal battery schedule for the strategy comparison.
+    
+    All strategies see the same solar and load (same seed), so the series of
+    the LOAD_PRIORITY run are used as the known horizon. The schedule is
+    solved again at twice the SoC levels to estimate the discretization
+    error of the optimum.
+    
+    Returns:
+        dict: Results of the optimal dispatch (Simulation results layout),
+            plus 'discretization' with the net cost at twice the SoC levels
+    """
+    print("\n" + "=" * 70)
+    print("OPTIMAL DISPATCH BENCHMARK")
+    print("=" * 70)
+    print("Solving cost-minimizing battery schedule (dynamic programming)...")
+    
+    import time
+    from src.OptimalDispatch import optimal_results
+    start = time.perf_counter()
+    results = optimal_results(strategy_results['LOAD_PRIORITY'], base_config)
+    print(f"  Solved {len(results['data']['hourly_data'])} steps x "
+          f"{results['battery']['soc_levels']} SoC levels in {time.perf_counter() - start:.2f} s")
+    print(f"  Optimal net cost: ${results['financial']['net_cost']:.2f}")
+    
+    soc_levels = 2 * results['battery']['soc_levels']
+    refined = optimal_results(strategy_results['LOAD_PRIORITY'], base_config, soc_levels=soc_levels)
+    results['discretization'] = {
+        'soc_levels': soc_levels,
+        'net_cost': refined['financial']['net_cost'],
+        'error': results['financial']['net_cost'] - refined['financial']['net_cost']
+    }
+    print(f"  Net cost at {soc_levels} SoC levels: ${refined['financial']['net_cost']:.2f} "
+          f"(discretization error ${abs(results['discretization']['error']):.4f})")
+    
+    return results
+
 def run_season_comparison(base_config):
     """
     Compare all four seasons.
     
-    Uses the same random seed for fair comparison.
+    Runs one simulation from the configured start_date with season 'auto',
+    so the cloud model follows the calendar and the battery carries over
+    between seasons, and splits it into seasons (Simulation results['seasons']).
+    The run covers at least 365 days so that every season is present; a
+    shorter configured duration_days is extended with a warning.
     
     Returns:
-        dict: Results for each season
+        dict: Results sections for each season
     """
     print("\n" + "=" * 70)
     print("PART 2: SEASONAL COMPARISON")
@@ -148,51 +211,36 @@ def run_season_comparison(base_config):
         print("  (Comparisons will be reproducible)")
         print("")
     
-    print("Running simulations with:")
+    start_date = base_config['simulation']['start_date']
+    configured_days = base_config['simulation']['duration_days']
+    duration_days = max(configured_days, 365)
+    if duration_days != configured_days:
+        print(f"WARNING: duration_days is {configured_days}; the seasonal run is extended to "
+              f"{duration_days} days so that it covers all four seasons.")
+        print("")
+    
+    print("Running simulation with:")
     print(f"  - Strategy: {base_config['energy_management']['strategy']}")
-    print(f"  - Duration: {base_config['simulation']['duration_days']} days")
-    print(f"  - Seasons: spring, summer, fall, winter")
+    print(f"  - Duration: {duration_days} days from {start_date}")
+    print(f"  - Seasons: automatic (spring, summer, fall, winter)")
     print(f"  - Random Seed: {comparison_seed}")
     print("-" * 70)
     
-    seasons = {
-        'spring': '2024-03-01',
-        'summer': '2024-06-01',
-        'fall': '2024-09-01',
-        'winter': '2024-12-01'
-    }
-    results = {}
+    # Create modified config with deep copy
+    config = json.loads(json.dumps(base_config))  # Deep copy
+    config['simulation']['season'] = 'auto'
+    config['simulation']['duration_days'] = duration_days
+    config['simulation']['random_seed'] = comparison_seed
     
-    for i, (season, start_date) in enumerate(seasons.items(), 1):
-        print(f"\n[{i}/4] Running {season}...")
-        
-        # Create modified config with deep copy
-        config = json.loads(json.dumps(base_config))  # Deep copy
-        config['simulation']['season'] = season
-        config['simulation']['start_date'] = start_date
-        config['simulation']['random_seed'] = comparison_seed  # Same seed for all
-        
-        # Save temporary config
-        temp_config_path = os.path.join(BASE_DIR, f'temp_config_{season}.json')
-        with open(temp_config_path, 'w') as f:
-            json.dump(config, f, indent=2)
-        
-        # Run simulation
-        sim = Simulation(config_path=temp_config_path)
-        sim_results = sim.run()
-        
-        # Store results
-        results[season] = sim_results
-        
-        # Clean up temp config
-        os.remove(temp_config_path)
-        
-        print(f"  {season} completed")
+    from src.Simulation import Simulation
+    sim = Simulation(config=config)
+    results = sim.run()['seasons']
     
     print("\nSeasonal comparison complete!")
     return results
 
-def generate_comparison_report(strategy_results, season_results, base_config):
+def generate_comparison_report(strategy_results, season_results, base_config,
+                               optimal_result=None):
     """
     Generate comprehensive comparison report.
     
@@ -200,10 +248,14 @@ def generate_comparison_report(strategy_results, season_results, base_config):
         strategy_results (dict): Results from strategy comparison
         season_results (dict): Results from season comparison
         base_config (dict): Base configuration used
+        optimal_result (dict, optional): Results from run_optimal_dispatch;
+            adds the optimality gap of each strategy to the report
         
     Returns:
         str: Formatted report
     """
+    from src.ReportStatistics import ReportStatistics
+    
     report = []
     report.append("=" * 70)
     report.append("GREENGRID SIMULATION - COMPREHENSIVE COMPARISON REPORT")
@@ -388,6 +440,27 @@ def generate_comparison_report(strategy_results, season_results, base_config):
         report.append(f"  -> Savings vs worst: ${costs[worst_strategy] - costs[best_strategy]:.2f}")
     report.append("")
     
+    if optimal_result is not None:
+        optimal_cost = optimal_result['financial']['net_cost']
+        report.append("Optimality Gap (vs. offline optimal dispatch with perfect foresight):")
+        report.append("-" * 70)
+        report.append(f"{'Strategy':<30} | {'Net Cost ($)':>12} | {'Gap ($)':>12} | {'Gap (%)':>10}")
+        report.append("-" * 70)
+        for strategy, cost in costs.items():
+            gap = cost - optimal_cost
+            gap_pct = (gap / abs(optimal_cost) * 100) if optimal_cost else 0
+            report.append(f"{strategy:<30} | {cost:>12.2f} | {gap:>12.2f} | {gap_pct:>9.1f}%")
+        report.append(f"{'OPTIMAL (DP)':<30} | {optimal_cost:>12.2f} | {0:>12.2f} | {0:>9.1f}%")
+        report.append("-" * 70)
+        report.append(f"  -> Optimal self-sufficiency: {optimal_result['summary']['self_sufficiency_percent']:.2f}%")
+        report.append(f"  -> OPTIMAL (DP) is an approximate optimum (perfect foresight, "
+                      f"{optimal_result['battery']['soc_levels']} SoC levels)")
+        discretization = optimal_result.get('discretization')
+        if discretization:
+            report.append(f"  -> Discretization error: ${abs(discretization['error']):.4f} "
+                          f"(net cost ${discretization['net_cost']:.2f} at {discretization['soc_levels']} SoC levels)")
+        report.append("")
+    
     # ========== PART 3: SEASONAL COMPARISON ==========
     report.append("=" * 70)
     report.append("QUESTION 13 & 14: SEASONAL PERFORMANCE COMPARISON")
@@ -400,11 +473,21 @@ def generate_comparison_report(strategy_results, season_results, base_config):
     report.append(f"{'Metric':<30} | {'Spring':<10} | {'Summer':<10} | {'Fall':<10} | {'Winter':<10}")
     report.append("-" * 70)
     
-    # Cloud coverage
-    spring_cloud = sum(h['cloud_coverage'] for h in season_results['spring']['data']['hourly_data']) / len(season_results['spring']['data']['hourly_data'])
-    summer_cloud = sum(h['cloud_coverage'] for h in season_results['summer']['data']['hourly_data']) / len(season_results['summer']['data']['hourly_data'])
-    fall_cloud = sum(h['cloud_coverage'] for h in season_results['fall']['data']['hourly_data']) / len(season_results['fall']['data']['hourly_data'])
-    winter_cloud = sum(h['cloud_coverage'] for h in season_results['winter']['data']['hourly_data']) / len(season_results['winter']['data']['hourly_data'])
+    report.append(f"{'Days':<30} | "
+                 f"{season_results['spring']['days']:>10} | "
+                 f"{season_results['summer']['days']:>10} | "
+                 f"{season_results['fall']['days']:>10} | "
+                 f"{season_results['winter']['days']:>10}")
+    
+    # Cloud coverage (from the shared single-pass statistics of each run)
+    season_cloud = {
+        season: ReportStatistics.from_results(season_results[season], base_config)['average_cloud_coverage']
+        for season in ('spring', 'summer', 'fall', 'winter')
+    }
+    spring_cloud = season_cloud['spring']
+    summer_cloud = season_cloud['summer']
+    fall_cloud = season_cloud['fall']
+    winter_cloud = season_cloud['winter']
     
     report.append(f"{'Avg Cloud Coverage':<30} | "
                  f"{spring_cloud:>10.2f} | "
@@ -443,23 +526,21 @@ def generate_comparison_report(strategy_results, season_results, base_config):
     report.append("-" * 70)
     report.append("")
     
-    # Find best and worst seasons
+    # Find best and worst seasons (per day: seasons differ in length)
     season_solar = {
-        'spring': season_results['spring']['summary']['total_solar_generated_kwh'],
-        'summer': season_results['summer']['summary']['total_solar_generated_kwh'],
-        'fall': season_results['fall']['summary']['total_solar_generated_kwh'],
-        'winter': season_results['winter']['summary']['total_solar_generated_kwh']
+        season: season_results[season]['summary']['total_solar_generated_kwh'] / season_results[season]['days']
+        for season in ('spring', 'summer', 'fall', 'winter')
     }
     best_season = max(season_solar, key=season_solar.get)
     worst_season = min(season_solar, key=season_solar.get)
     
     report.append(f"Best Season for Solar Generation: {best_season.capitalize()}")
-    report.append(f"  -> Solar generated: {season_solar[best_season]:.2f} kWh")
-    report.append(f"  -> Cloud coverage: {eval(f'{best_season}_cloud'):.2f}")
+    report.append(f"  -> Solar generated: {season_solar[best_season]:.2f} kWh/day")
+    report.append(f"  -> Cloud coverage: {season_cloud[best_season]:.2f}")
     report.append("")
     report.append(f"Worst Season for Solar Generation: {worst_season.capitalize()}")
-    report.append(f"  -> Solar generated: {season_solar[worst_season]:.2f} kWh")
-    report.append(f"  -> Cloud coverage: {eval(f'{worst_season}_cloud'):.2f}")
+    report.append(f"  -> Solar generated: {season_solar[worst_season]:.2f} kWh/day")
+    report.append(f"  -> Cloud coverage: {season_cloud[worst_season]:.2f}")
     report.append(f"  -> {((season_solar[best_season] - season_solar[worst_season])/season_solar[worst_season]*100):.1f}% less than {best_season}")
     report.append("")
     
@@ -473,7 +554,8 @@ def generate_comparison_report(strategy_results, season_results, base_config):
     report.append("SUMMARY AND RECOMMENDATIONS")
     report.append("=" * 70)
     report.append("")
-    report.append(f"Based on {base_config['simulation']['duration_days']}-day simulations:")
+    report.append(f"Based on {base_config['simulation']['duration_days']}-day strategy simulations "
+                  f"and a full-year seasonal run:")
     report.append("")
     report.append(f"1. Best Overall Strategy: {best_strategy}")
     report.append(f"   - Lowest cost: ${costs[best_strategy]:.2f}")
@@ -481,8 +563,8 @@ def generate_comparison_report(strategy_results, season_results, base_config):
     report.append(f"   - {('Best' if best_strategy == best_reliability else 'Good')} reliability")
     report.append("")
     report.append(f"2. Best Season: {best_season.capitalize()}")
-    report.append(f"   - Highest solar generation: {season_solar[best_season]:.2f} kWh")
-    report.append(f"   - Lowest cloud coverage: {eval(f'{best_season}_cloud'):.2f}")
+    report.append(f"   - Highest solar generation: {season_solar[best_season]:.2f} kWh/day")
+    report.append(f"   - Lowest cloud coverage: {season_cloud[best_season]:.2f}")
     report.append("")
     report.append("3. System Sizing Recommendations:")
     
@@ -502,49 +584,88 @@ def generate_comparison_report(strategy_results, season_results, base_config):
     
     return "\n".join(report)
 
-def main():
+def comparison_document(strategy_results, season_results, optimal_result, report_filename):
+    """Build the --output-format json document."""
+    return {
+        'report': report_filename,
+        'strategies': {strategy: {section: results[section] for section in RESULT_SECTIONS}
+                       for strategy, results in strategy_results.items()},
+        'optimal': {section: optimal_result[section] for section in ('summary', 'financial', 'discretization')},
+        'seasons': {season: {key: value for key, value in results.items() if key != 'statistics'}
+                    for season, results in season_results.items()}
+    }
+
+def main(argv=None):
     """Main execution function."""
+    args = build_parser().parse_args(argv)
     try:
-        # Print header
-        print_header()
-        
-        # Confirm
-        response = input("\nPress ENTER to start comparisons (or Ctrl+C to cancel): ")
-        
-        # Load base configuration
-        print("\nLoading base configuration from config.json...")
-        base_config = load_base_config()
-        
-        # Ensure random_seed exists
-        if 'random_seed' not in base_config['simulation']:
-            base_config['simulation']['random_seed'] = None
-            print("  No random seed specified in config")
+        # Load and validate base configuration (before importing the simulation)
+        try:
+            base_config = load_base_config(args.config, args.overrides)
+            problems = check_config(base_config)
+        except ValueError as e:
+            problems = [str(e)]  # Malformed JSON or --set
+        if problems:
+            print(f"\nError: Invalid configuration ({args.config}):", file=sys.stderr)
+            for problem in problems:
+                print(f"   - {problem}", file=sys.stderr)
+            return 1
+        if args.check:
+            if not args.quiet:
+                print(f"Configuration OK: {args.config}")
+            return 0
         
-        # Run strategy comparison
-        strategy_results = run_strategy_comparison(base_config)
+        with progress_output(args):
+            # Print header
+            print_header()
+            
+            # Confirm
+            confirm("\nPress ENTER to start comparisons (or Ctrl+C to cancel): ", args)
+            
+            print(f"\nUsing base configuration from {os.path.basename(args.config)}")
+            
+            # Ensure random_seed exists
+            if 'random_seed' not in base_config['simulation']:
+                base_config['simulation']['random_seed'] = None
+                print("  No random seed specified in config")
+            
+            # Run strategy comparison
+            strategy_results = run_strategy_comparison(base_config)
+            
+            # Optimal dispatch benchmark for the same horizon
+            optimal_result = run_optimal_dispatch(strategy_results, base_config)
+            
+            # Run season comparison
+            season_results = run_season_comparison(base_config)
+            
+            # Generate report
+            print("\n" + "=" * 70)
+            print("GENERATING COMPARISON REPORT")
+            print("=" * 70)
+            
+            report = generate_comparison_report(strategy_results, season_results, base_config,
+                                                optimal_result)
+            
+            # Save report
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            results_dir = os.path.join(BASE_DIR, 'results')
+            report_filename = os.path.join(results_dir, f"comparison_report_{timestamp}.txt")
+            
+            os.makedirs(results_dir, exist_ok=True)
+            with open(report_filename, 'w') as f:
+                f.write(report)
         
-        # Run season comparison
-        season_results = run_season_comparison(base_config)
-        
-        # Generate report
-        print("\n" + "=" * 70)
-        print("GENERATING COMPARISON REPORT")
-        print("=" * 70)
-        
-        report = generate_comparison_report(strategy_results, season_results, base_config)
-        
-        # Save report
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        results_dir = os.path.join(BASE_DIR, 'results')
-        report_filename = os.path.join(results_dir, f"comparison_report_{timestamp}.txt")
-        
-        os.makedirs(results_dir, exist_ok=True)
-        with open(report_filename, 'w') as f:
-            f.write(report)
+        if args.output_format == 'json':
+            print(json.dumps(comparison_document(strategy_results, season_results, optimal_result,
+                                                 report_filename), indent=2))
+            return 0
         
         # Print report to console
         print("\n" + report)
         
+        if args.quiet:
+            return 0
+        
         # Print save location
         print(f"\nReport saved to: {report_filename}")
         
@@ -559,22 +680,21 @@ def main():
         return 0
         
     except KeyboardInterrupt:
-        print("\n\nComparison cancelled by user.")
+        print("\n\nComparison cancelled by user.", file=sys.stderr)
         return 1
     
     except FileNotFoundError as e:
-        print(f"\nError: Configuration file not found.")
-        print(f"   Make sure 'config.json' exists in the project root.")
-        print(f"   Details: {e}")
+        print(f"\nError: Configuration file not found.", file=sys.stderr)
+        print(f"   Make sure '{os.path.basename(args.config)}' exists (or pass --config).", file=sys.stderr)
+        print(f"   Details: {e}", file=sys.stderr)
         return 1
     
     except Exception as e:
-        print(f"\nError during comparison:")
-        print(f"   {type(e).__name__}: {e}")
+        print(f"\nError during comparison:", file=sys.stderr)
+        print(f"   {type(e).__name__}: {e}", file=sys.stderr)
         import traceback
         traceback.print_exc()
         return 1
 
 if __name__ == "__main__":
-    import sys
-    sys.exit(main())
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""
+GreenGrid Simulation - Trace Converter
+
+Converts a measured solar/load CSV trace into the binary format used for
+memory-mapped replay (see the "replay" section of config_template.json).
+
+The CSV needs a timestamp column and solar / load power columns in kW at
+a regular interval (e.g. 1-minute metering data).
+
+Usage:
+    python3 convert_trace.py measured.csv measured.bin
+    python3 convert_trace.py measured.csv measured.bin --solar-column pv_kw --load-column house_kw
+
+Author: Team 3 - GreenGrid Project
+"""
+
+import argparse
+import sys
+import time
+
+from src.TraceReplay import convert_csv_to_binary, metadata_path
+
+
+def build_parser():
+    """Build the command line parser."""
+    parser = argparse.ArgumentParser(description="Convert a CSV solar/load trace to binary replay format")
+    parser.add_argument('csv_path', help="Source CSV trace")
+    parser.add_argument('binary_path', help="Destination binary file (metadata goes to <binary_path>.json)")
+    parser.add_argument('--timestamp-column', default='timestamp', help="Timestamp column (default: timestamp)")
+    parser.add_argument('--solar-column', default='solar_kw', help="Solar power column in kW (default: solar_kw)")
+    parser.add_argument('--load-column', default='load_kw', help="Load power column in kW (default: load_kw)")
+    parser.add_argument('--chunk-rows', type=int, default=65536, help="Rows converted per chunk (default: 65536)")
+    return parser
+
+
+def main(argv=None):
+    """Main execution function."""
+    args = build_parser().parse_args(argv)
+
+    start = time.perf_counter()
+    try:
+        metadata = convert_csv_to_binary(
+            args.csv_path,
+            args.binary_path,
+            timestamp_column=args.timestamp_column,
+            solar_column=args.solar_column,
+            load_column=args.load_column,
+            chunk_rows=args.chunk_rows
+        )
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        return 1
+    elapsed = time.perf_counter() - start
+
+    print(f"Converted {metadata['rows']} rows in {elapsed:.2f} s")
+    print(f"  Start: {metadata['start']}")
+    print(f"  Interval: {metadata['interval_minutes']} min")
+    print(f"  Binary: {args.binary_path}")
+    print(f"  Metadata: {metadata_path(args.binary_path)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
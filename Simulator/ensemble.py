@@ -0,0 +1,182 @@
+"""
+GreenGrid Simulation - Monte Carlo Ensemble
+
+Runs many simulations with different seeds and estimates the mean of the
+reliability and cost metrics with confidence intervals. Variance reduction:
+common random numbers across strategies, optional antithetic pairs and a
+solar control variate. The effective sample size shows how many plain
+independent runs the estimate is worth.
+
+With --sampling-failure-rate, inverter failures are simulated at an inflated
+daily rate and every run is weighted by its likelihood ratio, so outage tails
+(unmet load quantiles, failure probability) converge with far fewer runs.
+
+With --database (or results_database.path in the config), every run is also
+stored in a SQLite results database for queries across sweeps.
+
+With --target, runs are added in batches across worker processes until every
+target confidence interval half-width is reached (or --max-runs).
+
+Usage:
+    python3 ensemble.py --runs 20
+    python3 ensemble.py --runs 20 --antithetic --strategies LOAD_PRIORITY PRODUCE_PRIORITY
+    python3 ensemble.py --workers 4 --target self_sufficiency_percent=0.1 --target inverter_failure_probability=0.01
+    python3 ensemble.py --runs 200 --sampling-failure-rate 0.05
+    python3 ensemble.py --runs 50 --workers 4 --database runs.sqlite
+
+Author: Team 3 - GreenGrid Project
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+
+from src.Ensemble import Ensemble, ESTIMATED_METRICS, TAIL_METRICS
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def build_parser():
+    """Build the command line parser."""
+    parser = argparse.ArgumentParser(description="Monte Carlo ensemble with variance reduction")
+    parser.add_argument('--config', default=os.path.join(BASE_DIR, 'config.json'),
+                        help="Configuration file (default: config.json)")
+    parser.add_argument('--runs', type=int, default=20, help="Runs per strategy (default: 20)")
+    parser.add_argument('--strategies', nargs='+',
+                        help="Strategies to compare (default: the configured strategy)")
+    parser.add_argument('--days', type=int, help="Duration in days (overrides simulation.duration_days)")
+    parser.add_argument('--antithetic', action='store_true', help="Run antithetic pairs")
+    parser.add_argument('--no-control-variate', action='store_true',
+                        help="Disable the solar control variate")
+    parser.add_argument('--independent', action='store_true',
+                        help="Independent seeds per strategy instead of common random numbers")
+    parser.add_argument('--workers', type=int, default=1, help="Worker processes (default: 1)")
+    parser.add_argument('--sampling-failure-rate', type=float,
+                        help="Importance sampling: daily inverter failure probability to simulate with "
+                             "(overrides inverter.sampling_failure_rate)")
+    parser.add_argument('--target', action='append', default=[], metavar='METRIC=HALF_WIDTH',
+                        help="Adaptive mode: run until the CI half-width of METRIC is at most HALF_WIDTH "
+                             f"(repeatable; metrics: {', '.join(ESTIMATED_METRICS)})")
+    parser.add_argument('--batch-runs', type=int, default=10,
+                        help="Adaptive mode: runs per strategy between checks (default: 10)")
+    parser.add_argument('--min-runs', type=int, default=30,
+                        help="Adaptive mode: runs per strategy before stopping (default: 30)")
+    parser.add_argument('--max-runs', type=int, default=1000,
+                        help="Adaptive mode: runs per strategy at most (default: 1000)")
+    parser.add_argument('--database',
+                        help="Store every run in this results database (relative to results/; "
+                             "default: results_database.path)")
+    parser.add_argument('--output', help="Results JSON path (default: results/ensemble_TIMESTAMP.json)")
+    return parser
+
+
+def print_ensemble_summary(summary):
+    """Print estimates, confidence intervals and effective sample sizes."""
+    print("\n" + "=" * 70)
+    print(" ENSEMBLE RESULTS")
+    print("=" * 70)
+    techniques = ['common random numbers' if summary['common_random_numbers'] else 'independent seeds']
+    if summary['antithetic']:
+        techniques.append('antithetic pairs')
+    if summary['control_variate']:
+        techniques.append('solar control variate')
+    if summary['sampling_failure_rate'] is not None:
+        techniques.append(f"importance sampling at failure rate {summary['sampling_failure_rate']:g}")
+    runs = ', '.join(f"{strategy} {count}" for strategy, count in summary['runs'].items())
+    print(f"  Runs: {runs} ({', '.join(techniques)})")
+    print(f"  Confidence intervals: {summary['confidence'] * 100:.0f}%")
+    adaptive = summary.get('adaptive')
+    if adaptive is not None:
+        targets = ', '.join(f"{metric} ±{width:g}" for metric, width in adaptive['targets'].items())
+        status = "all targets met" if adaptive['converged'] else \
+            f"max runs reached for {', '.join(adaptive['unconverged_strategies'])}"
+        print(f"  Targets: {targets} -> {status} in {adaptive['elapsed_seconds']:.1f} s")
+
+    def rows(estimates):
+        for metric in ESTIMATED_METRICS:
+            e = estimates[metric]
+            ess = f"{e['ess']:>8.1f}" if e['ess'] is not None else f"{'inf':>8}"
+            saved = f"{e['runs_saved']:>8.1f}" if e['runs_saved'] is not None else f"{'-':>8}"
+            print(f"  {metric:<28} {e['mean']:>10.3f}  [{e['ci_low']:>10.3f}, {e['ci_high']:>10.3f}]  {ess} {saved}")
+
+    header = f"  {'Metric':<28} {'Mean':>10}  {'CI':^24}  {'ESS':>8} {'Saved':>8}"
+    for strategy, estimates in summary['estimates'].items():
+        print(f"\n {strategy}:")
+        print(header)
+        rows(estimates)
+        for metric in TAIL_METRICS:
+            quantiles = '  '.join(f"{name} {value:.3f}" for name, value in summary['quantiles'][strategy][metric].items())
+            print(f"  {metric:<28} {quantiles}")
+        if summary['sampling_failure_rate'] is not None:
+            weights = summary['weights'][strategy]
+            print(f"  {'likelihood ratio':<28} mean {weights['mean']:.3f}  "
+                  f"range [{weights['min']:.3g}, {weights['max']:.3g}]  Kish ESS {weights['kish_ess']:.1f}")
+
+    for strategy, differences in summary['differences'].items():
+        print(f"\n {strategy} - {summary['reference_strategy']}:")
+        print(header)
+        rows(differences)
+
+
+def main(argv=None):
+    """Main execution function."""
+    args = build_parser().parse_args(argv)
+
+    with open(args.config, 'r') as f:
+        config = json.load(f)
+    if args.days is not None:
+        config['simulation']['duration_days'] = args.days
+    database = args.database or (config.get('results_database') or {}).get('path')
+    if database:
+        database = os.path.join(BASE_DIR, 'results', database)
+        os.makedirs(os.path.dirname(database), exist_ok=True)
+
+    try:
+        targets = {}
+        for target in args.target:
+            metric, _, width = target.partition('=')
+            try:
+                targets[metric] = float(width)
+            except ValueError:
+                raise ValueError(f"Invalid target '{target}', expected METRIC=HALF_WIDTH")
+
+        ensemble = Ensemble(
+            config,
+            runs=args.runs,
+            strategies=args.strategies,
+            antithetic=args.antithetic,
+            control_variate=not args.no_control_variate,
+            common_random_numbers=not args.independent,
+            workers=args.workers,
+            sampling_failure_rate=args.sampling_failure_rate,
+            database=database
+        )
+        if targets:
+            summary = ensemble.run_adaptive(targets, batch_runs=args.batch_runs,
+                                            min_runs=args.min_runs, max_runs=args.max_runs)
+        else:
+            summary = ensemble.run()
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+
+    print_ensemble_summary(summary)
+
+    output = args.output
+    if output is None:
+        results_dir = os.path.join(BASE_DIR, 'results')
+        os.makedirs(results_dir, exist_ok=True)
+        output = os.path.join(results_dir, f"ensemble_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(output, 'w') as f:
+        json.dump(summary, f, indent=2)
+    print(f"\n  Results saved to: {output}")
+    if 'database' in summary:
+        print(f"  {summary['database']['runs_stored']} runs stored in {summary['database']['path']} "
+              f"(label {summary['database']['label']})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+"""
+GreenGrid Simulation - Fleet Simulation
+
+Simulates many homes behind one shared feeder (see the "fleet" section of
+config_template.json). The feeder export cap is enforced every step and
+curtailment is shared proportionally between exporting homes.
+
+Usage:
+    python3 fleet_simulation.py
+    python3 fleet_simulation.py --homes 10000 --days 365 --feeder-limit 5000
+
+Author: Team 3 - GreenGrid Project
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+
+from src.FleetSimulation import FleetSimulation
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def build_parser():
+    """Build the command line parser."""
+    parser = argparse.ArgumentParser(description="Simulate a fleet of homes on one feeder")
+    parser.add_argument('--config', default=os.path.join(BASE_DIR, 'config.json'),
+                        help="Configuration file (default: config.json)")
+    parser.add_argument('--homes', type=int, help="Number of homes (overrides fleet.homes)")
+    parser.add_argument('--days', type=int, help="Duration in days (overrides simulation.duration_days)")
+    parser.add_argument('--feeder-limit', type=float,
+                        help="Feeder export limit in kW (overrides fleet.feeder_export_limit_kw)")
+    parser.add_argument('--output', help="Results JSON path (default: results/fleet_TIMESTAMP.json)")
+    return parser
+
+
+def print_fleet_summary(results):
+    """Print aggregate fleet and feeder results."""
+    summary = results['summary']
+    feeder = results['feeder']
+    homes = results['homes']
+    ss = sorted(homes['self_sufficiency_percent'])
+
+    print("\n" + "=" * 70)
+    print(" FLEET RESULTS SUMMARY")
+    print("=" * 70)
+    print(f"  Homes: {summary['homes']} ({', '.join(f'{k} {v}' for k, v in summary['strategy_mix'].items())})")
+    print(f"  Solar generated: {summary['total_solar_generated_kwh']:,.0f} kWh")
+    print(f"  Load consumed: {summary['total_load_consumed_kwh']:,.0f} kWh")
+    print(f"  Grid import / export: {summary['total_grid_imported_kwh']:,.0f} / "
+          f"{summary['total_grid_exported_kwh']:,.0f} kWh")
+    print(f"  Curtailed: {summary['total_curtailed_kwh']:,.0f} kWh")
+    print(f"  Self-sufficiency: {summary['self_sufficiency_percent']:.2f}% "
+          f"(homes: min {ss[0]:.1f}%, median {ss[len(ss) // 2]:.1f}%, max {ss[-1]:.1f}%)")
+    print(f"  Net cost: ${results['financial']['net_cost']:,.2f} "
+          f"(${results['financial']['average_net_cost_per_home']:,.2f} per home)")
+
+    print("\n FEEDER:")
+    limit = feeder['export_limit_kw']
+    print(f"  Export limit: {'none' if limit is None else f'{limit:,.0f} kW'}")
+    print(f"  Peak export request: {feeder['peak_export_request_kw']:,.0f} kW")
+    print(f"  Peak export / import: {feeder['peak_export_kw']:,.0f} / {feeder['peak_import_kw']:,.0f} kW")
+    print(f"  Hours at limit: {feeder['hours_at_limit']:,.1f}")
+    print(f"  Export withheld by limit: {feeder['export_withheld_kwh']:,.0f} kWh "
+          f"({feeder['limit_curtailed_kwh']:,.0f} kWh curtailed)")
+
+    print(f"\n  Run time: {summary['run_seconds']:.1f} s "
+          f"({summary['home_steps_per_second']:,.0f} home-steps/s)")
+
+
+def main(argv=None):
+    """Main execution function."""
+    args = build_parser().parse_args(argv)
+
+    with open(args.config, 'r') as f:
+        config = json.load(f)
+    fleet = config.setdefault('fleet', {})
+    if args.homes is not None:
+        fleet['homes'] = args.homes
+    if args.feeder_limit is not None:
+        fleet['feeder_export_limit_kw'] = args.feeder_limit
+    if args.days is not None:
+        config['simulation']['duration_days'] = args.days
+
+    try:
+        results = FleetSimulation(config=config).run()
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+
+    print_fleet_summary(results)
+
+    output = args.output
+    if output is None:
+        results_dir = os.path.join(BASE_DIR, 'results')
+        os.makedirs(results_dir, exist_ok=True)
+        output = os.path.join(results_dir, f"fleet_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(output, 'w') as f:
+        json.dump(results, f)
+    print(f"\n  Results saved to: {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,22 +2,44 @@
 GreenGrid Simulation - Main Entry Point
 
 This is the main script to run the GreenGrid digital twin simulation.
-Configure parameters in config.json before running.
+Configure parameters in config.json before running, or override them with
+--set.
 
 Usage:
     python3 main.py
+    python3 main.py --yes --set simulation.duration_days=7 --set energy_management.strategy=MPC
+    python3 main.py --quiet --output-format json --config my_config.json
+    python3 main.py --check
+
+The simulation modules are only imported once the configuration is valid,
+so --help and --check return immediately.
 
 Author: Team 3 - GreenGrid Project
 Course: COM 139 - Simulation & Visualization
 Universidad Panamericana, Guadalajara
 """
 
-from src.Simulation import Simulation
-from src.DataLogger import DataLogger
+import argparse
+import json
 import sys
 import os
+
+from src.CommandLine import add_arguments, confirm, load_config, progress_output
+from src.ConfigSchema import check_config
+
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
+# Result sections in the --output-format json document (as in summary.json)
+RESULT_SECTIONS = ['summary', 'financial', 'battery', 'reliability', 'system']
+
+def build_parser():
+    """Build the command line parser."""
+    parser = argparse.ArgumentParser(description="Run the GreenGrid simulation and save the results")
+    add_arguments(parser, os.path.join(BASE_DIR, 'config.json'))
+    parser.add_argument('--output-dir', default=os.path.join(BASE_DIR, 'results'),
+                        help="Base directory of the run folder (default: results/)")
+    return parser
+
 def print_header():
     """Print welcome header."""
     print("\n" + "=" * 70)
@@ -70,81 +92,125 @@ def print_results_summary(results):
     print("\n Financial:")
     print(f"  Import Cost: ${results['financial']['total_import_cost']:.2f}")
     print(f"  Export Revenue: ${results['financial']['total_export_revenue']:.2f}")
+    if results['financial'].get('demand_charges') or results['financial'].get('fixed_charges'):
+        print(f"  Demand + Fixed Charges: "
+              f"${results['financial']['demand_charges'] + results['financial']['fixed_charges']:.2f}")
     print(f"  Net Cost: ${results['financial']['net_cost']:.2f}")
     
     print("\n Battery:")
     print(f"  Average SoC: {results['battery']['average_soc_percent']:.2f}%")
     print(f"  Final SoC: {results['battery']['final_soc_percent']:.2f}%")
+    if 'degradation' in results['battery']:
+        degradation = results['battery']['degradation']
+        print(f"  Equivalent Full Cycles: {degradation['equivalent_full_cycles']:.1f}")
+        print(f"  Capacity Fade: {degradation['capacity_fade_percent']:.3f}% "
+              f"({degradation['final_capacity_kwh']:.2f} kWh left)")
     
     print("\n Performance:")
     print(f"  Self-Sufficiency: {results['summary']['self_sufficiency_percent']:.2f}%")
     print(f"  Inverter Failures: {results['reliability']['inverter_failures']}")
     print(f"  Unmet Load: {results['reliability']['unmet_load_percentage']:.2f}%")
 
-def main():
+def results_document(results, config, saved_files):
+    """Build the --output-format json document."""
+    document = {'seed': config['simulation']['actual_seed_used']}
+    for section in RESULT_SECTIONS:
+        document[section] = results[section]
+    if 'seasons' in results:
+        document['seasons'] = results['seasons']
+    document['files'] = saved_files
+    return document
+
+def main(argv=None):
     """Main execution function."""
+    args = build_parser().parse_args(argv)
     try:
-        # Print header
-        print_header()
-        
-        # Load and display configuration
-        print("\n Loading configuration from config.json...")
-        sim = Simulation(config_path=os.path.join(BASE_DIR, 'config.json'))
-        print_configuration_info(sim.config)
+        # Load and validate configuration (before importing the simulation)
+        try:
+            config = load_config(args.config, args.overrides)
+            problems = check_config(config)
+        except ValueError as e:
+            problems = [str(e)]  # Malformed JSON or --set
+        if problems:
+            print(f"\n Error: Invalid configuration ({args.config}):", file=sys.stderr)
+            for problem in problems:
+                print(f"   - {problem}", file=sys.stderr)
+            return 1
+        if args.check:
+            if not args.quiet:
+                print(f"Configuration OK: {args.config}")
+            return 0
         
-        # Confirm before running
-        print("\n" + "-" * 70)
-        response = input("▶ Press ENTER to start simulation (or Ctrl+C to cancel): ")
+        from src.Simulation import Simulation
+        from src.DataLogger import DataLogger
         
-        # Run simulation
-        print("\n Starting simulation...")
-        results = sim.run()
+        with progress_output(args):
+            # Print header
+            print_header()
+            
+            # Display configuration
+            print(f"\n Loading configuration from {os.path.basename(args.config)}...")
+            sim = Simulation(config=config)
+            print_configuration_info(sim.config)
+            
+            # Confirm before running
+            print("\n" + "-" * 70)
+            confirm("▶ Press ENTER to start simulation (or Ctrl+C to cancel): ", args)
+            
+            # Run simulation
+            print("\n Starting simulation...")
+            results = sim.run()
         
         # Print results summary
-        print_results_summary(results)
-        
-        # Save data
-        print("\n" + "=" * 70)
-        print(" SAVING SIMULATION DATA")
-        print("=" * 70)
-        
-        logger = DataLogger(results, sim.config, output_dir=os.path.join(BASE_DIR, 'results'))
-        saved_files = logger.save_all()
+        if args.output_format == 'text':
+            print_results_summary(results)
         
-        # Print saved files
-        print("\n Files saved:")
-        for file_type, filepath in saved_files.items():
-            if filepath:
-                print(f"  ✓ {filepath}")
+        with progress_output(args):
+            # Save data
+            print("\n" + "=" * 70)
+            print(" SAVING SIMULATION DATA")
+            print("=" * 70)
+            
+            logger = DataLogger(results, sim.config, output_dir=args.output_dir)
+            saved_files = logger.save_all()
+            
+            # Print saved files
+            print("\n Files saved:")
+            for file_type, filepath in saved_files.items():
+                if filepath:
+                    print(f"  ✓ {filepath}")
+            
+            # Final message
+            print("\n" + "=" * 70)
+            print(" SIMULATION COMPLETED SUCCESSFULLY!")
+            print("=" * 70)
+            print("\n Next Steps:")
+            print("  1. Review answers.txt for project questions")
+            print("  2. Check hourly_data.csv for detailed analysis")
+            print("  3. Use summary.json for quick insights")
+            print("  4. Try different strategies or seasons by editing config.json (or with --set)")
+            print("\n Ready for Phase 2 (Visualization) and Phase 3 (Machine Learning)\n")
         
-        # Final message
-        print("\n" + "=" * 70)
-        print(" SIMULATION COMPLETED SUCCESSFULLY!")
-        print("=" * 70)
-        print("\n Next Steps:")
-        print("  1. Review answers.txt for project questions")
-        print("  2. Check hourly_data.csv for detailed analysis")
-        print("  3. Use summary.json for quick insights")
-        print("  4. Try different strategies or seasons by editing config.json")
-        print("\n Ready for Phase 2 (Visualization) and Phase 3 (Machine Learning)\n")
+        if args.output_format == 'json':
+            print(json.dumps(results_document(results, sim.config, saved_files), indent=2))
         
         return 0
         
     except KeyboardInterrupt:
-        print("\n\n  Simulation cancelled by user.")
+        print("\n\n  Simulation cancelled by user.", file=sys.stderr)
         return 1
     
     except FileNotFoundError as e:
-        print(f"\n Error: Configuration file not found.")
-        print(f"   Make sure 'config.json' exists in the project root.")
-        print(f"   Details: {e}")
+        print(f"\n Error: Configuration file not found.", file=sys.stderr)
+        print(f"   Make sure '{os.path.basename(args.config)}' exists (or pass --config).", file=sys.stderr)
+        print(f"   Details: {e}", file=sys.stderr)
         return 1
     
     except Exception as e:
-        print(f"\n Error during simulation:")
-        print(f"   {type(e).__name__}: {e}")
-        print("\n   Please check your configuration and try again.")
+        print(f"\n Error during simulation:", file=sys.stderr)
+        print(f"   {type(e).__name__}: {e}", file=sys.stderr)
+        print("\n   Please check your configuration and try again.", file=sys.stderr)
         return 1
 
 if __name__ == "__main__":
-    sys.exit(main())
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""
+GreenGrid Simulation - Local Simulation Service
+
+Long-running HTTP/JSON service with a warm pool of worker processes, so a
+dashboard can request simulations without starting Python, importing the
+simulation modules and reading config.json for every run.
+
+Requests are JSON objects {"config": {...}, "include": [...]}: "config" is
+merged over the service's config file (only the changed keys are needed),
+"include" optionally adds raw data (daily_summaries, events_log,
+hourly_data) to the response.
+
+Endpoints:
+    POST /simulate          -> {"results": ..., "latency": {"queued_ms", "run_ms", "total_ms"}}
+    POST /simulate/stream   -> one JSON line per simulated day, then the results line
+    GET  /stats             -> queue state, request counts, latency percentiles
+    GET  /health
+
+Usage:
+    python3 simulation_service.py --workers 4
+    python3 simulation_service.py --unix-socket /tmp/greengrid.sock
+    curl -s localhost:8765/simulate -d '{"config": {"simulation": {"season": "winter"}}}'
+
+Author: Team 3 - GreenGrid Project
+"""
+
+import argparse
+import json
+import os
+import signal
+import sys
+
+from src.SimulationService import SimulationService, make_server
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def build_parser():
+    """Build the command line parser."""
+    parser = argparse.ArgumentParser(description="Local simulation service with a warm worker pool")
+    parser.add_argument('--config', default=os.path.join(BASE_DIR, 'config.json'),
+                        help="Base configuration requests are merged over (default: config.json)")
+    parser.add_argument('--host', default='127.0.0.1', help="Interface to listen on (default: 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=8765, help="TCP port (default: 8765)")
+    parser.add_argument('--unix-socket', help="Listen on this Unix socket instead of TCP")
+    parser.add_argument('--workers', type=int, default=2, help="Worker processes (default: 2)")
+    parser.add_argument('--max-concurrent', type=int,
+                        help="Simulations running at once (default: --workers)")
+    parser.add_argument('--max-queue', type=int, default=64,
+                        help="Requests waiting for a slot before new ones get 503 (default: 64)")
+    parser.add_argument('--quiet', action='store_true', help="Do not log requests")
+    return parser
+
+
+def _stop(signum, frame):
+    """SIGTERM handler: stop like Ctrl+C."""
+    raise KeyboardInterrupt
+
+
+def main(argv=None):
+    """Main execution function."""
+    args = build_parser().parse_args(argv)
+
+    with open(args.config, 'r') as f:
+        config = json.load(f)
+
+    try:
+        service = SimulationService(config, workers=args.workers, max_concurrent=args.max_concurrent,
+                                    max_queue=args.max_queue)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+
+    print("\n" + "=" * 70)
+    print(" GREENGRID SIMULATION SERVICE")
+    print("=" * 70)
+    warmup = service.start()
+    print(f"  {service.workers} workers warmed up in {warmup:.2f} s "
+          f"(max {service.max_concurrent} concurrent, queue {service.max_queue})")
+
+    server = make_server(service, host=args.host, port=args.port, unix_socket=args.unix_socket,
+                         verbose=not args.quiet)
+    address = args.unix_socket or f"http://{args.host}:{server.server_address[1]}"
+    print(f"  Listening on {address} (Ctrl+C to stop)")
+    signal.signal(signal.SIGTERM, _stop)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n  Stopping service...")
+    finally:
+        server.server_close()
+        service.close()
+        if args.unix_socket and os.path.exists(args.unix_socket):
+            os.unlink(args.unix_socket)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
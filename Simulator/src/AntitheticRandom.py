@@ -0,0 +1,26 @@
+import random
+
+class AntitheticRandom(random.Random):
+    """
+    Random generator that mirrors random.Random with the same seed.
+
+    Every uniform draw u becomes 1 - u and every randint(a, b) result x
+    becomes a + b - x. Since uniform(), choices() and the probability checks
+    of the components are built on random(), a run using this generator sees
+    the "opposite" weather, load and failures of the run with the plain
+    generator. Each run is still a valid sample on its own; averaging the
+    pair cancels part of the noise (antithetic variates).
+    """
+
+    # random.Random switches subclasses that override random() to integer
+    # draws built on random(); keep the getrandbits path of the plain
+    # generator so randint() can be mirrored draw for draw
+    _randbelow = random.Random._randbelow_with_getrandbits
+
+    def random(self):
+        """Mirrored uniform draw in (0, 1]."""
+        return 1.0 - super().random()
+
+    def randint(self, a, b):
+        """Mirrored integer draw in [a, b]."""
+        return a + b - super().randint(a, b)
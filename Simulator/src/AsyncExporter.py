@@ -0,0 +1,157 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
+import threading
+
+from .DataLogger import DataLogger
+
+
+class AsyncExporter:
+    """
+    Exports simulation results in the background (see DataLogger).
+
+    submit() creates the run folder, hands the results to a writer and
+    returns at once, so the next simulation computes while the previous one
+    is written. At most max_pending exports are queued or being written;
+    submit() blocks beyond that, which bounds the memory held by results
+    waiting for export.
+
+    Writers are threads by default, which overlap the disk writes with the
+    simulation. Most of an export is CSV formatting, which holds the GIL, so
+    processes=True writes in separate processes instead (the results are
+    pickled to the writer, roughly a tenth of the export time). The gain
+    therefore depends on where the time goes: exports that wait on storage
+    (network shares, slow disks) overlap with the next run, while on a local
+    disk without spare cores the export costs about as much in the
+    background as inline.
+
+    The results must not be modified after submit(). A failed export does
+    not stop the others; its error is raised once, by the next submit(),
+    flush() or close().
+    """
+
+    def __init__(self, output_dir='results', workers=1, max_pending=2, processes=False):
+        """
+        Initialize the exporter.
+
+        Args:
+            output_dir (str): Base directory of the run folders
+            workers (int): Writer threads or processes
+            max_pending (int): Exports queued or running before submit() blocks
+            processes (bool): Write in processes instead of threads
+        """
+        if workers < 1:
+            raise ValueError(f"workers must be at least 1, got {workers}")
+        if max_pending < 1:
+            raise ValueError(f"max_pending must be at least 1, got {max_pending}")
+
+        self.output_dir = output_dir
+        self.workers = workers
+        self.max_pending = max_pending
+        self.processes = processes
+
+        executor_class = ProcessPoolExecutor if processes else ThreadPoolExecutor
+        self._executor = executor_class(max_workers=workers)
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._futures = []   # (run folder, future) since the last flush, in submission order
+        self._errors = []    # Failed futures of self._futures, for submit() to report
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # Do not hide the exception that ended the block behind an export error
+        self.close(raise_errors=exc_type is None)
+
+    def submit(self, results, config):
+        """
+        Queue the export of one run (blocks while max_pending are in flight).
+
+        Args:
+            results (dict): Simulation results from Simulation.run()
+            config (dict): Configuration used for the simulation
+
+        Returns:
+            str: Run folder the files are written to
+
+        Raises:
+            RuntimeError: A previous export failed
+        """
+        self._raise_errors()
+        self._slots.acquire()
+        try:
+            logger = DataLogger(results, config, output_dir=self.output_dir, verbose=False)
+            future = self._executor.submit(_save_all, logger)
+        except BaseException:
+            self._slots.release()
+            raise
+        # Listed before the callback runs (it may run at once), see _done()
+        with self._lock:
+            self._futures.append((logger.run_folder, future))
+        future.add_done_callback(self._done)
+        return logger.run_folder
+
+    def flush(self):
+        """
+        Wait until every submitted export is written.
+
+        Returns:
+            list: DataLogger.save_all() paths of each export finished since
+                the last flush, in submission order (without exports whose
+                error submit() already raised)
+
+        Raises:
+            RuntimeError: An export failed (the first error is the cause)
+        """
+        with self._lock:
+            futures, self._futures = self._futures, []
+            self._errors = []   # Reported below, from the futures themselves
+        # The done callbacks may still be running after wait() returns
+        wait([future for _, future in futures])
+        _raise_failed([future for _, future in futures
+                       if not future.cancelled() and future.exception() is not None])
+        return [future.result() for _, future in futures]
+
+    def close(self, raise_errors=True):
+        """
+        Flush and stop the writers.
+
+        Args:
+            raise_errors (bool): Raise export errors (False = drop them)
+
+        Raises:
+            RuntimeError: An export failed
+        """
+        try:
+            if raise_errors:
+                self.flush()
+        finally:
+            self._executor.shutdown(wait=True)
+
+    def _done(self, future):
+        """Future callback: free the slot and keep the failed future, if any."""
+        self._slots.release()
+        if not future.cancelled() and future.exception() is not None:
+            with self._lock:
+                # A future already taken by flush() is reported there
+                if any(pending is future for _, pending in self._futures):
+                    self._errors.append(future)
+
+    def _raise_errors(self):
+        """Raise the errors of failed pending exports (each reported once)."""
+        with self._lock:
+            failed, self._errors = self._errors, []
+            self._futures = [(folder, future) for folder, future in self._futures
+                             if not any(future is reported for reported in failed)]
+        _raise_failed(failed)
+
+
+def _raise_failed(failed):
+    """Raise a RuntimeError for failed futures (none = no-op)."""
+    if failed:
+        error = failed[0].exception()
+        raise RuntimeError(f"{len(failed)} export(s) failed: {error}") from error
+
+
+def _save_all(logger):
+    """Writer entry point (module level so processes can run it)."""
+    return logger.save_all()
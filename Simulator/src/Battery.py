@@ -25,6 +25,7 @@ class Battery:
         self._energy_kwh = capacity_kwh * 0.5  # Start at 50% SoC
         self._min_energy_kwh = capacity_kwh * min_soc
         self._one_way_efficiency = math.sqrt(efficiency)  # One-way efficiency
+        self._cycle_counter = None  # Optional RainflowCounter fed with every SoC change
 
     def get_soc(self) -> float:
         """
@@ -96,6 +97,8 @@ class Battery:
         
         # Step 5: Update battery state
         self._energy_kwh += energy_to_store
+        if self._cycle_counter is not None:
+            self._cycle_counter.add(self._energy_kwh / self._capacity_kwh)
         
         # Step 6: Return energy consumed from source (NOT stored energy)
         # This way, rejected_energy in EMS = only capacity rejection,
@@ -138,6 +141,8 @@ class Battery:
 
         # Step 4: Update battery energy
         self._energy_kwh -= actual_extracted
+        if self._cycle_counter is not None:
+            self._cycle_counter.add(self._energy_kwh / self._capacity_kwh)
 
         # Step 5: Calculate actual energy supplied after efficiency losses
         supplied = actual_extracted * self._one_way_efficiency
@@ -155,5 +160,28 @@ class Battery:
     def get_available_space(self) -> float:
         """Get available space for charging in kWh."""
         return self._capacity_kwh - self._energy_kwh
-
-     
\ No newline at end of file
+    
+    def set_capacity(self, capacity_kwh):
+        """
+        Change the total capacity (capacity fade, see BatteryDegradation).
+        
+        The minimum SoC stays the same fraction of the new capacity. Stored
+        energy is kept, except what no longer fits.
+        
+        Args:
+            capacity_kwh (float): New capacity in kWh
+        """
+        self._capacity_kwh = capacity_kwh
+        self._min_energy_kwh = capacity_kwh * self._min_soc
+        self._energy_kwh = min(self._energy_kwh, capacity_kwh)
+    
+    def track_cycles(self, counter):
+        """
+        Feed every SoC change (0-1) to a cycle counter.
+        
+        Args:
+            counter (RainflowCounter): Counter to feed (None = stop)
+        """
+        self._cycle_counter = counter
+        if counter is not None:
+            counter.add(self._energy_kwh / self._capacity_kwh)
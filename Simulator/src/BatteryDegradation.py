@@ -0,0 +1,134 @@
+from .RainflowCounter import RainflowCounter
+
+
+class BatteryDegradation:
+    """
+    Capacity fade of the battery from cycling and calendar ageing.
+
+    The battery feeds every SoC change to a RainflowCounter (see
+    Battery.track_cycles), so cycles are counted while the simulation runs,
+    without keeping the SoC series. Each closed cycle of depth d (fraction
+    of capacity) uses up d ** depth_exponent / cycle_life of the cycle life,
+    where cycle_life is the number of full-depth cycles until the capacity
+    has faded to end_of_life_capacity (a Woehler curve: with an exponent
+    above 1, shallow cycles wear less than their share of energy). Calendar
+    ageing fades the capacity linearly with time.
+
+    The fade is applied at day boundaries (end_of_day()), so the rest of the
+    day runs with a fixed capacity.
+    """
+
+    def __init__(self, battery, cycle_life=5000, depth_exponent=1.3, end_of_life_capacity=0.8,
+                 calendar_fade_per_year=0.01, depth_bins=10, resolution=0.001):
+        """
+        Initialize the model and start counting the battery's cycles.
+
+        Args:
+            battery (Battery): Battery to track (its capacity is updated)
+            cycle_life (float): Full-depth cycles until end of life
+            depth_exponent (float): Woehler exponent of the depth of discharge
+            end_of_life_capacity (float): Remaining capacity at end of life
+                (fraction of the initial capacity, 0.8 = 80%)
+            calendar_fade_per_year (float): Capacity lost per year of age
+                (fraction of the initial capacity)
+            depth_bins (int): Cycle depth histogram bins
+            resolution (float): SoC resolution of the cycle counter
+        """
+        if cycle_life <= 0:
+            raise ValueError(f"cycle_life must be positive, got {cycle_life}")
+        if not 0 < end_of_life_capacity < 1:
+            raise ValueError(f"end_of_life_capacity must be between 0 and 1, got {end_of_life_capacity}")
+        if calendar_fade_per_year < 0:
+            raise ValueError(f"calendar_fade_per_year must not be negative, got {calendar_fade_per_year}")
+
+        self.battery = battery
+        self.cycle_life = cycle_life
+        self.depth_exponent = depth_exponent
+        self.end_of_life_capacity = end_of_life_capacity
+        self.calendar_fade_per_year = calendar_fade_per_year
+        self.initial_capacity_kwh = battery.get_capacity()
+
+        self._cycle_damage = 0.0   # Fraction of the cycle life used
+        self._days = 0
+        self.counter = RainflowCounter(bins=depth_bins, resolution=resolution, on_cycle=self._on_cycle)
+        battery.track_cycles(self.counter)
+
+    @classmethod
+    def from_config(cls, config, battery):
+        """
+        Build the model from the 'degradation' configuration section.
+
+        Args:
+            config (dict): Simulation configuration
+            battery (Battery): Battery to track
+
+        Returns:
+            BatteryDegradation: Model, or None when degradation is disabled
+        """
+        settings = config.get('degradation') or {}
+        if not settings.get('enabled', False):
+            return None
+        return cls(
+            battery,
+            cycle_life=settings.get('cycle_life', 5000),
+            depth_exponent=settings.get('depth_exponent', 1.3),
+            end_of_life_capacity=settings.get('end_of_life_capacity', 0.8),
+            calendar_fade_per_year=settings.get('calendar_fade_per_year', 0.01),
+            depth_bins=settings.get('depth_bins', 10),
+            resolution=settings.get('soc_resolution', 0.001)
+        )
+
+    def _on_cycle(self, depth, count):
+        self._cycle_damage += count * depth ** self.depth_exponent / self.cycle_life
+
+    def cycle_fade(self):
+        """Capacity lost to closed cycles (fraction of the initial capacity)."""
+        return self._cycle_damage * (1 - self.end_of_life_capacity)
+
+    def calendar_fade(self):
+        """Capacity lost to age (fraction of the initial capacity)."""
+        return self.calendar_fade_per_year * self._days / 365.0
+
+    def end_of_day(self):
+        """
+        Apply the fade accumulated so far to the battery (call once per day).
+
+        Returns:
+            float: New battery capacity in kWh
+        """
+        self._days += 1
+        remaining = max(0.0, 1 - self.cycle_fade() - self.calendar_fade())
+        capacity = self.initial_capacity_kwh * remaining
+        self.battery.set_capacity(capacity)
+        return capacity
+
+    def results(self):
+        """
+        Degradation results for the run.
+
+        Cycle counts include the open residue as half cycles. The capacity
+        is the one set at the last day boundary; cycle and calendar fade are
+        accumulated up to now.
+
+        Returns:
+            dict: Cycle counts, depth histogram and capacity fade
+        """
+        cycles = self.counter.cycles(include_residue=True)
+        bins = len(cycles['depth_histogram'])
+        capacity = self.battery.get_capacity()
+        return {
+            'equivalent_full_cycles': cycles['equivalent_full_cycles'],
+            'full_cycles': cycles['full_cycles'],
+            'half_cycles': cycles['half_cycles'],
+            'cycle_depth_histogram': [
+                {'depth_percent': [100 * i / bins, 100 * (i + 1) / bins], 'cycles': count}
+                for i, count in enumerate(cycles['depth_histogram'])
+            ],
+            'initial_capacity_kwh': self.initial_capacity_kwh,
+            'final_capacity_kwh': capacity,
+            'capacity_fade_percent': (1 - capacity / self.initial_capacity_kwh) * 100,
+            'cycle_fade_percent': self.cycle_fade() * 100,
+            'calendar_fade_percent': self.calendar_fade() * 100,
+            'cycle_life_used_percent': self._cycle_damage * 100,
+            'residue_points': self.counter.residue_size()
+        }
@@ -21,17 +21,79 @@ class CloudCoverage:
         (0.8, 0.9)    # Overcast
     ]
     
-    def __init__(self, season='summer'):
+    # Season of each month (meteorological seasons) for season='auto'
+    AUTO = 'auto'
+    MONTH_SEASONS = {
+        12: 'winter', 1: 'winter', 2: 'winter',
+        3: 'spring', 4: 'spring', 5: 'spring',
+        6: 'summer', 7: 'summer', 8: 'summer',
+        9: 'fall', 10: 'fall', 11: 'fall'
+    }
+    
+    def __init__(self, season='summer', rng=None):
         """
         Initialize cloud coverage simulator.
         
         Args:
             season (str): Season name ('spring', 'summer', 'fall', 'winter')
+            rng (random.Random, optional): Random source (default: the
+                global random module)
         """
-        if season not in self.PROBABILITIES:
-            raise ValueError(f"Invalid season: {season}. Must be one of {list(self.PROBABILITIES.keys())}")
+        self._validate(season)
         
         self._season = season
+        self._rng = rng if rng is not None else random
+    
+    @classmethod
+    def season_for_date(cls, date):
+        """
+        Season of a calendar date.
+        
+        Args:
+            date (datetime.date | datetime.datetime): Date
+            
+        Returns:
+            str: 'spring', 'summer', 'fall' or 'winter'
+        """
+        return cls.MONTH_SEASONS[date.month]
+    
+    @classmethod
+    def resolve_season(cls, season, date):
+        """
+        Season in effect on a date for a configured season.
+        
+        Args:
+            season (str): Configured season name or 'auto' (from the date)
+            date (datetime.date | datetime.datetime): Date
+            
+        Returns:
+            str: Season name
+        """
+        if season == cls.AUTO:
+            return cls.season_for_date(date)
+        cls._validate(season)
+        return season
+    
+    @classmethod
+    def _validate(cls, season):
+        """Raise ValueError for an unknown season name."""
+        if season not in cls.PROBABILITIES:
+            raise ValueError(f"Invalid season: {season}. Must be one of "
+                             f"{list(cls.PROBABILITIES.keys()) + [cls.AUTO]}")
+    
+    def get_season(self):
+        """Get the season whose probabilities are in use."""
+        return self._season
+    
+    def set_season(self, season):
+        """
+        Switch to another season (e.g. at a season boundary).
+        
+        Args:
+            season (str): Season name ('spring', 'summer', 'fall', 'winter')
+        """
+        self._validate(season)
+        self._season = season
     
     def get_daily_coverage(self):
         """
@@ -43,10 +105,28 @@ class CloudCoverage:
         # 1. Obtaining the probabilities for the given season
         probabilities = self.PROBABILITIES[self._season]
         # 2. Selecting cloud coverage level
-        level = random.choices([0, 1, 2, 3], weights=probabilities)[0]
+        level = self._rng.choices([0, 1, 2, 3], weights=probabilities)[0]
         # 3. Obtaining the coverage range
         min_coverage, max_coverage = self.COVERAGE_RANGES[level]
         # 4. Generating random coverage within the range
-        coverage = random.uniform(min_coverage, max_coverage)
+        coverage = self._rng.uniform(min_coverage, max_coverage)
         # 5. Returning the coverage
-        return coverage
\ No newline at end of file
+        return coverage
+    
+    def get_expected_coverage(self, season=None):
+        """
+        Expected daily cloud coverage for the season (no randomness).
+        
+        Used as the forecast for days whose coverage is not known yet.
+        
+        Args:
+            season (str, optional): Season to use (default: the current one)
+        
+        Returns:
+            float: Mean of the seasonal coverage distribution (0-0.9)
+        """
+        probabilities = self.PROBABILITIES[season or self._season]
+        return sum(
+            probability * (min_coverage + max_coverage) / 2
+            for probability, (min_coverage, max_coverage) in zip(probabilities, self.COVERAGE_RANGES)
+        )
\ No newline at end of file
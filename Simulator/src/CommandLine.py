@@ -0,0 +1,112 @@
+import contextlib
+import io
+import json
+import sys
+
+# Shared command line handling of the entry scripts (main.py,
+# compare_strategies.py). Only the standard library is imported here, so
+# --help and --check answer without loading simpy or numpy.
+
+
+def add_arguments(parser, default_config):
+    """
+    Add the common options to an entry script's parser.
+
+    Args:
+        parser (argparse.ArgumentParser): Parser to extend
+        default_config (str): Default --config path
+    """
+    parser.add_argument('--config', default=default_config,
+                        help="Configuration file (default: config.json)")
+    parser.add_argument('--set', action='append', default=[], metavar='KEY=VALUE', dest='overrides',
+                        help="Override a configuration value, e.g. --set simulation.duration_days=7 "
+                             "(VALUE is parsed as JSON, otherwise taken as a string; repeatable)")
+    parser.add_argument('-y', '--yes', action='store_true',
+                        help="Start without the confirmation prompt (also skipped when stdin "
+                             "is not a terminal)")
+    parser.add_argument('-q', '--quiet', action='store_true',
+                        help="Only print the results (and errors)")
+    parser.add_argument('--output-format', choices=['text', 'json'], default='text',
+                        help="Results on stdout as text or as one JSON document "
+                             "(progress goes to stderr) (default: text)")
+    parser.add_argument('--check', action='store_true',
+                        help="Validate the configuration (with overrides) and exit")
+
+
+def parse_override(assignment):
+    """
+    Parse one --set assignment.
+
+    Args:
+        assignment (str): 'dotted.key=value'
+
+    Returns:
+        tuple: (list of key parts, value)
+    """
+    key, separator, text = assignment.partition('=')
+    if not separator or not key or any(not part for part in key.split('.')):
+        raise ValueError(f"Invalid --set '{assignment}'. Expected KEY=VALUE, e.g. simulation.duration_days=7")
+    try:
+        value = json.loads(text)
+    except ValueError:
+        value = text  # Bare strings: --set energy_management.strategy=MPC
+    return key.split('.'), value
+
+
+def load_config(path, overrides=()):
+    """
+    Load a configuration file and apply --set overrides.
+
+    Args:
+        path (str): Configuration JSON file
+        overrides (list): 'dotted.key=value' assignments
+
+    Returns:
+        dict: Configuration
+    """
+    with open(path, 'r') as f:
+        config = json.load(f)
+    for assignment in overrides:
+        keys, value = parse_override(assignment)
+        *sections, name = keys
+        target = config
+        for section in sections:
+            target = target.setdefault(section, {})
+            if not isinstance(target, dict):
+                raise ValueError(f"Invalid --set '{assignment}': {section} is not a section")
+        target[name] = value
+    return config
+
+
+def confirm(prompt, args):
+    """
+    Wait for ENTER unless --yes is given or stdin is not a terminal.
+
+    The prompt goes to stderr, so it stays visible with --quiet and does
+    not end up in --output-format json output.
+
+    Raises:
+        KeyboardInterrupt: The user cancelled (Ctrl+C or end of input)
+    """
+    if args.yes or not sys.stdin.isatty():
+        return
+    sys.stderr.write(prompt)
+    sys.stderr.flush()
+    if not sys.stdin.readline():
+        raise KeyboardInterrupt
+
+
+def progress_output(args):
+    """
+    Context for the progress output of a run.
+
+    Returns:
+        context manager: Silences stdout with --quiet, sends it to stderr with
+            --output-format json (stdout is kept for the JSON document)
+    """
+    if args.quiet:
+        return contextlib.redirect_stdout(io.StringIO())
+    if args.output_format == 'json':
+        return contextlib.redirect_stdout(sys.stderr)
+    return contextlib.nullcontext()
+
@@ -0,0 +1,151 @@
+import gzip
+import io
+import lzma
+import queue
+import threading
+import zlib
+
+try:
+    import zstandard
+except ImportError:  # Optional: only needed for the zstd codec
+    zstandard = None
+
+# Codec -> file suffix
+CODECS = {'gzip': '.gz', 'xz': '.xz', 'zstd': '.zst'}
+DEFAULT_LEVELS = {'gzip': 6, 'xz': 6, 'zstd': 3}
+LEVEL_RANGES = {'gzip': (0, 9), 'xz': (0, 9), 'zstd': (1, 22)}
+
+# Text is handed to the compression thread in blocks of this size
+BLOCK_BYTES = 1 << 20
+
+
+def check_codec(codec, level=None):
+    """
+    Validate a compression codec and level.
+
+    Args:
+        codec (str or None): 'gzip', 'xz', 'zstd' or None (uncompressed)
+        level (int, optional): Codec level (None = codec default)
+
+    Raises:
+        ValueError: Unknown codec, level out of range, or zstd without the
+            zstandard package
+    """
+    if codec is None:
+        return
+    if codec not in CODECS:
+        raise ValueError(f"Invalid compression: {codec}. Must be one of {list(CODECS)} or null")
+    if codec == 'zstd' and zstandard is None:
+        raise ValueError("zstd compression needs the zstandard package (pip install zstandard)")
+    if level is not None:
+        low, high = LEVEL_RANGES[codec]
+        if not low <= level <= high:
+            raise ValueError(f"{codec} compression level must be between {low} and {high}, got {level}")
+
+
+def compressed_path(path, codec):
+    """Path with the codec's suffix ('hourly_data.csv' -> 'hourly_data.csv.gz')."""
+    return path + CODECS[codec] if codec else path
+
+
+def open_text_writer(path, codec=None, level=None, threads=0):
+    """
+    Open a text file for writing, optionally compressed.
+
+    Compression runs in a background thread: the caller formats text while
+    the previous block is compressed and written (zlib, lzma and zstandard
+    release the GIL while compressing). With zstd, threads > 0 (or -1 for
+    one per CPU) also makes the compressor itself multi-threaded.
+
+    Args:
+        path (str): File to write (the codec suffix is not added)
+        codec (str, optional): 'gzip', 'xz', 'zstd' or None
+        level (int, optional): Codec level (None = codec default)
+        threads (int): zstd compression threads (0 = none)
+
+    Returns:
+        file: Text file object (newline='' for the csv module); close() waits
+            for the compression thread and raises its error, if any
+    """
+    if codec is None:
+        return open(path, 'w', newline='')
+    check_codec(codec, level)
+    level = DEFAULT_LEVELS[codec] if level is None else level
+
+    if codec == 'gzip':
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31 = gzip container
+    elif codec == 'xz':
+        compressor = lzma.LZMACompressor(preset=level)
+    else:
+        compressor = zstandard.ZstdCompressor(level=level, threads=threads).compressobj()
+
+    raw = _CompressingWriter(open(path, 'wb'), compressor)
+    return io.TextIOWrapper(io.BufferedWriter(raw, buffer_size=BLOCK_BYTES), encoding='utf-8', newline='')
+
+
+def open_text_reader(path):
+    """
+    Open a text file for reading, decompressing by its suffix (.gz, .xz, .zst).
+
+    Args:
+        path (str): Plain or compressed file
+
+    Returns:
+        file: Text file object (newline='' for the csv module)
+    """
+    if path.endswith(CODECS['gzip']):
+        return gzip.open(path, 'rt', encoding='utf-8', newline='')
+    if path.endswith(CODECS['xz']):
+        return lzma.open(path, 'rt', encoding='utf-8', newline='')
+    if path.endswith(CODECS['zstd']):
+        if zstandard is None:
+            raise ValueError(f"Reading {path} needs the zstandard package (pip install zstandard)")
+        return io.TextIOWrapper(zstandard.open(path, 'rb'), encoding='utf-8', newline='')
+    return open(path, 'r', newline='')
+
+
+class _CompressingWriter(io.RawIOBase):
+    """Binary sink that compresses and writes blocks on a background thread."""
+
+    def __init__(self, file, compressor):
+        self._file = file
+        self._compressor = compressor
+        self._blocks = queue.Queue(maxsize=4)  # Bounds the text held in memory
+        self._error = None
+        self._thread = threading.Thread(target=self._compress, daemon=True)
+        self._thread.start()
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        if self._error is not None:
+            raise self._error
+        self._blocks.put(bytes(data))
+        return len(data)
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            self._blocks.put(None)
+            self._thread.join()
+            self._file.close()
+        finally:
+            super().close()
+        if self._error is not None:
+            raise self._error
+
+    def _compress(self):
+        try:
+            while True:
+                block = self._blocks.get()
+                if block is None:
+                    self._file.write(self._compressor.flush())
+                    return
+                self._file.write(self._compressor.compress(block))
+        except Exception as e:
+            self._error = e
+            # Keep draining so the writer never blocks on a full queue
+            while self._blocks.get() is not None:
+                pass
@@ -0,0 +1,576 @@
+from collections.abc import Mapping
+from datetime import datetime
+import difflib
+import hashlib
+import json
+import math
+
+# Configuration schema: every section and key of config_template.json with
+# its default and checks. compile_config() validates a configuration once
+# (all problems at once) into an immutable Config, so sweeps, the service
+# and ensembles fail before any run is scheduled and hand their workers a
+# compact, hashable object. Only the standard library is imported here, so
+# main.py --check stays free of simpy and numpy.
+
+STRATEGIES = ('LOAD_PRIORITY', 'CHARGE_PRIORITY', 'PRODUCE_PRIORITY', 'MPC')
+FLEET_STRATEGIES = STRATEGIES[:3]
+SEASONS = ('spring', 'summer', 'fall', 'winter', 'auto')
+CLOUD_SEASONS = ('spring', 'summer', 'fall', 'winter')
+CLOUD_LEVELS = 4
+
+# Defaults that are not values: REQUIRED keys must be given, OPTIONAL keys
+# are accepted but not filled in (actual_seed_used of saved configurations)
+REQUIRED = object()
+OPTIONAL = object()
+
+
+def _number(minimum=None, maximum=None, above=None, below=None, integer=False, nullable=False):
+    """Check for a number (int or float, not bool) within the given bounds."""
+    kind = 'an integer' if integer else 'a number'
+    if above == 0 and minimum is None and maximum is None and below is None:
+        description = 'a positive integer' if integer else 'a positive number'
+    elif integer and minimum == 1 and maximum is None:
+        description = 'a positive integer'
+    else:
+        bounds = []
+        if minimum is not None:
+            bounds.append(f">= {minimum}")
+        if above is not None:
+            bounds.append(f"> {above}")
+        if maximum is not None:
+            bounds.append(f"<= {maximum}")
+        if below is not None:
+            bounds.append(f"< {below}")
+        description = f"{kind} {' and '.join(bounds)}" if bounds else kind
+    if nullable:
+        description += ' or null'
+
+    def check(value):
+        if value is None and nullable:
+            return None
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or (
+                isinstance(value, float) and not math.isfinite(value)):
+            return description
+        if integer and not isinstance(value, int):
+            return description
+        if ((minimum is not None and value < minimum) or (above is not None and value <= above)
+                or (maximum is not None and value > maximum) or (below is not None and value >= below)):
+            return description
+        return None
+    return check
+
+
+def _choice(*values, nullable=False):
+    """Check for one of the given values."""
+    def check(value):
+        if value in values or (value is None and nullable):
+            return None
+        return f"one of {', '.join(values)}{' or null' if nullable else ''}"
+    return check
+
+
+def _boolean(value):
+    return None if isinstance(value, bool) else 'true or false'
+
+
+def _string(nullable=False):
+    """Check for a (non-empty) string."""
+    def check(value):
+        if (value is None and nullable) or (isinstance(value, str) and value):
+            return None
+        return f"a non-empty string{' or null' if nullable else ''}"
+    return check
+
+
+def _date(value):
+    try:
+        datetime.strptime(value, '%Y-%m-%d')
+    except (TypeError, ValueError):
+        return 'a date YYYY-MM-DD'
+    return None
+
+
+def _object(nullable=False):
+    """Check for a JSON object (contents checked elsewhere)."""
+    def check(value):
+        if isinstance(value, Mapping) or (value is None and nullable):
+            return None
+        return f"an object{' or null' if nullable else ''}"
+    return check
+
+
+def _resolution(value):
+    if _number(above=0, integer=True)(value) is None and 1440 % value == 0:
+        return None
+    return 'a positive integer dividing 1440'
+
+
+def _transition_matrices(value):
+    if value is None:
+        return None
+    if not isinstance(value, Mapping) or not set(value) <= set(CLOUD_SEASONS):
+        return f"null or an object of {', '.join(CLOUD_SEASONS)} -> matrix"
+    for matrix in value.values():
+        if (not isinstance(matrix, (list, tuple)) or len(matrix) != CLOUD_LEVELS
+                or any(not isinstance(row, (list, tuple)) or len(row) != CLOUD_LEVELS
+                       or any(_number(minimum=0)(p) for p in row) or abs(sum(row) - 1.0) > 1e-6
+                       for row in matrix)):
+            return f"{CLOUD_LEVELS}x{CLOUD_LEVELS} matrices of probabilities with rows summing to 1"
+    return None
+
+
+def _strategy_mix(value):
+    if value is None:
+        return None
+    if (not isinstance(value, Mapping) or not value or not set(value) <= set(FLEET_STRATEGIES)
+            or any(_number(minimum=0)(share) for share in value.values()) or sum(value.values()) <= 0):
+        return f"null or an object of strategy -> share ({', '.join(FLEET_STRATEGIES)}) with a positive total"
+    return None
+
+
+_positive = _number(above=0)
+_positive_integer = _number(minimum=1, integer=True)
+_fraction = _number(minimum=0, maximum=1)
+_hour = _number(minimum=0, maximum=23, integer=True)
+
+# Section -> key -> (default, check). A section given as None is free-form
+# (any JSON object or null, validated where it is used)
+SCHEMA = {
+    'simulation': {
+        'duration_days': (REQUIRED, _positive),
+        'time_step_minutes': (REQUIRED, _positive_integer),
+        'start_date': (REQUIRED, _date),
+        'season': (REQUIRED, _choice(*SEASONS)),
+        'random_seed': (None, _number(integer=True, nullable=True)),
+        'random_streams': ('shared', _choice('shared', 'synchronized')),
+        'antithetic': (False, _boolean),
+        'adaptive_stepping': (False, _boolean),
+        'max_step_minutes': (60, _positive_integer),
+        'actual_seed_used': (OPTIONAL, _number(integer=True, nullable=True))
+    },
+    'battery': {
+        'unit_capacity_kwh': (REQUIRED, _positive),
+        'count': (1, _positive_integer),
+        'efficiency': (REQUIRED, _number(above=0, maximum=1)),
+        'min_soc': (REQUIRED, _number(minimum=0, below=1))
+    },
+    'degradation': {
+        'enabled': (False, _boolean),
+        'cycle_life': (5000, _positive),
+        'depth_exponent': (1.3, _positive),
+        'end_of_life_capacity': (0.8, _number(above=0, below=1)),
+        'calendar_fade_per_year': (0.01, _number(minimum=0, below=1)),
+        'depth_bins': (10, _positive_integer),
+        'soc_resolution': (0.001, _number(above=0, below=1))
+    },
+    'solar': {
+        'unit_peak_power_kw': (REQUIRED, _number(minimum=0)),
+        'count': (1, _positive_integer)
+    },
+    'clouds': {
+        'model': ('daily', _choice('daily', 'markov')),
+        'resolution_minutes': (15, _resolution),
+        'persistence_hours': (3.0, _positive),
+        'transition_matrices': (None, _transition_matrices)
+    },
+    'inverter': {
+        'unit_max_output_kw': (REQUIRED, _positive),
+        'count': (1, _positive_integer),
+        'individual_units': (False, _boolean),
+        'failure_rate': (REQUIRED, _fraction),
+        'min_failure_duration_hours': (REQUIRED, _number(minimum=0, integer=True)),
+        'max_failure_duration_hours': (REQUIRED, _number(minimum=0, integer=True)),
+        'sampling_failure_rate': (None, _number(above=0, below=1, nullable=True))
+    },
+    'load': {
+        'base_load_kw': (REQUIRED, _number(minimum=0)),
+        'peak_hours_max_kw': (REQUIRED, _number(minimum=0)),
+        'peak_hours_start': (REQUIRED, _hour),
+        'peak_hours_end': (REQUIRED, _number(minimum=0, maximum=24, integer=True))
+    },
+    'grid': {
+        'import_cost_per_kwh': (REQUIRED, _number()),
+        'export_revenue_per_kwh': (REQUIRED, _number()),
+        'export_limit_kw': (REQUIRED, _number(minimum=0))
+    },
+    'energy_management': {
+        'strategy': (REQUIRED, _choice(*STRATEGIES))
+    },
+    'mpc': {
+        'horizon_hours': (24, _positive),
+        'replan_interval_minutes': (60, _positive),
+        'forecast_tolerance': (0.05, _positive),
+        'soc_levels': (51, _number(minimum=2, integer=True)),
+        'cache_size': (4096, _positive_integer)
+    },
+    'replay': {
+        'path': (None, _string(nullable=True)),
+        'format': ('auto', _choice('auto', 'csv', 'binary')),
+        'timestamp_column': ('timestamp', _string()),
+        'solar_column': ('solar_kw', _string()),
+        'load_column': ('load_kw', _string()),
+        'chunk_rows': (65536, _positive_integer)
+    },
+    'fleet': {
+        'homes': (100, _positive_integer),
+        'feeder_export_limit_kw': (None, _number(minimum=0, nullable=True)),
+        'strategy_mix': (None, _strategy_mix),
+        'size_variation': (0.0, _number(minimum=0, below=1)),
+        'cloud_variation': (0.0, _number(minimum=0))
+    },
+    'tariff': None,
+    'optimal_dispatch': {
+        'soc_levels': (201, _number(minimum=2, integer=True)),
+        'terminal_soc': (None, _number(minimum=0, maximum=1, nullable=True))
+    },
+    'output': {
+        'compression': (None, _choice('gzip', 'xz', 'zstd', nullable=True)),
+        'compression_level': (None, _number(minimum=0, maximum=22, integer=True, nullable=True)),
+        'compression_threads': (0, _number(minimum=-1, integer=True))
+    },
+    'results_database': {
+        'path': (None, _string(nullable=True)),
+        'daily_summaries': (True, _boolean),
+        'label': (None, _string(nullable=True)),
+        'batch_size': (100, _positive_integer)
+    },
+    'sweep': {
+        'parameters': ({}, _object()),
+        'chunk_size': (8, _positive_integer),
+        'lease_timeout_seconds': (300, _positive),
+        'max_attempts': (3, _positive_integer)
+    }
+}
+
+
+class ConfigError(ValueError):
+    """Invalid configuration; problems lists every problem found."""
+
+    def __init__(self, problems):
+        self.problems = list(problems)
+        super().__init__("Invalid configuration: " + "; ".join(self.problems))
+
+
+class Config(Mapping):
+    """
+    Immutable, validated configuration (see compile_config()).
+
+    Reads like the nested dict it was compiled from (config['battery']
+    ['count'], .get(), iteration) and also by attribute
+    (config.battery.count). Sections and other objects are Config, lists
+    are tuples, and nothing can be changed: derive a new configuration with
+    with_overrides().
+
+    Equal configurations have equal hashes, also across processes through
+    fingerprint (SHA-256 of the canonical JSON), so a Config can key a
+    result cache. It pickles as its canonical JSON text, a single string
+    instead of a tree of dicts, and an unpickled Config only parses it on
+    first access: to_dict() in a worker is one json.loads.
+    """
+
+    __slots__ = ('_items', '_json')
+
+    def __init__(self, items):
+        """
+        Freeze a (validated) nested mapping.
+
+        Args:
+            items (Mapping): Configuration values (plain JSON types); keys
+                are kept sorted, like the canonical JSON
+        """
+        object.__setattr__(self, '_items', {key: _freeze(items[key]) for key in sorted(items)})
+        object.__setattr__(self, '_json', None)
+
+    @classmethod
+    def from_json(cls, text):
+        """Config of to_json() text (no validation, parsed on first access)."""
+        config = cls.__new__(cls)
+        object.__setattr__(config, '_items', None)
+        object.__setattr__(config, '_json', text)
+        return config
+
+    def _values(self):
+        if self._items is None:
+            object.__setattr__(self, '_items', {key: _freeze(value) for key, value in json.loads(self._json).items()})
+        return self._items
+
+    def __getitem__(self, key):
+        return self._values()[key]
+
+    def __iter__(self):
+        return iter(self._values())
+
+    def __len__(self):
+        return len(self._values())
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)  # Slots not set yet (copying, unpickling)
+        try:
+            return self._values()[name]
+        except KeyError:
+            raise AttributeError(f"Configuration has no key '{name}'") from None
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Config is immutable, use with_overrides()")
+
+    def __delattr__(self, name):
+        raise AttributeError("Config is immutable, use with_overrides()")
+
+    def __eq__(self, other):
+        if not isinstance(other, Config):
+            return NotImplemented
+        return self.to_json() == other.to_json()
+
+    def __hash__(self):
+        return hash(self.to_json())
+
+    def __reduce__(self):
+        return (Config.from_json, (self.to_json(),))
+
+    def __repr__(self):
+        return f"Config({self.to_json()})"
+
+    @property
+    def fingerprint(self):
+        """SHA-256 hex digest of the canonical JSON (stable across runs and hosts)."""
+        return hashlib.sha256(self.to_json().encode()).hexdigest()
+
+    def to_json(self):
+        """Canonical JSON text (sorted keys, no whitespace)."""
+        if self._json is None:
+            values = {key: _thaw(value) for key, value in self._items.items()}
+            object.__setattr__(self, '_json', json.dumps(values, sort_keys=True, separators=(',', ':')))
+        return self._json
+
+    def to_dict(self):
+        """
+        Mutable copy of the configuration.
+
+        Returns:
+            dict: Nested dicts and lists (keys sorted), as loaded from a
+                config file
+        """
+        return json.loads(self.to_json())
+
+    def with_overrides(self, overrides):
+        """
+        Validate a derived configuration.
+
+        Args:
+            overrides (dict): Partial configuration merged over this one
+                (sections key by key, see merge_config())
+
+        Returns:
+            Config: New configuration
+
+        Raises:
+            ConfigError: The merged configuration is invalid
+        """
+        return compile_config(self, overrides)
+
+
+def compile_config(config, overrides=None):
+    """
+    Validate a configuration into an immutable Config.
+
+    Keys starting with '_' (comments, _help texts, examples) are ignored
+    and missing optional keys get their defaults, so the result has every
+    section of SCHEMA.
+
+    Args:
+        config (dict or Config): Configuration
+        overrides (dict, optional): Partial configuration merged over config
+
+    Returns:
+        Config: Compiled configuration
+
+    Raises:
+        ConfigError: With every problem found
+    """
+    if isinstance(config, Config) and not overrides:
+        return config
+    raw = config.to_dict() if isinstance(config, Config) else config
+    if overrides:
+        raw = merge_config(raw, overrides)
+    problems = []
+    compiled = _validate(raw, problems)
+    if problems:
+        raise ConfigError(problems)
+    return Config(compiled)
+
+
+def check_config(config):
+    """
+    Validate a configuration without compiling it.
+
+    Args:
+        config (dict): Configuration
+
+    Returns:
+        list: Problems found (empty when the configuration is valid)
+    """
+    problems = []
+    _validate(config, problems)
+    return problems
+
+
+def check_overrides(base, overrides):
+    """
+    Validate a partial configuration merged over a valid configuration.
+
+    Only the keys the overrides set are checked again (plus the checks
+    across sections), so validating every run of a large sweep costs
+    little more than reading its overrides.
+
+    Args:
+        base (Mapping): Complete, valid configuration (a Config or its
+            to_dict())
+        overrides (dict): Partial configuration
+
+    Returns:
+        list: Problems found (empty when the merged configuration is valid)
+    """
+    problems = []
+    if not isinstance(overrides, Mapping):
+        return ["Overrides must be a JSON object"]
+    _unknown_keys(overrides, SCHEMA, '', problems)
+    merged = dict(base)
+    for section, value in overrides.items():
+        if section not in SCHEMA:
+            continue
+        fields = SCHEMA[section]
+        current = base.get(section)
+        if not isinstance(value, Mapping) or not isinstance(current, Mapping):
+            merged[section] = _validate_section(section, value, problems)
+            continue
+        if fields is None:
+            merged[section] = merge_config(current, value)
+            continue
+        _unknown_keys(value, fields, f"{section}.", problems)
+        values = dict(current)
+        for key, item in value.items():
+            if key in fields:
+                if isinstance(item, Mapping) and isinstance(current.get(key), Mapping):
+                    item = merge_config(current[key], item)
+                values[key] = _check_value(section, key, item, problems)
+        merged[section] = values
+    if not problems:
+        _check_combinations(merged, problems)
+    return problems
+
+
+def _validate(raw, problems):
+    """Fill in defaults and collect problems; returns the completed dict."""
+    if not isinstance(raw, Mapping):
+        problems.append("Configuration must be a JSON object")
+        return {}
+    _unknown_keys(raw, SCHEMA, '', problems)
+    compiled = {section: _validate_section(section, raw.get(section), problems) for section in SCHEMA}
+    if not problems:
+        _check_combinations(compiled, problems)
+    return compiled
+
+
+def _validate_section(section, given, problems):
+    """Check one section and fill in its defaults (None when unusable)."""
+    fields = SCHEMA[section]
+    if fields is None:
+        error = _object(nullable=True)(given)
+        if error:
+            problems.append(f"{section} must be {error}, got {given!r}")
+        return given
+    if given is None:
+        if any(default is REQUIRED for default, _ in fields.values()):
+            problems.append(f"Missing section '{section}'")
+            return None
+        given = {}
+    elif not isinstance(given, Mapping):
+        problems.append(f"{section} must be an object, got {given!r}")
+        return None
+    _unknown_keys(given, fields, f"{section}.", problems)
+
+    values = {}
+    for key, (default, _) in fields.items():
+        if key not in given:
+            if default is REQUIRED:
+                problems.append(f"Missing key '{section}.{key}'")
+            elif default is not OPTIONAL:
+                values[key] = json.loads(json.dumps(default))
+            continue
+        values[key] = _check_value(section, key, given[key], problems)
+    return values
+
+
+def _check_value(section, key, value, problems):
+    """Check one value; returns it."""
+    error = SCHEMA[section][key][1](value)
+    if error:
+        problems.append(f"{section}.{key} must be {error}, got {value!r}")
+    return value
+
+
+def _unknown_keys(given, known, prefix, problems):
+    """Report keys that are not in the schema (typos), with a suggestion."""
+    for key in given:
+        if isinstance(key, str) and key.startswith('_'):
+            continue
+        if key not in known:
+            close = difflib.get_close_matches(str(key), list(known), n=1)
+            hint = f" (did you mean '{prefix}{close[0]}'?)" if close else ""
+            problems.append(f"Unknown key '{prefix}{key}'{hint}")
+
+
+def _check_combinations(config, problems):
+    """Checks that involve several keys (run once every key is valid)."""
+    simulation = config['simulation']
+    inverter = config['inverter']
+    if inverter['min_failure_duration_hours'] > inverter['max_failure_duration_hours']:
+        problems.append(f"inverter.min_failure_duration_hours ({inverter['min_failure_duration_hours']}) "
+                        f"exceeds max_failure_duration_hours ({inverter['max_failure_duration_hours']})")
+    if simulation['adaptive_stepping']:
+        if config['replay']['path'] or config['energy_management']['strategy'] == 'MPC':
+            problems.append("simulation.adaptive_stepping needs the synthetic solar model and a heuristic "
+                            "strategy (not replay or MPC)")
+        if simulation['max_step_minutes'] < simulation['time_step_minutes']:
+            problems.append(f"simulation.max_step_minutes ({simulation['max_step_minutes']}) is shorter than "
+                            f"time_step_minutes ({simulation['time_step_minutes']})")
+
+
+def merge_config(base, overrides):
+    """
+    Merge a partial configuration over a base configuration.
+
+    Nested sections are merged key by key; any other value replaces the
+    base value.
+
+    Args:
+        base (dict): Base configuration (not modified)
+        overrides (dict): Partial configuration
+
+    Returns:
+        dict: New merged configuration
+    """
+    merged = json.loads(json.dumps(_thaw(base)))
+    for key, value in overrides.items():
+        if isinstance(value, Mapping) and isinstance(merged.get(key), dict):
+            merged[key] = merge_config(merged[key], value)
+        else:
+            merged[key] = _thaw(value)
+    return merged
+
+
+def _freeze(value):
+    if isinstance(value, Mapping):
+        return value if isinstance(value, Config) else Config(value)
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value):
+    if isinstance(value, Mapping):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_thaw(item) for item in value]
+    return value
@@ -1,8 +1,13 @@
 import csv
 import json
+import math
 from datetime import datetime
 import os
 
+from .CompressedIO import check_codec, compressed_path, open_text_writer
+from .ReportStatistics import ReportStatistics
+from .ResultsDatabase import ResultsDatabase
+
 class DataLogger:
     """
     Handles data export for simulation results.
@@ -12,7 +17,7 @@ class DataLogger:
     - Phase 3: Machine learning integration
     """
     
-    def __init__(self, results, config, output_dir='results'):
+    def __init__(self, results, config, output_dir='results', verbose=True):
         """
         Initialize data logger with simulation results.
         
@@ -20,9 +25,20 @@ class DataLogger:
             results (dict): Simulation results from Simulation.run()
             config (dict): Configuration used for the simulation
             output_dir (str): Base directory to save output files
+            verbose (bool): Print progress (False for background exports,
+                see AsyncExporter)
         """
         self.results = results
         self.config = config
+        self.output_dir = output_dir
+        self.verbose = verbose
+        
+        # CSV compression (off by default: plain .csv files)
+        output = config.get('output') or {}
+        self.compression = output.get('compression')
+        self.compression_level = output.get('compression_level')
+        self.compression_threads = output.get('compression_threads', 0)
+        check_codec(self.compression, self.compression_level)
         
         # Generate timestamp for folder naming
         self.timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
@@ -34,12 +50,60 @@ class DataLogger:
         
         # Create descriptive folder name
         folder_name = f"sim_{self.timestamp}_{strategy}_{season}_{days}d"
-        self.run_folder = os.path.join(output_dir, folder_name)
         
-        # Create the folder
-        os.makedirs(self.run_folder, exist_ok=True)
+        # Create the folder; runs started within the same second get a
+        # sequence suffix (_2, _3, ...) instead of overwriting each other
+        self.run_folder = self._create_run_folder(output_dir, folder_name)
         
-        print(f"\nSaving to: {self.run_folder}")
+        self._log(f"\nSaving to: {self.run_folder}")
+    
+    @staticmethod
+    def _create_run_folder(output_dir, folder_name):
+        """
+        Create a new, empty run folder.
+        
+        os.mkdir fails if the folder exists, so concurrent loggers (threads
+        or processes, see AsyncExporter) never share a folder.
+        
+        Args:
+            output_dir (str): Base directory (created if missing)
+            folder_name (str): Preferred folder name
+        
+        Returns:
+            str: Path of the created folder
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        sequence = 1
+        while True:
+            suffix = f"_{sequence}" if sequence > 1 else ""
+            run_folder = os.path.join(output_dir, folder_name + suffix)
+            try:
+                os.mkdir(run_folder)
+                return run_folder
+            except FileExistsError:
+                sequence += 1
+    
+    def _log(self, message):
+        """Print a progress message unless the logger is quiet."""
+        if self.verbose:
+            print(message)
+    
+    def _write_csv(self, name, fieldnames, rows):
+        """
+        Write rows to a CSV in the run folder (compressed if configured).
+        
+        Returns:
+            str: Path to saved file
+        """
+        filename = compressed_path(os.path.join(self.run_folder, name), self.compression)
+        
+        with open_text_writer(filename, self.compression, self.compression_level,
+                              self.compression_threads) as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(rows)
+        
+        return filename
     
     def save_all(self):
         """
@@ -48,9 +112,9 @@ class DataLogger:
         Returns:
             dict: Paths to saved files
         """
-        print("\n" + "=" * 70)
-        print("EXPORTING SIMULATION DATA")
-        print("=" * 70)
+        self._log("\n" + "=" * 70)
+        self._log("EXPORTING SIMULATION DATA")
+        self._log("=" * 70)
         
         saved_files = {}
         
@@ -65,11 +129,19 @@ class DataLogger:
         # Summary for quick analysis
         saved_files['summary_json'] = self.save_summary_json()
         
+        # Performance instrumentation (only for instrumented runs)
+        if 'perf' in self.results:
+            saved_files['perf_json'] = self.save_perf_json()
+        
         # Answers to document questions (for report)
         saved_files['answers_txt'] = self.save_answers()
         
-        print("\nAll data exported successfully!")
-        print(f"Ready for Phase 2 (Visualization) and Phase 3 (ML)")
+        # Cross-run results database (only when configured)
+        if (self.config.get('results_database') or {}).get('path'):
+            saved_files['database'] = self.save_to_database()
+        
+        self._log("\nAll data exported successfully!")
+        self._log(f"Ready for Phase 2 (Visualization) and Phase 3 (ML)")
         
         return saved_files
     
@@ -80,21 +152,15 @@ class DataLogger:
         Returns:
             str: Path to saved file
         """
-        filename = os.path.join(self.run_folder, "hourly_data.csv")
-        
         if not self.results['data']['hourly_data']:
-            print("  Warning: No hourly data")
+            self._log("  Warning: No hourly data")
             return None
         
         fieldnames = self.results['data']['hourly_data'][0].keys()
-        
-        with open(filename, 'w', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(self.results['data']['hourly_data'])
+        filename = self._write_csv("hourly_data.csv", fieldnames, self.results['data']['hourly_data'])
         
         rows = len(self.results['data']['hourly_data'])
-        print(f"  Hourly data: {rows} rows")
+        self._log(f"  Hourly data: {rows} rows")
         return filename
     
     def save_daily_summaries(self):
@@ -104,21 +170,15 @@ class DataLogger:
         Returns:
             str: Path to saved file
         """
-        filename = os.path.join(self.run_folder, "daily_summaries.csv")
-        
         if not self.results['data']['daily_summaries']:
-            print("  Warning: No daily summaries")
+            self._log("  Warning: No daily summaries")
             return None
         
         fieldnames = self.results['data']['daily_summaries'][0].keys()
-        
-        with open(filename, 'w', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(self.results['data']['daily_summaries'])
+        filename = self._write_csv("daily_summaries.csv", fieldnames, self.results['data']['daily_summaries'])
         
         rows = len(self.results['data']['daily_summaries'])
-        print(f"  Daily summaries: {rows} days")
+        self._log(f"  Daily summaries: {rows} days")
         return filename
     
     def save_events_log(self):
@@ -128,24 +188,16 @@ class DataLogger:
         Returns:
             str: Path to saved file
         """
-        filename = os.path.join(self.run_folder, "events_log.csv")
-        
         if not self.results['data']['events_log']:
-            with open(filename, 'w', newline='') as f:
-                writer = csv.DictWriter(f, fieldnames=['timestamp', 'message'])
-                writer.writeheader()
-            print(f"  Events log: 0 events")
+            filename = self._write_csv("events_log.csv", ['timestamp', 'message'], [])
+            self._log(f"  Events log: 0 events")
             return filename
         
         fieldnames = self.results['data']['events_log'][0].keys()
-        
-        with open(filename, 'w', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(self.results['data']['events_log'])
+        filename = self._write_csv("events_log.csv", fieldnames, self.results['data']['events_log'])
         
         rows = len(self.results['data']['events_log'])
-        print(f"  Events log: {rows} events")
+        self._log(f"  Events log: {rows} events")
         return filename
     
     def save_config(self):
@@ -161,7 +213,7 @@ class DataLogger:
             json.dump(self.config, f, indent=2)
         
         seed = self.config['simulation'].get('actual_seed_used', 'N/A')
-        print(f"  Configuration saved (seed: {seed})")
+        self._log(f"  Configuration saved (seed: {seed})")
         return filename
     
     def save_summary_json(self):
@@ -184,9 +236,50 @@ class DataLogger:
         with open(filename, 'w') as f:
             json.dump(summary, f, indent=2)
         
-        print(f"  Summary JSON saved")
+        self._log(f"  Summary JSON saved")
         return filename
     
+    def save_perf_json(self):
+        """
+        Save the performance instrumentation block as JSON.
+        
+        Returns:
+            str: Path to saved file (None if the run was not instrumented)
+        """
+        if 'perf' not in self.results:
+            self._log("  Warning: No performance data (run was not instrumented)")
+            return None
+        
+        filename = os.path.join(self.run_folder, "perf.json")
+        
+        with open(filename, 'w') as f:
+            json.dump(self.results['perf'], f, indent=2)
+        
+        self._log(f"  Performance JSON saved")
+        return filename
+    
+    def save_to_database(self):
+        """
+        Insert the run into the configured results database.
+        
+        A relative results_database.path is inside the output directory.
+        
+        Returns:
+            str: Path of the database file
+        """
+        settings = self.config['results_database']
+        path = os.path.join(self.output_dir, settings['path'])
+        
+        with ResultsDatabase(path) as database:
+            run_id = database.insert_run(
+                self.results, self.config,
+                include_daily=settings.get('daily_summaries', True),
+                label=settings.get('label')
+            )
+        
+        self._log(f"  Results database: run {run_id}")
+        return path
+    
     def save_answers(self):
         """
         Save answers to all document questions.
@@ -201,7 +294,7 @@ class DataLogger:
         with open(filename, 'w') as f:
             f.write(answers_text)
         
-        print(f"  Answers document saved")
+        self._log(f"  Answers document saved")
         return filename
     
     def _generate_answers(self):
@@ -246,32 +339,21 @@ class DataLogger:
         # Question 2: Use config values
         answers.append("2. How often does the battery reach full charge or empty state?")
         
-        # Get thresholds from config
-        min_soc_threshold = self.config['battery']['min_soc'] * 100
-        max_soc_threshold = 100.0
-        
-        # Count using config-based thresholds
-        full_count = sum(
-            1 for h in self.results['data']['hourly_data'] 
-            if h['battery_soc'] >= (max_soc_threshold - 0.1)
-        )
-        empty_count = sum(
-            1 for h in self.results['data']['hourly_data'] 
-            if h['battery_soc'] <= (min_soc_threshold + 0.1)
-        )
-
-        # Calculate hours based on time step
-        time_step_hours = self.config['simulation']['time_step_minutes'] / 60.0
-        total_steps = len(self.results['data']['hourly_data'])
+        # Single-pass statistics (precomputed by Simulation when available)
+        stats = ReportStatistics.from_results(self.results, self.config)
+        
+        full_count = stats['full_count']
+        empty_count = stats['empty_count']
+        total_steps = stats['total_steps']
 
-        full_hours = full_count * time_step_hours
-        empty_hours = empty_count * time_step_hours
+        full_hours = stats['full_hours']
+        empty_hours = stats['empty_hours']
         full_per_month = (full_hours / months) if months > 0 else full_hours
         empty_per_month = (empty_hours / months) if months > 0 else empty_hours
 
-        answers.append(f"   -> Full (>={max_soc_threshold - 0.1:.1f}%): {full_hours:.1f} hours total ({full_count/total_steps*100:.1f}%)")
+        answers.append(f"   -> Full (>={stats['full_threshold_percent']:.1f}%): {full_hours:.1f} hours total ({full_count/total_steps*100:.1f}%)")
         answers.append(f"      Per month average: {full_per_month:.1f} hours")
-        answers.append(f"   -> Empty (<={min_soc_threshold + 0.1:.1f}%): {empty_hours:.1f} hours total ({empty_count/total_steps*100:.1f}%)")
+        answers.append(f"   -> Empty (<={stats['empty_threshold_percent']:.1f}%): {empty_hours:.1f} hours total ({empty_count/total_steps*100:.1f}%)")
         answers.append(f"      Per month average: {empty_per_month:.1f} hours")
         
         # Question 3
@@ -306,14 +388,7 @@ class DataLogger:
         answers.append("6. How many times did the inverter fail, and what was the total downtime?")
         failures = self.results['reliability']['inverter_failures']
         
-        #Calculate actual downtime from hourly data
-        time_step_minutes = self.config['simulation']['time_step_minutes']
-        time_step_hours = time_step_minutes / 60.0
-        
-        total_downtime = sum(
-            time_step_hours for h in self.results['data']['hourly_data']
-            if not h['inverter_operational']
-        )
+        total_downtime = stats['inverter_downtime_hours']
         
         answers.append(f"   -> Failures: {failures} ({failures/months:.1f} per month)")
         answers.append(f"   -> Total downtime: {total_downtime:.1f} hours ({total_downtime/months:.1f} hours per month)")
@@ -321,13 +396,16 @@ class DataLogger:
         
         # Question 7
         answers.append("7. What is the average cloud coverage during the month?")
-        avg_cloud = sum(h['cloud_coverage'] for h in self.results['data']['hourly_data']) / len(self.results['data']['hourly_data'])
-        answers.append(f"   -> {avg_cloud:.3f} ({avg_cloud*100:.1f}%)")
+        avg_cloud = stats['average_cloud_coverage']
+        if math.isnan(avg_cloud):
+            answers.append("   -> Unknown (measured trace replay, no cloud model)")
+        else:
+            answers.append(f"   -> {avg_cloud:.3f} ({avg_cloud*100:.1f}%)")
         answers.append("")
         
         # Question 8
         answers.append("8. What is the peak load demand observed during the month?")
-        peak_load = max(h['load_demand_kw'] for h in self.results['data']['hourly_data'])
+        peak_load = stats['peak_load_kw']
         answers.append(f"   -> {peak_load:.2f} kW")
         answers.append("")
         
@@ -359,8 +437,14 @@ class DataLogger:
         
         # Question 12
         answers.append("12. Which energy management strategy is most cost-effective?")
-        answers.append(f"   -> Export rate: ${self.config['grid']['export_revenue_per_kwh']}/kWh")
-        answers.append(f"   -> Import rate: ${self.config['grid']['import_cost_per_kwh']}/kWh")
+        if self.config.get('tariff'):
+            financial = self.results['financial']
+            answers.append(f"   -> Tariff: {financial['tariff']} (time-of-use / tiered)")
+            answers.append(f"   -> Demand charges: ${financial['demand_charges']:.2f}, "
+                           f"fixed charges: ${financial['fixed_charges']:.2f}")
+        else:
+            answers.append(f"   -> Export rate: ${self.config['grid']['export_revenue_per_kwh']}/kWh")
+            answers.append(f"   -> Import rate: ${self.config['grid']['import_cost_per_kwh']}/kWh")
         net_cost_total = self.results['financial']['net_cost']
         net_cost_per_month = net_cost_total / months
         answers.append(f"   -> Current strategy net cost: ${net_cost_total:.2f} total (${net_cost_per_month:.2f}/month)")
@@ -370,7 +454,8 @@ class DataLogger:
         # Question 13
         answers.append("13. What is the impact of different cloud coverage levels on solar generation?")
         answers.append(f"   -> Season: {self.results['summary']['season']}")
-        answers.append(f"   -> Avg cloud coverage: {avg_cloud:.2f}")
+        if not math.isnan(avg_cloud):
+            answers.append(f"   -> Avg cloud coverage: {avg_cloud:.2f}")
         answers.append(f"   -> Solar generated: {solar_total:.2f} kWh total ({solar_per_month:.2f} kWh/month)")
         answers.append("   -> Note: Run simulations with different seasons for comparison")
         answers.append("")
@@ -7,7 +7,7 @@ class EnergyManagementSystem:
     - Where does deficit energy come from?
     """
     
-    def __init__(self, strategy='LOAD_PRIORITY'):
+    def __init__(self, strategy='LOAD_PRIORITY', controller=None):
         """
         Initialize the energy management system.
         
@@ -16,10 +16,18 @@ class EnergyManagementSystem:
                 - 'LOAD_PRIORITY': House first, battery second, grid last
                 - 'CHARGE_PRIORITY': Battery first, house second, grid last
                 - 'PRODUCE_PRIORITY': Grid export first, battery second, house last
+                - 'MPC': Battery follows a rolling 24 h cost-minimizing plan
+            controller (ModelPredictiveController, optional): Planner used by
+                the 'MPC' strategy (required for it)
         """
+        if strategy == 'MPC' and controller is None:
+            raise ValueError("MPC strategy requires a ModelPredictiveController")
+        
         self._strategy = strategy
+        self._controller = controller
 
-    def distribute_energy(self, solar_kw, load_kw, battery, grid, time_step_hours=1.0):
+    def distribute_energy(self, solar_kw, load_kw, battery, grid, time_step_hours=1.0,
+                          step=None, cloud_coverage=None):
         """
         Distribute energy according to the selected strategy.
         
@@ -29,6 +37,9 @@ class EnergyManagementSystem:
             battery (Battery): Battery object
             grid (Grid): Grid object
             time_step_hours (float): Duration of time step in hours
+            step (int, optional): Simulation step index (used by 'MPC')
+            cloud_coverage (float, optional): Today's cloud coverage forecast
+                (used by 'MPC')
             
         Returns:
             dict: Energy flows for logging {
@@ -50,9 +61,62 @@ class EnergyManagementSystem:
         elif self._strategy == 'PRODUCE_PRIORITY':
             return self._produce_priority(solar_kw, load_kw, battery, grid, time_step_hours)
         
+        elif self._strategy == 'MPC':
+            return self._mpc(solar_kw, load_kw, battery, grid, time_step_hours, step, cloud_coverage)
+        
         else:
             raise ValueError(f"Unknown strategy: {self._strategy}")
 
+    def distribute_without_solar(self, load_kw, battery, grid, time_step_hours, steps):
+        """
+        Closed-form dispatch of several steps without solar and constant load.
+
+        With no solar every heuristic strategy serves the load from the
+        battery until it reaches min_soc and imports the rest, so the result
+        is the same as calling distribute_energy(0, load_kw, ...) once per
+        step, but the battery and grid are only updated once.
+
+        Args:
+            load_kw (float): House load demand in kW (same for every step)
+            battery (Battery): Battery object
+            grid (Grid): Grid object
+            time_step_hours (float): Duration of one step in hours
+            steps (int): Number of steps
+
+        Returns:
+            list: Energy flows per step (same keys as distribute_energy)
+        """
+        if self._strategy == 'MPC':
+            raise ValueError("MPC decides the battery per step; use distribute_energy")
+
+        # Battery supplies the full load until it is empty, then nothing
+        step_energy = load_kw * time_step_hours
+        supplied = battery.discharge(step_energy * steps)
+        full_steps = min(int(supplied / step_energy + 1e-9), steps) if step_energy > 0 else steps
+        partial_kw = max(supplied - full_steps * step_energy, 0.0) / time_step_hours
+
+        imported_kwh = step_energy * steps - supplied
+        if imported_kwh > 0:
+            grid.import_energy(imported_kwh / (time_step_hours * steps), time_step_hours * steps)
+
+        def flows(battery_to_load):
+            grid_to_load = round(load_kw - battery_to_load, 6)
+            return {
+                'solar_to_load': 0.0,
+                'solar_to_battery': 0.0,
+                'solar_to_grid': 0.0,
+                'battery_to_load': round(battery_to_load, 6),
+                'grid_to_load': grid_to_load,
+                'unmet_load': grid_to_load,
+                'curtailed': 0.0
+            }
+
+        result = [flows(load_kw)] * full_steps
+        if full_steps < steps:
+            result.append(flows(partial_kw))
+            result.extend([flows(0.0)] * (steps - full_steps - 1))
+        return result
+
 # ==============================LOAD_PRIORITY==========================================
 
     def _load_priority(self, solar_kw, load_kw, battery, grid, time_step_hours):
@@ -330,6 +394,92 @@ class EnergyManagementSystem:
         
         unmet_load = grid_to_load
         
+        return {
+            'solar_to_load': round(solar_to_load, 6),
+            'solar_to_battery': round(solar_to_battery, 6),
+            'solar_to_grid': round(solar_to_grid, 6),
+            'battery_to_load': round(battery_to_load, 6),
+            'grid_to_load': round(grid_to_load, 6),
+            'unmet_load': round(unmet_load, 6),
+            'curtailed': round(curtailed, 6)
+        }
+
+# ==============================MPC==========================================
+
+    def _mpc(self, solar_kw, load_kw, battery, grid, time_step_hours, step, cloud_coverage):
+        """
+        MPC: Battery charge/discharge decided by the rolling-horizon planner.
+        
+        The controller plans the next 24 hours on forecasts and returns only
+        this step's decision. The decision is applied to the real solar and
+        load, so it is capped by what is actually available:
+        1. Charge battery from solar up to the planned amount
+        2. Split remaining solar between house and grid export in the order
+           that pays more (export only if it earns anything; rest curtailed)
+        3. Cover house deficit from battery up to the planned amount
+        4. Import from grid if still needed
+        
+        Args:
+            solar_kw (float): Available solar power
+            load_kw (float): House demand
+            battery (Battery): Battery object
+            grid (Grid): Grid object
+            time_step_hours (float): Duration of time step in hours
+            step (int): Simulation step index
+            cloud_coverage (float): Today's cloud coverage forecast (or None)
+            
+        Returns:
+            dict: Energy flows
+        """
+        decision = self._controller.decide(step, battery, cloud_coverage)
+        
+        solar_to_load = 0.0
+        solar_to_battery = 0.0
+        solar_to_grid = 0.0
+        battery_to_load = 0.0
+        grid_to_load = 0.0
+        curtailed = 0.0
+        
+        # Step 1: Charge battery with the planned share of solar
+        solar_remaining = solar_kw
+        if decision['charge_kwh'] > 0 and solar_kw > 0:
+            offered_energy = min(decision['charge_kwh'], solar_kw * time_step_hours)
+            charged_energy = battery.charge(offered_energy)
+            solar_to_battery = charged_energy / time_step_hours
+            solar_remaining = solar_kw - solar_to_battery
+        
+        # Step 2: Remaining solar to house and grid
+        if decision['export_first']:
+            if solar_remaining > 0 and decision['allow_export']:
+                solar_to_grid = grid.export_energy(solar_remaining, time_step_hours)
+                solar_remaining -= solar_to_grid
+            solar_to_load = min(solar_remaining, load_kw)
+            solar_remaining -= solar_to_load
+        else:
+            solar_to_load = min(solar_remaining, load_kw)
+            solar_remaining -= solar_to_load
+            if solar_remaining > 0 and decision['allow_export']:
+                solar_to_grid = grid.export_energy(solar_remaining, time_step_hours)
+                solar_remaining -= solar_to_grid
+        
+        if solar_remaining > 0:
+            curtailed = solar_remaining
+        
+        # Step 3: Cover deficit from battery up to the planned amount
+        deficit = load_kw - solar_to_load
+        if deficit > 0 and decision['discharge_kwh'] > 0:
+            requested_energy = min(decision['discharge_kwh'], deficit * time_step_hours)
+            discharged_energy = battery.discharge(requested_energy)
+            battery_to_load = discharged_energy / time_step_hours
+            deficit -= battery_to_load
+        
+        # Step 4: Import from grid if still needed
+        if deficit > 0:
+            grid.import_energy(deficit, time_step_hours)
+            grid_to_load = deficit
+        
+        unmet_load = grid_to_load
+        
         return {
             'solar_to_load': round(solar_to_load, 6),
             'solar_to_battery': round(solar_to_battery, 6),
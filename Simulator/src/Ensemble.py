@@ -0,0 +1,701 @@
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+import contextlib
+from datetime import datetime, timedelta
+import io
+import math
+import random
+import time
+from statistics import NormalDist
+
+import numpy as np
+
+from .CloudCoverage import CloudCoverage
+from .ConfigSchema import compile_config
+from .MarkovCloudCoverage import MarkovCloudCoverage
+from .ResultsDatabase import ResultsDatabase
+from .Simulation import Simulation
+from .SolarPanel import SolarPanel
+
+# Ensemble metrics: name -> path in the Simulation results
+METRICS = {
+    'net_cost': ('financial', 'net_cost'),
+    'inverter_failures': ('reliability', 'inverter_failures'),
+    'hours_with_unmet_load': ('reliability', 'hours_with_unmet_load'),
+    'total_unmet_load_kwh': ('reliability', 'total_unmet_load_kwh'),
+    'self_sufficiency_percent': ('summary', 'self_sufficiency_percent')
+}
+
+# Metrics computed from the ones above: name -> function of a sample
+DERIVED_METRICS = {
+    'inverter_failure_probability': lambda sample: float(sample['inverter_failures'] > 0)
+}
+
+ESTIMATED_METRICS = tuple(METRICS) + tuple(DERIVED_METRICS)
+
+# Tail quantiles reported per strategy (weighted under importance sampling)
+TAIL_METRICS = ('total_unmet_load_kwh', 'hours_with_unmet_load')
+QUANTILES = (0.5, 0.9, 0.99)
+
+class Ensemble:
+    """
+    Monte Carlo ensemble of simulation runs with variance reduction.
+
+    Estimates the mean of each metric in ESTIMATED_METRICS (per strategy)
+    with a confidence interval, either from a fixed number of runs (run) or
+    by adding runs until the intervals are narrow enough (run_adaptive).
+    Variance reduction:
+    - Common random numbers: every strategy is run with the same seeds and
+      synchronized random streams (see RandomStreams), so differences between
+      strategies are not drowned by weather/load noise
+    - Antithetic variates (optional): runs come in pairs, the second one
+      with mirrored uniform draws (see AntitheticRandom); the pair average is
+      one sample
+    - Control variate: the solar energy available before the inverter, whose
+      expectation is known analytically from SolarPanel and the seasonal
+      cloud distribution, is used to correct each sample
+    - Importance sampling (optional): inverter failures are drawn at an
+      inflated daily rate and every run is weighted by its likelihood ratio
+      (see Inverter), so rare outage scenarios show up in far fewer runs.
+      Means use E[W * Y] and tail quantiles the weighted distribution, both
+      unbiased for the real failure rate
+
+    With a results database, every run is also stored there (see
+    ResultsDatabase): workers build the rows and the ensemble inserts them
+    in batches.
+
+    The effective sample size (ESS) is the number of plain independent runs
+    that would give the same standard error; runs_saved = ESS - runs.
+    """
+
+    # Fewer sample units than this make the fitted control coefficient too
+    # noisy to trust, so the control variate is skipped
+    MIN_CONTROL_UNITS = 5
+
+    def __init__(self, config, runs=20, strategies=None, antithetic=False,
+                 control_variate=True, common_random_numbers=True, confidence=0.95,
+                 workers=1, sampling_failure_rate=None, database=None):
+        """
+        Initialize the ensemble.
+
+        Args:
+            config (dict or Config): Base simulation configuration (compiled
+                here, with each strategy, before any run is scheduled)
+            runs (int): Simulation runs per strategy for run() (even when
+                antithetic)
+            strategies (list, optional): Strategies to compare (default: the
+                configured strategy). The first one is the reference for the
+                differences
+            antithetic (bool): Run antithetic pairs
+            control_variate (bool): Correct samples with the solar control variate
+            common_random_numbers (bool): Use the same seeds for every strategy
+                (False = independent seeds, for comparison)
+            confidence (float): Confidence level of the intervals
+            workers (int): Worker processes (1 = run in this process)
+            sampling_failure_rate (float, optional): Importance sampling -
+                daily inverter failure probability to simulate with (None =
+                the configured failure_rate, no weighting)
+            database (str, optional): Results database file to store every
+                run in (batch size and daily summaries from the config's
+                results_database section)
+        """
+        if runs < 2:
+            raise ValueError(f"runs must be at least 2, got {runs}")
+        if antithetic and runs % 2:
+            raise ValueError(f"antithetic runs come in pairs, runs must be even (got {runs})")
+        if control_variate and (config.get('replay') or {}).get('path'):
+            raise ValueError("The solar control variate needs the synthetic solar model (replay is configured)")
+        if workers < 1:
+            raise ValueError(f"workers must be at least 1, got {workers}")
+
+        overrides = {}
+        if sampling_failure_rate is not None:
+            if not 0 < sampling_failure_rate < 1:
+                raise ValueError(f"sampling_failure_rate must be between 0 and 1, got {sampling_failure_rate}")
+            overrides['inverter'] = {'sampling_failure_rate': sampling_failure_rate}
+        self.config = compile_config(config, overrides)
+        self.sampling_failure_rate = self.config['inverter']['sampling_failure_rate']
+        self.runs = runs
+        self.strategies = list(strategies or [self.config['energy_management']['strategy']])
+        for strategy in self.strategies:
+            self.config.with_overrides({'energy_management': {'strategy': strategy}})
+        self.antithetic = antithetic
+        self.control_variate = control_variate
+        self.common_random_numbers = common_random_numbers
+        self.confidence = confidence
+        self.workers = workers
+
+        self.database = database
+        database_config = self.config.get('results_database') or {}
+        self.database_label = f"ensemble_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        self.database_batch_size = database_config.get('batch_size', 100)
+        self.database_daily = database_config.get('daily_summaries', True)
+        self.stored_runs = 0
+        self._pending_records = []
+
+        # Seeds are drawn per sample unit (one seed, or one per strategy
+        # without CRN) from the configured seed, so the first n units are the
+        # same whether the ensemble is fixed-size or adaptive
+        self._seed_source = random.Random(self.config['simulation'].get('random_seed') or 0)
+        self._unit_seeds = []
+        self._expected_control = None
+
+    @property
+    def runs_per_unit(self):
+        """Simulation runs per strategy in one sample unit (2 for antithetic pairs)."""
+        return 2 if self.antithetic else 1
+
+    def unit_seeds(self, unit):
+        """
+        Seeds of a sample unit.
+
+        Args:
+            unit (int): Sample unit index
+
+        Returns:
+            dict: strategy -> seed
+        """
+        while len(self._unit_seeds) <= unit:
+            count = 1 if self.common_random_numbers else len(self.strategies)
+            self._unit_seeds.append([self._seed_source.randrange(2147483647) for _ in range(count)])
+        seeds = self._unit_seeds[unit]
+        return {strategy: seeds[0 if self.common_random_numbers else i]
+                for i, strategy in enumerate(self.strategies)}
+
+    def expected_control(self):
+        """Known mean of the control variate (None when disabled)."""
+        if self.control_variate and self._expected_control is None:
+            self._expected_control = self.expected_solar_available_kwh(self.config)
+        return self._expected_control
+
+    @staticmethod
+    def expected_solar_available_kwh(config):
+        """
+        Expected solar energy before the inverter over the run.
+
+        SolarPanel output is linear in (1 - cloud coverage) and every day
+        has the same clear-sky energy, so the expectation is the clear-sky
+        energy times (1 - mean seasonal coverage), averaged over the days of
+        the run when the season follows the calendar ('auto'). The mean
+        coverage is the cloud model's: the seasonal level mix for the daily
+        model, the stationary level mix of the transition matrices for the
+        Markov model (its chain starts from that mix).
+
+        Args:
+            config (dict): Simulation configuration
+
+        Returns:
+            float: Expected available solar energy in kWh
+        """
+        simulation = config['simulation']
+        time_step_minutes = simulation['time_step_minutes']
+        solar_panel = SolarPanel(
+            peak_power_kw=config['solar']['unit_peak_power_kw'] * config['solar'].get('count', 1)
+        )
+        total_steps = (simulation['duration_days'] * 24 * 60) // time_step_minutes
+        clear_sky_kwh = sum(
+            solar_panel.generate((step * time_step_minutes) % (24 * 60) / 60.0, 0.0)
+            for step in range(total_steps)
+        ) * time_step_minutes / 60.0
+        # Every day has the same clear-sky energy, so the day-average coverage applies
+        start_date = datetime.strptime(simulation['start_date'], '%Y-%m-%d')
+        seasons = [CloudCoverage.resolve_season(simulation['season'], start_date + timedelta(days=day))
+                   for day in range(simulation['duration_days'])]
+        clouds = config.get('clouds') or {}
+        if clouds.get('model', 'daily') == 'markov':
+            cloud = MarkovCloudCoverage.from_config(clouds, seasons[0])
+        else:
+            cloud = CloudCoverage(season=seasons[0])
+        expected_cloud = sum(cloud.get_expected_coverage(season) for season in seasons) / len(seasons)
+        return clear_sky_kwh * (1 - expected_cloud)
+
+    @staticmethod
+    def run_one(config, strategy, seed, antithetic=False, record=None):
+        """
+        Run one simulation and extract the ensemble metrics.
+
+        Args:
+            config (dict or Config): Base simulation configuration
+            strategy (str): Energy management strategy
+            seed (int): Run seed
+            antithetic (bool): Mirror the random draws
+            record (dict, optional): {'label', 'include_daily'} to also return
+                the run's results database rows as 'record'
+
+        Returns:
+            dict: Metric values plus 'solar_available_kwh' (the control) and
+                'likelihood_ratio' (importance-sampling weight, 1.0 without)
+        """
+        run_config = compile_config(config).to_dict()
+        run_config['energy_management']['strategy'] = strategy
+        run_config['simulation']['random_seed'] = seed
+        run_config['simulation']['random_streams'] = 'synchronized'
+        run_config['simulation']['antithetic'] = antithetic
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = Simulation(config=run_config).run()
+
+        time_step_hours = run_config['simulation']['time_step_minutes'] / 60.0
+        sample = {name: float(results[section][key]) for name, (section, key) in METRICS.items()}
+        for name, derive in DERIVED_METRICS.items():
+            sample[name] = derive(sample)
+        sample['solar_available_kwh'] = sum(
+            step['solar_available_kw'] for step in results['data']['hourly_data']
+        ) * time_step_hours
+        sample['likelihood_ratio'] = results.get('importance_sampling', {}).get('likelihood_ratio', 1.0)
+        if record is not None:
+            sample['record'] = ResultsDatabase.record(results, run_config, record['include_daily'], record['label'])
+        return sample
+
+    def run(self):
+        """
+        Run the fixed-size ensemble (runs per strategy).
+
+        Returns:
+            dict: Settings, per-strategy estimates, differences vs. the
+                reference strategy (when comparing several), raw samples and,
+                with a results database, a 'database' block
+        """
+        units = self.runs // self.runs_per_unit
+        samples = {strategy: [] for strategy in self.strategies}
+        all_strategies = set(self.strategies)
+        try:
+            for unit, unit_samples in self._execute(lambda: all_strategies, units):
+                print(f"  Unit {unit + 1}/{units} done")
+                self._store(unit_samples)
+                for strategy, runs in unit_samples.items():
+                    samples[strategy].extend(runs)
+        finally:
+            self._flush_records()
+        return self._with_database(self.summarize(samples))
+
+    def run_adaptive(self, targets, batch_runs=10, min_runs=30, max_runs=1000, progress=None):
+        """
+        Run until the confidence intervals are narrow enough.
+
+        Sample units are launched on the workers as long as any strategy has
+        a target metric whose confidence interval half-width is above its
+        target. Every batch_runs runs the estimates are checked; a strategy
+        whose targets are all met stops receiving new runs, and when none is
+        left the outstanding work is cancelled. Units are counted in seed
+        order, so the result does not depend on the number of workers.
+
+        Args:
+            targets (dict): metric -> maximum CI half-width, in the metric's
+                unit (e.g. {'self_sufficiency_percent': 0.1,
+                'inverter_failure_probability': 0.01})
+            batch_runs (int): Runs per strategy between convergence checks
+            min_runs (int): Runs per strategy before a strategy may stop
+                (zero-variance early samples give zero-width intervals)
+            max_runs (int): Runs per strategy at most
+            progress (callable, optional): Called with a progress dict after
+                every check (default: print one line per check)
+
+        Returns:
+            dict: Ensemble summary (see run()) plus an 'adaptive' block with
+                the targets, per-strategy convergence and the check history
+        """
+        unknown = set(targets) - set(ESTIMATED_METRICS)
+        if unknown:
+            raise ValueError(f"Unknown target metrics: {sorted(unknown)}. Must be in {list(ESTIMATED_METRICS)}")
+        if any(width <= 0 for width in targets.values()):
+            raise ValueError("Target half-widths must be positive")
+
+        per_unit = self.runs_per_unit
+        batch_units = max(1, math.ceil(batch_runs / per_unit))
+        min_units = max(1, math.ceil(min_runs / per_unit))
+        max_units = max(min_units, max_runs // per_unit)
+        progress = progress or _print_progress
+
+        samples = {strategy: [] for strategy in self.strategies}
+        active = [strategy for strategy in self.strategies]
+        converged_runs = {}
+        history = []
+        completed = {}
+        prefix = 0
+        start = time.perf_counter()
+
+        units = self._execute(lambda: set(active), max_units)
+        try:
+            for unit, unit_samples in units:
+                self._store(unit_samples)
+                completed[unit] = unit_samples
+
+                # Add finished units in seed order only, and check at every
+                # batch boundary before adding the next unit, so a strategy's
+                # samples are exactly the prefix it converged at
+                while prefix in completed and active:
+                    for strategy, runs in completed.pop(prefix).items():
+                        if strategy in active:
+                            samples[strategy].extend(runs)
+                    prefix += 1
+                    if prefix % batch_units != 0 and prefix != max_units:
+                        continue
+
+                    estimates = {
+                        strategy: self._target_estimates(samples[strategy], targets)
+                        for strategy in active
+                    }
+                    for strategy, strategy_estimates in estimates.items():
+                        if (prefix >= min_units and
+                                all(e['half_width'] <= e['target'] for e in strategy_estimates.values())):
+                            converged_runs[strategy] = len(samples[strategy])
+                    active[:] = [strategy for strategy in active if strategy not in converged_runs]
+
+                    state = {
+                        'runs': prefix * per_unit,
+                        'elapsed_seconds': time.perf_counter() - start,
+                        'estimates': estimates,
+                        'active_strategies': list(active),
+                        'converged': not active
+                    }
+                    history.append(state)
+                    progress(state)
+
+                if not active:
+                    break
+        finally:
+            units.close()  # Cancels outstanding work
+            self._flush_records()
+
+        summary = self._with_database(self.summarize(samples))
+        summary['adaptive'] = {
+            'targets': dict(targets),
+            'batch_runs': batch_units * per_unit,
+            'min_runs': min_units * per_unit,
+            'max_runs': max_units * per_unit,
+            'converged': not active,
+            'converged_runs': converged_runs,
+            'unconverged_strategies': list(active),
+            'elapsed_seconds': time.perf_counter() - start,
+            'history': history
+        }
+        return summary
+
+    def summarize(self, samples):
+        """
+        Estimate every metric from per-run samples.
+
+        Args:
+            samples (dict): strategy -> list of run_one() dicts in seed order
+                (antithetic partners adjacent)
+
+        Returns:
+            dict: Ensemble summary (see run())
+        """
+        expected_control = self.expected_control()
+        z = self._z()
+
+        def column(strategy, name, count=None):
+            return np.array([sample[name] for sample in samples[strategy][:count]], dtype=float)
+
+        estimates = {}
+        quantiles = {}
+        for strategy in self.strategies:
+            control = column(strategy, 'solar_available_kwh')
+            weights = column(strategy, 'likelihood_ratio')
+            estimates[strategy] = {
+                metric: self._estimate(column(strategy, metric), control, expected_control, z, weights=weights)
+                for metric in ESTIMATED_METRICS
+            }
+            quantiles[strategy] = {
+                metric: {f"p{round(q * 100)}": self.weighted_quantile(column(strategy, metric), weights, q)
+                         for q in QUANTILES}
+                for metric in TAIL_METRICS
+            }
+
+        differences = {}
+        reference = self.strategies[0]
+        if self.common_random_numbers:
+            for strategy in self.strategies[1:]:
+                # Paired on the units both strategies ran
+                # (same seeds -> same failures -> same weights)
+                count = min(len(samples[strategy]), len(samples[reference]))
+                control = column(reference, 'solar_available_kwh', count)
+                weights = column(reference, 'likelihood_ratio', count)
+                differences[strategy] = {}
+                for metric in ESTIMATED_METRICS:
+                    y = column(strategy, metric, count)
+                    y_ref = column(reference, metric, count)
+                    # Independent runs would add the two single-run variances
+                    naive_variance = self._naive_variance(y, weights) + self._naive_variance(y_ref, weights)
+                    differences[strategy][metric] = self._estimate(
+                        y - y_ref, control, expected_control, z, naive_variance, weights
+                    )
+
+        per_unit = self.runs_per_unit
+        return {
+            'runs': {strategy: len(samples[strategy]) for strategy in self.strategies},
+            'strategies': self.strategies,
+            'reference_strategy': reference,
+            'antithetic': self.antithetic,
+            'control_variate': self.control_variate,
+            'common_random_numbers': self.common_random_numbers,
+            'sampling_failure_rate': self.sampling_failure_rate,
+            'confidence': self.confidence,
+            'seeds': {
+                strategy: [self.unit_seeds(unit)[strategy] for unit in range(len(samples[strategy]) // per_unit)]
+                for strategy in self.strategies
+            },
+            'control': {
+                'name': 'solar_available_kwh',
+                'expected': expected_control,
+                'mean': float(np.mean([s['solar_available_kwh'] for s in samples[reference]]))
+            },
+            'estimates': estimates,
+            'quantiles': quantiles,
+            'weights': {
+                strategy: self._weight_summary(column(strategy, 'likelihood_ratio'))
+                for strategy in self.strategies
+            },
+            'differences': differences,
+            'samples': samples
+        }
+
+    def _execute(self, strategies, max_units):
+        """
+        Run sample units, in this process or on a process pool.
+
+        Args:
+            strategies (callable): Returns the strategies to include in the
+                next unit to launch (no launch when empty)
+            max_units (int): Number of units to launch at most
+
+        Yields:
+            tuple: (unit index, {strategy: list of run_one() dicts}) in
+                completion order. Closing the generator cancels the units
+                that have not started
+        """
+        if self.workers == 1:
+            for unit in range(max_units):
+                include = strategies()
+                if not include:
+                    return
+                yield unit, _run_unit(self.config, self._unit_jobs(unit, include), self.antithetic,
+                                      self._record_settings())
+            return
+
+        executor = ProcessPoolExecutor(max_workers=self.workers)
+        pending = {}
+        next_unit = 0
+        try:
+            while True:
+                # Keep every worker busy plus one queued unit each
+                include = strategies()
+                while include and next_unit < max_units and len(pending) < 2 * self.workers:
+                    future = executor.submit(_run_unit, self.config, self._unit_jobs(next_unit, include),
+                                             self.antithetic, self._record_settings())
+                    pending[future] = next_unit
+                    next_unit += 1
+                if not pending:
+                    return
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield pending.pop(future), future.result()
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _store(self, unit_samples):
+        """Move the database rows out of a unit's samples, inserting full batches."""
+        if self.database is None:
+            return
+        for runs in unit_samples.values():
+            for sample in runs:
+                self._pending_records.append(sample.pop('record'))
+        if len(self._pending_records) >= self.database_batch_size:
+            self._flush_records()
+
+    def _flush_records(self):
+        """Insert the pending database rows (one transaction per batch)."""
+        if not self._pending_records:
+            return
+        with ResultsDatabase(self.database) as database:
+            database.insert_records(self._pending_records, self.database_batch_size)
+        self.stored_runs += len(self._pending_records)
+        self._pending_records = []
+
+    def _with_database(self, summary):
+        """Add the results database block to a summary when runs are stored."""
+        if self.database is not None:
+            summary['database'] = {
+                'path': self.database,
+                'label': self.database_label,
+                'runs_stored': self.stored_runs
+            }
+        return summary
+
+    def _record_settings(self):
+        """run_one() record argument (None when no database is used)."""
+        if self.database is None:
+            return None
+        return {'label': self.database_label, 'include_daily': self.database_daily}
+
+    def _unit_jobs(self, unit, include):
+        """(strategy, seed) pairs of a unit for the included strategies, in strategy order."""
+        seeds = self.unit_seeds(unit)
+        return [(strategy, seeds[strategy]) for strategy in self.strategies if strategy in include]
+
+    def _target_estimates(self, strategy_samples, targets):
+        """Current estimate and CI half-width of each target metric."""
+        expected_control = self.expected_control()
+        z = self._z()
+        control = np.array([sample['solar_available_kwh'] for sample in strategy_samples], dtype=float)
+        weights = np.array([sample['likelihood_ratio'] for sample in strategy_samples], dtype=float)
+        estimates = {}
+        for metric, target in targets.items():
+            y = np.array([sample[metric] for sample in strategy_samples], dtype=float)
+            estimate = self._estimate(y, control, expected_control, z, weights=weights)
+            half_width = (estimate['ci_high'] - estimate['ci_low']) / 2
+            estimates[metric] = {
+                'mean': estimate['mean'],
+                'half_width': half_width if half_width == half_width else math.inf,  # NaN: too few runs
+                'target': target,
+                'runs': estimate['runs']
+            }
+        return estimates
+
+    @staticmethod
+    def weighted_quantile(values, weights, q):
+        """
+        Quantile of the real (weighted) distribution of a metric.
+
+        Uses the upper tail estimate P(Y > y) = mean(W * [Y > y]), which is
+        unbiased under importance sampling (with unit weights it is the
+        plain empirical quantile).
+
+        Args:
+            values (numpy.ndarray): Per-run values
+            weights (numpy.ndarray): Importance-sampling weights
+            q (float): Quantile (0-1)
+
+        Returns:
+            float: Smallest value y with estimated P(Y > y) <= 1 - q
+        """
+        order = np.argsort(values)
+        values = np.asarray(values, dtype=float)[order]
+        weights = np.asarray(weights, dtype=float)[order]
+        # tail[i] = estimated P(Y > values[i])
+        tail = (np.sum(weights) - np.cumsum(weights)) / len(values)
+        index = int(np.argmax(tail <= 1 - q + 1e-12))
+        return float(values[index])
+
+    @staticmethod
+    def _naive_variance(y, weights):
+        """Single-run variance of y under the real distribution (self-normalized weighted variance)."""
+        n = len(y)
+        total = np.sum(weights)
+        if n < 2 or total <= 0:
+            return float('nan')
+        mean = np.sum(weights * y) / total
+        return float(np.sum(weights * (y - mean) ** 2) / total * n / (n - 1))
+
+    @staticmethod
+    def _weight_summary(weights):
+        """Importance-sampling weight diagnostics (Kish effective sample size)."""
+        total = float(np.sum(weights))
+        squares = float(np.sum(weights * weights))
+        return {
+            'mean': total / len(weights) if len(weights) else 0.0,
+            'min': float(np.min(weights)) if len(weights) else 0.0,
+            'max': float(np.max(weights)) if len(weights) else 0.0,
+            'kish_ess': (total * total / squares) if squares > 0 else 0.0
+        }
+
+    def _z(self):
+        """Normal quantile of the confidence level."""
+        return NormalDist().inv_cdf((1 + self.confidence) / 2)
+
+    def _estimate(self, y, control, expected_control, z, naive_variance=None, weights=None):
+        """
+        Point estimate, confidence interval and effective sample size.
+
+        Args:
+            y (numpy.ndarray): Per-run values (antithetic partners adjacent)
+            control (numpy.ndarray): Per-run control values
+            expected_control (float): Known mean of the control (None = no
+                control variate)
+            z (float): Normal quantile of the confidence level
+            naive_variance (float, optional): Single-run variance of plain
+                independent sampling (default: estimated from y)
+            weights (numpy.ndarray, optional): Importance-sampling weights
+
+        Returns:
+            dict: mean, std_error, ci_low, ci_high, ess, runs_saved, ...
+        """
+        runs = len(y)
+        if weights is None:
+            weights = np.ones(runs)
+        if naive_variance is None:
+            naive_variance = self._naive_variance(y, weights)
+
+        # E_P[Y] = E_Q[W Y]; the weighted control keeps its known mean
+        y = weights * y
+        control = weights * control
+
+        # Sample units: antithetic pair averages or single runs
+        units, control_units = y, control
+        if self.antithetic:
+            units = (y[0::2] + y[1::2]) / 2
+            control_units = (control[0::2] + control[1::2]) / 2
+        n = len(units)
+
+        coefficient = 0.0
+        ddof = 1
+        if expected_control is not None and n >= self.MIN_CONTROL_UNITS and control_units.var() > 0:
+            coefficient = float(np.cov(units, control_units)[0, 1] / control_units.var(ddof=1))
+            units = units - coefficient * (control_units - expected_control)
+            ddof = 2
+
+        mean = float(units.mean())
+        variance = float(units.var(ddof=ddof)) / n if n > ddof else float('nan')
+        std_error = variance ** 0.5
+
+        if variance > 0:
+            ess = naive_variance / variance
+        elif naive_variance == 0:
+            ess = float(runs)  # No variability at all: nothing gained or lost
+        else:
+            ess = None
+        return {
+            'mean': mean,
+            'std_error': std_error,
+            'ci_low': mean - z * std_error,
+            'ci_high': mean + z * std_error,
+            'naive_std_error': (naive_variance / runs) ** 0.5,
+            'control_coefficient': coefficient,
+            'runs': runs,
+            'ess': ess,
+            'runs_saved': (ess - runs) if ess is not None else None
+        }
+
+
+def _run_unit(config, jobs, antithetic, record=None):
+    """
+    Run one sample unit (worker entry point).
+
+    Args:
+        config (Config): Compiled base simulation configuration
+        jobs (list): (strategy, seed) pairs
+        antithetic (bool): Also run the mirrored partner of each run
+        record (dict, optional): run_one() record argument
+
+    Returns:
+        dict: strategy -> list of run_one() dicts (normal run, then partner)
+    """
+    unit_samples = {}
+    for strategy, seed in jobs:
+        runs = [Ensemble.run_one(config, strategy, seed, record=record)]
+        if antithetic:
+            runs.append(Ensemble.run_one(config, strategy, seed, antithetic=True, record=record))
+        unit_samples[strategy] = runs
+    return unit_samples
+
+
+def _print_progress(state):
+    """Default run_adaptive progress: one line per check."""
+    parts = []
+    for strategy, estimates in state['estimates'].items():
+        metrics = ", ".join(f"{metric} {e['mean']:.4g} ±{e['half_width']:.3g} (target {e['target']:g})"
+                            for metric, e in estimates.items())
+        parts.append(f"{strategy}: {metrics}")
+    status = "converged" if state['converged'] else f"{len(state['active_strategies'])} running"
+    print(f"  [{state['runs']} runs, {state['elapsed_seconds']:.1f} s, {status}] " + " | ".join(parts))
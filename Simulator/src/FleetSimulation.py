@@ -0,0 +1,600 @@
+"""
+Fleet Simulation Module - Many households behind one shared feeder
+
+Vectorized counterpart of Simulation: every home's battery, solar, inverter
+and load state lives in NumPy arrays and each time step is processed for
+the whole fleet at once. A feeder-level export cap is enforced every step
+by sharing curtailment proportionally between the exporting homes.
+"""
+
+import json
+import math
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from .CloudCoverage import CloudCoverage
+from .Load import Load
+from .ReportStatistics import ReportStatistics
+
+# Strategy order used for the contiguous home groups
+STRATEGIES = ('LOAD_PRIORITY', 'CHARGE_PRIORITY', 'PRODUCE_PRIORITY')
+
+# Energy flows per home, same names as EnergyManagementSystem
+FLOW_NAMES = ('solar_to_load', 'solar_to_battery', 'solar_to_grid',
+              'battery_to_load', 'grid_to_load', 'unmet_load', 'curtailed')
+
+
+class FleetSimulation:
+    """
+    Simulates a fleet of homes connected to one feeder.
+
+    Uses the same configuration as Simulation plus a 'fleet' section:
+        homes (int): Number of homes
+        feeder_export_limit_kw (float | None): Aggregate export cap of the
+            feeder (None = no cap, only each home's own export limit)
+        strategy_mix (dict): Strategy name -> share of homes (defaults to
+            energy_management.strategy for every home)
+        size_variation (float): Per-home random scaling of battery, solar and
+            load sizes, uniform in [1 - v, 1 + v] (0 = identical homes)
+        cloud_variation (float): Per-home deviation from the feeder-wide
+            daily cloud coverage, uniform in [-v, v] (0 = same weather)
+
+    Homes are stored grouped by strategy so each EMS strategy is applied to
+    a contiguous slice of the state arrays. Only per-home totals and
+    feeder-level series are kept, never per-home step data, so memory grows
+    with homes + steps rather than homes x steps.
+    """
+
+    def __init__(self, config_path='config.json', config=None):
+        """
+        Initialize fleet simulation with configuration.
+
+        Args:
+            config_path (str): Path to configuration JSON file
+            config (dict, optional): Configuration dict. When given it is used
+                instead of reading config_path (a deep copy is taken)
+        """
+        # Load configuration
+        if config is not None:
+            self.config = json.loads(json.dumps(config))  # Deep copy
+        else:
+            with open(config_path, 'r') as f:
+                self.config = json.load(f)
+
+        fleet = self.config.setdefault('fleet', {})
+        self.homes = int(fleet.get('homes', 100))
+        if self.homes < 1:
+            raise ValueError(f"Fleet needs at least one home, got {self.homes}")
+        self.feeder_export_limit_kw = fleet.get('feeder_export_limit_kw')
+        strategy_mix = fleet.get('strategy_mix') or {self.config['energy_management']['strategy']: 1.0}
+        size_variation = fleet.get('size_variation', 0.0)
+        self.cloud_variation = fleet.get('cloud_variation', 0.0)
+
+        print("\n" + "=" * 70)
+        print("GREENGRID FLEET SIMULATION - STARTING")
+        print("=" * 70)
+        print(f"Homes: {self.homes}")
+        print(f"Feeder export limit: "
+              f"{'none' if self.feeder_export_limit_kw is None else f'{self.feeder_export_limit_kw} kW'}")
+        print(f"Duration: {self.config['simulation']['duration_days']} days")
+        print(f"Season: {self.config['simulation']['season']}")
+        print(f"Time step: {self.config['simulation']['time_step_minutes']} minutes")
+
+        # Handle random seed for reproducibility (same rules as Simulation)
+        config_seed = self.config['simulation'].get('random_seed', None)
+        if config_seed is None:
+            self.actual_seed = int(time.time() * 1000000) % 2147483647  # Max int32
+            print(f"Random seed: {self.actual_seed} (auto-generated)")
+        else:
+            self.actual_seed = config_seed
+            print(f"Random seed: {self.actual_seed} (from config - reproducible)")
+        self.config['simulation']['actual_seed_used'] = self.actual_seed
+        self.rng = np.random.default_rng(self.actual_seed)
+
+        # Simulation parameters
+        self.duration_days = self.config['simulation']['duration_days']
+        self.time_step_minutes = self.config['simulation']['time_step_minutes']
+        self.start_date = datetime.strptime(self.config['simulation']['start_date'], '%Y-%m-%d')
+        self.season = self.config['simulation']['season']
+        CloudCoverage.resolve_season(self.season, self.start_date)  # Validates ('auto' = from the date)
+
+        # Strategy groups (contiguous slices of the home arrays)
+        self.groups = self._strategy_groups(strategy_mix)
+        print("Strategy mix: " + ", ".join(f"{name} {group.stop - group.start}"
+                                           for name, group in self.groups))
+
+        self._init_homes(size_variation)
+
+    def _strategy_groups(self, strategy_mix):
+        """
+        Split the homes into contiguous groups per strategy.
+
+        Counts are rounded with the largest-remainder method so they add up
+        to the number of homes.
+
+        Args:
+            strategy_mix (dict): Strategy name -> share (any positive scale)
+
+        Returns:
+            list: (strategy, slice) pairs in STRATEGIES order
+        """
+        for strategy in strategy_mix:
+            if strategy not in STRATEGIES:
+                raise ValueError(f"Unknown strategy: {strategy}")
+        total_share = sum(strategy_mix.values())
+        if total_share <= 0:
+            raise ValueError("Fleet strategy_mix shares must add up to a positive value")
+
+        exact = {s: strategy_mix.get(s, 0) / total_share * self.homes for s in STRATEGIES}
+        counts = {s: int(math.floor(exact[s])) for s in STRATEGIES}
+        by_remainder = sorted(STRATEGIES, key=lambda s: exact[s] - counts[s], reverse=True)
+        for strategy in by_remainder[:self.homes - sum(counts.values())]:
+            counts[strategy] += 1
+
+        groups = []
+        start = 0
+        for strategy in STRATEGIES:
+            if counts[strategy]:
+                groups.append((strategy, slice(start, start + counts[strategy])))
+                start += counts[strategy]
+        return groups
+
+    def _init_homes(self, size_variation):
+        """
+        Create the per-home state arrays.
+
+        Args:
+            size_variation (float): Relative size spread between homes
+        """
+        n = self.homes
+        rng = self.rng
+
+        def sizes():
+            if not size_variation:
+                return np.ones(n)
+            return rng.uniform(1 - size_variation, 1 + size_variation, n)
+
+        battery = self.config['battery']
+        solar = self.config['solar']
+        inverter = self.config['inverter']
+        load = self.config['load']
+        grid = self.config['grid']
+
+        # Battery (same model as Battery: sqrt of round-trip efficiency each way)
+        self.capacity_kwh = battery['unit_capacity_kwh'] * battery.get('count', 1) * sizes()
+        self.energy_kwh = self.capacity_kwh * 0.5  # Start at 50% SoC
+        self.min_energy_kwh = self.capacity_kwh * battery['min_soc']
+        self.one_way_efficiency = math.sqrt(battery['efficiency'])
+
+        # Solar and inverter
+        self.solar_peak_kw = solar['unit_peak_power_kw'] * solar.get('count', 1) * sizes()
+        self.inverter_max_kw = np.full(n, inverter['unit_max_output_kw'] * inverter.get('count', 1))
+        self.failure_hours_remaining = np.zeros(n)
+
+        # Load (scaled per home; peak window and events are shared)
+        load_scale = sizes()
+        self.base_load_kw = load['base_load_kw'] * load_scale
+        self.peak_extra_max_kw = load['peak_hours_max_kw'] * load_scale
+
+        # Each home's own grid connection limit
+        self.export_limit_kw = np.full(n, float(grid['export_limit_kw']))
+
+        # Per-home totals
+        self.totals = {name: np.zeros(n) for name in (
+            'solar_generated_kwh', 'load_consumed_kwh', 'grid_imported_kwh',
+            'grid_exported_kwh', 'curtailed_kwh', 'limit_curtailed_kwh', 'soc_sum')}
+        self.counts = {name: np.zeros(n, dtype=np.int64) for name in (
+            'times_full', 'times_empty', 'unmet_steps', 'downtime_steps', 'inverter_failures')}
+
+        # Feeder-level series (one value per step)
+        self.feeder = {name: [] for name in (
+            'solar_kw', 'load_kw', 'export_kw', 'import_kw', 'export_request_kw', 'export_withheld_kw', 'limit_curtailed_kw')}
+        self.daily_summaries = []
+
+    def run(self):
+        """
+        Run the fleet simulation.
+
+        Returns:
+            dict: Aggregate, per-home and feeder results
+        """
+        print("-" * 70)
+        total_steps = (self.duration_days * 24 * 60) // self.time_step_minutes
+        print(f"Simulating {self.homes} homes x {total_steps} steps...")
+
+        start = time.perf_counter()
+        self._simulation_loop(total_steps)
+        elapsed = time.perf_counter() - start
+
+        print(f"Fleet simulation complete in {elapsed:.1f} s "
+              f"({self.homes * total_steps / elapsed:,.0f} home-steps/s)")
+        return self._compile_results(total_steps, elapsed)
+
+    def _simulation_loop(self, total_steps):
+        """
+        Advance the whole fleet step by step.
+
+        Follows the step order of Simulation: solar, load, EMS dispatch,
+        inverter update, then day boundary (failures, new cloud coverage).
+
+        Args:
+            total_steps (int): Number of steps to simulate
+        """
+        n = self.homes
+        rng = self.rng
+        time_step_hours = self.time_step_minutes / 60.0
+        steps_per_day = (24 * 60) // self.time_step_minutes
+
+        load_config = self.config['load']
+        peak_start = load_config['peak_hours_start']
+        peak_end = load_config['peak_hours_end']
+        # Scheduled events of the Load model: hour -> (probability, min_kw, max_kw)
+        events = {hour: (p, min_kw, max_kw) for hour, p, min_kw, max_kw in Load(
+            load_config['base_load_kw'], load_config['peak_hours_max_kw'],
+            peak_start, peak_end)._scheduled_events}
+
+        inverter_config = self.config['inverter']
+        full_threshold = ReportStatistics.FULL_SOC_PERCENT - ReportStatistics.SOC_TOLERANCE
+        empty_threshold = self.config['battery']['min_soc'] * 100 + ReportStatistics.SOC_TOLERANCE
+
+        totals = self.totals
+        counts = self.counts
+        feeder = self.feeder
+        day = {name: 0.0 for name in ('solar', 'load', 'import', 'export', 'curtailed')}
+
+        cloud = self._daily_cloud(0)
+        current_day = 0
+
+        for current_step in range(total_steps):
+            hour_of_day = ((current_step * self.time_step_minutes) % (24 * 60)) / 60.0
+            hour = int(hour_of_day)
+
+            # ========== SOLAR (SolarPanel + Inverter) ==========
+            if 6 <= hour_of_day < 18:
+                sun = math.sin((hour_of_day - 6) * (math.pi / 12))
+                solar_available = self.solar_peak_kw * sun * (1 - cloud)
+            else:
+                solar_available = np.zeros(n)
+            failing = self.failure_hours_remaining > 0
+            solar = np.where(failing, 0.0, np.minimum(solar_available, self.inverter_max_kw))
+
+            # ========== LOAD (Load.generate, one draw per home) ==========
+            load = self.base_load_kw.copy()
+            if peak_start <= hour < peak_end:
+                load += 1.0 + rng.random(n) * (self.peak_extra_max_kw - 1.0)
+            elif hour in events:
+                probability, min_kw, max_kw = events[hour]
+                load += np.where(rng.random(n) < probability, rng.uniform(min_kw, max_kw, n), 0.0)
+            load += np.where(rng.random(n) < 0.3, rng.uniform(0.0, 0.8, n), 0.0)
+
+            # ========== EMS DISPATCH WITH FEEDER CAP ==========
+            flows, energy = self._dispatch(solar, load, self.export_limit_kw, time_step_hours)
+            export_request = float(flows['solar_to_grid'].sum())
+            export_withheld = 0.0
+            limit_curtailed = 0.0
+            if self.feeder_export_limit_kw is not None and export_request > self.feeder_export_limit_kw:
+                # Share the cap proportionally to what each home wanted to export;
+                # withheld export goes to batteries/loads where the strategy allows
+                scale = self.feeder_export_limit_kw / export_request
+                uncapped_curtailed = flows['curtailed']
+                flows, energy = self._dispatch(solar, load, flows['solar_to_grid'] * scale, time_step_hours)
+                home_limit_curtailed = flows['curtailed'] - uncapped_curtailed
+                totals['limit_curtailed_kwh'] += home_limit_curtailed * time_step_hours
+                export_withheld = export_request - float(flows['solar_to_grid'].sum())
+                limit_curtailed = float(home_limit_curtailed.sum())
+            self.energy_kwh = energy
+
+            # ========== ACCUMULATE ==========
+            solar_used = flows['solar_to_load'] + flows['solar_to_battery'] + flows['solar_to_grid']
+            soc = self.energy_kwh / self.capacity_kwh * 100
+
+            totals['solar_generated_kwh'] += solar_used * time_step_hours
+            totals['load_consumed_kwh'] += load * time_step_hours
+            totals['grid_imported_kwh'] += flows['grid_to_load'] * time_step_hours
+            totals['grid_exported_kwh'] += flows['solar_to_grid'] * time_step_hours
+            totals['curtailed_kwh'] += flows['curtailed'] * time_step_hours
+            totals['soc_sum'] += soc
+            counts['times_full'] += soc >= full_threshold
+            counts['times_empty'] += soc <= empty_threshold
+            counts['unmet_steps'] += flows['grid_to_load'] > 0
+            counts['downtime_steps'] += failing
+
+            step_solar = float(solar_used.sum())
+            step_load = float(load.sum())
+            step_export = float(flows['solar_to_grid'].sum())
+            step_import = float(flows['grid_to_load'].sum())
+            feeder['solar_kw'].append(step_solar)
+            feeder['load_kw'].append(step_load)
+            feeder['export_kw'].append(step_export)
+            feeder['import_kw'].append(step_import)
+            feeder['export_request_kw'].append(export_request)
+            feeder['export_withheld_kw'].append(export_withheld)
+            feeder['limit_curtailed_kw'].append(limit_curtailed)
+
+            day['solar'] += step_solar * time_step_hours
+            day['load'] += step_load * time_step_hours
+            day['import'] += step_import * time_step_hours
+            day['export'] += step_export * time_step_hours
+            day['curtailed'] += float(flows['curtailed'].sum()) * time_step_hours
+
+            # ========== UPDATE INVERTERS ==========
+            self.failure_hours_remaining = np.maximum(self.failure_hours_remaining - time_step_hours, 0.0)
+
+            # ========== DAY BOUNDARY ==========
+            step_done = current_step + 1
+            if step_done % steps_per_day == 0 or step_done == total_steps:
+                self._log_daily_summary(current_day, day)
+                day = dict.fromkeys(day, 0.0)
+                current_day += 1
+
+                if current_day % 30 == 0:
+                    print(f"  Day {current_day}/{self.duration_days} completed "
+                          f"({current_day/self.duration_days*100:.1f}%)")
+
+                if step_done < total_steps:
+                    # New failures for working inverters (Inverter.check_failure)
+                    new_failures = ((self.failure_hours_remaining <= 0)
+                                    & (rng.random(n) < inverter_config['failure_rate']))
+                    durations = rng.integers(inverter_config['min_failure_duration_hours'],
+                                             inverter_config['max_failure_duration_hours'] + 1, n)
+                    self.failure_hours_remaining = np.where(new_failures, durations,
+                                                            self.failure_hours_remaining)
+                    counts['inverter_failures'] += new_failures
+
+                    cloud = self._daily_cloud(current_day)
+
+    def _daily_cloud(self, day):
+        """
+        Draw the cloud coverage of the next day (CloudCoverage model).
+
+        One feeder-wide value, optionally jittered per home.
+
+        Args:
+            day (int): Day index (0 = start_date), selects the season when
+                the season is 'auto'
+
+        Returns:
+            float | numpy.ndarray: Cloud coverage (0-0.9)
+        """
+        season = CloudCoverage.resolve_season(self.season, self.start_date + timedelta(days=day))
+        level = self.rng.choice(4, p=CloudCoverage.PROBABILITIES[season])
+        min_coverage, max_coverage = CloudCoverage.COVERAGE_RANGES[level]
+        coverage = self.rng.uniform(min_coverage, max_coverage)
+        if not self.cloud_variation:
+            return coverage
+        jitter = self.rng.uniform(-self.cloud_variation, self.cloud_variation, self.homes)
+        return np.clip(coverage + jitter, 0.0, CloudCoverage.COVERAGE_RANGES[-1][1])
+
+    def _dispatch(self, solar, load, export_limit, time_step_hours):
+        """
+        Apply each group's EMS strategy to its slice of homes.
+
+        Pure function of the current battery state, so it can be re-run with
+        tighter export limits when the feeder cap binds.
+
+        Args:
+            solar (numpy.ndarray): Solar power after the inverter (kW)
+            load (numpy.ndarray): Load demand (kW)
+            export_limit (numpy.ndarray): Export limit per home (kW)
+            time_step_hours (float): Duration of time step in hours
+
+        Returns:
+            tuple: (flows dict of arrays, new battery energy array)
+        """
+        n = self.homes
+        flows = {name: np.empty(n) for name in FLOW_NAMES}
+        energy = np.empty(n)
+
+        for strategy, group in self.groups:
+            battery = _BatteryArrays(self.energy_kwh[group], self.capacity_kwh[group],
+                                     self.min_energy_kwh[group], self.one_way_efficiency,
+                                     time_step_hours)
+            dispatch = _DISPATCH[strategy]
+            group_flows = dispatch(solar[group], load[group], battery, export_limit[group])
+            for name in FLOW_NAMES:
+                flows[name][group] = group_flows[name]
+            energy[group] = battery.energy
+
+        return flows, energy
+
+    def _log_daily_summary(self, day, totals):
+        """
+        Log the fleet-wide daily summary.
+
+        Args:
+            day (int): Day number (0-based)
+            totals (dict): Fleet energy totals of the day (kWh)
+        """
+        self.daily_summaries.append({
+            'day': day + 1,
+            'solar_generated_kwh': totals['solar'],
+            'load_consumed_kwh': totals['load'],
+            'grid_imported_kwh': totals['import'],
+            'grid_exported_kwh': totals['export'],
+            'curtailed_kwh': totals['curtailed'],
+            'average_soc_end': float(np.mean(self.energy_kwh / self.capacity_kwh) * 100),
+            'self_sufficiency_percent': (
+                (1 - totals['import'] / totals['load']) * 100 if totals['load'] > 0 else 0
+            )
+        })
+
+    def _compile_results(self, total_steps, elapsed):
+        """
+        Compile aggregate, per-home and feeder results.
+
+        Args:
+            total_steps (int): Number of simulated steps
+            elapsed (float): Wall time of the step loop in seconds
+
+        Returns:
+            dict: Results dictionary (JSON serializable)
+        """
+        time_step_hours = self.time_step_minutes / 60.0
+        totals = self.totals
+        counts = self.counts
+        import_cost = self.config['grid']['import_cost_per_kwh']
+        export_revenue = self.config['grid']['export_revenue_per_kwh']
+
+        load = totals['load_consumed_kwh']
+        imported = totals['grid_imported_kwh']
+        exported = totals['grid_exported_kwh']
+        self_sufficiency = np.where(load > 0, (1 - imported / np.where(load > 0, load, 1)) * 100, 0)
+        net_cost = imported * import_cost - exported * export_revenue
+
+        total_load = float(load.sum())
+        total_import = float(imported.sum())
+        total_export = float(exported.sum())
+        steps_at_limit = int(np.count_nonzero(np.array(self.feeder['export_withheld_kw']) > 0))
+
+        strategy = np.empty(self.homes, dtype=object)
+        for name, group in self.groups:
+            strategy[group] = name
+
+        return {
+            'summary': {
+                'homes': self.homes,
+                'duration_days': self.duration_days,
+                'season': self.season,
+                'strategy_mix': {name: group.stop - group.start for name, group in self.groups},
+                'total_solar_generated_kwh': float(totals['solar_generated_kwh'].sum()),
+                'total_load_consumed_kwh': total_load,
+                'total_grid_imported_kwh': total_import,
+                'total_grid_exported_kwh': total_export,
+                'total_curtailed_kwh': float(totals['curtailed_kwh'].sum()),
+                'self_sufficiency_percent': (1 - total_import / total_load) * 100 if total_load > 0 else 0,
+                'run_seconds': elapsed,
+                'home_steps_per_second': self.homes * total_steps / elapsed if elapsed else 0.0
+            },
+            'financial': {
+                'total_import_cost': total_import * import_cost,
+                'total_export_revenue': total_export * export_revenue,
+                'net_cost': float(net_cost.sum()),
+                'average_net_cost_per_home': float(net_cost.mean())
+            },
+            'feeder': {
+                'export_limit_kw': self.feeder_export_limit_kw,
+                'steps_at_limit': steps_at_limit,
+                'hours_at_limit': steps_at_limit * time_step_hours,
+                'export_withheld_kwh': sum(self.feeder['export_withheld_kw']) * time_step_hours,
+                'limit_curtailed_kwh': float(totals['limit_curtailed_kwh'].sum()),
+                'peak_export_request_kw': max(self.feeder['export_request_kw'], default=0.0),
+                'peak_export_kw': max(self.feeder['export_kw'], default=0.0),
+                'peak_import_kw': max(self.feeder['import_kw'], default=0.0),
+                'peak_load_kw': max(self.feeder['load_kw'], default=0.0),
+                'series': self.feeder
+            },
+            'homes': {
+                'strategy': strategy.tolist(),
+                'battery_capacity_kwh': self.capacity_kwh.tolist(),
+                'solar_peak_kw': self.solar_peak_kw.tolist(),
+                'solar_generated_kwh': totals['solar_generated_kwh'].tolist(),
+                'load_consumed_kwh': load.tolist(),
+                'grid_imported_kwh': imported.tolist(),
+                'grid_exported_kwh': exported.tolist(),
+                'curtailed_kwh': totals['curtailed_kwh'].tolist(),
+                'limit_curtailed_kwh': totals['limit_curtailed_kwh'].tolist(),
+                'self_sufficiency_percent': self_sufficiency.tolist(),
+                'net_cost': net_cost.tolist(),
+                'average_soc_percent': (totals['soc_sum'] / max(total_steps, 1)).tolist(),
+                'final_soc_percent': (self.energy_kwh / self.capacity_kwh * 100).tolist(),
+                'times_full': counts['times_full'].tolist(),
+                'times_empty': counts['times_empty'].tolist(),
+                'hours_with_unmet_load': (counts['unmet_steps'] * time_step_hours).tolist(),
+                'inverter_failures': counts['inverter_failures'].tolist(),
+                'inverter_downtime_hours': (counts['downtime_steps'] * time_step_hours).tolist()
+            },
+            'data': {
+                'daily_summaries': self.daily_summaries
+            }
+        }
+
+
+
+class _BatteryArrays:
+    """Vectorized Battery.charge / Battery.discharge for a group of homes."""
+
+    def __init__(self, energy, capacity, min_energy, one_way_efficiency, time_step_hours):
+        self.energy = energy.copy()
+        self.capacity = capacity
+        self.min_energy = min_energy
+        self.eta = one_way_efficiency
+        self.dt = time_step_hours
+
+    def charge(self, power_kw):
+        """Offer power (kW) for one step; returns the power consumed from source."""
+        stored = np.minimum(power_kw * self.dt * self.eta, self.capacity - self.energy)
+        self.energy += stored
+        return stored / self.eta / self.dt
+
+    def discharge(self, power_kw):
+        """Request power (kW) for one step; returns the power supplied."""
+        extracted = np.minimum(power_kw * self.dt / self.eta, self.energy - self.min_energy)
+        self.energy -= extracted
+        return extracted * self.eta / self.dt
+
+
+def _flows(solar_to_load, solar_to_battery, solar_to_grid, battery_to_load, grid_to_load, curtailed):
+    """Build a flows dict in the format of EnergyManagementSystem."""
+    return {
+        'solar_to_load': solar_to_load,
+        'solar_to_battery': solar_to_battery,
+        'solar_to_grid': solar_to_grid,
+        'battery_to_load': battery_to_load,
+        'grid_to_load': grid_to_load,
+        'unmet_load': grid_to_load,
+        'curtailed': curtailed
+    }
+
+
+def _load_priority(solar, load, battery, export_limit):
+    """Vectorized EnergyManagementSystem._load_priority."""
+    surplus = np.maximum(solar - load, 0.0)
+    deficit = np.maximum(load - solar, 0.0)
+
+    solar_to_battery = battery.charge(surplus)
+    excess = surplus - solar_to_battery
+    solar_to_grid = np.minimum(excess, export_limit)
+
+    battery_to_load = battery.discharge(deficit)
+    return _flows(np.minimum(solar, load), solar_to_battery, solar_to_grid,
+                  battery_to_load, deficit - battery_to_load, excess - solar_to_grid)
+
+
+def _charge_priority(solar, load, battery, export_limit):
+    """Vectorized EnergyManagementSystem._charge_priority."""
+    has_surplus = solar >= load
+
+    # Battery first, but only when solar covers the load
+    solar_to_battery = battery.charge(np.where(has_surplus, solar, 0.0))
+    remaining = solar - solar_to_battery
+    solar_to_load = np.minimum(remaining, load)
+    excess = remaining - solar_to_load
+    solar_to_grid = np.minimum(excess, export_limit)
+    shortfall = load - solar_to_load
+
+    # Battery backs up the load only in deficit (not after charging)
+    battery_to_load = battery.discharge(np.where(has_surplus, 0.0, shortfall))
+    return _flows(solar_to_load, solar_to_battery, solar_to_grid,
+                  battery_to_load, shortfall - battery_to_load, excess - solar_to_grid)
+
+
+def _produce_priority(solar, load, battery, export_limit):
+    """Vectorized EnergyManagementSystem._produce_priority."""
+    solar_to_grid = np.minimum(solar, export_limit)
+    solar_to_battery = battery.charge(solar - solar_to_grid)
+    remaining = solar - solar_to_grid - solar_to_battery
+    solar_to_load = np.minimum(remaining, load)
+    deficit = load - solar_to_load
+
+    battery_to_load = battery.discharge(deficit)
+    return _flows(solar_to_load, solar_to_battery, solar_to_grid,
+                  battery_to_load, deficit - battery_to_load, remaining - solar_to_load)
+
+
+_DISPATCH = {
+    'LOAD_PRIORITY': _load_priority,
+    'CHARGE_PRIORITY': _charge_priority,
+    'PRODUCE_PRIORITY': _produce_priority,
+}
@@ -1,3 +1,4 @@
+import math
 import random
 
 class Inverter:
@@ -6,7 +7,8 @@ class Inverter:
     """
     
     def __init__(self, max_output_kw, failure_rate=0.005, 
-                 min_failure_duration=4, max_failure_duration=72):
+                 min_failure_duration=4, max_failure_duration=72, rng=None,
+                 sampling_failure_rate=None):
         """
         Initialize inverter.
         
@@ -15,13 +17,27 @@ class Inverter:
             failure_rate (float): Daily failure probability (default 0.005 = 0.5%)
             min_failure_duration (int): Minimum failure duration in hours
             max_failure_duration (int): Maximum failure duration in hours
+            rng (random.Random, optional): Random source (default: the
+                global random module)
+            sampling_failure_rate (float, optional): Importance sampling -
+                draw failures with this daily probability instead of
+                failure_rate and track the likelihood ratio of the run
+                (None = sample failure_rate directly)
         """
+        if sampling_failure_rate is not None and not 0 < sampling_failure_rate < 1:
+            raise ValueError(f"sampling_failure_rate must be between 0 and 1, got {sampling_failure_rate}")
+        
         self._max_output_kw = max_output_kw
         self._failure_rate = failure_rate
         self._min_failure_duration = min_failure_duration
         self._max_failure_duration = max_failure_duration
         self._is_failing = False
         self._failure_hours_remaining = 0
+        self._rng = rng if rng is not None else random
+        
+        # Importance sampling: log of P(failure draws) / Q(failure draws)
+        self._sampling_failure_rate = sampling_failure_rate
+        self._log_likelihood_ratio = 0.0
     
     def apply_limit(self, solar_generation):
         """
@@ -47,11 +63,21 @@ class Inverter:
         #if it's already failing, do nothing
         if self._is_failing:
             return
+        elif self._sampling_failure_rate is not None:
+            # Importance sampling: draw with the sampling rate and weight the
+            # outcome by its probability ratio (durations are unchanged)
+            p, q = self._failure_rate, self._sampling_failure_rate
+            if self._rng.random() < q:
+                self._log_likelihood_ratio += math.log(p / q) if p > 0 else -math.inf
+                self._is_failing = True
+                self._failure_hours_remaining = self._rng.randint(self._min_failure_duration, self._max_failure_duration)
+            else:
+                self._log_likelihood_ratio += math.log((1 - p) / (1 - q)) if p < 1 else -math.inf
         else:
             #If not, check probability and create failure if it occurs
-            if random.random() < self._failure_rate:
+            if self._rng.random() < self._failure_rate:
                 self._is_failing = True
-                self._failure_hours_remaining = random.randint(self._min_failure_duration, self._max_failure_duration)
+                self._failure_hours_remaining = self._rng.randint(self._min_failure_duration, self._max_failure_duration)
     
     def update(self, hours_passed):
         """
@@ -77,4 +103,18 @@ class Inverter:
             return False
         else:
             #If it is not failing, return True
-            return True
\ No newline at end of file
+            return True
+    
+    def get_likelihood_ratio(self):
+        """
+        Importance-sampling weight of the failures drawn so far.
+        
+        Returns:
+            float: P(failure history) / Q(failure history) under the real
+                and the sampling failure rate (1.0 without importance sampling)
+        """
+        return math.exp(self._log_likelihood_ratio)
+    
+    def get_log_likelihood_ratio(self):
+        """Natural log of get_likelihood_ratio()."""
+        return self._log_likelihood_ratio
\ No newline at end of file
@@ -0,0 +1,233 @@
+import math
+import random
+
+import numpy as np
+
+from .AntitheticRandom import AntitheticRandom
+
+
+class InverterBank:
+    """
+    Inverter units modelled individually, each with its own failures.
+
+    Drop-in for Inverter in Simulation (apply_limit, is_operational,
+    update, check_failure, likelihood ratio) when the site has several
+    units: a failure only takes out its unit's share of the solar array and
+    of the output capacity, instead of the whole site.
+
+    Unit states live in arrays and the per-step methods are O(1) whatever
+    the number of units:
+    - apply_limit() uses the cached healthy share and capacity
+    - update() advances a clock; the arrays are only touched when the
+      earliest repair is due
+    - failure timelines are sampled in bulk: when a unit becomes healthy its
+      next failure day is drawn at once from the geometric distribution
+      (the day of the first success of the daily failure_rate draws), so
+      check_failure() only looks up the units failing today instead of
+      drawing for every unit every day.
+    """
+
+    def __init__(self, unit_max_output_kw, count=1, failure_rate=0.005,
+                 min_failure_duration=4, max_failure_duration=72, rng=None,
+                 sampling_failure_rate=None):
+        """
+        Initialize the bank.
+
+        Args:
+            unit_max_output_kw (float or list): Maximum output per unit in kW
+                (a list gives each unit its own capacity; count is then
+                its length)
+            count (int): Number of units (scalar unit_max_output_kw)
+            failure_rate (float): Daily failure probability per unit
+            min_failure_duration (int): Minimum failure duration in hours
+            max_failure_duration (int): Maximum failure duration in hours
+            rng (random.Random, optional): Random source, one draw per day
+                seeds the bulk draws (default: the global random module)
+            sampling_failure_rate (float, optional): Importance sampling -
+                draw failures with this daily probability per unit and track
+                the likelihood ratio of the run (see Inverter)
+        """
+        if sampling_failure_rate is not None and not 0 < sampling_failure_rate < 1:
+            raise ValueError(f"sampling_failure_rate must be between 0 and 1, got {sampling_failure_rate}")
+
+        capacities = np.atleast_1d(np.asarray(unit_max_output_kw, dtype=float))
+        if capacities.size == 1:
+            if not isinstance(count, int) or count < 1:
+                raise ValueError(f"count must be a positive integer, got {count!r}")
+            capacities = np.full(count, capacities[0])
+        if np.any(capacities <= 0):
+            raise ValueError("Inverter unit capacities must be positive")
+
+        self.count = capacities.size
+        self._unit_kw = capacities
+        # Each unit converts the part of the solar array it is wired to,
+        # sized like its capacity
+        self._unit_share = capacities / capacities.sum()
+        self._failure_rate = failure_rate
+        self._min_failure_duration = min_failure_duration
+        self._max_failure_duration = max_failure_duration
+        self._rng = rng if rng is not None else random
+        self._antithetic = isinstance(rng, AntitheticRandom)
+
+        self._clock = 0.0                                   # Hours since start
+        self._day = 0                                       # check_failure() calls
+        self._repair_at = np.zeros(self.count)              # Clock time the failure ends
+        self._failing = np.zeros(self.count, dtype=bool)
+        self._next_failure_day = np.full(self.count, -1)    # -1 = not drawn yet
+        self._next_repair = math.inf
+        self._total_kw = float(capacities.sum())
+        self._healthy_kw = self._total_kw
+        self._healthy_share = 1.0
+        self._failing_count = 0
+
+        # Statistics (capacity-weighted downtime, O(1) per update)
+        self.unit_failures = 0
+        self._failing_kw = 0.0
+        self._lost_kw_hours = 0.0
+        self._unit_down_hours = 0.0
+
+        # Importance sampling: log of P(failure draws) / Q(failure draws)
+        self._sampling_failure_rate = sampling_failure_rate
+        self._log_likelihood_ratio = 0.0
+
+    def apply_limit(self, solar_generation):
+        """
+        Apply the healthy units' share and clipping.
+
+        Args:
+            solar_generation (float): Raw solar generation of the whole array in kW
+
+        Returns:
+            float: Output of the healthy units (0 when all have failed)
+        """
+        return min(solar_generation * self._healthy_share, self._healthy_kw)
+
+    def check_failure(self):
+        """
+        Start the failures due today (call once per day).
+
+        Returns:
+            list: (unit index, failure hours) of the units that failed
+        """
+        day = self._day
+        self._day += 1
+        # One draw from the (possibly day-seeded) stream seeds the bulk draws
+        generator = np.random.default_rng(self._rng.getrandbits(64))
+
+        # Units healthy again since their last failure get their next
+        # failure day (geometric: first day a daily draw succeeds)
+        unscheduled = np.flatnonzero(~self._failing & (self._next_failure_day < 0))
+        if unscheduled.size:
+            rate = self._sampling_failure_rate if self._sampling_failure_rate is not None else self._failure_rate
+            self._next_failure_day[unscheduled] = day + self._geometric(generator, rate, unscheduled.size) - 1
+
+        failed = np.flatnonzero(self._next_failure_day == day)
+        if self._sampling_failure_rate is not None:
+            self._weigh_draws(failed.size, self.count - int(np.count_nonzero(self._failing)))
+        if not failed.size:
+            return []
+
+        hours = generator.integers(self._min_failure_duration, self._max_failure_duration + 1, failed.size)
+        if self._antithetic:
+            hours = self._min_failure_duration + self._max_failure_duration - hours
+        self._failing[failed] = True
+        self._next_failure_day[failed] = -1
+        self._repair_at[failed] = self._clock + hours
+        self._next_repair = min(self._next_repair, float(self._repair_at[failed].min()))
+        self.unit_failures += failed.size
+        self._refresh()
+        return list(zip(failed.tolist(), hours.tolist()))
+
+    def update(self, hours_passed):
+        """
+        Advance time and end the failures that are over.
+
+        Args:
+            hours_passed (float): Time elapsed in hours
+        """
+        self._clock += hours_passed
+        self._lost_kw_hours += self._failing_kw * hours_passed
+        self._unit_down_hours += self._failing_count * hours_passed
+        # Tolerance for the rounding of the summed time steps
+        if self._clock >= self._next_repair - 1e-9:
+            self._failing &= self._repair_at > self._clock + 1e-9
+            self._next_repair = float(self._repair_at[self._failing].min()) if self._failing.any() else math.inf
+            self._refresh()
+
+    def is_operational(self):
+        """Check if at least one unit is working."""
+        return self._failing_count < self.count
+
+    def get_capacity(self):
+        """Output capacity of the healthy units in kW."""
+        return self._healthy_kw
+
+    def failing_units(self):
+        """Number of units currently failed."""
+        return self._failing_count
+
+    def results(self):
+        """
+        Unit-level reliability of the run.
+
+        Returns:
+            dict: Unit count, unit failures, unit downtime hours (summed over
+                units) and capacity availability (percent of capacity-hours)
+        """
+        total_kw_hours = self._total_kw * self._clock
+        return {
+            'inverter_units': self.count,
+            'unit_failures': self.unit_failures,
+            'unit_downtime_hours': self._unit_down_hours,
+            'capacity_availability_percent': (
+                (1 - self._lost_kw_hours / total_kw_hours) * 100 if total_kw_hours > 0 else 100.0
+            )
+        }
+
+    def get_likelihood_ratio(self):
+        """
+        Importance-sampling weight of the failures drawn so far.
+
+        Returns:
+            float: P(failure history) / Q(failure history) under the real
+                and the sampling failure rate (1.0 without importance sampling)
+        """
+        return math.exp(self._log_likelihood_ratio)
+
+    def get_log_likelihood_ratio(self):
+        """Natural log of get_likelihood_ratio()."""
+        return self._log_likelihood_ratio
+
+    def _geometric(self, generator, rate, size):
+        """Days until the first failure (1 = today), by inverse transform."""
+        if rate <= 0:
+            return np.full(size, np.iinfo(np.int64).max // 2)
+        if rate >= 1:
+            return np.ones(size, dtype=np.int64)
+        u = generator.random(size)
+        if self._antithetic:
+            u = 1.0 - u
+        # u in [0, 1): 1 - u in (0, 1], so the log is finite
+        return np.maximum(np.ceil(np.log1p(-u) / math.log1p(-rate)), 1).astype(np.int64)
+
+    def _weigh_draws(self, failures, healthy):
+        """Add today's Bernoulli draws of the healthy units to the likelihood ratio."""
+        p, q = self._failure_rate, self._sampling_failure_rate
+        if failures:
+            self._log_likelihood_ratio += failures * math.log(p / q) if p > 0 else -math.inf
+        if healthy > failures:
+            self._log_likelihood_ratio += (healthy - failures) * (
+                math.log((1 - p) / (1 - q)) if p < 1 else -math.inf
+            )
+
+    def _refresh(self):
+        """Recompute the cached healthy capacity and share."""
+        self._failing_count = int(np.count_nonzero(self._failing))
+        if not self._failing_count:
+            self._failing_kw = 0.0
+            self._healthy_kw = self._total_kw
+            self._healthy_share = 1.0
+            return
+        self._failing_kw = float(self._unit_kw[self._failing].sum())
+        self._healthy_kw = max(self._total_kw - self._failing_kw, 0.0) if self._failing_count < self.count else 0.0
+        self._healthy_share = float(self._unit_share[~self._failing].sum())
@@ -6,7 +6,7 @@ class Load:
     """
     
     def __init__(self, base_load_kw, peak_hours_max_kw, 
-                 peak_hours_start, peak_hours_end):
+                 peak_hours_start, peak_hours_end, rng=None):
         """
         Initialize load profile.
         
@@ -15,11 +15,14 @@ class Load:
             peak_hours_max_kw (float): Maximum additional load during peaks
             peak_hours_start (int): Start hour of peak (e.g., 18 for 6 PM)
             peak_hours_end (int): End hour of peak (e.g., 21 for 9 PM)
+            rng (random.Random, optional): Random source (default: the
+                global random module)
         """
         self._base_load_kw = base_load_kw
         self._peak_hours_max_kw = peak_hours_max_kw
         self._peak_hours_start = peak_hours_start
         self._peak_hours_end = peak_hours_end
+        self._rng = rng if rng is not None else random
 
         # Scheduled events: (hour, probability, min_kw, max_kw)
         self._scheduled_events = [
@@ -48,17 +51,60 @@ class Load:
         # Component 2: Peak hours (evening activities)
         if self._peak_hours_start <= hour_of_day < self._peak_hours_end:
             # High consumption during evening (cooking, entertainment, etc.)
-            total_demand += random.uniform(1.0, self._peak_hours_max_kw)
+            total_demand += self._rng.uniform(1.0, self._peak_hours_max_kw)
 
         else:
             # Component 3: Scheduled events (outside peak hours)
             for event_hour, probability, min_kw, max_kw in self._scheduled_events:
                 if hour_of_day == event_hour:
-                    if random.random() < probability:
-                        total_demand += random.uniform(min_kw, max_kw)
+                    if self._rng.random() < probability:
+                        total_demand += self._rng.uniform(min_kw, max_kw)
 
         # Component 4: Random noise (always possible, anywhere)
-        if random.random() < 0.3:  # 30% chance
-            total_demand += random.uniform(0.0, 0.8)
+        if self._rng.random() < 0.3:  # 30% chance
+            total_demand += self._rng.uniform(0.0, 0.8)
 
+        return total_demand
+    
+    def transition_hours(self):
+        """
+        Hours of day at which the load distribution changes.
+        
+        Between two consecutive transitions generate() draws from the same
+        distribution (peak hours and scheduled events switch on full hours).
+        
+        Returns:
+            list: Sorted hours (0-24), always including 0 and 24
+        """
+        hours = {0, 24, self._peak_hours_start, self._peak_hours_end}
+        for event_hour, _, _, _ in self._scheduled_events:
+            hours.update((event_hour, event_hour + 1))
+        return sorted(hour for hour in hours if 0 <= hour <= 24)
+    
+    def expected_demand(self, hour):
+        """
+        Expected energy demand for given hour (no randomness).
+        
+        Mean of generate(hour), used as the load forecast.
+        
+        Args:
+            hour (float): Hour of day (0-23, can be fractional for sub-hourly steps)
+            
+        Returns:
+            float: Expected load demand in kW
+        """
+        hour_of_day = int(hour)
+        
+        total_demand = self._base_load_kw
+        
+        if self._peak_hours_start <= hour_of_day < self._peak_hours_end:
+            total_demand += (1.0 + self._peak_hours_max_kw) / 2
+        else:
+            for event_hour, probability, min_kw, max_kw in self._scheduled_events:
+                if hour_of_day == event_hour:
+                    total_demand += probability * (min_kw + max_kw) / 2
+        
+        # Random noise: 30% chance of uniform(0, 0.8)
+        total_demand += 0.3 * 0.4
+        
         return total_demand
\ No newline at end of file
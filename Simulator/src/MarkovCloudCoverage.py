@@ -0,0 +1,264 @@
+from datetime import timedelta
+import math
+
+import numpy as np
+
+from .AntitheticRandom import AntitheticRandom
+from .CloudCoverage import CloudCoverage
+
+
+class MarkovCloudCoverage(CloudCoverage):
+    """
+    Intra-day cloud coverage from a Markov chain over the cloud levels.
+
+    The day is split into periods of resolution_minutes. The cloud level
+    (Clear, Partly Cloudy, Mostly Cloudy, Overcast, as in CloudCoverage)
+    follows a per-season transition matrix from one period to the next, and
+    each period draws its coverage within the level's range. Partly cloudy
+    days therefore alternate between sunny and cloudy spells instead of
+    holding one coverage for 24 hours.
+
+    The default matrix of a season keeps the level with probability
+    1 - resolution / persistence_hours and otherwise redraws it from the
+    season's PROBABILITIES, so the long-run level mix is the daily model's.
+
+    A series is generated without a Python step per period: every period's
+    transition is a map level -> next level picked by one uniform
+    (cumulative transition tables, batched uniforms), and since composing
+    the maps is associative they are composed block-wise, all blocks at
+    once (about 2 sqrt(periods) batched numpy passes).
+    The daily model (get_daily_coverage) remains available.
+    """
+
+    LEVELS = len(CloudCoverage.COVERAGE_RANGES)
+
+    # Periods per scan (bounds the (periods, levels) map arrays)
+    CHUNK_PERIODS = 1 << 16
+
+    def __init__(self, season='summer', rng=None, resolution_minutes=15, persistence_hours=3.0,
+                 transition_matrices=None):
+        """
+        Initialize the model.
+
+        Args:
+            season (str): Season name ('spring', 'summer', 'fall', 'winter')
+            rng (random.Random, optional): Random source, one draw per
+                generate() call seeds the batched draws (default: the
+                global random module)
+            resolution_minutes (int): Length of a period (must divide a day)
+            persistence_hours (float): Mean time between redraws of the
+                cloud level by the default matrices
+            transition_matrices (dict, optional): Season -> 4x4 transition
+                matrix per period (rows sum to 1); missing seasons use the
+                default matrix
+        """
+        super().__init__(season=season, rng=rng)
+        if not isinstance(resolution_minutes, int) or resolution_minutes <= 0 or 1440 % resolution_minutes:
+            raise ValueError(f"resolution_minutes must be a positive divisor of 1440, got {resolution_minutes!r}")
+        if persistence_hours <= 0:
+            raise ValueError(f"persistence_hours must be positive, got {persistence_hours}")
+
+        self.resolution_minutes = resolution_minutes
+        self.persistence_hours = persistence_hours
+        self.seasons = list(self.PROBABILITIES)
+        redraw = min(1.0, resolution_minutes / (persistence_hours * 60))
+
+        matrices = []
+        for name in self.seasons:
+            if transition_matrices and name in transition_matrices:
+                matrix = self._check_matrix(name, transition_matrices[name])
+            else:
+                matrix = ((1 - redraw) * np.eye(self.LEVELS)
+                          + redraw * np.tile(self.PROBABILITIES[name], (self.LEVELS, 1)))
+            matrices.append(matrix)
+        self.transition_matrices = np.array(matrices)
+
+        # Cumulative tables: next level = number of entries <= u (u uniform)
+        cumulative = np.cumsum(self.transition_matrices, axis=2)
+        cumulative[:, :, -1] = np.inf
+        self._cumulative = cumulative
+        self._ranges = np.array(self.COVERAGE_RANGES)
+        self._antithetic = isinstance(rng, AntitheticRandom)
+        self._level = None   # Level of the last generated period
+
+    @classmethod
+    def from_config(cls, clouds, season, rng=None):
+        """
+        Build the model from the 'clouds' configuration section.
+
+        Args:
+            clouds (dict): 'clouds' section (model 'markov')
+            season (str): Starting season
+            rng (random.Random, optional): Random source
+
+        Returns:
+            MarkovCloudCoverage: Model
+        """
+        return cls(
+            season=season,
+            rng=rng,
+            resolution_minutes=clouds.get('resolution_minutes', 15),
+            persistence_hours=clouds.get('persistence_hours', 3.0),
+            transition_matrices=clouds.get('transition_matrices')
+        )
+
+    @classmethod
+    def _check_matrix(cls, season, matrix):
+        """Validate a configured transition matrix."""
+        matrix = np.asarray(matrix, dtype=float)
+        if matrix.shape != (cls.LEVELS, cls.LEVELS):
+            raise ValueError(f"Transition matrix for {season} must be {cls.LEVELS}x{cls.LEVELS}, "
+                             f"got shape {matrix.shape}")
+        if np.any(matrix < 0) or not np.allclose(matrix.sum(axis=1), 1.0, atol=1e-6):
+            raise ValueError(f"Transition matrix rows for {season} must be probabilities summing to 1")
+        return matrix / matrix.sum(axis=1, keepdims=True)
+
+    def periods_per_day(self):
+        """Number of periods in a day."""
+        return 1440 // self.resolution_minutes
+
+    def stationary_distribution(self, season=None):
+        """
+        Long-run share of each cloud level under a season's matrix.
+
+        Args:
+            season (str, optional): Season (default: the current one)
+
+        Returns:
+            numpy.ndarray: Probability of each level
+        """
+        matrix = self.transition_matrices[self.seasons.index(season or self._season)]
+        # Solve pi (P - I) = 0 with sum(pi) = 1
+        system = np.vstack([matrix.T - np.eye(self.LEVELS), np.ones(self.LEVELS)])
+        target = np.zeros(self.LEVELS + 1)
+        target[-1] = 1.0
+        distribution = np.linalg.lstsq(system, target, rcond=None)[0]
+        distribution = np.clip(distribution, 0.0, None)
+        return distribution / distribution.sum()
+
+    def get_expected_coverage(self, season=None):
+        """
+        Expected cloud coverage for the season (no randomness).
+
+        Args:
+            season (str, optional): Season to use (default: the current one)
+
+        Returns:
+            float: Mean coverage under the stationary level mix (0-0.9)
+        """
+        midpoints = self._ranges.mean(axis=1)
+        return float(self.stationary_distribution(season) @ midpoints)
+
+    def generate(self, periods, seasons=None):
+        """
+        Cloud coverage for the next periods, continuing the chain.
+
+        Args:
+            periods (int): Number of periods to generate
+            seasons (sequence, optional): Season name of each period (default:
+                the current season throughout)
+
+        Returns:
+            list: Coverage per period (0-0.9)
+        """
+        generator = np.random.default_rng(self._rng.getrandbits(64))
+        if seasons is None:
+            season_index = np.full(periods, self.seasons.index(self._season))
+        else:
+            names, inverse = np.unique(np.asarray(seasons), return_inverse=True)
+            for name in names:
+                self._validate(name)
+            season_index = np.array([self.seasons.index(name) for name in names])[inverse]
+            if season_index.size != periods:
+                raise ValueError(f"Got {season_index.size} seasons for {periods} periods")
+
+        if self._level is None:
+            first_season = self.seasons[season_index[0]] if periods else self._season
+            stationary = np.cumsum(self.stationary_distribution(first_season))
+            self._level = min(int(np.searchsorted(stationary, self._uniforms(generator, 1)[0], side='right')),
+                              self.LEVELS - 1)
+
+        levels = np.empty(periods, dtype=np.intp)
+        for start in range(0, periods, self.CHUNK_PERIODS):
+            stop = min(start + self.CHUNK_PERIODS, periods)
+            levels[start:stop] = self._sample_levels(season_index[start:stop], self._uniforms(generator, stop - start))
+            self._level = int(levels[stop - 1])
+
+        low = self._ranges[levels, 0]
+        high = self._ranges[levels, 1]
+        return (low + (high - low) * self._uniforms(generator, periods)).tolist()
+
+    def generate_days(self, start_date, days, auto_season=False):
+        """
+        Cloud coverage for whole days, following the calendar if asked.
+
+        Args:
+            start_date (datetime.datetime): Date of the first day
+            days (int): Number of days
+            auto_season (bool): Use each day's calendar season (season
+                'auto'); otherwise the current season
+
+        Returns:
+            list: Coverage per period, periods_per_day() per day
+        """
+        periods = days * self.periods_per_day()
+        if not auto_season:
+            return self.generate(periods)
+        per_day = [self.season_for_date(start_date + timedelta(days=day)) for day in range(days)]
+        seasons = np.repeat(per_day, self.periods_per_day())
+        return self.generate(periods, seasons)
+
+    def _sample_levels(self, season_index, uniforms):
+        """
+        Levels after each transition, starting from self._level.
+
+        Args:
+            season_index (numpy.ndarray): Season of each period
+            uniforms (numpy.ndarray): One uniform per period
+
+        Returns:
+            numpy.ndarray: Level of each period
+        """
+        # maps[t, s]: level after period t when period t - 1 was at level s
+        maps = np.empty((len(uniforms), self.LEVELS), dtype=np.intp)
+        for season in np.unique(season_index):
+            at = season_index == season
+            u = uniforms[at]
+            for level in range(self.LEVELS):
+                maps[at, level] = np.searchsorted(self._cumulative[season, level], u, side='right')
+
+        # Composition is associative, so the periods are cut into about
+        # sqrt(n) blocks of `block` periods and every loop below advances
+        # all blocks at once: the composed map of each block, the level each
+        # block starts at (a short walk over the blocks), then the levels
+        # inside the blocks
+        n = len(maps)
+        block = max(1, math.isqrt(n))
+        blocks = -(-n // block)
+        identity = np.arange(self.LEVELS)
+        padded = np.empty((blocks * block, self.LEVELS), dtype=maps.dtype)
+        padded[:n] = maps
+        padded[n:] = identity
+        maps = padded.reshape(blocks, block, self.LEVELS)
+
+        composed = np.tile(identity, (blocks, 1))
+        for j in range(block):
+            composed = np.take_along_axis(maps[:, j], composed, axis=1)
+
+        starts = np.empty(blocks, dtype=np.intp)
+        level = self._level
+        for b in range(blocks):
+            starts[b] = level
+            level = composed[b, level]
+
+        levels = np.empty((blocks, block), dtype=np.intp)
+        rows = np.arange(blocks)
+        current = starts
+        for j in range(block):
+            current = maps[rows, j, current]
+            levels[:, j] = current
+        return levels.ravel()[:n]
+
+    def _uniforms(self, generator, size):
+        u = generator.random(size)
+        return 1.0 - u if self._antithetic else u
@@ -0,0 +1,329 @@
+from array import array
+from collections import OrderedDict
+from datetime import datetime, timedelta
+import time
+
+import numpy as np
+
+from .CloudCoverage import CloudCoverage
+from .Load import Load
+from .MarkovCloudCoverage import MarkovCloudCoverage
+from .OptimalDispatch import OptimalDispatch
+from .SolarPanel import SolarPanel
+from .Tariff import Tariff
+
+class ModelPredictiveController:
+    """
+    Rolling-horizon battery planner for the 'MPC' strategy.
+
+    Every replan, the next horizon (24 h by default) is planned with the
+    OptimalDispatch dynamic program on forecasts instead of the real future:
+    - Solar: clear-sky SolarPanel output scaled by the cloud forecast (today's
+      coverage once the day has started, the seasonal mean for later days,
+      following the calendar with season 'auto'),
+      clipped by the inverter
+    - Load: Load.expected_demand for each hour
+    - Rates: the configured tariff (flat grid rates by default)
+
+    Only the decision for the current step is applied. Replanning is kept
+    cheap by three mechanisms:
+    - Warm start: the DP policy covers every battery state, so the last plan
+      keeps serving decisions (even when the battery drifts from the planned
+      path) until it is older than replan_interval_minutes
+    - Material change: a plan is replaced early only when today's cloud
+      forecast moves to a different forecast_tolerance bucket
+    - Plan cache: forecasts are a function of the step of day, the cloud
+      bucket and the horizon's rates, so plans are cached by that key (LRU)
+      and repeat days reuse them without solving
+    """
+
+    DEFAULT_HORIZON_HOURS = 24
+    DEFAULT_REPLAN_INTERVAL_MINUTES = 60
+    DEFAULT_FORECAST_TOLERANCE = 0.05
+    DEFAULT_SOC_LEVELS = 51
+    DEFAULT_CACHE_SIZE = 4096
+
+    def __init__(self, optimizer, clear_sky_kw, inverter_max_kw, expected_load_kw, expected_cloud,
+                 import_rate, export_rate, time_step_hours, horizon_steps,
+                 replan_interval_steps=1, forecast_tolerance=DEFAULT_FORECAST_TOLERANCE,
+                 cache_size=DEFAULT_CACHE_SIZE):
+        """
+        Initialize the controller.
+
+        Args:
+            optimizer (OptimalDispatch): Planner for the battery and grid
+            clear_sky_kw (numpy.ndarray): Cloud-free solar power per step of day
+            inverter_max_kw (float): Inverter output limit in kW
+            expected_load_kw (numpy.ndarray): Load forecast per step of day
+            expected_cloud (float | numpy.ndarray): Cloud coverage assumed for
+                days not yet started (one value, or one per simulation day)
+            import_rate (numpy.ndarray): Import price per simulation step,
+                covering the run plus one horizon
+            export_rate (numpy.ndarray): Export price per simulation step
+            time_step_hours (float): Duration of time step in hours
+            horizon_steps (int): Planning horizon in steps
+            replan_interval_steps (int): Maximum age of a plan in steps
+            forecast_tolerance (float): Cloud coverage bucket width; smaller
+                forecast changes do not trigger a replan
+            cache_size (int): Maximum number of cached plans
+        """
+        if horizon_steps < 1 or replan_interval_steps < 1:
+            raise ValueError("horizon and replan interval must be at least one step")
+        if replan_interval_steps > horizon_steps:
+            raise ValueError(f"replan interval ({replan_interval_steps} steps) exceeds "
+                             f"the horizon ({horizon_steps} steps)")
+        if forecast_tolerance <= 0:
+            raise ValueError(f"forecast_tolerance must be positive, got {forecast_tolerance}")
+
+        self.optimizer = optimizer
+        self.time_step_hours = time_step_hours
+        self.horizon_steps = horizon_steps
+        self.replan_interval_steps = replan_interval_steps
+        self.forecast_tolerance = forecast_tolerance
+        self.cache_size = cache_size
+
+        self._clear_sky_kw = np.asarray(clear_sky_kw, dtype=float)
+        self._inverter_max_kw = inverter_max_kw
+        self._expected_load_kw = np.asarray(expected_load_kw, dtype=float)
+        self._expected_cloud = np.atleast_1d(np.asarray(expected_cloud, dtype=float))
+        self._import_rate = np.asarray(import_rate, dtype=float)
+        self._export_rate = np.asarray(export_rate, dtype=float)
+        self._steps_per_day = len(self._clear_sky_kw)
+
+        # Current plan
+        self._policy = None
+        self._plan_start = 0
+        self._plan_bucket = None
+
+        self._cache = OrderedDict()
+
+        # Statistics
+        self._latency = array('d')
+        self._solves = 0
+        self._solve_seconds = 0.0
+        self._cache_hits = 0
+        self._scheduled_replans = 0
+        self._forecast_replans = 0
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Create a controller from a simulation configuration.
+
+        Forecast models are built from the same component sections as the
+        simulation, so they never touch the simulation's random stream.
+
+        Args:
+            config (dict): Simulation configuration (optional 'mpc' section
+                with 'horizon_hours', 'replan_interval_minutes',
+                'forecast_tolerance', 'soc_levels', 'cache_size')
+
+        Returns:
+            ModelPredictiveController: Configured controller
+        """
+        options = config.get('mpc') or {}
+        simulation = config['simulation']
+        time_step_minutes = simulation['time_step_minutes']
+        steps_per_day = (24 * 60) // time_step_minutes
+        horizon_steps = max(1, round(options.get('horizon_hours', cls.DEFAULT_HORIZON_HOURS) * 60 / time_step_minutes))
+        replan_interval_steps = max(1, round(
+            options.get('replan_interval_minutes', cls.DEFAULT_REPLAN_INTERVAL_MINUTES) / time_step_minutes
+        ))
+
+        solar_panel = SolarPanel(
+            peak_power_kw=config['solar']['unit_peak_power_kw'] * config['solar'].get('count', 1)
+        )
+        inverter_max_kw = config['inverter']['unit_max_output_kw'] * config['inverter'].get('count', 1)
+        load = Load(
+            base_load_kw=config['load']['base_load_kw'],
+            peak_hours_max_kw=config['load']['peak_hours_max_kw'],
+            peak_hours_start=config['load']['peak_hours_start'],
+            peak_hours_end=config['load']['peak_hours_end']
+        )
+        hours = [step * time_step_minutes / 60.0 for step in range(steps_per_day)]
+        clear_sky_kw = [solar_panel.generate(hour, 0.0) for hour in hours]
+        expected_load_kw = [load.expected_demand(hour) for hour in hours]
+
+        total_steps = (simulation['duration_days'] * 24 * 60) // time_step_minutes
+        calendar = Tariff.calendar(simulation['start_date'], time_step_minutes, total_steps + horizon_steps)
+        import_rate, export_rate = Tariff.from_config(config).step_rates(calendar)
+
+        # Seasonal mean coverage per day of the run plus one horizon, under
+        # the configured cloud model (Markov: stationary level mix)
+        start_date = datetime.strptime(simulation['start_date'], '%Y-%m-%d')
+        start_season = CloudCoverage.resolve_season(simulation['season'], start_date)
+        clouds = config.get('clouds') or {}
+        if clouds.get('model', 'daily') == 'markov':
+            cloud = MarkovCloudCoverage.from_config(clouds, start_season)
+        else:
+            cloud = CloudCoverage(season=start_season)
+        forecast_days = (total_steps + horizon_steps) // steps_per_day + 2
+        expected_cloud = [
+            cloud.get_expected_coverage(
+                CloudCoverage.resolve_season(simulation['season'], start_date + timedelta(days=day))
+            )
+            for day in range(forecast_days)
+        ]
+
+        battery = config['battery']
+        optimizer = OptimalDispatch(
+            capacity_kwh=battery['unit_capacity_kwh'] * battery.get('count', 1),
+            efficiency=battery['efficiency'],
+            min_soc=battery['min_soc'],
+            export_limit_kw=config['grid']['export_limit_kw'],
+            soc_levels=options.get('soc_levels', cls.DEFAULT_SOC_LEVELS)
+        )
+
+        return cls(
+            optimizer=optimizer,
+            clear_sky_kw=clear_sky_kw,
+            inverter_max_kw=inverter_max_kw,
+            expected_load_kw=expected_load_kw,
+            expected_cloud=expected_cloud,
+            import_rate=import_rate,
+            export_rate=export_rate,
+            time_step_hours=time_step_minutes / 60.0,
+            horizon_steps=horizon_steps,
+            replan_interval_steps=replan_interval_steps,
+            forecast_tolerance=options.get('forecast_tolerance', cls.DEFAULT_FORECAST_TOLERANCE),
+            cache_size=options.get('cache_size', cls.DEFAULT_CACHE_SIZE)
+        )
+
+    def decide(self, step, battery, cloud_coverage=None):
+        """
+        Battery decision for one step.
+
+        Args:
+            step (int): Simulation step index (0 = start_date midnight)
+            battery (Battery): Battery object (only its stored energy is read)
+            cloud_coverage (float, optional): Today's cloud coverage forecast
+                (None = unknown, the seasonal mean is used)
+
+        Returns:
+            dict: 'charge_kwh' (energy to take from solar into the battery),
+                'discharge_kwh' (energy to deliver from the battery to the
+                load), 'export_first' (export surplus solar before serving
+                the load), 'allow_export' (export pays anything at all)
+        """
+        start = time.perf_counter()
+
+        bucket = self._bucket(cloud_coverage)
+        if self._policy is None or bucket != self._plan_bucket:
+            if self._policy is not None:
+                self._forecast_replans += 1
+            self._replan(step, bucket)
+        elif step - self._plan_start >= self.replan_interval_steps:
+            self._scheduled_replans += 1
+            self._replan(step, bucket)
+
+        optimizer = self.optimizer
+        level = optimizer.nearest_level(battery.get_stored_energy())
+        shift = int(self._policy[step - self._plan_start, level])
+        delta_kwh = shift * optimizer.level_kwh
+
+        import_rate = self._import_rate[step]
+        export_rate = self._export_rate[step]
+        decision = {
+            'charge_kwh': max(delta_kwh, 0.0) / optimizer.one_way_efficiency,
+            'discharge_kwh': max(-delta_kwh, 0.0) * optimizer.one_way_efficiency,
+            'export_first': bool(export_rate > import_rate),
+            'allow_export': bool(export_rate > 0)
+        }
+
+        self._latency.append(time.perf_counter() - start)
+        return decision
+
+    def report(self):
+        """
+        Planner statistics for the results.
+
+        Returns:
+            dict: Decision count, replans by cause, DP solves, cache hits,
+                warm-start decisions and per-decision latency (ms)
+        """
+        latency_ms = np.frombuffer(self._latency, dtype=float) * 1000
+        decisions = len(latency_ms)
+        replans = self._solves + self._cache_hits
+        return {
+            'horizon_steps': self.horizon_steps,
+            'replan_interval_steps': self.replan_interval_steps,
+            'soc_levels': self.optimizer.soc_levels,
+            'decisions': decisions,
+            'replans': replans,
+            'scheduled_replans': self._scheduled_replans,
+            'forecast_replans': self._forecast_replans,
+            'solves': self._solves,
+            'cache_hits': self._cache_hits,
+            'cache_hit_rate': (self._cache_hits / replans) if replans else 0.0,
+            'warm_start_decisions': decisions - replans,
+            'solve_seconds': self._solve_seconds,
+            'latency_ms': {
+                'mean': float(latency_ms.mean()) if decisions else 0.0,
+                'p50': float(np.percentile(latency_ms, 50)) if decisions else 0.0,
+                'p95': float(np.percentile(latency_ms, 95)) if decisions else 0.0,
+                'max': float(latency_ms.max()) if decisions else 0.0
+            }
+        }
+
+    def _bucket(self, cloud_coverage):
+        """Forecast bucket of today's cloud coverage (None = unknown)."""
+        if cloud_coverage is None or cloud_coverage != cloud_coverage:  # None or NaN
+            return None
+        return round(cloud_coverage / self.forecast_tolerance)
+
+    def _replan(self, step, bucket):
+        """Select the plan for the horizon starting at step (cached or solved)."""
+        horizon = self.horizon_steps
+        step_of_day = step % self._steps_per_day
+        import_rate = self._import_rate[step:step + horizon]
+        export_rate = self._export_rate[step:step + horizon]
+        expected_cloud = self._expected_cloud_days(step // self._steps_per_day, step_of_day)
+        key = (step_of_day, bucket, import_rate.tobytes(), export_rate.tobytes(), expected_cloud.tobytes())
+
+        policy = self._cache.get(key)
+        if policy is not None:
+            self._cache.move_to_end(key)
+            self._cache_hits += 1
+        else:
+            solve_start = time.perf_counter()
+            solar_kw, load_kw = self._forecast(step_of_day, bucket, expected_cloud)
+            policy, _ = self.optimizer.plan(solar_kw, load_kw, import_rate, export_rate, self.time_step_hours)
+            self._solve_seconds += time.perf_counter() - solve_start
+            self._solves += 1
+
+            self._cache[key] = policy
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+        self._policy = policy
+        self._plan_start = step
+        self._plan_bucket = bucket
+
+    def _expected_cloud_days(self, day, step_of_day):
+        """Seasonal mean coverage of each day touched by a horizon starting on day."""
+        days = (step_of_day + self.horizon_steps - 1) // self._steps_per_day + 1
+        index = np.minimum(np.arange(day, day + days), len(self._expected_cloud) - 1)
+        return self._expected_cloud[index]
+
+    def _forecast(self, step_of_day, bucket, expected_cloud):
+        """
+        Solar and load forecast for one horizon.
+
+        Args:
+            step_of_day (int): Step of day the horizon starts at
+            bucket (int): Today's cloud forecast bucket (None = unknown)
+            expected_cloud (numpy.ndarray): Seasonal mean coverage of each
+                day the horizon touches (today first)
+
+        Returns:
+            tuple: (solar_kw, load_kw) arrays of horizon_steps values
+        """
+        steps = step_of_day + np.arange(self.horizon_steps)
+        slot = steps % self._steps_per_day
+        day = steps // self._steps_per_day
+
+        cloud = expected_cloud[day]
+        if bucket is not None:
+            cloud = np.where(day == 0, bucket * self.forecast_tolerance, cloud)
+        solar_kw = np.minimum(self._clear_sky_kw[slot] * (1 - cloud), self._inverter_max_kw)
+        return solar_kw, self._expected_load_kw[slot]
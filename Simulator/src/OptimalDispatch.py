@@ -0,0 +1,329 @@
+import math
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .ReportStatistics import ReportStatistics
+from .Tariff import Tariff
+
+class OptimalDispatch:
+    """
+    Offline cost-minimizing battery dispatch by dynamic programming.
+
+    Given the full solar / load horizon and the time-of-use rates, finds the
+    battery schedule with the lowest energy cost. It is a benchmark for the
+    heuristic EnergyManagementSystem strategies, not a realizable policy
+    (it knows the future).
+
+    The model follows the same physical rules as the heuristics:
+    - The battery charges from solar only and discharges into the load only
+      (never from or to the grid), with sqrt(efficiency) losses each way
+    - Solar is split between load and export by price each step (export
+      first when it pays more than the import it displaces), limited by the
+      export limit; what is left is curtailed
+
+    Battery energy is discretized into soc_levels states between min_soc and
+    full. Because the step cost only depends on the energy change, each
+    backward step is a min over a band of level shifts, evaluated for all
+    states at once with a sliding-window view of the value function.
+    """
+
+    DEFAULT_SOC_LEVELS = 201
+
+    # $/kWh moved through the battery, only to break ties between equal-cost
+    # schedules in favour of less cycling
+    TIE_BREAK_PER_KWH = 1e-9
+
+    def __init__(self, capacity_kwh, efficiency, min_soc, export_limit_kw,
+                 soc_levels=DEFAULT_SOC_LEVELS, initial_soc=0.5, terminal_soc=None):
+        """
+        Initialize the optimizer.
+
+        Args:
+            capacity_kwh (float): Battery capacity in kWh
+            efficiency (float): Round-trip efficiency (0 < efficiency <= 1)
+            min_soc (float): Minimum SoC as decimal (0-1)
+            export_limit_kw (float): Maximum export power in kW
+            soc_levels (int): Number of discrete battery energy states
+            initial_soc (float): SoC at the start as decimal (nearest level)
+            terminal_soc (float, optional): Minimum SoC at the end as decimal
+                (None = the battery may end anywhere)
+        """
+        if soc_levels < 2:
+            raise ValueError(f"soc_levels must be at least 2, got {soc_levels}")
+
+        self.capacity_kwh = capacity_kwh
+        self.min_energy_kwh = capacity_kwh * min_soc
+        self.one_way_efficiency = math.sqrt(efficiency)
+        self.export_limit_kw = export_limit_kw
+        self.soc_levels = soc_levels
+        self.level_kwh = (capacity_kwh - self.min_energy_kwh) / (soc_levels - 1)
+        self.energy_levels = self.min_energy_kwh + np.arange(soc_levels) * self.level_kwh
+        self.initial_level = self.nearest_level(capacity_kwh * initial_soc)
+        self.terminal_soc = terminal_soc
+
+    @classmethod
+    def from_config(cls, config, soc_levels=None):
+        """
+        Create an optimizer for the battery and grid of a configuration.
+
+        Args:
+            config (dict): Simulation configuration (optional
+                'optimal_dispatch' section with 'soc_levels', 'terminal_soc')
+            soc_levels (int, optional): Overrides the configured resolution
+
+        Returns:
+            OptimalDispatch: Configured optimizer
+        """
+        options = config.get('optimal_dispatch', {})
+        battery = config['battery']
+        return cls(
+            capacity_kwh=battery['unit_capacity_kwh'] * battery.get('count', 1),
+            efficiency=battery['efficiency'],
+            min_soc=battery['min_soc'],
+            export_limit_kw=config['grid']['export_limit_kw'],
+            soc_levels=soc_levels or options.get('soc_levels', cls.DEFAULT_SOC_LEVELS),
+            terminal_soc=options.get('terminal_soc')
+        )
+
+    def nearest_level(self, energy_kwh):
+        """Index of the discrete state closest to a battery energy."""
+        level = round((energy_kwh - self.min_energy_kwh) / self.level_kwh)
+        return int(min(max(level, 0), self.soc_levels - 1))
+
+    def solve(self, solar_kw, load_kw, import_rate, export_rate, time_step_hours, initial_level=None):
+        """
+        Compute the cost-minimizing schedule for a horizon.
+
+        Args:
+            solar_kw (numpy.ndarray): Solar power after the inverter per step
+            load_kw (numpy.ndarray): Load demand per step
+            import_rate (numpy.ndarray): Import price per step ($/kWh)
+            export_rate (numpy.ndarray): Export price per step ($/kWh)
+            time_step_hours (float): Duration of time step in hours
+            initial_level (int, optional): Starting state (default: initial_soc)
+
+        Returns:
+            dict: 'flows' (name -> kW array, EnergyManagementSystem names),
+                'battery_soc' (percent after each step), 'levels' (state
+                after each step), 'energy_cost' (TOU energy cost in $)
+        """
+        solar_kwh = np.asarray(solar_kw, dtype=float) * time_step_hours
+        load_kwh = np.asarray(load_kw, dtype=float) * time_step_hours
+        import_rate = np.broadcast_to(np.asarray(import_rate, dtype=float), solar_kwh.shape)
+        export_rate = np.broadcast_to(np.asarray(export_rate, dtype=float), solar_kwh.shape)
+        export_kwh = self.export_limit_kw * time_step_hours
+
+        steps = len(solar_kwh)
+        policy, value = self.plan(solar_kw, load_kw, import_rate, export_rate, time_step_hours)
+
+        # ========== FORWARD PASS ==========
+        level = self.initial_level if initial_level is None else initial_level
+        if not np.isfinite(value[level]):
+            raise ValueError("No feasible schedule reaches the terminal SoC from the initial SoC")
+
+        shifts = np.empty(steps, dtype=np.int64)
+        levels = np.empty(steps, dtype=np.int64)
+        for t in range(steps):
+            shifts[t] = policy[t, level]
+            level += shifts[t]
+            levels[t] = level
+
+        _, flows = self._step_flows(shifts, solar_kwh, load_kwh, export_kwh, import_rate, export_rate)
+        energy_cost = float(np.sum(flows['grid_to_load'] * import_rate - flows['solar_to_grid'] * export_rate))
+
+        return {
+            'flows': {name: amount / time_step_hours for name, amount in flows.items()},
+            'battery_soc': self.energy_levels[levels] / self.capacity_kwh * 100,
+            'levels': levels,
+            'energy_cost': energy_cost
+        }
+
+    def plan(self, solar_kw, load_kw, import_rate, export_rate, time_step_hours):
+        """
+        Backward pass: the optimal level shift for every step and state.
+
+        The policy is closed-loop (defined for every battery state), so it
+        stays valid when the real battery drifts from the planned path.
+
+        Args:
+            solar_kw (numpy.ndarray): Solar power after the inverter per step
+            load_kw (numpy.ndarray): Load demand per step
+            import_rate (numpy.ndarray): Import price per step ($/kWh)
+            export_rate (numpy.ndarray): Export price per step ($/kWh)
+            time_step_hours (float): Duration of time step in hours
+
+        Returns:
+            tuple: (policy, value) - policy[t, level] is the level shift to
+                apply at step t, value[level] the optimal cost from step 0
+                (+inf where the terminal SoC cannot be reached)
+        """
+        solar_kwh = np.asarray(solar_kw, dtype=float) * time_step_hours
+        load_kwh = np.asarray(load_kw, dtype=float) * time_step_hours
+        import_rate = np.broadcast_to(np.asarray(import_rate, dtype=float), solar_kwh.shape)
+        export_rate = np.broadcast_to(np.asarray(export_rate, dtype=float), solar_kwh.shape)
+        export_kwh = self.export_limit_kw * time_step_hours
+
+        steps = len(solar_kwh)
+        n = self.soc_levels
+        bands = self._bands(solar_kwh, load_kwh)
+
+        # Value function padded with +inf so shifts past empty/full are infeasible
+        padded = np.full(3 * n, np.inf)
+        value = padded[n:2 * n]
+        value[:] = 0.0
+        if self.terminal_soc is not None:
+            value[self.energy_levels < self.capacity_kwh * self.terminal_soc - 1e-9] = np.inf
+
+        policy = np.empty((steps, n), dtype=np.int16)
+        rows = np.arange(n)
+
+        for t in range(steps - 1, -1, -1):
+            k_min, k_max = bands[t]
+            shifts = np.arange(k_min, k_max + 1)
+            cost = self._step_cost(shifts, solar_kwh[t], load_kwh[t], export_kwh,
+                                   import_rate[t], export_rate[t])
+
+            # window[i, b] = value[i + shifts[b]]
+            window = sliding_window_view(padded, len(shifts))[n + k_min:2 * n + k_min]
+            total = window + cost
+            best = np.argmin(total, axis=1)
+            policy[t] = shifts[best]
+            value[:] = total[rows, best]
+
+        return policy, value.copy()
+
+    def _bands(self, solar_kwh, load_kwh):
+        """
+        Feasible level shifts per step.
+
+        Charging is limited by the solar energy, discharging by the load.
+
+        Returns:
+            numpy.ndarray: (steps, 2) array of [min shift, max shift]
+        """
+        n = self.soc_levels
+        eta = self.one_way_efficiency
+        k_max = np.floor(solar_kwh * eta / self.level_kwh + 1e-9).astype(np.int64)
+        k_min = -np.floor(load_kwh / eta / self.level_kwh + 1e-9).astype(np.int64)
+        return np.stack([np.maximum(k_min, -(n - 1)), np.minimum(k_max, n - 1)], axis=1)
+
+    def _step_cost(self, shifts, solar_kwh, load_kwh, export_kwh, import_rate, export_rate):
+        """Energy cost (with tie-break) of level shifts; see _step_flows."""
+        cost, _ = self._step_flows(shifts, solar_kwh, load_kwh, export_kwh, import_rate, export_rate)
+        return cost + np.abs(shifts) * (self.level_kwh * self.TIE_BREAK_PER_KWH)
+
+    def _step_flows(self, shifts, solar_kwh, load_kwh, export_kwh, import_rate, export_rate):
+        """
+        Energy flows (kWh) and cost of level shifts; all arguments broadcast.
+
+        Returns:
+            tuple: (cost array, flows dict of kWh arrays)
+        """
+        eta = self.one_way_efficiency
+        delta = shifts * self.level_kwh
+        to_battery = np.maximum(delta, 0.0) / eta        # Taken from solar
+        from_battery = np.maximum(-delta, 0.0) * eta     # Delivered to load
+
+        remaining = np.maximum(solar_kwh - to_battery, 0.0)
+        open_load = np.maximum(load_kwh - from_battery, 0.0)
+        can_export = export_rate > 0
+
+        # Load first (import displaced is worth more) or export first
+        load_first = import_rate >= export_rate
+        solar_to_load_a = np.minimum(remaining, open_load)
+        export_a = np.where(can_export, np.minimum(remaining - solar_to_load_a, export_kwh), 0.0)
+        export_b = np.where(can_export, np.minimum(remaining, export_kwh), 0.0)
+        solar_to_load_b = np.minimum(remaining - export_b, open_load)
+
+        solar_to_load = np.where(load_first, solar_to_load_a, solar_to_load_b)
+        solar_to_grid = np.where(load_first, export_a, export_b)
+        grid_to_load = open_load - solar_to_load
+
+        cost = grid_to_load * import_rate - solar_to_grid * export_rate
+        flows = {
+            'solar_to_load': solar_to_load,
+            'solar_to_battery': to_battery,
+            'solar_to_grid': solar_to_grid,
+            'battery_to_load': from_battery,
+            'grid_to_load': grid_to_load,
+            'unmet_load': grid_to_load,
+            'curtailed': remaining - solar_to_load - solar_to_grid
+        }
+        return cost, flows
+
+
+def optimal_results(results, config, soc_levels=None):
+    """
+    Solve the optimal dispatch for the solar/load series of a finished run.
+
+    Every heuristic run with the same seed sees the same solar and load, so
+    any strategy's results can be used. The output mirrors the Simulation
+    results layout (summary, financial, battery, data.hourly_data) with
+    strategy 'OPTIMAL', billed under the configured tariff.
+
+    Args:
+        results (dict): Simulation results from Simulation.run()
+        config (dict): Configuration used for the simulation
+        soc_levels (int, optional): Battery state resolution
+
+    Returns:
+        dict: Results of the optimal schedule
+    """
+    hourly_data = results['data']['hourly_data']
+    time_step_minutes = config['simulation']['time_step_minutes']
+    time_step_hours = time_step_minutes / 60.0
+
+    solar_kw = np.array([step['solar_generated_kw'] for step in hourly_data], dtype=float)
+    load_kw = np.array([step['load_demand_kw'] for step in hourly_data], dtype=float)
+
+    tariff = Tariff.from_config(config)
+    calendar = Tariff.calendar(config['simulation']['start_date'], time_step_minutes, len(solar_kw))
+    import_rate, export_rate = tariff.step_rates(calendar)
+
+    optimizer = OptimalDispatch.from_config(config, soc_levels=soc_levels)
+    solution = optimizer.solve(solar_kw, load_kw, import_rate, export_rate, time_step_hours)
+    flows = solution['flows']
+
+    # Step records in the heuristic format (flows and SoC replaced)
+    columns = {name: values.tolist() for name, values in flows.items()}
+    columns['battery_soc'] = solution['battery_soc'].tolist()
+    optimal_steps = []
+    for i, step in enumerate(hourly_data):
+        record = dict(step)
+        for name, values in columns.items():
+            record[name] = values[i]
+        optimal_steps.append(record)
+
+    total = {name: float(values.sum()) * time_step_hours for name, values in flows.items()}
+    total_solar = total['solar_to_load'] + total['solar_to_battery'] + total['solar_to_grid']
+    total_load = float(load_kw.sum()) * time_step_hours
+
+    statistics = ReportStatistics.compute(optimal_steps, config['battery']['min_soc'], time_step_minutes)
+
+    return {
+        'summary': {
+            'duration_days': config['simulation']['duration_days'],
+            'season': config['simulation']['season'],
+            'strategy': 'OPTIMAL',
+            'total_solar_generated_kwh': total_solar,
+            'total_load_consumed_kwh': total_load,
+            'total_grid_imported_kwh': total['grid_to_load'],
+            'total_grid_exported_kwh': total['solar_to_grid'],
+            'total_curtailed_kwh': total['curtailed'],
+            'self_sufficiency_percent': (1 - total['grid_to_load'] / total_load) * 100 if total_load > 0 else 0
+        },
+        'financial': tariff.bill(flows['grid_to_load'], flows['solar_to_grid'], calendar, time_step_hours),
+        'battery': {
+            'average_soc_percent': statistics['average_soc_percent'],
+            'final_soc_percent': float(solution['battery_soc'][-1]) if len(solar_kw) else 0.0,
+            'capacity_kwh': optimizer.capacity_kwh,
+            'times_full': statistics['full_count'],
+            'times_empty': statistics['empty_count'],
+            'soc_levels': optimizer.soc_levels
+        },
+        'statistics': statistics,
+        'data': {
+            'hourly_data': optimal_steps
+        }
+    }
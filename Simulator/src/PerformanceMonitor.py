@@ -0,0 +1,81 @@
+import time
+
+class PerformanceMonitor:
+    """
+    Accumulates wall time and call counts per phase of the simulation loop.
+
+    Instrumentation is opt-in: Simulation only creates a monitor when asked,
+    and the step loop skips all timing when there is none, so the disabled
+    cost is a single `is not None` check per phase.
+    """
+
+    # Phases of one simulation step, in loop order
+    PHASES = (
+        'solar_generation',
+        'load_generation',
+        'ems_dispatch',
+        'step_logging',
+        'simpy_scheduling',
+        'inverter_update',
+        'coarse_step',
+        'day_boundary'
+    )
+
+    # Clock used for all measurements (exposed so the loop can bind it locally)
+    clock = staticmethod(time.perf_counter)
+
+    def __init__(self):
+        """Initialize empty accumulators for every phase."""
+        self._seconds = dict.fromkeys(self.PHASES, 0.0)
+        self._calls = dict.fromkeys(self.PHASES, 0)
+        self._run_seconds = 0.0
+        self._steps = 0
+
+    def add(self, phase, seconds):
+        """
+        Record one call of a phase.
+
+        Args:
+            phase (str): Phase name (one of PHASES)
+            seconds (float): Wall time spent in the phase
+        """
+        self._seconds[phase] += seconds
+        self._calls[phase] += 1
+
+    def set_run(self, seconds, steps):
+        """
+        Record the total wall time of the run.
+
+        Args:
+            seconds (float): Wall time of the whole step loop
+            steps (int): Number of simulated steps
+        """
+        self._run_seconds = seconds
+        self._steps = steps
+
+    def report(self):
+        """
+        Build the perf block attached to the results.
+
+        Returns:
+            dict: Per-phase totals, call counts and share of the run time
+        """
+        phases = {}
+        for phase in self.PHASES:
+            seconds = self._seconds[phase]
+            calls = self._calls[phase]
+            phases[phase] = {
+                'total_seconds': seconds,
+                'calls': calls,
+                'mean_microseconds': (seconds / calls * 1e6) if calls else 0.0,
+                'share_percent': (seconds / self._run_seconds * 100) if self._run_seconds else 0.0
+            }
+
+        measured = sum(self._seconds.values())
+        return {
+            'run_seconds': self._run_seconds,
+            'steps': self._steps,
+            'steps_per_second': (self._steps / self._run_seconds) if self._run_seconds else 0.0,
+            'unattributed_seconds': max(self._run_seconds - measured, 0.0),
+            'phases': phases
+        }
@@ -0,0 +1,148 @@
+class RainflowCounter:
+    """
+    Online rainflow cycle counting of a bounded signal (battery SoC).
+
+    Values are fed one at a time with add(). Only the turning points that
+    have not closed a cycle yet (the residue) are kept, so memory does not
+    grow with the length of the run: values are quantized to `resolution`,
+    and the ranges in the residue strictly decrease, so a signal in [0, 1]
+    never keeps more than 1 / resolution + 2 points. Each value is pushed
+    and popped at most once (amortized O(1) per add()).
+
+    Cycles follow the ASTM E1049 four-point method: a range is counted as
+    a full cycle when it is enclosed by a larger one, as a half cycle when
+    it starts at the first point of the signal. At the end the residue
+    counts as half cycles (see cycles()).
+    """
+
+    def __init__(self, bins=10, resolution=0.001, on_cycle=None):
+        """
+        Initialize the counter.
+
+        Args:
+            bins (int): Depth histogram bins over [0, 1]
+            resolution (float): Quantization step of the values (smaller
+                turning points are ignored)
+            on_cycle (callable, optional): Called as on_cycle(depth, count)
+                for every closed cycle (count 1.0) or half cycle (0.5)
+        """
+        if bins < 1:
+            raise ValueError(f"bins must be at least 1, got {bins}")
+        if not 0 < resolution < 1:
+            raise ValueError(f"resolution must be between 0 and 1, got {resolution}")
+
+        self.bins = bins
+        self.resolution = resolution
+        self.on_cycle = on_cycle
+        self._histogram = [0.0] * bins
+        self._full_cycles = 0
+        self._half_cycles = 0
+        self._depth_sum = 0.0    # Sum of count x depth over closed cycles
+        self._stack = []         # Confirmed turning points (quantized)
+        self._last = None        # Running extreme, not yet a turning point
+        self._direction = 0
+
+    def add(self, value):
+        """
+        Feed the next value of the signal.
+
+        Args:
+            value (float): Signal value, normally in [0, 1]
+        """
+        level = round(value / self.resolution)
+        last = self._last
+        if level == last:
+            return
+        if last is None:
+            self._stack.append(level)
+            self._last = level
+            return
+
+        direction = 1 if level > last else -1
+        if direction != self._direction and self._direction != 0:
+            # The running extreme is a turning point
+            self._stack.append(last)
+            for depth, count in self._extract(self._stack):
+                self._record(depth, count)
+        self._direction = direction
+        self._last = level
+
+    def cycles(self, include_residue=True):
+        """
+        Cycle counts so far.
+
+        Args:
+            include_residue (bool): Count the open residue as half cycles
+                (as at the end of a signal); the counter is not changed
+
+        Returns:
+            dict: full_cycles, half_cycles, equivalent_full_cycles (sum of
+                depth x count) and depth_histogram (cycles per depth bin)
+        """
+        histogram = list(self._histogram)
+        full_cycles = self._full_cycles
+        half_cycles = self._half_cycles
+        depth_sum = self._depth_sum
+
+        if include_residue and self._last is not None:
+            residue = list(self._stack)
+            if residue[-1] != self._last:
+                residue.append(self._last)
+            ranges = self._extract(residue)
+            ranges += [(abs(b - a) * self.resolution, 0.5) for a, b in zip(residue, residue[1:])]
+            for depth, count in ranges:
+                histogram[self._bin(depth)] += count
+                depth_sum += depth * count
+                if count == 1.0:
+                    full_cycles += 1
+                else:
+                    half_cycles += 1
+
+        return {
+            'full_cycles': full_cycles,
+            'half_cycles': half_cycles,
+            'equivalent_full_cycles': depth_sum,
+            'depth_histogram': histogram
+        }
+
+    def residue_size(self):
+        """Number of turning points held (bounded, see class docstring)."""
+        return len(self._stack)
+
+    def _extract(self, stack):
+        """
+        Remove the cycles closed by the top of the stack.
+
+        Args:
+            stack (list): Turning points, modified in place
+
+        Returns:
+            list: (depth, count) of the removed cycles (count 1.0 for a full
+                cycle, 0.5 for a half cycle from the starting point)
+        """
+        cycles = []
+        while len(stack) >= 3:
+            x = abs(stack[-1] - stack[-2])
+            y = abs(stack[-2] - stack[-3])
+            if x < y:
+                break
+            if len(stack) == 3:
+                cycles.append((y * self.resolution, 0.5))
+                del stack[0]
+            else:
+                cycles.append((y * self.resolution, 1.0))
+                del stack[-3:-1]
+        return cycles
+
+    def _record(self, depth, count):
+        self._histogram[self._bin(depth)] += count
+        self._depth_sum += depth * count
+        if count == 1.0:
+            self._full_cycles += 1
+        else:
+            self._half_cycles += 1
+        if self.on_cycle is not None:
+            self.on_cycle(depth, count)
+
+    def _bin(self, depth):
+        return min(int(depth * self.bins), self.bins - 1)
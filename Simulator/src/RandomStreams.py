@@ -0,0 +1,45 @@
+import random
+
+from .AntitheticRandom import AntitheticRandom
+
+class RandomStreams:
+    """
+    Per-component random streams re-seeded by simulated time.
+
+    With the default shared stream, one extra draw anywhere (e.g. a load
+    event that happens in one run but not in another) shifts every later
+    draw, so runs that should share their noise drift apart. Here the cloud,
+    load and inverter models each get their own generator, re-seeded from
+    (run seed, component, step or day). Two runs with the same seed therefore
+    draw the same numbers at the same simulated time, whatever happened
+    before - which is what common random numbers and antithetic pairs need.
+    """
+
+    # Component ids mixed into the per-step/per-day seeds
+    CLOUD = 0
+    LOAD = 1
+    INVERTER = 2
+
+    def __init__(self, seed, antithetic=False):
+        """
+        Initialize the streams.
+
+        Args:
+            seed (int): Run seed
+            antithetic (bool): Mirror every draw (see AntitheticRandom)
+        """
+        generator = AntitheticRandom if antithetic else random.Random
+        self.seed = seed
+        self.antithetic = antithetic
+        self.cloud = generator()
+        self.load = generator()
+        self.inverter = generator()
+
+    def begin_step(self, step):
+        """Re-seed the per-step stream (load) for a simulation step."""
+        self.load.seed(hash((self.seed, self.LOAD, step)))
+
+    def begin_day(self, day):
+        """Re-seed the per-day streams (cloud, inverter) for a simulated day."""
+        self.cloud.seed(hash((self.seed, self.CLOUD, day)))
+        self.inverter.seed(hash((self.seed, self.INVERTER, day)))
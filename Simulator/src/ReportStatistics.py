@@ -0,0 +1,148 @@
+from operator import itemgetter
+
+import numpy as np
+
+
+class ReportStatistics:
+    """
+    Shared statistics layer for simulation reports.
+
+    Computes every per-step metric used by answers.txt and the comparison
+    report in one pass over the step data. The result is a plain dict that
+    Simulation stores under results['statistics'], so report generators can
+    reuse it instead of walking hourly_data again.
+    """
+
+    # Columns needed from each step record (order matters for unpacking)
+    COLUMNS = (
+        'battery_soc',
+        'cloud_coverage',
+        'load_demand_kw',
+        'inverter_operational',
+        'unmet_load'
+    )
+
+    # Thresholds used to decide if the battery is "full" or "empty"
+    FULL_SOC_PERCENT = 100.0
+    SOC_TOLERANCE = 0.1
+
+    @classmethod
+    def compute(cls, hourly_data, min_soc, time_step_minutes):
+        """
+        Compute report statistics from per-step data.
+
+        Args:
+            hourly_data (list | dict): Step records (list of dicts) or a
+                column dict mapping each name in COLUMNS to an array
+            min_soc (float): Battery minimum SoC as decimal (0-1)
+            time_step_minutes (int): Simulation time step in minutes
+
+        Returns:
+            dict: Report statistics
+        """
+        time_step_hours = time_step_minutes / 60.0
+        columns = cls._to_columns(hourly_data)
+
+        soc = columns['battery_soc']
+        steps = len(soc)
+
+        if steps == 0:
+            return cls._empty(min_soc, time_step_hours)
+
+        full_threshold = cls.FULL_SOC_PERCENT - cls.SOC_TOLERANCE
+        empty_threshold = min_soc * 100 + cls.SOC_TOLERANCE
+
+        full_count = int(np.count_nonzero(soc >= full_threshold))
+        empty_count = int(np.count_nonzero(soc <= empty_threshold))
+        downtime_steps = int(np.count_nonzero(columns['inverter_operational'] == 0))
+        unmet_steps = int(np.count_nonzero(columns['unmet_load'] > 0))
+
+        return {
+            'total_steps': steps,
+            'time_step_hours': time_step_hours,
+            'average_soc_percent': float(soc.mean()),
+            'full_threshold_percent': full_threshold,
+            'empty_threshold_percent': empty_threshold,
+            'full_count': full_count,
+            'empty_count': empty_count,
+            'full_hours': full_count * time_step_hours,
+            'empty_hours': empty_count * time_step_hours,
+            'inverter_downtime_hours': downtime_steps * time_step_hours,
+            'unmet_load_hours': unmet_steps * time_step_hours,
+            'average_cloud_coverage': cls._mean_known(columns['cloud_coverage']),
+            'peak_load_kw': float(columns['load_demand_kw'].max())
+        }
+
+    @classmethod
+    def from_results(cls, results, config):
+        """
+        Get report statistics for a results dict.
+
+        Reuses results['statistics'] when Simulation already computed it,
+        otherwise computes (and caches) it from the hourly data.
+
+        Args:
+            results (dict): Simulation results from Simulation.run()
+            config (dict): Configuration used for the simulation
+
+        Returns:
+            dict: Report statistics
+        """
+        statistics = results.get('statistics')
+        if statistics is None:
+            statistics = cls.compute(
+                results['data']['hourly_data'],
+                config['battery']['min_soc'],
+                config['simulation']['time_step_minutes']
+            )
+            results['statistics'] = statistics
+        return statistics
+
+    @classmethod
+    def _to_columns(cls, hourly_data):
+        """
+        Convert step data into one NumPy array per needed column.
+
+        A list of dicts is walked exactly once; column dicts are used as-is.
+
+        Args:
+            hourly_data (list | dict): Step records or column dict
+
+        Returns:
+            dict: Column name -> numpy array
+        """
+        if isinstance(hourly_data, dict):
+            return {name: np.asarray(hourly_data[name], dtype=float)
+                    for name in cls.COLUMNS}
+
+        if not hourly_data:
+            return {name: np.empty(0) for name in cls.COLUMNS}
+
+        table = np.array(list(map(itemgetter(*cls.COLUMNS), hourly_data)),
+                         dtype=float)
+        return {name: table[:, i] for i, name in enumerate(cls.COLUMNS)}
+
+    @staticmethod
+    def _mean_known(values):
+        """Mean ignoring unknown (NaN) values; NaN if nothing is known."""
+        known = values[~np.isnan(values)]
+        return float(known.mean()) if len(known) else float('nan')
+
+    @classmethod
+    def _empty(cls, min_soc, time_step_hours):
+        """Statistics for a run without step data."""
+        return {
+            'total_steps': 0,
+            'time_step_hours': time_step_hours,
+            'average_soc_percent': 0,
+            'full_threshold_percent': cls.FULL_SOC_PERCENT - cls.SOC_TOLERANCE,
+            'empty_threshold_percent': min_soc * 100 + cls.SOC_TOLERANCE,
+            'full_count': 0,
+            'empty_count': 0,
+            'full_hours': 0,
+            'empty_hours': 0,
+            'inverter_downtime_hours': 0,
+            'unmet_load_hours': 0,
+            'average_cloud_coverage': 0,
+            'peak_load_kw': 0
+        }
@@ -0,0 +1,341 @@
+import contextlib
+import json
+import sqlite3
+from datetime import datetime
+
+class ResultsDatabase:
+    """
+    SQLite store of simulation runs for queries across many runs.
+
+    Every run is one row in `runs` with its settings, seed, key metrics as
+    indexed columns, the full configuration and the result sections as JSON.
+    `run_seasons` holds the metrics per season (one row for a fixed-season
+    run, one per season met for season 'auto'), so "runs above 95%
+    self-sufficiency in winter" is a single indexed query either way.
+    `daily_summaries` optionally holds the day-by-day summaries.
+
+    Runs are inserted in one transaction per batch with executemany. The
+    database uses write-ahead logging, so readers never block the writer and
+    several processes can append to the same file (a writer waits up to
+    `timeout` seconds for another one's batch to commit).
+
+    Rows are built by record(), which needs no connection, so sweep workers
+    can build them and the parent only inserts.
+    """
+
+    SCHEMA_VERSION = 1
+
+    # runs columns: (name, SQL type, value from (results, config))
+    RUN_COLUMNS = [
+        ('label', 'TEXT', None),
+        ('created_at', 'TEXT', None),
+        ('strategy', 'TEXT', lambda r, c: c['energy_management']['strategy']),
+        ('season', 'TEXT', lambda r, c: c['simulation']['season']),
+        ('start_date', 'TEXT', lambda r, c: c['simulation']['start_date']),
+        ('duration_days', 'INTEGER', lambda r, c: r['summary']['duration_days']),
+        ('time_step_minutes', 'INTEGER', lambda r, c: c['simulation']['time_step_minutes']),
+        ('seed', 'INTEGER', lambda r, c: c['simulation'].get('actual_seed_used', c['simulation'].get('random_seed'))),
+        ('antithetic', 'INTEGER', lambda r, c: int(bool(c['simulation'].get('antithetic', False)))),
+        ('battery_count', 'INTEGER', lambda r, c: r['system']['battery_count']),
+        ('solar_count', 'INTEGER', lambda r, c: r['system']['solar_panel_count']),
+        ('inverter_count', 'INTEGER', lambda r, c: r['system']['inverter_count']),
+        ('total_solar_generated_kwh', 'REAL', lambda r, c: r['summary']['total_solar_generated_kwh']),
+        ('total_load_consumed_kwh', 'REAL', lambda r, c: r['summary']['total_load_consumed_kwh']),
+        ('total_grid_imported_kwh', 'REAL', lambda r, c: r['summary']['total_grid_imported_kwh']),
+        ('total_grid_exported_kwh', 'REAL', lambda r, c: r['summary']['total_grid_exported_kwh']),
+        ('total_curtailed_kwh', 'REAL', lambda r, c: r['summary']['total_curtailed_kwh']),
+        ('self_sufficiency_percent', 'REAL', lambda r, c: r['summary']['self_sufficiency_percent']),
+        ('net_cost', 'REAL', lambda r, c: r['financial']['net_cost']),
+        ('average_soc_percent', 'REAL', lambda r, c: r['battery']['average_soc_percent']),
+        ('inverter_failures', 'INTEGER', lambda r, c: r['reliability']['inverter_failures']),
+        ('inverter_downtime_hours', 'REAL', lambda r, c: r['reliability']['inverter_downtime_hours']),
+        ('hours_with_unmet_load', 'REAL', lambda r, c: r['reliability']['hours_with_unmet_load']),
+        ('likelihood_ratio', 'REAL', lambda r, c: r.get('importance_sampling', {}).get('likelihood_ratio', 1.0)),
+        ('config_json', 'TEXT', lambda r, c: json.dumps(c)),
+        ('results_json', 'TEXT', lambda r, c: json.dumps(
+            {section: value for section, value in r.items() if section not in ('data', 'seasons')}))
+    ]
+
+    # Per-season metrics, also available as filters in find_runs()
+    SEASON_METRICS = [
+        'total_solar_generated_kwh', 'total_load_consumed_kwh', 'total_grid_imported_kwh',
+        'total_grid_exported_kwh', 'self_sufficiency_percent', 'net_cost',
+        'inverter_failures', 'hours_with_unmet_load'
+    ]
+
+    DAILY_COLUMNS = [
+        'solar_generated_kwh', 'load_consumed_kwh', 'grid_imported_kwh', 'grid_exported_kwh',
+        'curtailed_kwh', 'battery_soc_end', 'self_sufficiency_percent'
+    ]
+
+    INDEXES = {
+        'idx_runs_strategy': 'runs(strategy, season)',
+        'idx_runs_season': 'runs(season)',
+        'idx_runs_counts': 'runs(battery_count, solar_count, inverter_count)',
+        'idx_runs_label': 'runs(label)',
+        'idx_runs_seed': 'runs(seed)',
+        'idx_runs_self_sufficiency': 'runs(self_sufficiency_percent)',
+        'idx_runs_net_cost': 'runs(net_cost)',
+        'idx_runs_unmet_load': 'runs(hours_with_unmet_load)',
+        'idx_run_seasons_self_sufficiency': 'run_seasons(season, self_sufficiency_percent)',
+        'idx_run_seasons_net_cost': 'run_seasons(season, net_cost)',
+        'idx_daily_season': 'daily_summaries(season, self_sufficiency_percent)'
+    }
+
+    def __init__(self, path, timeout=30.0):
+        """
+        Open (and create if needed) a results database.
+
+        Args:
+            path (str): SQLite file (':memory:' for a throwaway database)
+            timeout (float): Seconds to wait for another writer's transaction
+        """
+        self.path = path
+        # Autocommit mode: transactions are opened explicitly in insert_records()
+        self._connection = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        self._connection.row_factory = sqlite3.Row
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute("PRAGMA foreign_keys=ON")
+        self._create_schema()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Close the connection."""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def _create_schema(self):
+        """Create tables and indexes (no-op for an existing database)."""
+        version = self._connection.execute("PRAGMA user_version").fetchone()[0]
+        if version > self.SCHEMA_VERSION:
+            raise ValueError(f"{self.path} has results schema version {version}, "
+                             f"this version reads up to {self.SCHEMA_VERSION}")
+        if version == self.SCHEMA_VERSION:
+            return  # Opening an existing database takes no write lock
+
+        run_columns = ",\n".join(f"    {name} {sql_type}" for name, sql_type, _ in self.RUN_COLUMNS)
+        season_columns = ",\n".join(f"    {name} REAL" for name in self.SEASON_METRICS)
+        daily_columns = ",\n".join(f"    {name} REAL" for name in self.DAILY_COLUMNS)
+        statements = [
+            f"CREATE TABLE IF NOT EXISTS runs (\n    id INTEGER PRIMARY KEY,\n{run_columns}\n)",
+            f"CREATE TABLE IF NOT EXISTS run_seasons (\n"
+            f"    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,\n"
+            f"    season TEXT NOT NULL,\n    days INTEGER,\n{season_columns},\n"
+            f"    PRIMARY KEY (run_id, season)\n) WITHOUT ROWID",
+            f"CREATE TABLE IF NOT EXISTS daily_summaries (\n"
+            f"    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,\n"
+            f"    day INTEGER NOT NULL,\n    season TEXT,\n{daily_columns},\n"
+            f"    PRIMARY KEY (run_id, day)\n) WITHOUT ROWID"
+        ]
+        statements += [f"CREATE INDEX IF NOT EXISTS {name} ON {target}" for name, target in self.INDEXES.items()]
+
+        with self._transaction():
+            for statement in statements:
+                self._connection.execute(statement)
+            self._connection.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        """BEGIN IMMEDIATE ... COMMIT, rolled back on error."""
+        # IMMEDIATE takes the write lock up front, so the run ids read at the
+        # start of a batch stay valid until the commit
+        self._connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._connection.execute("ROLLBACK")
+            raise
+        self._connection.execute("COMMIT")
+
+    @classmethod
+    def record(cls, results, config, include_daily=True, label=None):
+        """
+        Build the rows of one run (no database needed).
+
+        Args:
+            results (dict): Simulation results from Simulation.run()
+            config (dict): Configuration of the run (with actual_seed_used)
+            include_daily (bool): Also store the daily summaries
+            label (str, optional): Free-form tag, e.g. the sweep a run belongs to
+
+        Returns:
+            dict: {'run': runs row, 'seasons': run_seasons rows,
+                   'daily': daily_summaries rows}, all without the run id
+        """
+        run = [label, datetime.now().isoformat(timespec='seconds')]
+        run += [value(results, config) for _, _, value in cls.RUN_COLUMNS[2:]]
+
+        if 'seasons' in results:
+            seasons = [
+                (season, breakdown['days'], {**breakdown['summary'], **breakdown['financial'],
+                                             **breakdown['reliability']})
+                for season, breakdown in results['seasons'].items()
+            ]
+        else:
+            seasons = [(config['simulation']['season'], results['summary']['duration_days'],
+                        {**results['summary'], **results['financial'], **results['reliability']})]
+        season_rows = [(season, days) + tuple(metrics[name] for name in cls.SEASON_METRICS)
+                       for season, days, metrics in seasons]
+
+        daily_rows = []
+        if include_daily:
+            default_season = config['simulation']['season']
+            daily_rows = [(d['day'], d.get('season', default_season)) + tuple(d[name] for name in cls.DAILY_COLUMNS)
+                          for d in results['data']['daily_summaries']]
+
+        return {'run': tuple(run), 'seasons': season_rows, 'daily': daily_rows}
+
+    def insert_run(self, results, config, include_daily=True, label=None):
+        """
+        Store one run in a single transaction.
+
+        Args:
+            results (dict): Simulation results from Simulation.run()
+            config (dict): Configuration of the run
+            include_daily (bool): Also store the daily summaries
+            label (str, optional): Free-form tag
+
+        Returns:
+            int: Run id
+        """
+        return self.insert_records([self.record(results, config, include_daily, label)])[0]
+
+    def insert_records(self, records, batch_size=500):
+        """
+        Store many runs built by record(), one transaction per batch.
+
+        Args:
+            records (list): record() dicts
+            batch_size (int): Runs per transaction
+
+        Returns:
+            list: Run ids, in the order of records
+        """
+        run_placeholders = ", ".join("?" * (len(self.RUN_COLUMNS) + 1))
+        season_placeholders = ", ".join("?" * (len(self.SEASON_METRICS) + 3))
+        daily_placeholders = ", ".join("?" * (len(self.DAILY_COLUMNS) + 3))
+
+        run_ids = []
+        for start in range(0, len(records), batch_size):
+            batch = records[start:start + batch_size]
+            with self._transaction():
+                # Ids are assigned here so child rows can go in with executemany too
+                first_id = self._connection.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM runs").fetchone()[0]
+                ids = range(first_id, first_id + len(batch))
+                self._connection.executemany(
+                    f"INSERT INTO runs VALUES ({run_placeholders})",
+                    [(run_id,) + record['run'] for run_id, record in zip(ids, batch)]
+                )
+                self._connection.executemany(
+                    f"INSERT INTO run_seasons VALUES ({season_placeholders})",
+                    [(run_id,) + row for run_id, record in zip(ids, batch) for row in record['seasons']]
+                )
+                self._connection.executemany(
+                    f"INSERT INTO daily_summaries VALUES ({daily_placeholders})",
+                    [(run_id,) + row for run_id, record in zip(ids, batch) for row in record['daily']]
+                )
+            run_ids.extend(ids)
+        return run_ids
+
+    def find_runs(self, strategy=None, season=None, label=None, battery_count=None, solar_count=None,
+                  inverter_count=None, min_self_sufficiency=None, max_net_cost=None,
+                  order_by='self_sufficiency_percent', descending=True, limit=None):
+        """
+        Find runs by settings and metrics.
+
+        With a season, the metrics (filters, ordering and returned values)
+        are those of that season: the whole run for a fixed-season run, the
+        season's share of a season 'auto' run.
+
+        Args:
+            strategy (str, optional): Energy management strategy
+            season (str, optional): spring, summer, fall or winter
+            label (str, optional): Run label
+            battery_count, solar_count, inverter_count (int, optional): System size
+            min_self_sufficiency (float, optional): Lowest self-sufficiency in %
+            max_net_cost (float, optional): Highest net cost in $
+            order_by (str): Metric to sort by (one of SEASON_METRICS)
+            descending (bool): Sort order
+            limit (int, optional): Maximum number of runs
+
+        Returns:
+            list: dicts of run settings and metrics (no JSON columns)
+        """
+        if order_by not in self.SEASON_METRICS:
+            raise ValueError(f"Cannot order by '{order_by}'. Must be in {self.SEASON_METRICS}")
+
+        metrics = "s" if season is not None else "r"
+        settings = [name for name, _, _ in self.RUN_COLUMNS
+                    if name not in self.SEASON_METRICS and not name.endswith('_json')]
+        columns = ["r.id"] + [f"r.{name}" for name in settings] + [f"{metrics}.{name}" for name in self.SEASON_METRICS]
+        if season is not None:
+            columns.append("s.days")
+        sql = f"SELECT {', '.join(columns)} FROM runs r"
+        conditions, params = [], []
+        if season is not None:
+            sql += " JOIN run_seasons s ON s.run_id = r.id AND s.season = ?"
+            params.append(season)
+        for column, value in [('strategy', strategy), ('label', label), ('battery_count', battery_count),
+                              ('solar_count', solar_count), ('inverter_count', inverter_count)]:
+            if value is not None:
+                conditions.append(f"r.{column} = ?")
+                params.append(value)
+        if min_self_sufficiency is not None:
+            conditions.append(f"{metrics}.self_sufficiency_percent >= ?")
+            params.append(min_self_sufficiency)
+        if max_net_cost is not None:
+            conditions.append(f"{metrics}.net_cost <= ?")
+            params.append(max_net_cost)
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += f" ORDER BY {metrics}.{order_by} {'DESC' if descending else 'ASC'}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self.query(sql, params)
+
+    def get_run(self, run_id):
+        """
+        Everything stored for one run.
+
+        Args:
+            run_id (int): Run id
+
+        Returns:
+            dict: Run columns with 'config' and 'results' parsed from JSON,
+                plus 'seasons' and 'daily_summaries' lists (None if unknown id)
+        """
+        rows = self.query("SELECT * FROM runs WHERE id = ?", (run_id,))
+        if not rows:
+            return None
+        run = rows[0]
+        run['config'] = json.loads(run.pop('config_json'))
+        run['results'] = json.loads(run.pop('results_json'))
+        run['seasons'] = self.query("SELECT * FROM run_seasons WHERE run_id = ?", (run_id,))
+        run['daily_summaries'] = self.query(
+            "SELECT * FROM daily_summaries WHERE run_id = ? ORDER BY day", (run_id,))
+        return run
+
+    def count_runs(self):
+        """Number of stored runs."""
+        return self._connection.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+
+    def query(self, sql, params=()):
+        """
+        Run any SQL query.
+
+        Args:
+            sql (str): Query
+            params (sequence): Query parameters
+
+        Returns:
+            list: One dict per row
+        """
+        return [dict(row) for row in self._connection.execute(sql, params)]
@@ -6,16 +6,29 @@ This module coordinates all components and runs the discrete-event simulation.
 
 import simpy
 import json
+import math
 from datetime import datetime, timedelta
 import random
+import cProfile
+from collections import deque
 
 from .Battery import Battery
 from .SolarPanel import SolarPanel
 from .CloudCoverage import CloudCoverage
+from .MarkovCloudCoverage import MarkovCloudCoverage
 from .Inverter import Inverter
+from .InverterBank import InverterBank
 from .Load import Load
 from .Grid import Grid
 from .EnergyManagementSystem import EnergyManagementSystem
+from .ReportStatistics import ReportStatistics
+from .PerformanceMonitor import PerformanceMonitor
+from .TraceReplay import TraceReplay
+from .Tariff import Tariff
+from .ModelPredictiveController import ModelPredictiveController
+from .RandomStreams import RandomStreams
+from .BatteryDegradation import BatteryDegradation
+from .ConfigSchema import Config
 
 class Simulation:
     """
@@ -24,16 +37,29 @@ class Simulation:
     Coordinates all system components and manages energy flow through time.
     """
     
-    def __init__(self, config_path='config.json'):
+    def __init__(self, config_path='config.json', config=None,
+                 instrument=False, profile_path=None):
         """
         Initialize simulation with configuration.
         
         Args:
             config_path (str): Path to configuration JSON file
+            config (dict or Config, optional): Configuration dict or compiled
+                Config (see ConfigSchema). When given it is used instead of
+                reading config_path (a deep copy is taken)
+            instrument (bool): Collect per-phase timings of the step loop and
+                attach them to the results under 'perf' (default False)
+            profile_path (str, optional): Dump a cProfile/pstats file of the
+                run to this path
         """
         # Load configuration
-        with open(config_path, 'r') as f:
-            self.config = json.load(f)
+        if isinstance(config, Config):
+            self.config = config.to_dict()
+        elif config is not None:
+            self.config = json.loads(json.dumps(config))  # Deep copy
+        else:
+            with open(config_path, 'r') as f:
+                self.config = json.load(f)
         
         # Create SimPy environment
         self.env = simpy.Environment()
@@ -66,6 +92,18 @@ class Simulation:
         # Store the actual seed used in config for logging
         self.config['simulation']['actual_seed_used'] = self.actual_seed
         
+        # Optional per-component streams for variance reduction (shared = global random)
+        random_streams = self.config['simulation'].get('random_streams', 'shared')
+        antithetic = self.config['simulation'].get('antithetic', False)
+        if random_streams not in ('shared', 'synchronized'):
+            raise ValueError(f"Unknown random_streams: {random_streams}. Must be 'shared' or 'synchronized'")
+        self.streams = None
+        if random_streams == 'synchronized' or antithetic:
+            self.streams = RandomStreams(self.actual_seed, antithetic=antithetic)
+            self.streams.begin_day(0)
+            print(f"Random streams: synchronized{' (antithetic)' if antithetic else ''}")
+        streams = self.streams
+        
         # Calculate component counts and total capacities
         battery_count = self.config['battery'].get('count', 1)
         battery_unit = self.config['battery']['unit_capacity_kwh']
@@ -96,26 +134,73 @@ class Simulation:
             min_soc=self.config['battery']['min_soc']
         )
         
+        # Optional capacity fade (rainflow cycle counting while the run goes)
+        self.degradation = BatteryDegradation.from_config(self.config, self.battery)
+        if self.degradation is not None:
+            print(f"  -> Battery degradation enabled ({self.degradation.cycle_life:g} cycle life)")
+        
         self.solar_panel = SolarPanel(
             peak_power_kw=solar_total
         )
         
-        self.cloud_coverage = CloudCoverage(
-            season=self.config['simulation']['season']
-        )
-        
-        self.inverter = Inverter(
-            max_output_kw=inverter_total,
-            failure_rate=self.config['inverter']['failure_rate'],
-            min_failure_duration=self.config['inverter']['min_failure_duration_hours'],
-            max_failure_duration=self.config['inverter']['max_failure_duration_hours']
+        # season 'auto' follows the calendar: the cloud model switches season
+        # at the first midnight of each new season
+        self.auto_season = self.config['simulation']['season'] == CloudCoverage.AUTO
+        start_season = CloudCoverage.resolve_season(
+            self.config['simulation']['season'],
+            datetime.strptime(self.config['simulation']['start_date'], '%Y-%m-%d')
         )
+        # Cloud model: one coverage per day (daily) or an intra-day Markov chain
+        clouds = self.config.get('clouds') or {}
+        self.cloud_model = clouds.get('model', 'daily')
+        if self.cloud_model == 'markov':
+            self.cloud_coverage = MarkovCloudCoverage.from_config(
+                clouds, start_season, rng=streams.cloud if streams is not None else None
+            )
+            print(f"  -> Markov cloud model ({self.cloud_coverage.resolution_minutes} min periods)")
+        elif self.cloud_model == 'daily':
+            self.cloud_coverage = CloudCoverage(
+                season=start_season,
+                rng=streams.cloud if streams is not None else None
+            )
+        else:
+            raise ValueError(f"Unknown clouds.model: {self.cloud_model}. Must be 'daily' or 'markov'")
+        if self.auto_season:
+            print(f"  -> Seasons follow the calendar (starting in {self.cloud_coverage.get_season()})")
+        
+        # individual_units: each inverter fails on its own and only takes
+        # out its share of the array; otherwise one merged inverter
+        self.individual_inverters = self.config['inverter'].get('individual_units', False)
+        if self.individual_inverters:
+            self.inverter = InverterBank(
+                unit_max_output_kw=inverter_unit,
+                count=inverter_count,
+                failure_rate=self.config['inverter']['failure_rate'],
+                min_failure_duration=self.config['inverter']['min_failure_duration_hours'],
+                max_failure_duration=self.config['inverter']['max_failure_duration_hours'],
+                rng=streams.inverter if streams is not None else None,
+                sampling_failure_rate=self.config['inverter'].get('sampling_failure_rate')
+            )
+            print(f"  -> {inverter_count} inverter units fail independently")
+        else:
+            self.inverter = Inverter(
+                max_output_kw=inverter_total,
+                failure_rate=self.config['inverter']['failure_rate'],
+                min_failure_duration=self.config['inverter']['min_failure_duration_hours'],
+                max_failure_duration=self.config['inverter']['max_failure_duration_hours'],
+                rng=streams.inverter if streams is not None else None,
+                sampling_failure_rate=self.config['inverter'].get('sampling_failure_rate')
+            )
+        if self.config['inverter'].get('sampling_failure_rate') is not None:
+            print(f"Importance sampling: failures drawn at {self.config['inverter']['sampling_failure_rate']}/day "
+                  f"(real rate {self.config['inverter']['failure_rate']}/day), run is weighted")
         
         self.load = Load(
             base_load_kw=self.config['load']['base_load_kw'],
             peak_hours_max_kw=self.config['load']['peak_hours_max_kw'],
             peak_hours_start=self.config['load']['peak_hours_start'],
-            peak_hours_end=self.config['load']['peak_hours_end']
+            peak_hours_end=self.config['load']['peak_hours_end'],
+            rng=streams.load if streams is not None else None
         )
         
         self.grid = Grid(
@@ -124,8 +209,14 @@ class Simulation:
             export_limit_kw=self.config['grid']['export_limit_kw']
         )
         
+        # Rolling-horizon planner, only for the MPC strategy
+        self.mpc = None
+        if self.config['energy_management']['strategy'] == 'MPC':
+            self.mpc = ModelPredictiveController.from_config(self.config)
+        
         self.ems = EnergyManagementSystem(
-            strategy=self.config['energy_management']['strategy']
+            strategy=self.config['energy_management']['strategy'],
+            controller=self.mpc
         )
         
         # Data collection
@@ -141,13 +232,58 @@ class Simulation:
             '%Y-%m-%d'
         )
         
-        # Daily cloud coverage (will be updated each day)
-        self.current_cloud_coverage = self.cloud_coverage.get_daily_coverage()
+        # Optional measured-data replay (replaces synthetic solar/cloud/load)
+        self.replay = None
+        if self.config.get('replay', {}).get('path'):
+            self.replay = TraceReplay.from_config(self.config['replay'])
+            print(f"Replay: {self.config['replay']['path']} "
+                  f"(every {self.replay.interval_minutes} min, replaces solar/cloud/load models)")
+        
+        # Cloud coverage: daily value (updated each day), or the Markov series
+        # of the whole horizon generated up front (with synchronized streams one
+        # day at a time, each day from its own stream). Unknown for measured data
+        self.cloud_series = None
+        self.cloud_series_start = 0   # Period of cloud_series[0]
+        if self.cloud_model == 'markov' and self.replay is None:
+            days = 1 if streams is not None else math.ceil(self.duration_days)
+            self.cloud_series = self.cloud_coverage.generate_days(self.start_date, days, self.auto_season)
+            self.current_cloud_coverage = self.cloud_series[0]
+        else:
+            self.current_cloud_coverage = self.cloud_coverage.get_daily_coverage()
+        if self.replay is not None:
+            self.current_cloud_coverage = None
+        
+        # Optional adaptive stepping: coarse steps while solar is zero
+        self.adaptive_stepping = self.config['simulation'].get('adaptive_stepping', False)
+        self.max_step_minutes = self.config['simulation'].get('max_step_minutes', 60)
+        self.coarse_steps = 0
+        self.coarse_output_steps = 0
+        if self.adaptive_stepping:
+            if self.replay is not None or self.mpc is not None:
+                raise ValueError("adaptive_stepping needs the synthetic solar model and a heuristic "
+                                 "strategy (not replay or MPC)")
+            if self.max_step_minutes < self.time_step_minutes:
+                raise ValueError(f"max_step_minutes ({self.max_step_minutes}) is shorter than "
+                                 f"time_step_minutes ({self.time_step_minutes})")
+            print(f"Adaptive stepping: up to {self.max_step_minutes} min while solar is zero")
+        
+        # Optional instrumentation (None = disabled, near-zero cost)
+        self.perf = PerformanceMonitor() if instrument else None
+        self.profile_path = profile_path
+        
+        # Items produced by the SimPy process, drained by iter_steps()
+        # ('step', record) or ('day', daily_summary)
+        self._stream = deque()
+        self._started = False
     
-    def run(self):
+    def run(self, on_day=None):
         """
         Run the simulation.
         
+        Args:
+            on_day (callable, optional): Called with each iter_days() chunk
+                as soon as the day is simulated (for streaming to a client)
+        
         Returns:
             dict: Simulation results including all data and statistics
         """
@@ -158,23 +294,129 @@ class Simulation:
         print(f"Simulating {self.duration_days * 24} hours ({self.duration_days} days)...")
         print(f"Time step: {self.time_step_minutes} min ({total_steps} total steps)")
         
-        # Register simulation process
-        self.env.process(self._simulation_loop())
+        # Run simulation (optionally under cProfile), keeping every step
+        profiler = cProfile.Profile() if self.profile_path else None
+        start = PerformanceMonitor.clock()
+        if profiler is not None:
+            profiler.enable()
+        
+        if on_day is None:
+            self.hourly_data.extend(self.iter_steps())
+        else:
+            for chunk in self.iter_days():
+                self.hourly_data.extend(chunk['steps'])
+                on_day(chunk)
         
-        # Run simulation
-        self.env.run()
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(self.profile_path)
+        elapsed = PerformanceMonitor.clock() - start
         
         print("-" * 70)
         print("SIMULATION COMPLETED SUCCESSFULLY!")
         print("=" * 70)
         
         # Compile results
-        return self._compile_results()
+        results = self._compile_results()
+        
+        if self.config['inverter'].get('sampling_failure_rate') is not None:
+            results['importance_sampling'] = {
+                'failure_rate': self.config['inverter']['failure_rate'],
+                'sampling_failure_rate': self.config['inverter']['sampling_failure_rate'],
+                'likelihood_ratio': self.inverter.get_likelihood_ratio(),
+                'log_likelihood_ratio': self.inverter.get_log_likelihood_ratio()
+            }
+        
+        if self.adaptive_stepping:
+            results['adaptive_stepping'] = {
+                'max_step_minutes': self.max_step_minutes,
+                'output_steps': total_steps,
+                'internal_steps': total_steps - self.coarse_output_steps + self.coarse_steps,
+                'coarse_steps': self.coarse_steps,
+                'coarse_output_steps': self.coarse_output_steps
+            }
+            print(f"Adaptive stepping: {results['adaptive_stepping']['internal_steps']} internal steps "
+                  f"for {total_steps} output steps")
+        
+        if self.mpc is not None:
+            results['mpc'] = self.mpc.report()
+            print(f"MPC: {results['mpc']['decisions']} decisions, {results['mpc']['solves']} plans solved, "
+                  f"{results['mpc']['cache_hits']} from cache, "
+                  f"mean decision latency {results['mpc']['latency_ms']['mean']:.3f} ms")
+        
+        if self.perf is not None or profiler is not None:
+            perf = {}
+            if self.perf is not None:
+                self.perf.set_run(elapsed, total_steps)
+                perf = self.perf.report()
+            perf['profile_path'] = self.profile_path
+            results['perf'] = perf
+        
+        return results
+    
+    def iter_steps(self):
+        """
+        Run the simulation lazily, yielding one record per time step.
+        
+        Records are the same dicts run() stores in hourly_data, but they are
+        not retained here, so memory stays bounded regardless of duration.
+        Daily summaries and events are still collected on the simulation.
+        
+        Yields:
+            dict: Step record (timestamp, flows, SoC, ...)
+        """
+        for kind, item in self._iter_stream():
+            if kind == 'step':
+                yield item
+    
+    def iter_days(self):
+        """
+        Run the simulation lazily, yielding one chunk per simulated day.
+        
+        Yields:
+            dict: {'day': day number, 'summary': daily summary dict,
+                   'steps': list of that day's step records}
+        """
+        day_steps = []
+        for kind, item in self._iter_stream():
+            if kind == 'step':
+                day_steps.append(item)
+            else:
+                yield {'day': item['day'], 'summary': item, 'steps': day_steps}
+                day_steps = []
+    
+    def _iter_stream(self):
+        """
+        Drive the SimPy environment one event at a time.
+        
+        Yields:
+            tuple: ('step', record) or ('day', daily_summary) in time order
+        """
+        if self._started:
+            raise RuntimeError("Simulation has already been run; create a new Simulation")
+        self._started = True
+        
+        stream = self._stream
+        self.env.process(self._simulation_loop())
+        
+        while True:
+            try:
+                self.env.step()
+            except simpy.core.EmptySchedule:
+                break
+            while stream:
+                yield stream.popleft()
+        
+        while stream:
+            yield stream.popleft()
     
     def _simulation_loop(self):
         """
         Main simulation loop (SimPy generator process).
         
+        Step records and daily summaries are pushed to self._stream for
+        iter_steps()/iter_days() to hand out.
+        
         Yields:
             simpy.Timeout: Time advancement events
         """
@@ -185,6 +427,28 @@ class Simulation:
         # Calculate steps per day for day detection
         steps_per_day = (24 * 60) // self.time_step_minutes
         
+        # Instrumentation (every timing block is skipped when perf is None)
+        perf = self.perf
+        clock = PerformanceMonitor.clock
+        
+        stream = self._stream
+        streams = self.streams
+        
+        # Measured (solar_kw, load_kw) per step when replaying a trace
+        replay = None
+        if self.replay is not None:
+            replay = self.replay.iter_steps(self.start_date, self.time_step_minutes, total_steps)
+        
+        # Coarse step length per step of day (None = fixed steps)
+        coarse_table = self._coarse_step_table(steps_per_day) if self.adaptive_stepping else None
+        
+        # Today's cloud forecast for the EMS (MPC): the day's coverage, or the
+        # mean of the day's Markov periods (per-period values would replan MPC
+        # every period)
+        cloud_forecast = self.current_cloud_coverage
+        if self.cloud_series is not None:
+            cloud_forecast = self._daily_cloud_forecast(0)
+        
         # Daily accumulators
         daily_solar = 0
         daily_load = 0
@@ -194,79 +458,197 @@ class Simulation:
         current_day = 0
         
         while current_step < total_steps:
-            # ========== CALCULATE CURRENT TIME (BEFORE STEP) ==========
-            # This is used for solar generation and load calculation
-            minutes_since_midnight = (current_step * self.time_step_minutes) % (24 * 60)
-            hour_of_day = minutes_since_midnight / 60.0
+            # Adaptive stepping: one coarse step for a dark, constant-load stretch
+            block_steps = 1
+            if coarse_table is not None:
+                block_steps = min(coarse_table[current_step % steps_per_day], total_steps - current_step)
             
-            # Calculate current date
-            current_date = self.start_date + timedelta(
-                minutes=current_step * self.time_step_minutes
-            )
-            
-            # ========== GENERATE SOLAR POWER ==========
-            solar_available = self.solar_panel.generate(
-                hour_of_day,
-                self.current_cloud_coverage
-            )
+            if block_steps > 1:
+                # ========== COARSE STEP (NO SOLAR) ==========
+                if perf is not None:
+                    t0 = clock()
+                
+                # One load draw for the whole stretch (same distribution throughout)
+                if streams is not None:
+                    streams.begin_step(current_step)
+                minutes_since_midnight = (current_step * self.time_step_minutes) % (24 * 60)
+                load_demand = self.load.generate(hour=minutes_since_midnight / 60.0)
+                
+                # Battery and grid advanced in closed form
+                soc_start = self.battery.get_soc()
+                block_flows = self.ems.distribute_without_solar(
+                    load_kw=load_demand,
+                    battery=self.battery,
+                    grid=self.grid,
+                    time_step_hours=time_step_hours,
+                    steps=block_steps
+                )
+                soc_drop = soc_start - self.battery.get_soc()
+                supplied_total = sum(flows['battery_to_load'] for flows in block_flows)
+                
+                # Output at the fixed resolution (SoC falls with the energy supplied);
+                # a coarse step never crosses midnight, so the date is shared
+                date_prefix = (self.start_date + timedelta(minutes=current_step * self.time_step_minutes)
+                               ).strftime('%Y-%m-%d ')
+                supplied = 0.0
+                for offset, flows in enumerate(block_flows):
+                    step = current_step + offset
+                    minutes = minutes_since_midnight + offset * self.time_step_minutes
+                    supplied += flows['battery_to_load']
+                    stream.append(('step', {
+                        'timestamp': f"{date_prefix}{minutes // 60:02d}:{minutes % 60:02d}:00",
+                        'step': step,
+                        'hour': minutes / 60.0,
+                        'solar_generated_kw': 0.0,
+                        'solar_available_kw': 0.0,
+                        'load_demand_kw': load_demand,
+                        'cloud_coverage': (self._cloud_coverage_at(step) if self.cloud_series is not None
+                                           else self.current_cloud_coverage),
+                        'battery_soc': soc_start - (soc_drop * supplied / supplied_total if supplied_total > 0 else soc_drop),
+                        'solar_to_load': flows['solar_to_load'],
+                        'solar_to_battery': flows['solar_to_battery'],
+                        'solar_to_grid': flows['solar_to_grid'],
+                        'battery_to_load': flows['battery_to_load'],
+                        'grid_to_load': flows['grid_to_load'],
+                        'unmet_load': flows['unmet_load'],
+                        'curtailed': flows['curtailed'],
+                        'inverter_operational': self.inverter.is_operational()
+                    }))
+                    daily_grid_import += flows['grid_to_load'] * time_step_hours
+                    self.inverter.update(time_step_hours)
+                daily_load += load_demand * time_step_hours * block_steps
+                current_date = self.start_date + timedelta(minutes=(current_step + block_steps - 1) * self.time_step_minutes)
+                
+                yield self.env.timeout(self.time_step_minutes * block_steps)
+                current_step += block_steps
+                self.coarse_steps += 1
+                self.coarse_output_steps += block_steps
+                
+                if perf is not None:
+                    t1 = clock()
+                    perf.add('coarse_step', t1 - t0)
+                    t0 = t1
             
-            # Apply inverter limits and check for failures
-            if self.inverter.is_operational():
-                solar_generated = self.inverter.apply_limit(solar_available)
             else:
-                solar_generated = 0  # No solar during inverter failure
+                # ========== CALCULATE CURRENT TIME (BEFORE STEP) ==========
+                # This is used for solar generation and load calculation
+                minutes_since_midnight = (current_step * self.time_step_minutes) % (24 * 60)
+                hour_of_day = minutes_since_midnight / 60.0
             
-            # ========== GENERATE LOAD DEMAND ==========
-            load_demand = self.load.generate(hour=hour_of_day)
+                # Calculate current date
+                current_date = self.start_date + timedelta(
+                    minutes=current_step * self.time_step_minutes
+                )
             
-            # ========== DISTRIBUTE ENERGY USING EMS ==========
-            flows = self.ems.distribute_energy(
-                solar_kw=solar_generated,
-                load_kw=load_demand,
-                battery=self.battery,
-                grid=self.grid,
-                time_step_hours=time_step_hours
-            )
+                # ========== GENERATE SOLAR POWER ==========
+                if perf is not None:
+                    t0 = clock()
+            
+                if replay is None:
+                    if self.cloud_series is not None:
+                        self.current_cloud_coverage = self._cloud_coverage_at(current_step)
+                    solar_available = self.solar_panel.generate(
+                        hour_of_day,
+                        self.current_cloud_coverage
+                    )
+                else:
+                    solar_available, replay_load = next(replay)
+            
+                # Apply inverter limits and check for failures
+                if self.inverter.is_operational():
+                    solar_generated = self.inverter.apply_limit(solar_available)
+                else:
+                    solar_generated = 0  # No solar during inverter failure
+            
+                if perf is not None:
+                    t1 = clock()
+                    perf.add('solar_generation', t1 - t0)
+                    t0 = t1
+            
+                # ========== GENERATE LOAD DEMAND ==========
+                if streams is not None:
+                    streams.begin_step(current_step)
+            
+                if replay is None:
+                    load_demand = self.load.generate(hour=hour_of_day)
+                else:
+                    load_demand = replay_load
+            
+                if perf is not None:
+                    t1 = clock()
+                    perf.add('load_generation', t1 - t0)
+                    t0 = t1
+            
+                # ========== DISTRIBUTE ENERGY USING EMS ==========
+                flows = self.ems.distribute_energy(
+                    solar_kw=solar_generated,
+                    load_kw=load_demand,
+                    battery=self.battery,
+                    grid=self.grid,
+                    time_step_hours=time_step_hours,
+                    step=current_step,
+                    cloud_coverage=cloud_forecast
+                )
+            
+                if perf is not None:
+                    t1 = clock()
+                    perf.add('ems_dispatch', t1 - t0)
+                    t0 = t1
             
-            # ========== LOG HOURLY DATA ==========
-            self.hourly_data.append({
-                'timestamp': current_date.strftime('%Y-%m-%d %H:%M:%S'),
-                'step': current_step,
-                'hour': hour_of_day,
-                'solar_generated_kw': solar_generated,
-                'solar_available_kw': solar_available,
-                'load_demand_kw': load_demand,
-                'cloud_coverage': self.current_cloud_coverage,
-                'battery_soc': self.battery.get_soc(),
-                'solar_to_load': flows['solar_to_load'],
-                'solar_to_battery': flows['solar_to_battery'],
-                'solar_to_grid': flows['solar_to_grid'],
-                'battery_to_load': flows['battery_to_load'],
-                'grid_to_load': flows['grid_to_load'],
-                'unmet_load': flows['unmet_load'],
-                'curtailed': flows['curtailed'],
-                'inverter_operational': self.inverter.is_operational()
-            })
+                # ========== LOG HOURLY DATA ==========
+                stream.append(('step', {
+                    'timestamp': current_date.strftime('%Y-%m-%d %H:%M:%S'),
+                    'step': current_step,
+                    'hour': hour_of_day,
+                    'solar_generated_kw': solar_generated,
+                    'solar_available_kw': solar_available,
+                    'load_demand_kw': load_demand,
+                    'cloud_coverage': self.current_cloud_coverage,
+                    'battery_soc': self.battery.get_soc(),
+                    'solar_to_load': flows['solar_to_load'],
+                    'solar_to_battery': flows['solar_to_battery'],
+                    'solar_to_grid': flows['solar_to_grid'],
+                    'battery_to_load': flows['battery_to_load'],
+                    'grid_to_load': flows['grid_to_load'],
+                    'unmet_load': flows['unmet_load'],
+                    'curtailed': flows['curtailed'],
+                    'inverter_operational': self.inverter.is_operational()
+                }))
             
-            # ========== UPDATE DAILY TOTALS ==========
-            # Curtailed is NOT counted in solar_generated
-            daily_solar += (
-                flows['solar_to_load'] + 
-                flows['solar_to_battery'] + 
-                flows['solar_to_grid']
-            ) * time_step_hours
+                # ========== UPDATE DAILY TOTALS ==========
+                # Curtailed is NOT counted in solar_generated
+                daily_solar += (
+                    flows['solar_to_load'] + 
+                    flows['solar_to_battery'] + 
+                    flows['solar_to_grid']
+                ) * time_step_hours
             
-            daily_load += load_demand * time_step_hours
-            daily_grid_import += flows['grid_to_load'] * time_step_hours
-            daily_grid_export += flows['solar_to_grid'] * time_step_hours
-            daily_curtailed += flows['curtailed'] * time_step_hours
+                daily_load += load_demand * time_step_hours
+                daily_grid_import += flows['grid_to_load'] * time_step_hours
+                daily_grid_export += flows['solar_to_grid'] * time_step_hours
+                daily_curtailed += flows['curtailed'] * time_step_hours
             
-            # ========== ADVANCE TIME ==========
-            yield self.env.timeout(self.time_step_minutes)
-            current_step += 1
+                if perf is not None:
+                    t1 = clock()
+                    perf.add('step_logging', t1 - t0)
+                    t0 = t1
             
-            # ========== UPDATE INVERTER (EVERY TIMESTEP) ==========
-            self.inverter.update(time_step_hours)
+                # ========== ADVANCE TIME ==========
+                yield self.env.timeout(self.time_step_minutes)
+                current_step += 1
+            
+                if perf is not None:
+                    t1 = clock()
+                    perf.add('simpy_scheduling', t1 - t0)
+                    t0 = t1
+            
+                # ========== UPDATE INVERTER (EVERY TIMESTEP) ==========
+                self.inverter.update(time_step_hours)
+            
+                if perf is not None:
+                    t1 = clock()
+                    perf.add('inverter_update', t1 - t0)
+                    t0 = t1
             
             # ========== CHECK FOR NEW DAY (AFTER INCREMENT) ==========
             if current_step % steps_per_day == 0 and current_step > 0:
@@ -286,6 +668,10 @@ class Simulation:
                     daily_self_sufficiency
                 )
                 
+                # Apply the day's capacity fade
+                if self.degradation is not None:
+                    self.degradation.end_of_day()
+                
                 # Reset daily accumulators
                 daily_solar = 0
                 daily_load = 0
@@ -298,12 +684,21 @@ class Simulation:
                 if current_day % 5 == 0:
                     print(f"  Day {current_day}/{self.duration_days} completed ({current_day/self.duration_days*100:.1f}%)")
                 
+                if streams is not None:
+                    streams.begin_day(current_day)
+                
                 # Check for inverter failure (once per day at day start)
-                self.inverter.check_failure()
+                if self.individual_inverters:
+                    failure_events = [f"Inverter unit {unit + 1} FAILURE (remaining: {hours}h)"
+                                      for unit, hours in self.inverter.check_failure()]
+                else:
+                    self.inverter.check_failure()
+                    failure_events = [
+                        f"Inverter FAILURE (remaining: {self.inverter._failure_hours_remaining}h)"
+                    ] if self.inverter._is_failing else []
                 
                 # Log inverter failure events
-                if self.inverter._is_failing:
-                    event_msg = f"Inverter FAILURE (remaining: {self.inverter._failure_hours_remaining}h)"
+                for event_msg in failure_events:
                     print(f"  EVENT: {event_msg}")
                     self.events_log.append({
                         'timestamp': current_date.strftime('%Y-%m-%d %H:%M:%S'),
@@ -311,7 +706,24 @@ class Simulation:
                     })
                 
                 # Generate new cloud coverage for next day
-                self.current_cloud_coverage = self.cloud_coverage.get_daily_coverage()
+                if replay is None:
+                    if self.auto_season:
+                        self.cloud_coverage.set_season(
+                            CloudCoverage.season_for_date(self.start_date + timedelta(days=current_day))
+                        )
+                    if self.cloud_series is None:
+                        self.current_cloud_coverage = self.cloud_coverage.get_daily_coverage()
+                        cloud_forecast = self.current_cloud_coverage
+                    else:
+                        if streams is not None:
+                            self.cloud_series = self.cloud_coverage.generate_days(
+                                self.start_date + timedelta(days=current_day), 1, self.auto_season
+                            )
+                            self.cloud_series_start = current_day * self.cloud_coverage.periods_per_day()
+                        cloud_forecast = self._daily_cloud_forecast(current_day)
+                
+                if perf is not None:
+                    perf.add('day_boundary', clock() - t0)
         
         # Log final day if incomplete
         if daily_solar > 0 or daily_load > 0:
@@ -329,6 +741,49 @@ class Simulation:
                 daily_self_sufficiency
             )
     
+    def _coarse_step_table(self, steps_per_day):
+        """
+        Length of the coarse step starting at each step of the day.
+        
+        A coarse step can start wherever solar is zero and runs up to the next
+        transition (sunrise, sunset, a load regime change or midnight), capped
+        by max_step_minutes. Inside it the load is drawn once and the battery
+        is advanced in closed form.
+        
+        Args:
+            steps_per_day (int): Number of steps per day
+        
+        Returns:
+            list: Steps covered by a step starting at each step of day
+                (1 = normal step)
+        """
+        minutes = self.time_step_minutes
+        max_steps = self.max_step_minutes // minutes
+        sunrise = SolarPanel.SUNRISE_HOUR * 60
+        sunset = SolarPanel.SUNSET_HOUR * 60
+        transitions = sorted({sunrise, sunset} | {hour * 60 for hour in self.load.transition_hours()})
+        
+        table = []
+        for step in range(steps_per_day):
+            start = step * minutes
+            if sunrise <= start < sunset:
+                table.append(1)
+                continue
+            end = next(t for t in transitions if t > start)
+            table.append(max(1, min(-(-(end - start) // minutes), max_steps)))
+        return table
+    
+    def _cloud_coverage_at(self, step):
+        """Markov cloud coverage of a simulation step (period it starts in)."""
+        period = step * self.time_step_minutes // self.cloud_coverage.resolution_minutes
+        return self.cloud_series[period - self.cloud_series_start]
+    
+    def _daily_cloud_forecast(self, day):
+        """Mean Markov cloud coverage of a day."""
+        periods = self.cloud_coverage.periods_per_day()
+        start = day * periods - self.cloud_series_start
+        return sum(self.cloud_series[start:start + periods]) / periods
+    
     def _log_daily_summary(self, day, solar, load, grid_import, grid_export, 
                           curtailed, self_sufficiency):
         """
@@ -343,7 +798,7 @@ class Simulation:
             curtailed (float): Energy curtailed (kWh)
             self_sufficiency (float): Self-sufficiency percentage
         """
-        self.daily_summaries.append({
+        summary = {
             'day': day + 1,
             'solar_generated_kwh': solar,
             'load_consumed_kwh': load,
@@ -352,7 +807,13 @@ class Simulation:
             'curtailed_kwh': curtailed,
             'battery_soc_end': self.battery.get_soc(),
             'self_sufficiency_percent': self_sufficiency
-        })
+        }
+        if self.auto_season:
+            summary['season'] = CloudCoverage.season_for_date(self.start_date + timedelta(days=day))
+        if self.degradation is not None:
+            summary['battery_capacity_kwh'] = self.battery.get_capacity()
+        self.daily_summaries.append(summary)
+        self._stream.append(('day', summary))
     
     def _compile_results(self):
         """
@@ -368,42 +829,33 @@ class Simulation:
         total_grid_export = sum(d['grid_exported_kwh'] for d in self.daily_summaries)
         total_curtailed = sum(d['curtailed_kwh'] for d in self.daily_summaries)
         
-        # Calculate financial
-        total_import_cost = total_grid_import * self.config['grid']['import_cost_per_kwh']
-        total_export_revenue = total_grid_export * self.config['grid']['export_revenue_per_kwh']
-        net_cost = total_import_cost - total_export_revenue
-        
-        # Calculate battery statistics
-        soc_values = [h['battery_soc'] for h in self.hourly_data]
-        avg_soc = sum(soc_values) / len(soc_values) if soc_values else 0
-        final_soc = self.battery.get_soc()
-        
-        # Use config values instead of hardcoded thresholds
-        min_soc_threshold = self.config['battery']['min_soc'] * 100
-        max_soc_threshold = 100.0  # Always 100% for full
-        
-        battery_full_count = sum(
-            1 for h in self.hourly_data 
-            if h['battery_soc'] >= (max_soc_threshold - 0.1)
+        # Calculate financial (tariff from config, flat grid rates by default)
+        import_kw, export_kw = Tariff.flows_from_steps(self.hourly_data)
+        calendar = Tariff.calendar(self.start_date, self.time_step_minutes, len(import_kw))
+        financial = Tariff.from_config(self.config).bill(
+            import_kw, export_kw, calendar, self.time_step_minutes / 60.0
         )
         
-        battery_empty_count = sum(
-            1 for h in self.hourly_data 
-            if h['battery_soc'] <= (min_soc_threshold + 0.1)
+        # Per-step statistics (single pass, reused by report generators)
+        statistics = ReportStatistics.compute(
+            self.hourly_data,
+            self.config['battery']['min_soc'],
+            self.time_step_minutes
         )
         
+        # Battery statistics
+        avg_soc = statistics['average_soc_percent']
+        final_soc = self.battery.get_soc()
+        battery_full_count = statistics['full_count']
+        battery_empty_count = statistics['empty_count']
+        
         # Calculate reliability metrics
         inverter_failures = len([e for e in self.events_log if 'FAILURE' in e['message']])
-        
-        # Calculate inverter downtime from hourly data
-        downtime_hours = sum(
-            1 for h in self.hourly_data 
-            if not h['inverter_operational']
-        ) * (self.time_step_minutes / 60.0)
+        downtime_hours = statistics['inverter_downtime_hours']
         
         time_step_hours = self.time_step_minutes / 60.0
-        unmet_load_hours = sum(1 for h in self.hourly_data if h['unmet_load'] > 0) * time_step_hours
-        total_hours = len(self.hourly_data) * time_step_hours
+        unmet_load_hours = statistics['unmet_load_hours']
+        total_hours = statistics['total_steps'] * time_step_hours
         unmet_load_percentage = (unmet_load_hours / total_hours * 100) if total_hours > 0 else 0
         
         # Correct self-sufficiency formula
@@ -411,7 +863,7 @@ class Simulation:
             (1 - total_grid_import / total_load)
         ) * 100 if total_load > 0 else 0
         
-        return {
+        results = {
             'summary': {
                 'duration_days': self.duration_days,
                 'season': self.config['simulation']['season'],
@@ -423,11 +875,7 @@ class Simulation:
                 'total_curtailed_kwh': total_curtailed,
                 'self_sufficiency_percent': self_sufficiency
             },
-            'financial': {
-                'total_import_cost': total_import_cost,
-                'total_export_revenue': total_export_revenue,
-                'net_cost': net_cost
-            },
+            'financial': financial,
             'battery': {
                 'average_soc_percent': avg_soc,
                 'final_soc_percent': final_soc,
@@ -448,9 +896,91 @@ class Simulation:
                 'solar_panel_count': self.solar_count,
                 'inverter_count': self.inverter_count
             },
+            'statistics': statistics,
             'data': {
                 'hourly_data': self.hourly_data,
                 'daily_summaries': self.daily_summaries,
                 'events_log': self.events_log
             }
-        }
\ No newline at end of file
+        }
+        
+        if self.individual_inverters:
+            results['reliability'].update(self.inverter.results())
+        
+        if self.degradation is not None:
+            results['battery']['degradation'] = self.degradation.results()
+        
+        if self.auto_season:
+            results['seasons'] = self._season_breakdown(financial)
+        
+        return results
+    
+    def _season_breakdown(self, financial):
+        """
+        Per-season results of a run with season 'auto'.
+        
+        Every season gets the same sections as the run results, computed over
+        its own days; a season met twice (winter at both ends of a calendar
+        year) is combined. Seasons start on the first of a month, so the
+        financial figures are the sums of the tariff's monthly bills.
+        
+        Args:
+            financial (dict): Tariff bill of the whole run
+        
+        Returns:
+            dict: Season name -> results sections, in order of first appearance
+        """
+        time_step = timedelta(minutes=self.time_step_minutes)
+        
+        def season_of(timestamp):
+            return CloudCoverage.MONTH_SEASONS[int(timestamp[5:7])]
+        
+        breakdown = {}
+        for season in dict.fromkeys(d['season'] for d in self.daily_summaries):
+            days = [d for d in self.daily_summaries if d['season'] == season]
+            steps = [step for step in self.hourly_data if season_of(step['timestamp']) == season]
+            months = [m for m in financial['monthly']
+                      if CloudCoverage.MONTH_SEASONS[int(m['month'][5:7])] == season]
+            # A failure event is logged at the last step before it starts
+            failures = sum(
+                1 for e in self.events_log if 'FAILURE' in e['message'] and CloudCoverage.season_for_date(
+                    datetime.strptime(e['timestamp'], '%Y-%m-%d %H:%M:%S') + time_step) == season
+            )
+            
+            statistics = ReportStatistics.compute(steps, self.config['battery']['min_soc'], self.time_step_minutes)
+            solar = sum(d['solar_generated_kwh'] for d in days)
+            load = sum(d['load_consumed_kwh'] for d in days)
+            grid_import = sum(d['grid_imported_kwh'] for d in days)
+            
+            breakdown[season] = {
+                'days': len(days),
+                'summary': {
+                    'total_solar_generated_kwh': solar,
+                    'total_load_consumed_kwh': load,
+                    'total_grid_imported_kwh': grid_import,
+                    'total_grid_exported_kwh': sum(d['grid_exported_kwh'] for d in days),
+                    'total_curtailed_kwh': sum(d['curtailed_kwh'] for d in days),
+                    'self_sufficiency_percent': (1 - grid_import / load) * 100 if load > 0 else 0
+                },
+                'financial': {
+                    'months': [m['month'] for m in months],
+                    'total_import_cost': sum(m['import_cost'] for m in months),
+                    'total_export_revenue': sum(m['export_revenue'] for m in months),
+                    'demand_charges': sum(m['demand_charges'] for m in months),
+                    'net_cost': sum(m['net_cost'] for m in months)
+                },
+                'battery': {
+                    'average_soc_percent': statistics['average_soc_percent'],
+                    'final_soc_percent': days[-1]['battery_soc_end'],
+                    'times_full': statistics['full_count'],
+                    'times_empty': statistics['empty_count']
+                },
+                'reliability': {
+                    'inverter_failures': failures,
+                    'inverter_downtime_hours': statistics['inverter_downtime_hours'],
+                    'total_unmet_load_kwh': grid_import,
+                    'hours_with_unmet_load': statistics['unmet_load_hours']
+                },
+                'statistics': statistics
+            }
+        return breakdown
\ No newline at end of file
@@ -0,0 +1,439 @@
+from concurrent.futures import ProcessPoolExecutor
+import contextlib
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import io
+import itertools
+import json
+import multiprocessing
+import os
+import socketserver
+import stat
+import threading
+import time
+
+import numpy as np
+
+# merge_config moved to ConfigSchema, still importable from here
+from .ConfigSchema import compile_config, merge_config
+from .Simulation import Simulation
+
+# Request fields that may add raw data to the response
+DATA_SECTIONS = ('daily_summaries', 'events_log', 'hourly_data')
+
+
+class ServiceBusy(RuntimeError):
+    """The request queue is full; the client should retry later."""
+
+
+class SimulationService:
+    """
+    Warm pool of simulation worker processes behind a request queue.
+
+    Workers are started once, import the simulation modules and run a short
+    warm-up simulation, so a request pays only for its own simulation (no
+    interpreter start, imports or config file parsing). At most
+    max_concurrent simulations run at a time; further requests wait in a
+    queue of at most max_queue and are rejected with ServiceBusy beyond it.
+
+    A request is a dict {'config': partial config merged over the base
+    config, 'include': optional list of DATA_SECTIONS}. simulate() returns
+    the result sections (everything but the raw data unless included) and
+    stream() yields one chunk per simulated day before the results. Every
+    response carries its latency: time queued, simulation time in the
+    worker and total time in the service.
+
+    The merged configuration is compiled (see ConfigSchema) before the
+    request takes a slot, so invalid requests are rejected without reaching
+    a worker, and workers receive the compiled Config.
+    """
+
+    def __init__(self, base_config, workers=2, max_concurrent=None, max_queue=64):
+        """
+        Initialize the service (call start() before submitting requests).
+
+        Args:
+            base_config (dict or Config): Configuration that requests are
+                merged over
+            workers (int): Worker processes
+            max_concurrent (int, optional): Simulations running at once
+                (default: workers)
+            max_queue (int): Requests allowed to wait for a free slot
+        """
+        if workers < 1:
+            raise ValueError(f"workers must be at least 1, got {workers}")
+        max_concurrent = max_concurrent or workers
+        if max_concurrent < 1:
+            raise ValueError(f"max_concurrent must be at least 1, got {max_concurrent}")
+        if max_queue < 0:
+            raise ValueError(f"max_queue must not be negative, got {max_queue}")
+
+        self.base_config = compile_config(base_config)
+        self.workers = workers
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+
+        self._executor = None
+        self._manager = None
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._active = 0
+        self._counts = {'completed': 0, 'failed': 0, 'rejected': 0}
+        # Latencies of the most recent requests, for stats()
+        self._latencies = deque(maxlen=1000)
+        self._started_at = None
+
+    def start(self):
+        """
+        Start and warm up the worker processes.
+
+        Returns:
+            float: Warm-up time in seconds
+        """
+        start = time.perf_counter()
+        warmup_config = self.base_config.with_overrides({'simulation': {'duration_days': 1}})
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers, initializer=_warm_worker, initargs=(warmup_config,)
+        )
+        # One no-op task per worker so every process is started (and warmed) now
+        for future in [self._executor.submit(_ready) for _ in range(self.workers)]:
+            future.result()
+        self._started_at = time.time()
+        return time.perf_counter() - start
+
+    def close(self):
+        """Stop the worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def simulate(self, request):
+        """
+        Run one simulation.
+
+        Args:
+            request (dict): {'config': partial config, 'include': [...]}
+
+        Returns:
+            dict: {'results': result sections, 'latency': {'queued_ms',
+                   'run_ms', 'total_ms'}}
+
+        Raises:
+            ServiceBusy: The queue is full
+            ValueError: Invalid request or configuration
+        """
+        config, include = self._parse(request)
+        received = time.perf_counter()
+        with self._slot() as queued_ms:
+            results, run_ms = self._executor.submit(_run_simulation, config, include).result()
+        return {'results': results, 'latency': self._finish(received, queued_ms, run_ms)}
+
+    def stream(self, request):
+        """
+        Run one simulation, yielding each day as soon as it is simulated.
+
+        Args:
+            request (dict): {'config': partial config, 'include': [...]}
+
+        Yields:
+            dict: {'day', 'summary', 'steps'} per simulated day, then
+                {'results': ..., 'latency': ...} as from simulate()
+
+        Raises:
+            ServiceBusy: The queue is full
+            ValueError: Invalid request or configuration
+        """
+        config, include = self._parse(request)
+        received = time.perf_counter()
+        with self._slot() as queued_ms:
+            days = self._day_queue()
+            future = self._executor.submit(_run_simulation, config, include, days)
+            finished = False
+            try:
+                while not finished:
+                    chunk = days.get()
+                    finished = chunk is None
+                    if not finished:
+                        yield chunk
+            finally:
+                # A client that disconnects early keeps its slot until the
+                # worker is done, so the concurrency limit stays exact
+                while not finished:
+                    finished = days.get() is None
+            results, run_ms = future.result()
+        yield {'results': results, 'latency': self._finish(received, queued_ms, run_ms)}
+
+    def stats(self):
+        """
+        Service counters and latency percentiles of recent requests.
+
+        Returns:
+            dict: Pool settings, queue state, request counts and
+                {'queued_ms', 'run_ms', 'total_ms'} -> {'mean', 'p50', 'p95', 'max'}
+        """
+        with self._lock:
+            latencies = list(self._latencies)
+            stats = {
+                'workers': self.workers,
+                'max_concurrent': self.max_concurrent,
+                'max_queue': self.max_queue,
+                'active': self._active,
+                'queued': self._queued,
+                'uptime_seconds': time.time() - self._started_at if self._started_at else 0.0,
+                **self._counts
+            }
+        stats['latency_ms'] = {}
+        for key in ('queued_ms', 'run_ms', 'total_ms'):
+            values = np.array([latency[key] for latency in latencies], dtype=float)
+            stats['latency_ms'][key] = {
+                'mean': float(values.mean()) if len(values) else None,
+                'p50': float(np.percentile(values, 50)) if len(values) else None,
+                'p95': float(np.percentile(values, 95)) if len(values) else None,
+                'max': float(values.max()) if len(values) else None
+            }
+        return stats
+
+    def _parse(self, request):
+        """Validate a request; returns (compiled merged config, included data sections)."""
+        if not isinstance(request, dict):
+            raise ValueError("Request must be a JSON object")
+        unknown = set(request) - {'config', 'include'}
+        if unknown:
+            raise ValueError(f"Unknown request fields: {sorted(unknown)}")
+        overrides = request.get('config') or {}
+        if not isinstance(overrides, dict):
+            raise ValueError("'config' must be an object")
+        include = list(request.get('include') or [])
+        unknown = set(include) - set(DATA_SECTIONS)
+        if unknown:
+            raise ValueError(f"Unknown include sections: {sorted(unknown)}. Must be in {list(DATA_SECTIONS)}")
+        return self.base_config.with_overrides(overrides), include
+
+    @contextlib.contextmanager
+    def _slot(self):
+        """Wait in the queue for a simulation slot; yields the wait in ms."""
+        if self._executor is None:
+            raise RuntimeError("Service is not started")
+        start = time.perf_counter()
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                if self._queued >= self.max_queue:
+                    self._counts['rejected'] += 1
+                    raise ServiceBusy(f"Queue full ({self._queued} requests waiting)")
+                self._queued += 1
+            try:
+                self._slots.acquire()
+            finally:
+                with self._lock:
+                    self._queued -= 1
+        queued_ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self._active += 1
+        try:
+            yield queued_ms
+        except BaseException:
+            with self._lock:
+                self._counts['failed'] += 1
+            raise
+        finally:
+            with self._lock:
+                self._active -= 1
+            self._slots.release()
+
+    def _finish(self, received, queued_ms, run_ms):
+        """Record a completed request; returns its latency dict."""
+        latency = {
+            'queued_ms': queued_ms,
+            'run_ms': run_ms,
+            'total_ms': (time.perf_counter() - received) * 1000
+        }
+        with self._lock:
+            self._counts['completed'] += 1
+            self._latencies.append(latency)
+        return latency
+
+    def _day_queue(self):
+        """A queue the workers can put day chunks on (one manager, started on first use)."""
+        with self._lock:
+            if self._manager is None:
+                self._manager = multiprocessing.Manager()
+            return self._manager.Queue()
+
+
+class ServiceRequestHandler(BaseHTTPRequestHandler):
+    """
+    HTTP/JSON front end of a SimulationService.
+
+    Endpoints:
+    - GET /health: {'status': 'ok'}
+    - GET /stats: SimulationService.stats()
+    - POST /simulate: request JSON -> {'results', 'latency'}
+    - POST /simulate/stream: request JSON -> newline-delimited JSON, one
+      day chunk per line, then the {'results', 'latency'} line (chunked
+      transfer encoding, so lines arrive as days are simulated)
+
+    Errors are JSON {'error': message}: 400 for invalid requests or
+    configurations, 404 for unknown paths, 503 (with Retry-After) when the
+    queue is full.
+    """
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._send_json(200, {'status': 'ok'})
+        elif self.path == '/stats':
+            self._send_json(200, self.server.service.stats())
+        else:
+            self._send_json(404, {'error': f"Unknown path: {self.path}"})
+
+    def do_POST(self):
+        if self.path not in ('/simulate', '/simulate/stream'):
+            self._send_json(404, {'error': f"Unknown path: {self.path}"})
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            request = json.loads(self.rfile.read(length) or b'{}')
+            if self.path == '/simulate':
+                response = self.server.service.simulate(request)
+                self._send_json(200, response)
+                self._log_latency(response['latency'])
+            else:
+                self._send_stream(self.server.service.stream(request))
+        except ServiceBusy as e:
+            self._send_json(503, {'error': str(e)}, {'Retry-After': '1'})
+        except (ValueError, KeyError, TypeError) as e:
+            message = f"Missing configuration key: {e}" if isinstance(e, KeyError) else str(e)
+            self._send_json(400, {'error': message})
+
+    def _send_stream(self, chunks):
+        """Send a generator of dicts as chunked newline-delimited JSON."""
+        # The first item is produced before the headers, so queue and
+        # validation errors still get a proper status code
+        first = next(chunks)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        try:
+            for chunk in itertools.chain([first], chunks):
+                self._write_chunk(chunk)
+                if 'latency' in chunk:
+                    self._log_latency(chunk['latency'])
+        except (ValueError, KeyError, TypeError) as e:
+            self._write_chunk({'error': str(e)})
+        finally:
+            chunks.close()  # Waits for the worker if the client went away
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _write_chunk(self, item):
+        line = (json.dumps(item) + "\n").encode()
+        self.wfile.write(f"{len(line):X}\r\n".encode() + line + b"\r\n")
+
+    def _send_json(self, status, body, headers=None):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+        if status != 200:
+            self.log_message('"%s" %d %s', self.requestline, status, body['error'])
+
+    def _log_latency(self, latency):
+        self.log_message('"%s" 200 queued %.1f ms, run %.1f ms, total %.1f ms', self.requestline,
+                         latency['queued_ms'], latency['run_ms'], latency['total_ms'])
+
+    def log_request(self, code='-', size='-'):
+        pass  # Responses are logged with their latency or error instead
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def address_string(self):
+        # Unix socket clients have no address
+        return self.client_address[0] if self.client_address else 'unix'
+
+
+class _UnixHTTPServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+def make_server(service, host='127.0.0.1', port=8765, unix_socket=None, verbose=True):
+    """
+    Create the HTTP server of a started service.
+
+    Args:
+        service (SimulationService): Service to expose
+        host (str): Interface to listen on (localhost by default)
+        port (int): TCP port (0 = pick a free one)
+        unix_socket (str, optional): Listen on this Unix socket instead of TCP
+        verbose (bool): Log one line per request
+
+    Returns:
+        socketserver.BaseServer: Call serve_forever() to handle requests
+    """
+    if unix_socket is not None:
+        if os.path.exists(unix_socket) and stat.S_ISSOCK(os.stat(unix_socket).st_mode):
+            os.unlink(unix_socket)  # Left over from a previous run
+        server = _UnixHTTPServer(unix_socket, ServiceRequestHandler)
+    else:
+        server = ThreadingHTTPServer((host, port), ServiceRequestHandler)
+    server.service = service
+    server.verbose = verbose
+    return server
+
+
+def _warm_worker(config):
+    """Worker initializer: run a short simulation so every code path is loaded."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        Simulation(config=config).run()
+
+
+def _ready():
+    """No-op task used to start the workers."""
+    return True
+
+
+def _run_simulation(config, include, days=None):
+    """
+    Run one simulation in a worker.
+
+    Args:
+        config (Config): Compiled configuration
+        include (list): DATA_SECTIONS to return
+        days (queue, optional): Gets every iter_days() chunk, then None
+
+    Returns:
+        tuple: (results without unrequested data plus 'seed', simulation
+            time in ms)
+    """
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            simulation = Simulation(config=config)
+            results = simulation.run(on_day=days.put if days is not None else None)
+    finally:
+        if days is not None:
+            days.put(None)
+    run_ms = (time.perf_counter() - start) * 1000
+
+    data = results.pop('data')
+    if include:
+        results['data'] = {section: data[section] for section in include}
+    results['seed'] = simulation.actual_seed
+    return results, run_ms
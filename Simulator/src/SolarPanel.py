@@ -5,6 +5,10 @@ class SolarPanel:
     Simulates solar panel energy generation based on time and weather.
     """
     
+    # Daylight window: generation is zero before sunrise and from sunset on
+    SUNRISE_HOUR = 6
+    SUNSET_HOUR = 18
+    
     def __init__(self, peak_power_kw):
         """
         Initialize solar panel system.
@@ -26,11 +30,11 @@ class SolarPanel:
             float: Generated power in kW
         """
         # 1. If hour_of_day < 6 or hour_of_day >= 18: return 0.0
-        if hour_of_day < 6 or hour_of_day >= 18:
+        if hour_of_day < self.SUNRISE_HOUR or hour_of_day >= self.SUNSET_HOUR:
             return 0.0
         
         # 2. Calculate hours_since_sunrise 
-        hours_since_sunrise = hour_of_day - 6
+        hours_since_sunrise = hour_of_day - self.SUNRISE_HOUR
         
         # 3. Calculate sun_angle
         sun_angle = hours_since_sunrise * (math.pi / 12)
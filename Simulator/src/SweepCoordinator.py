@@ -0,0 +1,371 @@
+from collections import deque
+import itertools
+import json
+import socketserver
+import threading
+import time
+
+from .ConfigSchema import ConfigError, check_overrides, compile_config
+
+# Wire format: one JSON object per line (UTF-8)
+
+
+def send_message(stream, message):
+    """Write one protocol message to a socket file and flush it."""
+    stream.write((json.dumps(message) + "\n").encode())
+    stream.flush()
+
+
+def read_message(stream):
+    """Read one protocol message from a socket file (None at end of stream)."""
+    line = stream.readline()
+    if not line:
+        return None
+    return json.loads(line)
+
+
+class SweepCoordinator:
+    """
+    Hands out chunks of a configuration sweep to workers over TCP.
+
+    A sweep is a list of partial configurations (overrides merged over a
+    base configuration by the workers). It is split into chunks of
+    chunk_size runs; workers (see SweepWorker) connect, receive the base
+    configuration once, then repeatedly pull a chunk, run it and push back
+    one compact summary record per run with the next request.
+
+    Protocol (newline-delimited JSON, worker -> coordinator first):
+    - {'type': 'hello', 'worker': name} -> {'type': 'welcome', 'base_config'}
+    - {'type': 'request'} or {'type': 'result', 'chunk', 'records'} ->
+      {'type': 'chunk', 'chunk', 'runs': [[index, overrides], ...]},
+      {'type': 'wait', 'seconds'} (every chunk is out, try again later) or
+      {'type': 'done'}
+
+    A chunk is leased to one worker connection at a time. When that
+    connection drops (a reconnect under the same worker name keeps its own
+    leases), or the lease is older than lease_timeout (a hung or
+    partitioned worker), the chunk goes back to the queue; after
+    max_attempts lost leases its runs are recorded as failed instead. The
+    first result of a chunk wins, late duplicates are ignored.
+
+    Every run's merged configuration is validated when the coordinator is
+    created, so a typo or an invalid value in the sweep fails before any
+    worker is scheduled (ConfigError listing each problem with its runs).
+    """
+
+    # Runs listed per problem in a ConfigError
+    LISTED_RUNS = 5
+
+    WAIT_SECONDS = 0.5
+
+    def __init__(self, base_config, runs, chunk_size=8, host='127.0.0.1', port=0,
+                 lease_timeout=300.0, max_attempts=3):
+        """
+        Initialize the coordinator and bind its socket.
+
+        Args:
+            base_config (dict or Config): Configuration every run is merged over
+            runs (list): Partial configurations, one per run (see expand())
+            chunk_size (int): Runs per chunk
+            host (str): Interface to listen on ('0.0.0.0' for other hosts)
+            port (int): TCP port (0 = pick a free one, see address)
+            lease_timeout (float): Seconds before an unfinished chunk is
+                handed to another worker
+            max_attempts (int): Leases of a chunk before its runs fail
+
+        Raises:
+            ConfigError: The base configuration or a run's configuration is
+                invalid
+        """
+        if not runs:
+            raise ValueError("The sweep has no runs")
+        if chunk_size < 1:
+            raise ValueError(f"chunk_size must be at least 1, got {chunk_size}")
+        if max_attempts < 1:
+            raise ValueError(f"max_attempts must be at least 1, got {max_attempts}")
+
+        self.base_config = compile_config(base_config)
+        self.runs = list(runs)
+        self._validate_runs()
+        self.chunk_size = chunk_size
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max_attempts
+        self.chunks = [list(range(start, min(start + chunk_size, len(self.runs))))
+                       for start in range(0, len(self.runs), chunk_size)]
+
+        self._lock = threading.Lock()
+        self._pending = deque(range(len(self.chunks)))
+        self._leases = {}     # chunk -> (worker, connection, leased_at)
+        self._attempts = [0] * len(self.chunks)
+        self._records = {}    # run index -> record
+        self._done = set()
+        self._workers = {}    # worker name -> counters
+        self._connections = {}  # connection id -> worker name (open connections)
+        self._connection_ids = itertools.count(1)
+        self._requeued = 0
+        self._duplicates = 0
+        self._failed_chunks = []
+        self._finished = threading.Event()
+        self._start_time = None
+        self._end_time = None
+
+        self._server = _CoordinatorServer((host, port), _WorkerHandler)
+        self._server.coordinator = self
+        self._thread = None
+
+    @staticmethod
+    def expand(parameters):
+        """
+        Cartesian product of sweep parameters.
+
+        Args:
+            parameters (dict): Dotted config key -> list of values, e.g.
+                {'battery.count': [1, 2], 'energy_management.strategy': [...]}
+
+        Returns:
+            list: Partial configurations (nested dicts), one per combination,
+                the last parameter varying fastest
+        """
+        for key, values in parameters.items():
+            if not isinstance(values, list) or not values:
+                raise ValueError(f"Sweep parameter '{key}' needs a non-empty list of values")
+        runs = []
+        for combination in itertools.product(*parameters.values()):
+            overrides = {}
+            for key, value in zip(parameters, combination):
+                *sections, name = key.split('.')
+                target = overrides
+                for section in sections:
+                    target = target.setdefault(section, {})
+                target[name] = value
+            runs.append(overrides)
+        return runs
+
+    def _validate_runs(self):
+        """Check every run's merged configuration; raises ConfigError."""
+        base = self.base_config.to_dict()
+        runs_by_problem = {}
+        for index, overrides in enumerate(self.runs):
+            for problem in check_overrides(base, overrides):
+                runs_by_problem.setdefault(problem, []).append(index)
+        if not runs_by_problem:
+            return
+        problems = []
+        for problem, indices in runs_by_problem.items():
+            listed = ', '.join(str(index) for index in indices[:self.LISTED_RUNS])
+            more = f" and {len(indices) - self.LISTED_RUNS} more" if len(indices) > self.LISTED_RUNS else ""
+            problems.append(f"{problem} (run{'s' if len(indices) > 1 else ''} {listed}{more})")
+        raise ConfigError(problems)
+
+    @property
+    def address(self):
+        """(host, port) the coordinator listens on."""
+        return self._server.server_address[:2]
+
+    def start(self):
+        """Start accepting workers in a background thread."""
+        self._start_time = time.perf_counter()
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def wait(self, timeout=None):
+        """
+        Block until every chunk is finished.
+
+        Args:
+            timeout (float, optional): Seconds to wait at most
+
+        Returns:
+            bool: True when the sweep is finished
+        """
+        return self._finished.wait(timeout)
+
+    def close(self, grace_seconds=2.0):
+        """
+        Stop the coordinator.
+
+        Connected workers are given grace_seconds to pick up their 'done'
+        message first.
+        """
+        deadline = time.perf_counter() + grace_seconds
+        while self._finished.is_set() and time.perf_counter() < deadline:
+            with self._lock:
+                if not any(worker['connected'] for worker in self._workers.values()):
+                    break
+            time.sleep(0.05)
+        self._server.shutdown()
+        self._server.server_close()
+
+    def run(self, timeout=None):
+        """
+        Run the whole sweep: start, wait for the workers, close.
+
+        Returns:
+            dict: See results()
+        """
+        self.start()
+        try:
+            self.wait(timeout)
+        finally:
+            self.close()
+        return self.results()
+
+    def status(self):
+        """
+        Progress of the sweep.
+
+        Returns:
+            dict: Chunk counts, current leases (chunk -> worker) and
+                per-worker counters
+        """
+        with self._lock:
+            return {
+                'chunks': len(self.chunks),
+                'done': len(self._done),
+                'pending': len(self._pending),
+                'leases': {chunk: worker for chunk, (worker, _, _) in self._leases.items()},
+                'requeued': self._requeued,
+                'duplicates': self._duplicates,
+                'workers': {name: dict(counters) for name, counters in self._workers.items()}
+            }
+
+    def results(self):
+        """
+        Records collected so far.
+
+        Returns:
+            dict: Sweep counters, per-worker counters and 'records' (one
+                per finished run, in run order; failed runs have 'error')
+        """
+        with self._lock:
+            return {
+                'runs': len(self.runs),
+                'chunks': len(self.chunks),
+                'chunk_size': self.chunk_size,
+                'completed_runs': len(self._records),
+                'finished': self._finished.is_set(),
+                'elapsed_seconds': ((self._end_time or time.perf_counter()) - self._start_time
+                                    if self._start_time else 0.0),
+                'requeued_chunks': self._requeued,
+                'duplicate_results': self._duplicates,
+                'failed_chunks': list(self._failed_chunks),
+                'workers': {name: {key: value for key, value in counters.items() if key != 'connected'}
+                            for name, counters in self._workers.items()},
+                'records': [self._records[index] for index in sorted(self._records)]
+            }
+
+    def _connect(self, worker, address):
+        """
+        Register a worker connection.
+
+        Returns:
+            int: Connection id, which owns the leases handed out on it
+        """
+        with self._lock:
+            counters = self._workers.setdefault(worker, {'address': address, 'chunks': 0, 'runs': 0,
+                                                         'lost_chunks': 0, 'connected': False})
+            counters['address'] = address
+            counters['connected'] = True
+            connection = next(self._connection_ids)
+            self._connections[connection] = worker
+            return connection
+
+    def _disconnect(self, connection):
+        """A connection closed: its leases go back to the queue."""
+        with self._lock:
+            worker = self._connections.pop(connection)
+            # The worker may have reconnected before this connection noticed EOF
+            self._workers[worker]['connected'] = worker in self._connections.values()
+            for chunk in [chunk for chunk, (_, owner, _) in self._leases.items() if owner == connection]:
+                self._lose(chunk)
+
+    def _lose(self, chunk):
+        """Requeue a chunk whose lease is lost (or fail it). Caller holds the lock."""
+        worker, _, _ = self._leases.pop(chunk)
+        self._workers[worker]['lost_chunks'] += 1
+        if self._attempts[chunk] >= self.max_attempts:
+            self._failed_chunks.append(chunk)
+            error = f"Chunk lost {self._attempts[chunk]} times (last worker {worker})"
+            self._finish(chunk, [{'index': index, 'overrides': self.runs[index], 'error': error}
+                                 for index in self.chunks[chunk]])
+        else:
+            self._requeued += 1
+            self._pending.appendleft(chunk)  # Retried before new work
+
+    def _next_message(self, connection):
+        """Next reply to a worker's request: a chunk, 'wait' or 'done'."""
+        with self._lock:
+            now = time.perf_counter()
+            for chunk in [chunk for chunk, (_, _, leased_at) in self._leases.items()
+                          if now - leased_at > self.lease_timeout]:
+                self._lose(chunk)
+
+            if self._pending:
+                chunk = self._pending.popleft()
+                self._attempts[chunk] += 1
+                self._leases[chunk] = (self._connections[connection], connection, now)
+                return {'type': 'chunk', 'chunk': chunk,
+                        'runs': [[index, self.runs[index]] for index in self.chunks[chunk]]}
+            if self._leases:
+                return {'type': 'wait', 'seconds': self.WAIT_SECONDS}
+            return {'type': 'done'}
+
+    def _complete(self, worker, chunk, records):
+        """Store a worker's result (the first result of a chunk wins)."""
+        with self._lock:
+            if chunk in self._done:
+                self._duplicates += 1
+                return
+            # Also when the lease timed out and the chunk was requeued or
+            # re-leased: this worker finished first
+            self._leases.pop(chunk, None)
+            if chunk in self._pending:
+                self._pending.remove(chunk)
+            self._workers[worker]['chunks'] += 1
+            self._workers[worker]['runs'] += len(records)
+            self._finish(chunk, records)
+
+    def _finish(self, chunk, records):
+        """Mark a chunk done. Caller holds the lock."""
+        self._done.add(chunk)
+        for record in records:
+            self._records[record['index']] = record
+        if len(self._done) == len(self.chunks):
+            self._end_time = time.perf_counter()
+            self._finished.set()
+
+
+class _CoordinatorServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class _WorkerHandler(socketserver.StreamRequestHandler):
+    """One worker connection."""
+
+    def handle(self):
+        coordinator = self.server.coordinator
+        try:
+            hello = read_message(self.rfile)
+        except ValueError:
+            return
+        if not hello or hello.get('type') != 'hello':
+            return
+        worker = hello['worker']
+        connection = coordinator._connect(worker, f"{self.client_address[0]}:{self.client_address[1]}")
+        try:
+            send_message(self.wfile, {'type': 'welcome', 'base_config': coordinator.base_config.to_dict()})
+            while True:
+                message = read_message(self.rfile)
+                if message is None:
+                    break
+                if message['type'] == 'result':
+                    coordinator._complete(worker, message['chunk'], message['records'])
+                reply = coordinator._next_message(connection)
+                send_message(self.wfile, reply)
+                if reply['type'] == 'done':
+                    break
+        except (OSError, ValueError):
+            pass  # Connection lost or garbled: same as a disconnect
+        finally:
+            coordinator._disconnect(connection)
@@ -0,0 +1,138 @@
+import contextlib
+import io
+import os
+import socket
+import time
+
+from .ConfigSchema import compile_config
+from .Simulation import Simulation
+from .SweepCoordinator import send_message, read_message
+
+# Summary record metrics: name -> path in the Simulation results
+RECORD_METRICS = {
+    'self_sufficiency_percent': ('summary', 'self_sufficiency_percent'),
+    'total_solar_generated_kwh': ('summary', 'total_solar_generated_kwh'),
+    'total_load_consumed_kwh': ('summary', 'total_load_consumed_kwh'),
+    'total_grid_imported_kwh': ('summary', 'total_grid_imported_kwh'),
+    'total_grid_exported_kwh': ('summary', 'total_grid_exported_kwh'),
+    'net_cost': ('financial', 'net_cost'),
+    'average_soc_percent': ('battery', 'average_soc_percent'),
+    'inverter_failures': ('reliability', 'inverter_failures'),
+    'hours_with_unmet_load': ('reliability', 'hours_with_unmet_load')
+}
+
+
+class SweepWorker:
+    """
+    Runs sweep chunks handed out by a SweepCoordinator.
+
+    Connects over TCP, pulls chunks, runs every configuration of a chunk
+    with Simulation and pushes back one compact record per run (overrides,
+    seed, RECORD_METRICS, run time). A run whose configuration is invalid
+    gets a record with 'error' instead of failing the chunk. When the
+    connection drops, the worker reconnects for up to connect_timeout
+    seconds (the coordinator has requeued the chunk in hand).
+    """
+
+    def __init__(self, host, port, name=None, connect_timeout=30.0):
+        """
+        Initialize the worker.
+
+        Args:
+            host (str): Coordinator host
+            port (int): Coordinator port
+            name (str, optional): Worker name (default: hostname:pid)
+            connect_timeout (float): Seconds to keep trying to (re)connect
+        """
+        self.host = host
+        self.port = port
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}"
+        self.connect_timeout = connect_timeout
+        self.counters = {'chunks': 0, 'runs': 0, 'errors': 0, 'reconnects': 0}
+
+    def run(self):
+        """
+        Work until the coordinator reports the sweep done (or is gone).
+
+        Returns:
+            dict: Counters plus 'finished' (False when the coordinator could
+                not be reached any more)
+        """
+        first = True
+        while True:
+            connection = self._connect()
+            if connection is None:
+                return dict(self.counters, finished=False)
+            if not first:
+                self.counters['reconnects'] += 1
+            first = False
+            try:
+                with connection, connection.makefile('rwb') as stream:
+                    if self._serve(stream):
+                        return dict(self.counters, finished=True)
+            except (OSError, ValueError):
+                pass  # Lost the coordinator: reconnect
+
+    def _connect(self):
+        """Connect to the coordinator, retrying until connect_timeout."""
+        deadline = time.perf_counter() + self.connect_timeout
+        while True:
+            try:
+                return socket.create_connection((self.host, self.port), timeout=None)
+            except OSError:
+                if time.perf_counter() >= deadline:
+                    return None
+                time.sleep(0.2)
+
+    def _serve(self, stream):
+        """Exchange messages on one connection; True when the sweep is done."""
+        send_message(stream, {'type': 'hello', 'worker': self.name})
+        welcome = read_message(stream)
+        if welcome is None:
+            return False
+        base_config = compile_config(welcome['base_config'])
+
+        send_message(stream, {'type': 'request'})
+        while True:
+            message = read_message(stream)
+            if message is None:
+                return False
+            if message['type'] == 'done':
+                return True
+            if message['type'] == 'wait':
+                time.sleep(message['seconds'])
+                send_message(stream, {'type': 'request'})
+                continue
+            records = [self.run_one(base_config, index, overrides) for index, overrides in message['runs']]
+            self.counters['chunks'] += 1
+            self.counters['runs'] += len(records)
+            self.counters['errors'] += sum('error' in record for record in records)
+            send_message(stream, {'type': 'result', 'chunk': message['chunk'], 'records': records})
+
+    def run_one(self, base_config, index, overrides):
+        """
+        Run one configuration of a sweep.
+
+        Args:
+            base_config (dict or Config): Sweep base configuration
+            index (int): Run index in the sweep
+            overrides (dict): Partial configuration of the run
+
+        Returns:
+            dict: {'index', 'overrides', 'worker', 'seed', RECORD_METRICS...,
+                   'run_ms'} or {'index', 'overrides', 'worker', 'error'}
+        """
+        record = {'index': index, 'overrides': overrides, 'worker': self.name}
+        start = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                simulation = Simulation(config=compile_config(base_config, overrides))
+                results = simulation.run()
+        except (ValueError, KeyError, TypeError) as e:
+            record['error'] = f"{type(e).__name__}: {e}"
+            return record
+        record['seed'] = simulation.actual_seed
+        for name, (section, key) in RECORD_METRICS.items():
+            record[name] = results[section][key]
+        record['run_ms'] = (time.perf_counter() - start) * 1000
+        return record
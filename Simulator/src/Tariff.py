@@ -0,0 +1,392 @@
+from datetime import datetime
+from operator import itemgetter
+
+import numpy as np
+
+class Tariff:
+    """
+    Electricity tariff evaluated post hoc over whole import/export series.
+
+    Supports:
+    - Time-of-use periods (hour window, weekday/weekend, months) for import
+      and export rates; the first matching period wins, otherwise the
+      default rate applies
+    - Monthly tiers: $/kWh adders on top of the import rate by cumulative
+      import within the billing month
+    - Demand charges: $/kW on the highest import power of each billing
+      month, optionally only inside a time window
+    - Fixed monthly charge
+
+    Billing works on NumPy arrays in a few vectorized passes, so the same
+    energy flows can be re-billed under many tariffs without re-running
+    the simulation (see bill_many).
+    """
+
+    DAY_TYPES = ('all', 'weekday', 'weekend')
+
+    def __init__(self, tariff_config):
+        """
+        Create a tariff from its configuration.
+
+        Args:
+            tariff_config (dict): {
+                'name': str,
+                'import': {'default_rate', 'periods': [...], 'tiers': [...]},
+                'export': {'default_rate', 'periods': [...]},
+                'demand_charges': [{'name', 'rate_per_kw', window keys}],
+                'fixed_monthly': float
+            }
+                Periods are {'name', 'rate', 'start_hour', 'end_hour',
+                'days', 'months'}; the hour window may wrap past midnight
+                and every window key is optional. Tiers are
+                {'up_to_kwh': float or None, 'adder': $/kWh} in ascending
+                order.
+        """
+        self.name = tariff_config.get('name', 'custom')
+
+        import_config = tariff_config.get('import', {})
+        export_config = tariff_config.get('export', {})
+        self.import_default_rate = import_config.get('default_rate', 0.0)
+        self.export_default_rate = export_config.get('default_rate', 0.0)
+        self.import_periods = [self._validate_window(p, 'import period') for p in import_config.get('periods', [])]
+        self.export_periods = [self._validate_window(p, 'export period') for p in export_config.get('periods', [])]
+        self.tiers = self._validate_tiers(import_config.get('tiers', []))
+        self.demand_charges = [self._validate_window(c, 'demand charge')
+                               for c in tariff_config.get('demand_charges', [])]
+        self.fixed_monthly = tariff_config.get('fixed_monthly', 0.0)
+
+    @classmethod
+    def flat(cls, import_cost_per_kwh, export_revenue_per_kwh, name='flat'):
+        """
+        Create a flat tariff (the Grid pricing model).
+
+        Args:
+            import_cost_per_kwh (float): Import rate in $/kWh
+            export_revenue_per_kwh (float): Export rate in $/kWh
+            name (str): Tariff name
+
+        Returns:
+            Tariff: Tariff with a single import and export rate
+        """
+        return cls({
+            'name': name,
+            'import': {'default_rate': import_cost_per_kwh},
+            'export': {'default_rate': export_revenue_per_kwh}
+        })
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Create the tariff of a simulation configuration.
+
+        Uses the 'tariff' section when present, otherwise the flat rates of
+        the 'grid' section.
+
+        Args:
+            config (dict): Simulation configuration
+
+        Returns:
+            Tariff: Configured tariff
+        """
+        if config.get('tariff'):
+            return cls(config['tariff'])
+        return cls.flat(config['grid']['import_cost_per_kwh'],
+                        config['grid']['export_revenue_per_kwh'])
+
+    @staticmethod
+    def calendar(start_date, time_step_minutes, steps):
+        """
+        Build the time features of every step (shared by all tariffs).
+
+        Args:
+            start_date (datetime | str): Simulation start ('YYYY-MM-DD')
+            time_step_minutes (int): Simulation time step in minutes
+            steps (int): Number of steps
+
+        Returns:
+            dict: Arrays 'hour' (fractional hour of day), 'weekday' (0 =
+                Monday), 'month' (1-12), 'month_starts' (first step index of
+                each billing month) and 'month_labels' ('YYYY-MM')
+        """
+        if isinstance(start_date, str):
+            start_date = datetime.strptime(start_date, '%Y-%m-%d')
+        times = (np.datetime64(start_date, 'm')
+                 + np.arange(steps) * np.timedelta64(time_step_minutes, 'm'))
+        days = times.astype('datetime64[D]')
+        months = times.astype('datetime64[M]')
+        month_index = months.astype(np.int64)
+
+        month_starts = np.flatnonzero(np.diff(month_index)) + 1
+        month_starts = np.concatenate([[0], month_starts]) if steps else month_starts
+
+        return {
+            'hour': (times - days).astype(np.int64) / 60.0,
+            'weekday': (days.astype(np.int64) + 3) % 7,  # 1970-01-01 was a Thursday
+            'month': month_index % 12 + 1,
+            'month_starts': month_starts,
+            'month_labels': [str(m) for m in months[month_starts]]
+        }
+
+    @staticmethod
+    def flows_from_steps(hourly_data):
+        """
+        Extract import and export power arrays from step records.
+
+        Args:
+            hourly_data (list): Step records of Simulation
+
+        Returns:
+            tuple: (import_kw array, export_kw array)
+        """
+        if not hourly_data:
+            return np.empty(0), np.empty(0)
+        table = np.array(list(map(itemgetter('grid_to_load', 'solar_to_grid'), hourly_data)),
+                         dtype=float)
+        return table[:, 0], table[:, 1]
+
+    def bill(self, import_kw, export_kw, calendar, time_step_hours):
+        """
+        Bill import/export power series under this tariff.
+
+        Args:
+            import_kw (numpy.ndarray): Grid import power per step (kW)
+            export_kw (numpy.ndarray): Grid export power per step (kW)
+            calendar (dict): Output of Tariff.calendar for the same steps
+            time_step_hours (float): Duration of time step in hours
+
+        Returns:
+            dict: Totals, per-period breakdown and per-month breakdown
+        """
+        import_kw = np.asarray(import_kw, dtype=float)
+        import_kwh = import_kw * time_step_hours
+        export_kwh = np.asarray(export_kw, dtype=float) * time_step_hours
+        month_starts = calendar['month_starts']
+        months = len(month_starts)
+
+        # Time-of-use energy charges
+        import_rate, import_period = self._rates(self.import_periods, self.import_default_rate, calendar)
+        export_rate, export_period = self._rates(self.export_periods, self.export_default_rate, calendar)
+        import_cost = import_kwh * import_rate
+        export_revenue = export_kwh * export_rate
+
+        # Monthly tiers on cumulative import
+        if self.tiers and len(import_kwh):
+            import_cost = import_cost + self._tier_charges(import_kwh, month_starts)
+
+        # Demand charges on monthly peak import power
+        monthly_demand = np.zeros(months)
+        demand_breakdown = {}
+        for charge in self.demand_charges:
+            window = self._window_mask(charge, calendar)
+            peaks = _monthly_max(np.where(window, import_kw, 0.0), month_starts)
+            cost = peaks * charge['rate_per_kw']
+            monthly_demand += cost
+            demand_breakdown[charge.get('name', 'demand')] = {
+                'peak_kw': peaks.tolist(),
+                'cost': float(cost.sum())
+            }
+
+        monthly_import_cost = _monthly_sum(import_cost, month_starts)
+        monthly_export_revenue = _monthly_sum(export_revenue, month_starts)
+        monthly_net = monthly_import_cost + monthly_demand + self.fixed_monthly - monthly_export_revenue
+
+        total_import_cost = float(import_cost.sum())
+        total_export_revenue = float(export_revenue.sum())
+        total_demand = float(monthly_demand.sum())
+        total_fixed = self.fixed_monthly * months
+
+        return {
+            'tariff': self.name,
+            'total_import_cost': total_import_cost,
+            'total_export_revenue': total_export_revenue,
+            'demand_charges': total_demand,
+            'fixed_charges': total_fixed,
+            'net_cost': total_import_cost + total_demand + total_fixed - total_export_revenue,
+            'by_period': {
+                'import': self._period_breakdown(self.import_periods, import_period, import_kwh, import_cost),
+                'export': self._period_breakdown(self.export_periods, export_period, export_kwh, export_revenue)
+            },
+            'demand': demand_breakdown,
+            'monthly': [
+                {
+                    'month': label,
+                    'import_kwh': float(i_kwh),
+                    'export_kwh': float(e_kwh),
+                    'import_cost': float(i_cost),
+                    'export_revenue': float(e_rev),
+                    'demand_charges': float(demand),
+                    'net_cost': float(net)
+                }
+                for label, i_kwh, e_kwh, i_cost, e_rev, demand, net in zip(
+                    calendar['month_labels'],
+                    _monthly_sum(import_kwh, month_starts),
+                    _monthly_sum(export_kwh, month_starts),
+                    monthly_import_cost, monthly_export_revenue, monthly_demand, monthly_net)
+            ]
+        }
+
+    def step_rates(self, calendar):
+        """
+        Time-of-use energy rates of every step (tiers and demand excluded).
+
+        Args:
+            calendar (dict): Output of Tariff.calendar
+
+        Returns:
+            tuple: (import $/kWh array, export $/kWh array)
+        """
+        import_rate, _ = self._rates(self.import_periods, self.import_default_rate, calendar)
+        export_rate, _ = self._rates(self.export_periods, self.export_default_rate, calendar)
+        return import_rate, export_rate
+
+    def _rates(self, periods, default_rate, calendar):
+        """
+        Rate and matching period index (-1 = default) for every step.
+
+        Periods are applied last to first so the first matching one wins.
+        """
+        steps = len(calendar['hour'])
+        rate = np.full(steps, float(default_rate))
+        period_index = np.full(steps, -1)
+        for index in range(len(periods) - 1, -1, -1):
+            mask = self._window_mask(periods[index], calendar)
+            rate[mask] = periods[index]['rate']
+            period_index[mask] = index
+        return rate, period_index
+
+    @staticmethod
+    def _window_mask(window, calendar):
+        """Boolean mask of the steps inside a period / demand charge window."""
+        hour = calendar['hour']
+        mask = np.ones(len(hour), dtype=bool)
+
+        start = window.get('start_hour')
+        end = window.get('end_hour')
+        if start is not None and end is not None:
+            if start <= end:
+                mask &= (hour >= start) & (hour < end)
+            else:  # Wraps past midnight, e.g. 22 -> 6
+                mask &= (hour >= start) | (hour < end)
+
+        days = window.get('days', 'all')
+        if days == 'weekday':
+            mask &= calendar['weekday'] < 5
+        elif days == 'weekend':
+            mask &= calendar['weekday'] >= 5
+
+        if window.get('months'):
+            mask &= np.isin(calendar['month'], window['months'])
+        return mask
+
+    def _tier_charges(self, import_kwh, month_starts):
+        """Tier adders for the energy of each step falling in each monthly block."""
+        cumulative = np.cumsum(import_kwh)
+        month_offset = np.repeat(
+            np.concatenate([[0.0], cumulative[month_starts[1:] - 1]]),
+            np.diff(np.concatenate([month_starts, [len(import_kwh)]]))
+        )
+        after = cumulative - month_offset
+        before = after - import_kwh
+
+        charges = np.zeros(len(import_kwh))
+        lower = 0.0
+        for tier in self.tiers:
+            upper = np.inf if tier['up_to_kwh'] is None else tier['up_to_kwh']
+            in_block = np.clip(after, lower, upper) - np.clip(before, lower, upper)
+            charges += in_block * tier['adder']
+            lower = upper
+        return charges
+
+    @staticmethod
+    def _period_breakdown(periods, period_index, energy_kwh, money):
+        """Energy and money per period name (plus 'default')."""
+        names = [p.get('name', f"period_{i + 1}") for i, p in enumerate(periods)] + ['default']
+        # period_index -1 maps to the last entry ('default')
+        index = np.where(period_index < 0, len(periods), period_index)
+        energy = np.bincount(index, weights=energy_kwh, minlength=len(names))
+        amount = np.bincount(index, weights=money, minlength=len(names))
+        return {name: {'energy_kwh': float(e), 'amount': float(a)}
+                for name, e, a in zip(names, energy, amount)}
+
+    @classmethod
+    def _validate_window(cls, window, kind):
+        """Check the window keys of a period or demand charge."""
+        for key in ('start_hour', 'end_hour'):
+            value = window.get(key)
+            if value is not None and not 0 <= value <= 24:
+                raise ValueError(f"Tariff {kind} {key} must be between 0 and 24, got {value}")
+        if window.get('days', 'all') not in cls.DAY_TYPES:
+            raise ValueError(f"Tariff {kind} days must be one of {list(cls.DAY_TYPES)}, got {window['days']}")
+        for month in window.get('months') or []:
+            if not 1 <= month <= 12:
+                raise ValueError(f"Tariff {kind} months must be 1-12, got {month}")
+        return window
+
+    @staticmethod
+    def _validate_tiers(tiers):
+        """Check that tier limits are ascending and only the last is open-ended."""
+        tiers = [dict(tier) for tier in tiers]
+        previous = 0.0
+        for i, tier in enumerate(tiers):
+            limit = tier.get('up_to_kwh')
+            if limit is None:
+                if i != len(tiers) - 1:
+                    raise ValueError("Only the last tariff tier can have up_to_kwh = null")
+            elif limit <= previous:
+                raise ValueError(f"Tariff tiers must have ascending up_to_kwh, got {limit} after {previous}")
+            else:
+                previous = limit
+            tier.setdefault('adder', 0.0)
+        return tiers
+
+
+def bill_many(tariffs, import_kw, export_kw, calendar, time_step_hours):
+    """
+    Bill the same energy flows under several tariffs.
+
+    Args:
+        tariffs (list): Tariff objects (or tariff config dicts)
+        import_kw (numpy.ndarray): Grid import power per step (kW)
+        export_kw (numpy.ndarray): Grid export power per step (kW)
+        calendar (dict): Output of Tariff.calendar
+        time_step_hours (float): Duration of time step in hours
+
+    Returns:
+        list: One bill dict per tariff, in input order
+    """
+    import_kw = np.asarray(import_kw, dtype=float)
+    export_kw = np.asarray(export_kw, dtype=float)
+    return [(t if isinstance(t, Tariff) else Tariff(t)).bill(import_kw, export_kw, calendar, time_step_hours)
+            for t in tariffs]
+
+
+def bill_results(tariffs, results, config):
+    """
+    Re-bill a finished simulation under several tariffs.
+
+    Args:
+        tariffs (list): Tariff objects (or tariff config dicts)
+        results (dict): Simulation results from Simulation.run()
+        config (dict): Configuration used for the simulation
+
+    Returns:
+        list: One bill dict per tariff, in input order
+    """
+    import_kw, export_kw = Tariff.flows_from_steps(results['data']['hourly_data'])
+    time_step_minutes = config['simulation']['time_step_minutes']
+    calendar = Tariff.calendar(config['simulation']['start_date'], time_step_minutes, len(import_kw))
+    return bill_many(tariffs, import_kw, export_kw, calendar, time_step_minutes / 60.0)
+
+
+def _monthly_sum(values, month_starts):
+    """Sum of values per billing month."""
+    if len(values) == 0:
+        return np.zeros(len(month_starts))
+    return np.add.reduceat(values, month_starts)
+
+
+def _monthly_max(values, month_starts):
+    """Maximum of values per billing month."""
+    if len(values) == 0:
+        return np.zeros(len(month_starts))
+    return np.maximum.reduceat(values, month_starts)
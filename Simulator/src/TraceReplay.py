@@ -0,0 +1,309 @@
+import csv
+import json
+import os
+
+import numpy as np
+
+from .CompressedIO import open_text_reader
+
+class TraceReplay:
+    """
+    Replays measured solar and load time series instead of the synthetic
+    SolarPanel / CloudCoverage / Load models.
+
+    Sources:
+    - CSV with a timestamp column plus solar and load power columns (kW),
+      read in fixed-size chunks (.gz, .xz and .zst files are decompressed
+      on the fly)
+    - Binary trace produced by convert_csv_to_binary(), opened with
+      numpy.memmap so only the rows being replayed are paged in
+
+    The trace must have a regular interval. It is aligned to the simulation
+    start date and resampled to the simulation time step: averaged when the
+    step is a multiple of the trace interval, held (repeated) when the trace
+    interval is a multiple of the step.
+    """
+
+    # Value columns of the binary format, in order
+    COLUMNS = ('solar_kw', 'load_kw')
+    BINARY_DTYPE = 'float32'
+    FORMAT_NAME = 'greengrid-trace'
+    FORMAT_VERSION = 1
+
+    DEFAULT_CHUNK_ROWS = 65536
+
+    def __init__(self, path, format='auto', timestamp_column='timestamp',
+                 solar_column='solar_kw', load_column='load_kw',
+                 chunk_rows=DEFAULT_CHUNK_ROWS):
+        """
+        Open a trace file.
+
+        Args:
+            path (str): CSV file or binary trace file
+            format (str): 'csv', 'binary' or 'auto' (binary if a metadata
+                sidecar '<path>.json' exists, otherwise CSV)
+            timestamp_column (str): CSV column with timestamps
+            solar_column (str): CSV column with solar power in kW
+            load_column (str): CSV column with load power in kW
+            chunk_rows (int): Rows read per chunk
+        """
+        if format == 'auto':
+            format = 'binary' if os.path.exists(metadata_path(path)) else 'csv'
+        if format not in ('csv', 'binary'):
+            raise ValueError(f"Invalid trace format: {format}. Must be 'csv', 'binary' or 'auto'")
+
+        self._path = path
+        self._format = format
+        self._chunk_rows = chunk_rows
+        self._columns = (timestamp_column, solar_column, load_column)
+
+        if format == 'binary':
+            with open(metadata_path(path), 'r') as f:
+                metadata = json.load(f)
+            if metadata.get('format') != self.FORMAT_NAME:
+                raise ValueError(f"{metadata_path(path)} is not a GreenGrid trace metadata file")
+
+            self._start = np.datetime64(metadata['start'], 's')
+            self._interval_minutes = metadata['interval_minutes']
+            self._rows = metadata['rows']
+            self._data = np.memmap(path, dtype=metadata['dtype'], mode='r',
+                                   shape=(self._rows, len(metadata['columns'])))
+        else:
+            head = _read_csv_chunks(path, self._columns, chunk_rows=2)
+            try:
+                timestamps, _ = next(head, (None, None))
+            finally:
+                head.close()
+            if timestamps is None or len(timestamps) < 2:
+                raise ValueError(f"Trace {path} needs at least two rows to determine its interval")
+
+            self._start = timestamps[0]
+            self._interval_minutes = _interval_minutes(timestamps[1] - timestamps[0])
+            self._rows = None  # Unknown until fully read
+            self._data = None
+
+    @classmethod
+    def from_config(cls, replay_config):
+        """
+        Create a trace source from the 'replay' section of the configuration.
+
+        Args:
+            replay_config (dict): {'path', 'format', 'timestamp_column',
+                'solar_column', 'load_column', 'chunk_rows'} (path required)
+
+        Returns:
+            TraceReplay: Opened trace
+        """
+        return cls(
+            replay_config['path'],
+            format=replay_config.get('format', 'auto'),
+            timestamp_column=replay_config.get('timestamp_column', 'timestamp'),
+            solar_column=replay_config.get('solar_column', 'solar_kw'),
+            load_column=replay_config.get('load_column', 'load_kw'),
+            chunk_rows=replay_config.get('chunk_rows', cls.DEFAULT_CHUNK_ROWS)
+        )
+
+    @property
+    def interval_minutes(self):
+        """Interval between trace rows in minutes."""
+        return self._interval_minutes
+
+    @property
+    def start(self):
+        """Timestamp of the first trace row (numpy.datetime64)."""
+        return self._start
+
+    def iter_steps(self, start_date, time_step_minutes, total_steps):
+        """
+        Yield the replayed inputs for each simulation step.
+
+        Args:
+            start_date (datetime): Simulation start
+            time_step_minutes (int): Simulation time step in minutes
+            total_steps (int): Number of steps to produce
+
+        Yields:
+            tuple: (solar_kw, load_kw) as Python floats
+
+        Raises:
+            ValueError: If the trace cannot be aligned or is too short
+        """
+        interval = self._interval_minutes
+
+        # Resampling: average `factor` rows per step, or repeat each row
+        if time_step_minutes % interval == 0:
+            factor, repeat = time_step_minutes // interval, 1
+        elif interval % time_step_minutes == 0:
+            factor, repeat = 1, interval // time_step_minutes
+        else:
+            raise ValueError(f"Time step of {time_step_minutes} min is not compatible with "
+                             f"the trace interval of {interval} min")
+
+        # Alignment: first row to replay
+        offset = _interval_minutes(np.datetime64(start_date, 's') - self._start, allow_zero=True)
+        if offset < 0 or offset % interval != 0:
+            raise ValueError(f"Simulation start {start_date} is not on the trace grid "
+                             f"(trace starts {self._start}, every {interval} min)")
+        first_row = offset // interval
+
+        produced = 0
+        pending = np.empty((0, len(self.COLUMNS)))
+
+        for chunk in self._iter_chunks(first_row):
+            # Keep incomplete averaging groups for the next chunk
+            values = np.concatenate([pending, chunk]) if len(pending) else chunk
+            usable = len(values) - len(values) % factor
+            pending = values[usable:]
+
+            steps = values[:usable].reshape(-1, factor, len(self.COLUMNS)).mean(axis=1)
+            if repeat > 1:
+                steps = np.repeat(steps, repeat, axis=0)
+
+            steps = steps[:total_steps - produced]
+            produced += len(steps)
+            yield from map(tuple, steps.tolist())
+
+            if produced >= total_steps:
+                return
+
+        raise ValueError(f"Trace {self._path} is too short: covers {produced} of "
+                         f"{total_steps} simulation steps")
+
+    def _iter_chunks(self, first_row):
+        """
+        Yield the value columns as float arrays of at most chunk_rows rows.
+
+        Args:
+            first_row (int): Index of the first trace row to return
+        """
+        if self._format == 'binary':
+            for start in range(first_row, self._rows, self._chunk_rows):
+                yield np.asarray(self._data[start:start + self._chunk_rows], dtype=float)
+            return
+
+        skipped = 0
+        for _, values in _read_csv_chunks(self._path, self._columns, self._chunk_rows):
+            if skipped < first_row:
+                drop = min(first_row - skipped, len(values))
+                skipped += drop
+                values = values[drop:]
+            if len(values):
+                yield values
+
+
+def metadata_path(binary_path):
+    """Path of the JSON metadata sidecar for a binary trace."""
+    return binary_path + '.json'
+
+
+def convert_csv_to_binary(csv_path, binary_path, timestamp_column='timestamp',
+                          solar_column='solar_kw', load_column='load_kw',
+                          chunk_rows=TraceReplay.DEFAULT_CHUNK_ROWS):
+    """
+    Convert a CSV trace to the binary format read by TraceReplay.
+
+    The CSV is streamed in chunks and appended to a flat float32 file of
+    (solar_kw, load_kw) rows; start time, interval and row count go into a
+    JSON sidecar '<binary_path>.json'.
+
+    Args:
+        csv_path (str): Source CSV file
+        binary_path (str): Destination binary file
+        timestamp_column (str): CSV column with timestamps
+        solar_column (str): CSV column with solar power in kW
+        load_column (str): CSV column with load power in kW
+        chunk_rows (int): Rows converted per chunk
+
+    Returns:
+        dict: Metadata written to the sidecar
+    """
+    columns = (timestamp_column, solar_column, load_column)
+    start = None
+    interval = None
+    rows = 0
+
+    with open(binary_path, 'wb') as out:
+        for timestamps, values in _read_csv_chunks(csv_path, columns, chunk_rows):
+            if start is None:
+                start = timestamps[0]
+            if interval is None and rows + len(timestamps) >= 2:
+                second = timestamps[1] if rows == 0 else timestamps[0]
+                interval = _interval_minutes(second - start)
+            values.astype(TraceReplay.BINARY_DTYPE).tofile(out)
+            rows += len(values)
+
+    if interval is None:
+        raise ValueError(f"Trace {csv_path} needs at least two rows to determine its interval")
+
+    metadata = {
+        'format': TraceReplay.FORMAT_NAME,
+        'version': TraceReplay.FORMAT_VERSION,
+        'columns': list(TraceReplay.COLUMNS),
+        'dtype': TraceReplay.BINARY_DTYPE,
+        'rows': rows,
+        'start': str(start),
+        'interval_minutes': interval
+    }
+    with open(metadata_path(binary_path), 'w') as f:
+        json.dump(metadata, f, indent=2)
+
+    return metadata
+
+
+def _read_csv_chunks(path, columns, chunk_rows):
+    """
+    Stream a CSV trace in chunks, checking that timestamps are regular.
+
+    Args:
+        path (str): CSV file
+        columns (tuple): (timestamp, solar, load) column names
+        chunk_rows (int): Rows per chunk
+
+    Yields:
+        tuple: (datetime64[s] array, float array of shape (n, 2))
+    """
+    timestamp_column, solar_column, load_column = columns
+    previous = None
+    step = None
+
+    with open_text_reader(path) as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        try:
+            indexes = [header.index(name) for name in columns]
+        except ValueError:
+            raise ValueError(f"Trace {path} must have columns {list(columns)}, found {header}")
+        t_index, s_index, l_index = indexes
+
+        while True:
+            rows = [row for _, row in zip(range(chunk_rows), reader)]
+            if not rows:
+                return
+
+            timestamps = np.array([row[t_index] for row in rows], dtype='datetime64[s]')
+            values = np.array([(row[s_index], row[l_index]) for row in rows], dtype=float)
+
+            # Regular interval check (including across chunk boundaries)
+            series = timestamps if previous is None else np.concatenate([[previous], timestamps])
+            deltas = np.diff(series)
+            if len(deltas):
+                if step is None:
+                    step = deltas[0]
+                if np.any(deltas != step):
+                    bad = int(np.argmax(deltas != step))
+                    raise ValueError(f"Trace {path} has an irregular interval near {series[bad + 1]}")
+            previous = timestamps[-1]
+
+            yield timestamps, values
+
+
+def _interval_minutes(delta, allow_zero=False):
+    """Convert a numpy timedelta to whole minutes (validating it)."""
+    seconds = int(delta / np.timedelta64(1, 's'))
+    if seconds % 60 != 0 or (seconds <= 0 and not allow_zero):
+        if allow_zero:
+            return -1  # Not on a minute grid; caller reports the error
+        raise ValueError(f"Trace interval must be a positive whole number of minutes, got {seconds} s")
+    return seconds // 60
@@ -1,8 +1,44 @@
-from .Battery import Battery
-from .SolarPanel import SolarPanel
-from .CloudCoverage import CloudCoverage
-from .Inverter import Inverter
-from .Load import Load
-from .Grid import Grid
-from .EnergyManagementSystem import EnergyManagementSystem
-from .Simulation import Simulation
\ No newline at end of file
+import importlib
+import sys
+import types
+
+# Components are imported on first use (PEP 562), so importing one module
+# of the package (e.g. for command line parsing) does not load simpy and
+# numpy through Simulation.
+_EXPORTS = {
+    'Battery': '.Battery',
+    'SolarPanel': '.SolarPanel',
+    'CloudCoverage': '.CloudCoverage',
+    'Inverter': '.Inverter',
+    'Load': '.Load',
+    'Grid': '.Grid',
+    'EnergyManagementSystem': '.EnergyManagementSystem',
+    'Simulation': '.Simulation',
+    'FleetSimulation': '.FleetSimulation',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
+
+
+class _Package(types.ModuleType):
+    """Keeps the exported names bound to the classes, as eager imports did."""
+
+    def __setattr__(self, name, value):
+        # Importing a submodule (import src.Simulation, also indirectly)
+        # binds it on the package; export its class instead
+        if name in _EXPORTS and isinstance(value, types.ModuleType):
+            value = getattr(value, name)
+        super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _Package
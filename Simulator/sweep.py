@@ -0,0 +1,185 @@
+"""
+GreenGrid Simulation - Distributed Sweep
+
+Runs a configuration sweep (every combination of the parameter values in
+the "sweep" section of config.json) on worker processes that may live on
+other hosts. The coordinator splits the sweep into chunks, workers connect
+over TCP, pull chunks, run them and push back compact summary records.
+Chunks of workers that die or hang are handed to another worker.
+
+Usage:
+    # Coordinator on one host (listens on all interfaces), workers elsewhere
+    python3 sweep.py coordinator --host 0.0.0.0 --port 8766
+    python3 sweep.py worker --coordinator coordinator-host:8766
+
+    # Everything on one machine: coordinator plus 4 local worker processes
+    python3 sweep.py coordinator --local-workers 4
+
+Author: Team 3 - GreenGrid Project
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime
+
+from src.ConfigSchema import ConfigError
+from src.SweepCoordinator import SweepCoordinator
+from src.SweepWorker import SweepWorker
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def build_parser():
+    """Build the command line parser."""
+    parser = argparse.ArgumentParser(description="Distributed configuration sweep")
+    modes = parser.add_subparsers(dest='mode', required=True)
+
+    coordinator = modes.add_parser('coordinator', help="Split the sweep and collect results")
+    coordinator.add_argument('--config', default=os.path.join(BASE_DIR, 'config.json'),
+                             help="Base configuration (default: config.json)")
+    coordinator.add_argument('--sweep',
+                             help="JSON file with the sweep settings (default: the config's sweep section)")
+    coordinator.add_argument('--host', default='127.0.0.1',
+                             help="Interface to listen on (default: 127.0.0.1; 0.0.0.0 for remote workers)")
+    coordinator.add_argument('--port', type=int, default=8766, help="TCP port (default: 8766)")
+    coordinator.add_argument('--chunk-size', type=int, help="Runs per chunk (overrides sweep.chunk_size)")
+    coordinator.add_argument('--local-workers', type=int, default=0,
+                             help="Also start this many worker processes on this machine")
+    coordinator.add_argument('--output', help="Results JSON path (default: results/sweep_TIMESTAMP.json)")
+
+    worker = modes.add_parser('worker', help="Run chunks from a coordinator")
+    worker.add_argument('--coordinator', default='127.0.0.1:8766', metavar='HOST:PORT',
+                        help="Coordinator address (default: 127.0.0.1:8766)")
+    worker.add_argument('--name', help="Worker name (default: hostname:pid)")
+    worker.add_argument('--connect-timeout', type=float, default=30.0,
+                        help="Seconds to keep trying to reach the coordinator (default: 30)")
+    return parser
+
+
+def print_sweep_summary(results, parameters):
+    """Print sweep throughput, worker counters and the best runs."""
+    print("\n" + "=" * 70)
+    print(" SWEEP RESULTS")
+    print("=" * 70)
+    elapsed = results['elapsed_seconds']
+    print(f"  Runs: {results['completed_runs']}/{results['runs']} in {results['chunks']} chunks "
+          f"of {results['chunk_size']}, {elapsed:.1f} s ({results['completed_runs'] / max(elapsed, 1e-9):.1f} runs/s)")
+    print(f"  Requeued chunks: {results['requeued_chunks']}, duplicate results ignored: "
+          f"{results['duplicate_results']}, failed chunks: {len(results['failed_chunks'])}")
+    for name, counters in results['workers'].items():
+        print(f"  Worker {name}: {counters['chunks']} chunks, {counters['runs']} runs, "
+              f"{counters['lost_chunks']} lost")
+
+    records = [record for record in results['records'] if 'error' not in record]
+    errors = len(results['records']) - len(records)
+    if errors:
+        print(f"  Runs with errors: {errors}")
+    print(f"\n  Best self-sufficiency ({', '.join(parameters)}):")
+    for record in sorted(records, key=lambda r: -r['self_sufficiency_percent'])[:5]:
+        values = []
+        for key in parameters:
+            value = record['overrides']
+            for part in key.split('.'):
+                value = value[part]
+            values.append(json.dumps(value) if isinstance(value, (dict, list)) else str(value))
+        print(f"    {', '.join(values):<40} {record['self_sufficiency_percent']:6.1f}%  "
+              f"${record['net_cost']:.2f}")
+
+
+def run_coordinator(args):
+    """Coordinator mode: serve the sweep and save the records."""
+    with open(args.config, 'r') as f:
+        config = json.load(f)
+    if args.sweep:
+        with open(args.sweep, 'r') as f:
+            settings = json.load(f)
+    else:
+        settings = config.get('sweep') or {}
+    parameters = settings.get('parameters') or {}
+    if not parameters:
+        print("Error: no sweep parameters (add a 'sweep' section to the config, see config_template.json)")
+        return 1
+
+    try:
+        coordinator = SweepCoordinator(
+            config,
+            SweepCoordinator.expand(parameters),
+            chunk_size=args.chunk_size or settings.get('chunk_size', 8),
+            host=args.host,
+            port=args.port,
+            lease_timeout=settings.get('lease_timeout_seconds', 300),
+            max_attempts=settings.get('max_attempts', 3)
+        )
+    except ConfigError as e:
+        # Every run is validated before a worker starts
+        print(f"Error: Invalid sweep configuration ({args.config}):")
+        for problem in e.problems:
+            print(f"   - {problem}")
+        return 1
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+
+    host, port = coordinator.address
+    print(f"\n Sweep: {len(coordinator.runs)} runs in {len(coordinator.chunks)} chunks, "
+          f"listening on {host}:{port}")
+    coordinator.start()
+    workers = [
+        subprocess.Popen([sys.executable, os.path.abspath(__file__), 'worker', '--coordinator', f"127.0.0.1:{port}"],
+                         stdout=subprocess.DEVNULL)
+        for _ in range(args.local_workers)
+    ]
+    if workers:
+        print(f" Started {len(workers)} local workers")
+
+    try:
+        while not coordinator.wait(timeout=5):
+            status = coordinator.status()
+            print(f"  {status['done']}/{status['chunks']} chunks done, {len(status['leases'])} running, "
+                  f"{sum(w['connected'] for w in status['workers'].values())} workers connected")
+    except KeyboardInterrupt:
+        print("\n  Sweep interrupted, saving the records collected so far")
+    finally:
+        coordinator.close()
+        for worker in workers:
+            worker.wait()
+
+    results = coordinator.results()
+    results['parameters'] = parameters
+    print_sweep_summary(results, parameters)
+
+    output = args.output
+    if output is None:
+        results_dir = os.path.join(BASE_DIR, 'results')
+        os.makedirs(results_dir, exist_ok=True)
+        output = os.path.join(results_dir, f"sweep_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n  Results saved to: {output}")
+    return 0 if results['finished'] else 1
+
+
+def run_worker(args):
+    """Worker mode: run chunks until the sweep is done."""
+    host, _, port = args.coordinator.rpartition(':')
+    worker = SweepWorker(host or '127.0.0.1', int(port), name=args.name, connect_timeout=args.connect_timeout)
+    print(f"Worker {worker.name} -> {args.coordinator}")
+    counters = worker.run()
+    print(f"Worker {worker.name}: {counters['chunks']} chunks, {counters['runs']} runs, "
+          f"{counters['errors']} errors ({'sweep done' if counters['finished'] else 'coordinator unreachable'})")
+    return 0 if counters['finished'] else 1
+
+
+def main(argv=None):
+    """Main execution function."""
+    args = build_parser().parse_args(argv)
+    if args.mode == 'coordinator':
+        return run_coordinator(args)
+    return run_worker(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+import sys
+import os
+import json
+import time
+import contextlib
+import io
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.Battery import Battery
+from src.Grid import Grid
+from src.EnergyManagementSystem import EnergyManagementSystem
+from src.Simulation import Simulation
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), '..', 'config.json')
+with open(CONFIG_PATH, 'r') as f:
+    config = json.load(f)
+
+print("=== Test Closed-form dispatch without solar ===")
+for strategy in ['LOAD_PRIORITY', 'CHARGE_PRIORITY', 'PRODUCE_PRIORITY']:
+    ems = EnergyManagementSystem(strategy=strategy)
+    batteries = [Battery(capacity_kwh=13.5, efficiency=0.9, min_soc=0.05) for _ in range(2)]
+    grids = [Grid(0.25, 0.10, 5.0) for _ in range(2)]
+    batteries[0]._energy_kwh = batteries[1]._energy_kwh = 2.0  # Runs empty within the stretch
+    stepwise = [ems.distribute_energy(0.0, 0.9, batteries[0], grids[0], 1 / 60) for _ in range(180)]
+    closed = ems.distribute_without_solar(0.9, batteries[1], grids[1], 1 / 60, 180)
+    same_flows = all(abs(a[key] - b[key]) < 1e-6 for a, b in zip(stepwise, closed) for key in a)
+    same_state = (abs(batteries[0].get_stored_energy() - batteries[1].get_stored_energy()) < 1e-9
+                  and abs(grids[0].get_total_imported() - grids[1].get_total_imported()) < 1e-9)
+    print(f"{strategy:<18} same flows: {same_flows}, same battery and grid: {same_state}")
+
+print("\n=== Test Coarse steps stop at transitions (15-minute steps) ===")
+config['simulation']['time_step_minutes'] = 15
+config['simulation']['adaptive_stepping'] = True
+with contextlib.redirect_stdout(io.StringIO()):
+    simulation = Simulation(config=config)
+table = simulation._coarse_step_table(96)
+print(f"Coarse step lengths from 00:00: {table[:24:4]} (1 = normal step)")
+print(f"Daylight steps are normal steps: {all(length == 1 for length in table[24:72])}")
+print(f"Last night step before sunrise ends at 06:00: {max(s * 15 + table[s] * 15 for s in range(24))} min")
+
+print("\n=== Test Fixed vs adaptive (30 days, 1-minute steps, synchronized streams) ===")
+config['simulation'].update(duration_days=30, time_step_minutes=1, random_streams='synchronized')
+keys = ['load_demand_kw', 'grid_to_load', 'battery_to_load', 'solar_to_load', 'solar_to_grid']
+for max_step_minutes in [15, 60]:
+    config['simulation']['max_step_minutes'] = max_step_minutes
+    worst = 0.0
+    for seed in [1, 2, 3]:
+        config['simulation']['random_seed'] = seed
+        totals = {}
+        for adaptive in [False, True]:
+            config['simulation']['adaptive_stepping'] = adaptive
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                results = Simulation(config=config).run()
+            elapsed = time.perf_counter() - start
+            steps = results['data']['hourly_data']
+            totals[adaptive] = {key: sum(step[key] for step in steps) / 60 for key in keys}
+            if adaptive:
+                stats = results['adaptive_stepping']
+                print(f"max {max_step_minutes} min, seed {seed}: {stats['internal_steps']} internal steps "
+                      f"for {len(steps)} output steps ({elapsed:.2f} s)")
+        worst = max(worst, max(abs(totals[True][key] - totals[False][key]) / totals[False][key] for key in keys))
+    print(f"max {max_step_minutes} min: largest energy total difference {worst * 100:.2f}%")
+
+print("\n=== Test Adaptive stepping needs a heuristic strategy ===")
+config['energy_management']['strategy'] = 'MPC'
+try:
+    with contextlib.redirect_stdout(io.StringIO()):
+        Simulation(config=config)
+except ValueError as e:
+    print(f"Error: {e}")
@@ -0,0 +1,118 @@
+import sys
+import os
+import json
+import time
+import shutil
+import tempfile
+import contextlib
+import io
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.Simulation import Simulation
+from src.DataLogger import DataLogger
+from src.AsyncExporter import AsyncExporter
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), '..', 'config.json')
+with open(CONFIG_PATH, 'r') as f:
+    config = json.load(f)
+config['simulation']['random_seed'] = 42
+config['simulation']['duration_days'] = 60
+config['simulation']['time_step_minutes'] = 15
+
+def simulate(seed):
+    run_config = json.loads(json.dumps(config))
+    run_config['simulation']['random_seed'] = seed
+    with contextlib.redirect_stdout(io.StringIO()):
+        return Simulation(config=run_config).run(), run_config
+
+def folder_files(folder):
+    return {name: open(os.path.join(folder, name), 'rb').read() for name in sorted(os.listdir(folder))}
+
+base_dir = tempfile.mkdtemp(prefix='greengrid_test_')
+
+print("=== Test Same files as a synchronous export ===")
+results, run_config = simulate(1)
+with contextlib.redirect_stdout(io.StringIO()):
+    sync_logger = DataLogger(results, run_config, output_dir=os.path.join(base_dir, 'sync'))
+    sync_logger.save_all()
+with AsyncExporter(output_dir=os.path.join(base_dir, 'async')) as exporter:
+    folder = exporter.submit(results, run_config)
+    saved = exporter.flush()
+print(f"Saved files: {sorted(saved[0])}")
+print(f"Identical files: {folder_files(sync_logger.run_folder) == folder_files(folder)}")
+quiet = DataLogger(results, run_config, output_dir=os.path.join(base_dir, 'quiet'), verbose=False)
+output = io.StringIO()
+with contextlib.redirect_stdout(output):
+    quiet.save_all()
+print(f"verbose=False prints nothing: {output.getvalue() == ''}")
+
+print("\n=== Test Simulation overlaps the export ===")
+runs = [simulate(seed) for seed in range(4)]
+for mode, processes in [('thread', False), ('process', True)]:
+    start = time.perf_counter()
+    with AsyncExporter(output_dir=os.path.join(base_dir, mode), processes=processes) as exporter:
+        submit_ms = []
+        folders = []
+        for results, run_config in runs:
+            submitted = time.perf_counter()
+            folders.append(exporter.submit(results, run_config))
+            submit_ms.append((time.perf_counter() - submitted) * 1000)
+        saved = exporter.flush()
+    print(f"{mode}: {len(saved)} exports in {time.perf_counter() - start:.2f} s, "
+          f"first submit {submit_ms[0]:.0f} ms (returns before the files are written)")
+    print(f"  Folder suffixes: {[f.split('_60d')[-1] for f in folders]}, "
+          f"distinct: {len(set(folders)) == len(runs)}")
+
+print("\n=== Test Bounded queue ===")
+results, run_config = runs[0]
+with AsyncExporter(output_dir=os.path.join(base_dir, 'bounded'), max_pending=1) as exporter:
+    exporter.submit(results, run_config)
+    start = time.perf_counter()
+    exporter.submit(results, run_config)
+    print(f"Second submit waited {(time.perf_counter() - start) * 1000:.0f} ms for the first export")
+
+print("\n=== Test Write errors ===")
+blocked = os.path.join(base_dir, 'blocked')
+exporter = AsyncExporter(output_dir=blocked)
+folder = exporter.submit(results, run_config)
+shutil.rmtree(folder)
+open(folder, 'w').close()  # A file where the run folder should be
+try:
+    exporter.flush()
+except RuntimeError as e:
+    print(f"Error: {e} (cause {type(e.__cause__).__name__})")
+folder = exporter.submit(results, run_config)
+print(f"Exports after the error: {len(exporter.flush())} (folder suffix {folder.split('_60d')[-1]!r}, next to the blocked one)")
+exporter.close()
+
+# Failing exports (no results to write): each error is raised once, as RuntimeError
+outcomes = []
+with AsyncExporter(output_dir=os.path.join(base_dir, 'failing')) as exporter:
+    for _ in range(200):
+        exporter.submit({}, run_config)
+        try:
+            exporter.flush()
+            outcomes.append('no error')
+        except RuntimeError:
+            outcomes.append('RuntimeError')
+        except Exception as e:
+            outcomes.append(type(e).__name__)
+print(f"flush() of a failed export, 200 times: {sorted(set(outcomes))}")
+exporter = AsyncExporter(output_dir=os.path.join(base_dir, 'failing'))
+exporter.submit({}, run_config)
+time.sleep(0.5)
+try:
+    exporter.submit(results, run_config)
+except RuntimeError:
+    print("Error raised by the next submit()")
+exporter.submit(results, run_config)
+print(f"...and not again by flush(): {len(exporter.flush())} export(s) saved")
+exporter.close()
+try:
+    AsyncExporter(max_pending=0)
+except ValueError as e:
+    print(f"Error: {e}")
+
+shutil.rmtree(base_dir, ignore_errors=True)
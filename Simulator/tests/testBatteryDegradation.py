@@ -0,0 +1,88 @@
+import sys
+import os
+import json
+import random
+import contextlib
+import io
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.Battery import Battery
+from src.RainflowCounter import RainflowCounter
+from src.BatteryDegradation import BatteryDegradation
+from src.Simulation import Simulation
+
+with open(os.path.join(os.path.dirname(__file__), '..', 'config.json'), 'r') as f:
+    base_config = json.load(f)
+base_config['simulation'].update(random_seed=42, duration_days=30, time_step_minutes=15)
+
+def run_with_degradation(degradation=None):
+    """Quiet 30-day run with a 'degradation' section (None: the section is left out)."""
+    run_config = json.loads(json.dumps(base_config))
+    if degradation is not None:
+        run_config['degradation'] = degradation
+    with contextlib.redirect_stdout(io.StringIO()):
+        return Simulation(config=run_config).run()
+
+print("=== Test Rainflow counting (ASTM E1049 example) ===")
+# Expected (ranges of 10%): 3 x 0.5, 4 x 1.5, 6 x 0.5, 8 x 1.0, 9 x 0.5
+counter = RainflowCounter(bins=10, resolution=0.01)
+for value in [-2, 1, -3, 5, -1, 3, -4, 4, -2]:
+    counter.add((value + 4) / 10.0)
+cycles = counter.cycles()
+print(f"Full cycles: {cycles['full_cycles']}, half cycles: {cycles['half_cycles']}")
+print(f"Equivalent full cycles: {cycles['equivalent_full_cycles']:.2f}")
+print(f"Depth histogram: {cycles['depth_histogram']}")
+print(f"Counter unchanged by cycles(): {counter.cycles() == cycles}")
+
+print("\n=== Test Bounded residue on a long signal ===")
+rng = random.Random(1)
+counter = RainflowCounter(resolution=0.01)
+largest = 0
+soc = 0.5
+for _ in range(200000):
+    soc = min(1.0, max(0.0, soc + rng.uniform(-0.05, 0.05)))
+    counter.add(soc)
+    largest = max(largest, counter.residue_size())
+cycles = counter.cycles()
+print(f"200000 values: {cycles['full_cycles']} full cycles, largest residue {largest} "
+      f"(bound {int(1 / 0.01) + 2})")
+
+print("\n=== Test Capacity fade ===")
+battery = Battery(capacity_kwh=10.0, efficiency=1.0, min_soc=0.0)
+degradation = BatteryDegradation(battery, cycle_life=1000, depth_exponent=1.0, calendar_fade_per_year=0.0)
+for _ in range(100):
+    battery.charge(10.0)
+    battery.discharge(10.0)
+capacity = degradation.end_of_day()
+print(f"100 full cycles of 1000: capacity {capacity:.2f} kWh (expected {10.0 * (1 - 0.1 * 0.2):.2f})")
+battery.charge(20.0)
+print(f"Charge after fade stops at {battery.get_stored_energy():.2f} kWh")
+for name in ['cycle_life', 'end_of_life_capacity', 'calendar_fade_per_year']:
+    try:
+        BatteryDegradation(Battery(10.0, 0.9, 0.05), **{name: -1})
+    except ValueError as e:
+        print(f"Error: {e}")
+
+print("\n=== Test Simulation with degradation ===")
+baseline = run_with_degradation()
+results = run_with_degradation({'enabled': True, 'cycle_life': 3000})
+degradation = results['battery']['degradation']
+print(f"Equivalent full cycles: {degradation['equivalent_full_cycles']:.2f} "
+      f"({degradation['full_cycles']} full, {degradation['half_cycles']} half)")
+for row in degradation['cycle_depth_histogram']:
+    print(f"  {row['depth_percent'][0]:>5.0f}-{row['depth_percent'][1]:<5.0f}% {row['cycles']:>8.1f}")
+print(f"Capacity: {degradation['initial_capacity_kwh']:.2f} -> {degradation['final_capacity_kwh']:.3f} kWh "
+      f"({degradation['capacity_fade_percent']:.3f}% fade, cycle {degradation['cycle_fade_percent']:.3f}%, "
+      f"calendar {degradation['calendar_fade_percent']:.3f}%)")
+print(f"Open turning points at the end: {degradation['residue_points']}")
+print(f"Daily capacity: {[round(d['battery_capacity_kwh'], 3) for d in results['data']['daily_summaries'][:5]]} ...")
+print(f"Self-sufficiency {baseline['summary']['self_sufficiency_percent']:.2f}% -> "
+      f"{results['summary']['self_sufficiency_percent']:.2f}%")
+
+print("\n=== Test Disabled degradation leaves the results unchanged ===")
+disabled = run_with_degradation({'enabled': False})
+print(f"No degradation section: {'degradation' not in disabled['battery']}")
+print(f"Same summary: {disabled['summary'] == baseline['summary']}")
+print(f"Same daily summaries: {disabled['data']['daily_summaries'] == baseline['data']['daily_summaries']}")
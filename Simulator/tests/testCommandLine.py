@@ -0,0 +1,69 @@
+import sys
+import os
+import json
+import shutil
+import subprocess
+import tempfile
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.CommandLine import load_config, parse_override
+from src.ConfigSchema import check_config
+
+SIMULATOR_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+CONFIG_PATH = os.path.join(SIMULATOR_DIR, 'config.json')
+
+def run_script(*arguments):
+    return subprocess.run([sys.executable] + list(arguments), cwd=SIMULATOR_DIR, stdin=subprocess.DEVNULL,
+                          capture_output=True, text=True)
+
+print("=== Test --set overrides ===")
+for assignment in ['simulation.duration_days=7', 'energy_management.strategy=MPC',
+                   'simulation.random_seed=null', 'tariff.import.default_rate=0.01']:
+    print(f"{assignment}: {parse_override(assignment)}")
+config = load_config(CONFIG_PATH, ['simulation.duration_days=7', 'battery.count=2'])
+print(f"Duration {config['simulation']['duration_days']}, batteries {config['battery']['count']}")
+for assignment in ['duration_days', 'simulation..season=x']:
+    try:
+        parse_override(assignment)
+    except ValueError as e:
+        print(f"Error: {e}")
+
+print("\n=== Test Configuration validation ===")
+print(f"config.json: {check_config(config) or 'valid'}")
+config = load_config(CONFIG_PATH, ['energy_management.strategy=RANDOM', 'simulation.season=monsoon',
+                                   'simulation.time_step_minutes=0', 'simulation.start_date=2024-13-01',
+                                   'grid.export_limit_kw="5"', 'solar.count=1.5'])
+for problem in check_config(config):
+    print(f"  - {problem}")
+del config['battery']
+print(f"Without battery: {check_config(config)}")
+
+print("\n=== Test --check without the simulation modules ===")
+check = run_script('-c', "import sys, main; code = main.main(['--check', '--quiet']); "
+                         "print(code, 'simpy' in sys.modules, 'numpy' in sys.modules)")
+print(f"Exit code, simpy loaded, numpy loaded: {check.stdout.strip()}")
+invalid = run_script('main.py', '--check', '--set', 'simulation.season=monsoon')
+print(f"Invalid config: exit code {invalid.returncode}, stderr: {invalid.stderr.strip().splitlines()[-1].strip()}")
+compare = run_script('compare_strategies.py', '--check', '--set', 'simulation.duration_days=2')
+print(f"compare_strategies.py --check: {compare.stdout.strip().split(':')[0]} (exit code {compare.returncode})")
+exports = run_script('-c', "import src.Ensemble; from src import Simulation, Battery; "
+                           "print(Simulation.__name__, type(Simulation).__name__, Battery.__name__)")
+print(f"Package exports after importing the submodules: {exports.stdout.strip()} (classes, not modules)")
+
+print("\n=== Test Non-interactive JSON run ===")
+output_dir = tempfile.mkdtemp(prefix='greengrid_test_')
+run = run_script('main.py', '--quiet', '--output-format', 'json', '--output-dir', output_dir,
+                 '--set', 'simulation.duration_days=3', '--set', 'simulation.random_seed=42')
+document = json.loads(run.stdout)
+print(f"Exit code {run.returncode}, sections {sorted(document)}, seed {document['seed']}")
+print(f"Self-sufficiency {document['summary']['self_sufficiency_percent']:.2f}%, "
+      f"{document['summary']['duration_days']} days, files written: "
+      f"{all(os.path.exists(path) for path in document['files'].values() if path)}")
+print(f"Nothing else on stdout or stderr: {run.stderr == ''}")
+text = run_script('main.py', '--output-dir', output_dir, '--set', 'simulation.duration_days=1')
+print(f"Text mode without a terminal: exit code {text.returncode}, "
+      f"prompt skipped: {'Press ENTER' not in text.stdout + text.stderr}")
+
+shutil.rmtree(output_dir, ignore_errors=True)
@@ -0,0 +1,82 @@
+import sys
+import os
+import csv
+import json
+import shutil
+import tempfile
+import contextlib
+import io
+from datetime import datetime
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.Simulation import Simulation
+from src.DataLogger import DataLogger
+from src.TraceReplay import TraceReplay
+from src.CompressedIO import CODECS, open_text_reader, open_text_writer, zstandard
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), '..', 'config.json')
+with open(CONFIG_PATH, 'r') as f:
+    config = json.load(f)
+config['simulation']['random_seed'] = 42
+config['simulation']['duration_days'] = 30
+config['simulation']['time_step_minutes'] = 5
+
+with contextlib.redirect_stdout(io.StringIO()):
+    results = Simulation(config=config).run()
+
+def read_rows(path):
+    with open_text_reader(path) as f:
+        return list(csv.reader(f))
+
+base_dir = tempfile.mkdtemp(prefix='greengrid_test_')
+
+print("=== Test Compressed DataLogger output ===")
+plain = DataLogger(results, config, output_dir=os.path.join(base_dir, 'plain'), verbose=False).save_all()
+plain_rows = read_rows(plain['hourly_csv'])
+print(f"Plain: {os.path.basename(plain['hourly_csv'])} {os.path.getsize(plain['hourly_csv']) / 1e6:.2f} MB, "
+      f"{len(plain_rows) - 1} rows")
+for codec in CODECS:
+    if codec == 'zstd' and zstandard is None:
+        print("zstd: skipped (zstandard not installed)")
+        continue
+    codec_config = dict(config, output={'compression': codec})
+    saved = DataLogger(results, codec_config, output_dir=os.path.join(base_dir, codec), verbose=False).save_all()
+    same = all(read_rows(saved[key]) == read_rows(plain[key]) for key in ['hourly_csv', 'daily_csv', 'events_csv'])
+    size = os.path.getsize(saved['hourly_csv'])
+    print(f"{codec}: {os.path.basename(saved['hourly_csv'])} {size / 1e6:.2f} MB "
+          f"({os.path.getsize(plain['hourly_csv']) / size:.1f}x smaller), same rows: {same}")
+
+print("\n=== Test Compression level ===")
+path = os.path.join(base_dir, 'levels.csv.gz')
+sizes = []
+for level in [1, 9]:
+    with open_text_writer(path, 'gzip', level) as f:
+        csv.writer(f).writerows(plain_rows)
+    sizes.append(os.path.getsize(path))
+print(f"gzip level 1: {sizes[0] / 1e6:.2f} MB, level 9: {sizes[1] / 1e6:.2f} MB")
+
+print("\n=== Test Compressed trace replay ===")
+trace_path = os.path.join(base_dir, 'trace.csv')
+with open(trace_path, 'w', newline='') as f:
+    writer = csv.writer(f)
+    writer.writerow(['timestamp', 'solar_kw', 'load_kw'])
+    for minute in range(0, 2 * 24 * 60, 15):
+        writer.writerow([f"2024-06-0{1 + minute // 1440}T{minute % 1440 // 60:02d}:{minute % 60:02d}:00",
+                         max(0.0, 3.0 - abs(minute % 1440 - 720) / 120), 0.8])
+with open(trace_path, newline='') as f, open_text_writer(trace_path + '.xz', 'xz') as out:
+    out.write(f.read())
+start = datetime(2024, 6, 1)
+plain_trace = list(TraceReplay(trace_path).iter_steps(start, 60, 48))
+xz_trace = list(TraceReplay(trace_path + '.xz').iter_steps(start, 60, 48))
+print(f"Hourly steps {len(xz_trace)}, identical to the plain trace: {xz_trace == plain_trace}")
+
+print("\n=== Test Invalid settings ===")
+for output in [{'compression': 'bzip2'}, {'compression': 'gzip', 'compression_level': 12}]:
+    try:
+        DataLogger(results, dict(config, output=output), output_dir=base_dir, verbose=False)
+    except ValueError as e:
+        print(f"Error: {e}")
+
+shutil.rmtree(base_dir, ignore_errors=True)
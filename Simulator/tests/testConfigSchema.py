@@ -0,0 +1,130 @@
+import sys
+import os
+import json
+import operator
+import pickle
+import subprocess
+import time
+import contextlib
+import io
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.ConfigSchema import SCHEMA, REQUIRED, ConfigError, check_overrides, compile_config
+from src.Simulation import Simulation
+from src.SweepCoordinator import SweepCoordinator
+
+SIMULATOR_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+CONFIG_PATH = os.path.join(SIMULATOR_DIR, 'config.json')
+TEMPLATE_PATH = os.path.join(SIMULATOR_DIR, 'config_template.json')
+with open(CONFIG_PATH, 'r') as f:
+    config = json.load(f)
+config['simulation'].update(random_seed=42, duration_days=14)
+with open(TEMPLATE_PATH, 'r') as f:
+    template = json.load(f)
+
+print("=== Test Schema mirrors config_template.json ===")
+print(f"Template compiles (help texts and examples ignored): {len(compile_config(template))} sections")
+documented = {section: sorted(key for key in values if not key.startswith('_'))
+              for section, values in template.items()
+              if not section.startswith('_') and isinstance(values, dict)}
+print(f"Same sections: {sorted(documented) == sorted(s for s, fields in SCHEMA.items() if fields is not None)}")
+print(f"Keys not in the schema: {[f'{s}.{k}' for s, keys in documented.items() for k in keys if k not in SCHEMA[s]]}")
+print(f"Schema keys not in the template: "
+      f"{[f'{s}.{k}' for s, fields in SCHEMA.items() if fields for k in fields if k not in documented[s]]}")
+mismatched = [f"{section}.{key}" for section, fields in SCHEMA.items() if fields
+              for key, (default, _) in fields.items()
+              if default is not REQUIRED and key in documented[section] and key in template[section]
+              and section not in ('fleet', 'sweep') and template[section][key] != default]
+print(f"Defaults that differ from the template values: {mismatched} (fleet and sweep hold examples)")
+minimal = compile_config(config)
+print(f"config.json compiles, sections filled in: {sorted(set(minimal) - set(config))}")
+print(f"Defaults: clouds.model {minimal.clouds.model}, mpc.soc_levels {minimal.mpc.soc_levels}, "
+      f"fleet.strategy_mix {minimal.fleet.strategy_mix}")
+
+print("\n=== Test Every problem reported at once ===")
+broken = json.loads(json.dumps(config))
+broken['battery']['unit_capacity_kwh'] = -13.5
+broken['battery']['unit_capcity'] = 13.5
+broken['simulation']['season'] = 'monsoon'
+broken['simulation']['time_step_minutes'] = 7.5
+broken['inverter']['failure_rate'] = 2
+broken['clouds'] = {'model': 'markov', 'resolution_minutes': 7}
+broken['degradaton'] = {'enabled': True}
+broken['_comment'] = 'ignored'
+try:
+    compile_config(broken)
+except ConfigError as e:
+    print(f"ConfigError is a ValueError: {isinstance(e, ValueError)}")
+    for problem in e.problems:
+        print(f"  - {problem}")
+for overrides in [{'simulation': {'adaptive_stepping': True}, 'energy_management': {'strategy': 'MPC'}},
+                  {'inverter': {'min_failure_duration_hours': 96}},
+                  {'fleet': {'strategy_mix': {'MPC': 1.0}}},
+                  {'battery': None}]:
+    try:
+        compile_config(config, overrides)
+    except ConfigError as e:
+        print(f"  - {e.problems}")
+
+print("\n=== Test Immutable, hashable and picklable ===")
+compiled = compile_config(config)
+print(f"Mapping and attribute access: {compiled['battery']['count']} == {compiled.battery.count}, "
+      f"start {compiled.simulation.start_date}, tariff {compiled.get('tariff')}")
+for attempt in [lambda: setattr(compiled, 'battery', None), lambda: operator.setitem(compiled.battery, 'count', 2)]:
+    try:
+        attempt()
+    except (AttributeError, TypeError) as e:
+        print(f"{type(e).__name__}: {e}")
+print(f"__slots__ only: {not hasattr(compiled, '__dict__')}")
+again = compile_config(json.loads(json.dumps(config)))
+print(f"Equal configs share hash and fingerprint: {again == compiled and hash(again) == hash(compiled)}")
+derived = compiled.with_overrides({'battery': {'count': 2}})
+print(f"with_overrides: count {derived.battery.count}, original {compiled.battery.count}, "
+      f"fingerprint changed: {derived.fingerprint != compiled.fingerprint}")
+cache = {compiled: 'result'}
+print(f"Usable as a cache key: {cache[again]}")
+restored = pickle.loads(pickle.dumps(compiled))
+print(f"Pickle round trip equal: {restored == compiled}, hash equal: {hash(restored) == hash(compiled)}")
+probe = subprocess.run([sys.executable, '-c',
+                        "import json, sys; sys.path.insert(0, '.'); from src.ConfigSchema import compile_config; "
+                        "config = json.load(open('config.json')); config['simulation'].update(random_seed=42, duration_days=14); "
+                        "print(compile_config(config).fingerprint)"],
+                       cwd=SIMULATOR_DIR, capture_output=True, text=True)
+print(f"Fingerprint stable in another process: {probe.stdout.strip() == compiled.fingerprint}")
+
+start = time.perf_counter()
+for _ in range(1000):
+    pickle.loads(pickle.dumps(compiled)).to_dict()
+config_seconds = time.perf_counter() - start
+plain = compiled.to_dict()
+start = time.perf_counter()
+for _ in range(1000):
+    json.loads(json.dumps(pickle.loads(pickle.dumps(plain))))
+dict_seconds = time.perf_counter() - start
+print(f"Pickle to a worker and copy for Simulation, per config: Config {config_seconds * 1000:.1f} us, "
+      f"dict {dict_seconds * 1000:.1f} us")
+
+print("\n=== Test Simulation with a compiled config ===")
+with contextlib.redirect_stdout(io.StringIO()):
+    from_dict = Simulation(config=json.loads(json.dumps(config))).run()
+    from_config = Simulation(config=compiled).run()
+    markov = Simulation(config=compiled.with_overrides({'clouds': {'model': 'markov'}})).run()
+print(f"Same results as the dict: "
+      f"{from_dict['summary'] == from_config['summary'] and from_dict['financial'] == from_config['financial']}")
+print(f"Markov run through the schema: {markov['summary']['self_sufficiency_percent']:.2f}% self-sufficiency")
+
+print("\n=== Test Fail-fast sweep validation ===")
+runs = SweepCoordinator.expand({'battery.count': list(range(1, 11)), 'solar.count': list(range(1, 11)),
+                                'simulation.random_seed': list(range(100))})
+base = compiled.to_dict()
+start = time.perf_counter()
+problems = [problem for overrides in runs for problem in check_overrides(base, overrides)]
+elapsed = time.perf_counter() - start
+print(f"{len(runs)} runs validated in {elapsed * 1000:.0f} ms, problems: {problems}")
+bad_runs = runs[:50] + [{'battery': {'count': 0}}, {'simulation': {'season': 'monsoon'}}]
+try:
+    SweepCoordinator(config, bad_runs)
+except ConfigError as e:
+    print(f"Coordinator refused the sweep: {e.problems}")
@@ -0,0 +1,102 @@
+import sys
+import os
+import json
+import random
+import contextlib
+import io
+
+import numpy as np
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.AntitheticRandom import AntitheticRandom
+from src.RandomStreams import RandomStreams
+from src.Ensemble import Ensemble
+from src.Simulation import Simulation
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), '..', 'config.json')
+with open(CONFIG_PATH, 'r') as f:
+    config = json.load(f)
+config['simulation']['duration_days'] = 30
+
+print("=== Test AntitheticRandom mirrors random.Random ===")
+plain, mirrored = random.Random(42), AntitheticRandom(42)
+pairs = [(plain.random(), mirrored.random()) for _ in range(5)]
+print(f"u + mirrored u: {[round(a + b, 12) for a, b in pairs]} (expected all 1.0)")
+print(f"randint(4, 72) pair sums: {[plain.randint(4, 72) + mirrored.randint(4, 72) for _ in range(5)]} (expected all 76)")
+
+print("\n=== Test Synchronized streams ===")
+streams_a, streams_b = RandomStreams(7), RandomStreams(7)
+streams_a.begin_step(10)
+streams_a.load.random()  # Extra draw in run A only
+streams_a.begin_step(11)
+streams_b.begin_step(11)
+print(f"Same draw at step 11 after an extra draw: {streams_a.load.random() == streams_b.load.random()}")
+
+
+def run(**simulation):
+    run_config = json.loads(json.dumps(config))
+    run_config['simulation'].update(simulation)
+    with contextlib.redirect_stdout(io.StringIO()):
+        return Simulation(config=run_config).run()
+
+
+shared = run()
+synchronized = run(random_streams='synchronized')
+mirrored = run(random_streams='synchronized', antithetic=True)
+clouds = [d['cloud_coverage'] for d in synchronized['data']['hourly_data'][::24]]
+mirrored_clouds = [d['cloud_coverage'] for d in mirrored['data']['hourly_data'][::24]]
+print(f"Shared vs synchronized self-sufficiency: {shared['summary']['self_sufficiency_percent']:.2f}% / "
+      f"{synchronized['summary']['self_sufficiency_percent']:.2f}%")
+print(f"Daily cloud correlation, normal vs antithetic: {np.corrcoef(clouds, mirrored_clouds)[0, 1]:.2f} (expected negative)")
+
+print("\n=== Test Control variate expectation ===")
+expected = Ensemble.expected_solar_available_kwh(config)
+sampled = np.mean([Ensemble.run_one(config, 'LOAD_PRIORITY', seed)['solar_available_kwh'] for seed in range(40)])
+print(f"Expected available solar: {expected:.1f} kWh (mean of 40 runs {sampled:.1f} kWh)")
+
+print("\n=== Test Ensemble with variance reduction ===")
+ensemble = Ensemble(config, runs=20, strategies=['LOAD_PRIORITY', 'CHARGE_PRIORITY'], antithetic=True)
+with contextlib.redirect_stdout(io.StringIO()):
+    summary = ensemble.run()
+print(f"Seeds shared by strategies (CRN): {summary['seeds']['LOAD_PRIORITY'] == summary['seeds']['CHARGE_PRIORITY']}")
+for metric, estimate in summary['estimates']['LOAD_PRIORITY'].items():
+    print(f"  {metric:<26} {estimate['mean']:>9.3f} [{estimate['ci_low']:.3f}, {estimate['ci_high']:.3f}] "
+          f"ESS {estimate['ess']:.1f} from {estimate['runs']} runs")
+difference = summary['differences']['CHARGE_PRIORITY']['net_cost']
+print(f"Net cost difference CHARGE - LOAD: {difference['mean']:.4f} +/- {difference['std_error']:.4f} "
+      f"(ESS {difference['ess']:.0f}, expected much more than 20)")
+
+print("\n=== Test Adaptive stopping ===")
+targets = {'self_sufficiency_percent': 0.5, 'inverter_failure_probability': 0.15}
+adaptive = {}
+for workers in (1, 2):
+    checks = []
+    ensemble = Ensemble(config, strategies=['LOAD_PRIORITY', 'PRODUCE_PRIORITY'], workers=workers)
+    with contextlib.redirect_stdout(io.StringIO()):
+        adaptive[workers] = ensemble.run_adaptive(targets, batch_runs=10, min_runs=20, max_runs=400,
+                                                  progress=checks.append)
+    print(f"workers={workers}: runs {adaptive[workers]['runs']}, converged {adaptive[workers]['adaptive']['converged']}, "
+          f"{len(checks)} progress updates")
+summary = adaptive[2]
+for strategy, estimates in summary['estimates'].items():
+    for metric, width in targets.items():
+        e = estimates[metric]
+        print(f"  {strategy:<18} {metric:<28} {e['mean']:.3f} +/- {(e['ci_high'] - e['ci_low']) / 2:.3f} (target {width})")
+assert adaptive[1]['runs'] == adaptive[2]['runs'], (adaptive[1]['runs'], adaptive[2]['runs'])
+assert adaptive[1]['adaptive']['converged_runs'] == adaptive[2]['adaptive']['converged_runs']
+assert adaptive[1]['estimates'] == adaptive[2]['estimates']
+print("Same result with 1 and 2 workers: True")
+print(f"Strategies stopped independently: {summary['adaptive']['converged_runs']}")
+
+print("\n=== Test Invalid ensembles ===")
+for kwargs in ({'runs': 5, 'antithetic': True}, {'runs': 1}):
+    try:
+        Ensemble(config, **kwargs)
+    except ValueError as e:
+        print(f"Error: {e}")
+try:
+    Ensemble(config).run_adaptive({'battery_health': 0.1})
+except ValueError as e:
+    print(f"Error: {e}")
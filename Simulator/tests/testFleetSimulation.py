@@ -0,0 +1,83 @@
+import sys
+import os
+import json
+import random
+import contextlib
+import io
+
+import numpy as np
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.FleetSimulation import FleetSimulation, _DISPATCH, _BatteryArrays
+from src.Battery import Battery
+from src.Grid import Grid
+from src.EnergyManagementSystem import EnergyManagementSystem
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), '..', 'config.json')
+with open(CONFIG_PATH, 'r') as f:
+    config = json.load(f)
+config['simulation']['duration_days'] = 30
+config['simulation']['time_step_minutes'] = 60
+
+print("=== Test Vectorized EMS - Matches EnergyManagementSystem ===")
+rng = random.Random(42)
+for strategy, dispatch in _DISPATCH.items():
+    battery = Battery(capacity_kwh=13.5, efficiency=0.9, min_soc=0.05)
+    grid = Grid(import_cost_per_kwh=0.0075, export_revenue_per_kwh=0.009, export_limit_kw=2.0)
+    ems = EnergyManagementSystem(strategy=strategy)
+    energy = np.array([battery.get_stored_energy()])
+    worst = 0.0
+    for _ in range(2000):
+        solar_kw, load_kw = rng.uniform(0, 6), rng.uniform(0.3, 4)
+        flows = ems.distribute_energy(solar_kw, load_kw, battery, grid, 0.25)
+        arrays = _BatteryArrays(energy, np.array([13.5]), np.array([13.5 * 0.05]), 0.9 ** 0.5, 0.25)
+        vector_flows = dispatch(np.array([solar_kw]), np.array([load_kw]), arrays, np.array([2.0]))
+        energy = arrays.energy
+        worst = max(worst, abs(energy[0] - battery.get_stored_energy()),
+                    *(abs(flows[name] - vector_flows[name][0]) for name in flows))
+    print(f"{strategy}: max difference {worst:.1e} (expected < 1e-6, EMS rounds to 6 decimals)")
+
+print("\n=== Test Fleet - No feeder limit ===")
+config['fleet'] = {'homes': 500, 'feeder_export_limit_kw': None,
+                   'strategy_mix': {'LOAD_PRIORITY': 2, 'CHARGE_PRIORITY': 1, 'PRODUCE_PRIORITY': 1},
+                   'size_variation': 0.2, 'cloud_variation': 0.05}
+with contextlib.redirect_stdout(io.StringIO()):
+    free = FleetSimulation(config=config).run()
+print(f"Strategy mix: {free['summary']['strategy_mix']} (expected 250/125/125)")
+print(f"Per-home records: {len(free['homes']['self_sufficiency_percent'])} (expected 500)")
+print(f"Peak export: {free['feeder']['peak_export_kw']:.1f} kW, hours at limit: "
+      f"{free['feeder']['hours_at_limit']} (expected 0)")
+total_import = sum(free['homes']['grid_imported_kwh'])
+print(f"Aggregate import equals sum of homes: "
+      f"{abs(total_import - free['summary']['total_grid_imported_kwh']) < 1e-6}")
+
+print("\n=== Test Fleet - Feeder export cap ===")
+cap = free['feeder']['peak_export_kw'] / 2
+config['fleet']['feeder_export_limit_kw'] = cap
+with contextlib.redirect_stdout(io.StringIO()):
+    capped = FleetSimulation(config=config).run()
+feeder = capped['feeder']
+print(f"Cap: {cap:.1f} kW, peak export: {feeder['peak_export_kw']:.1f} kW (expected <= cap)")
+print(f"Never above cap: {max(feeder['series']['export_kw']) <= cap + 1e-6}")
+print(f"Hours at limit: {feeder['hours_at_limit']} (expected > 0)")
+print(f"Export withheld: {feeder['export_withheld_kwh']:.1f} kWh, curtailed by cap: "
+      f"{feeder['limit_curtailed_kwh']:.1f} kWh (PRODUCE_PRIORITY homes absorb part of it)")
+print(f"Export reduced vs uncapped: {capped['summary']['total_grid_exported_kwh']:.1f} < "
+      f"{free['summary']['total_grid_exported_kwh']:.1f}")
+sharing = sum(1 for kwh in capped['homes']['limit_curtailed_kwh'] if kwh > 0)
+print(f"Homes sharing curtailment: {sharing} of 500")
+
+print("\n=== Test Fleet - Reproducible with seed ===")
+with contextlib.redirect_stdout(io.StringIO()):
+    again = FleetSimulation(config=config).run()
+print(f"Same results: {again['homes']['net_cost'] == capped['homes']['net_cost']}")
+
+print("\n=== Test Fleet - Invalid strategy ===")
+config['fleet']['strategy_mix'] = {'SOMETHING_ELSE': 1}
+try:
+    with contextlib.redirect_stdout(io.StringIO()):
+        FleetSimulation(config=config)
+except ValueError as e:
+    print(f"Error: {e}")
@@ -0,0 +1,74 @@
+import sys
+import os
+import json
+import random
+import contextlib
+import io
+
+import numpy as np
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.Inverter import Inverter
+from src.Simulation import Simulation
+from src.Ensemble import Ensemble
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), '..', 'config.json')
+with open(CONFIG_PATH, 'r') as f:
+    config = json.load(f)
+
+print("=== Test Inverter - P(failure within 30 days) ===")
+p, days, reps = 0.005, 30, 20000
+exact = 1 - (1 - p) ** days
+for label, q in [('Plain', None), ('Importance (q=0.1)', 0.1)]:
+    rng = random.Random(7)
+    values = np.empty(reps)
+    for i in range(reps):
+        inverter = Inverter(max_output_kw=5.0, failure_rate=p, rng=rng, sampling_failure_rate=q)
+        failed = False
+        for _ in range(days):
+            inverter.check_failure()
+            failed = failed or inverter._is_failing
+        values[i] = failed * inverter.get_likelihood_ratio()
+    print(f"{label:<20} {values.mean():.4f} ± {values.std(ddof=1) / reps ** 0.5:.4f} (exact {exact:.4f})")
+
+print("\n=== Test Invalid sampling rate ===")
+try:
+    Inverter(max_output_kw=5.0, sampling_failure_rate=1.5)
+except ValueError as e:
+    print(f"Error: {e}")
+
+print("\n=== Test Sampling at the real rate changes nothing ===")
+config['simulation']['duration_days'] = 10
+config['simulation']['random_seed'] = 3
+with contextlib.redirect_stdout(io.StringIO()):
+    plain = Simulation(config=config).run()
+config['inverter']['sampling_failure_rate'] = config['inverter']['failure_rate']
+with contextlib.redirect_stdout(io.StringIO()):
+    weighted = Simulation(config=config).run()
+del config['inverter']['sampling_failure_rate']
+print(f"Likelihood ratio: {weighted['importance_sampling']['likelihood_ratio']:.6f} (expected 1)")
+print(f"Same net cost: {plain['financial']['net_cost'] == weighted['financial']['net_cost']}")
+
+print("\n=== Test Ensemble - plain vs importance sampling (10 days, failure rate 0.02) ===")
+config['inverter']['failure_rate'] = 0.02
+summaries = {}
+for label, q in [('Plain', None), ('Importance (q=0.15)', 0.15)]:
+    ensemble = Ensemble(config, runs=200, control_variate=False, sampling_failure_rate=q)
+    with contextlib.redirect_stdout(io.StringIO()):
+        summaries[label] = ensemble.run()
+    strategy = ensemble.strategies[0]
+    estimates = summaries[label]['estimates'][strategy]
+    quantiles = summaries[label]['quantiles'][strategy]['total_unmet_load_kwh']
+    weights = summaries[label]['weights'][strategy]
+    for metric in ['inverter_failure_probability', 'total_unmet_load_kwh']:
+        e = estimates[metric]
+        print(f"{label:<20} {metric:<30} {e['mean']:>8.3f} ± {e['std_error']:.3f}")
+    print(f"{label:<20} {'unmet kWh p50/p99':<30} {quantiles['p50']:>8.3f} / {quantiles['p99']:.3f}")
+    print(f"{label:<20} {'mean weight / Kish ESS':<30} {weights['mean']:>8.3f} / {weights['kish_ess']:.1f}")
+exact = 1 - (1 - 0.02) ** 10
+print(f"Exact failure probability (10 daily checks): {exact:.4f}")
+plain_e = summaries['Plain']['estimates'][strategy]['total_unmet_load_kwh']
+weighted_e = summaries['Importance (q=0.15)']['estimates'][strategy]['total_unmet_load_kwh']
+print(f"Unmet load CIs overlap: {plain_e['ci_low'] <= weighted_e['ci_high'] and weighted_e['ci_low'] <= plain_e['ci_high']}")
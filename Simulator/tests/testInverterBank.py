@@ -0,0 +1,104 @@
+import sys
+import os
+import json
+import math
+import random
+import time
+import contextlib
+import io
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.Inverter import Inverter
+from src.InverterBank import InverterBank
+from src.Simulation import Simulation
+
+def run_site(**inverter):
+    """Simulate 60 days (seed 42) with the inverter section updated by the keyword arguments."""
+    with open(os.path.join(os.path.dirname(__file__), '..', 'config.json'), 'r') as f:
+        site_config = json.load(f)
+    site_config['simulation'].update(random_seed=42, duration_days=60, time_step_minutes=15)
+    site_config['inverter'].update(inverter)
+    with contextlib.redirect_stdout(io.StringIO()):
+        return Simulation(config=site_config).run()
+
+def run_days(inverter, days, steps_per_day=24):
+    """Drive an inverter like Simulation; returns the mean capacity share over the steps."""
+    available = 0.0
+    for _ in range(days):
+        for _ in range(steps_per_day):
+            available += inverter.apply_limit(1.0) if inverter.is_operational() else 0.0
+            inverter.update(24 / steps_per_day)
+        inverter.check_failure()
+    return available / (days * steps_per_day)
+
+print("=== Test Clipping and partial failures ===")
+bank = InverterBank(unit_max_output_kw=4.0, count=4, failure_rate=0.0)
+print(f"Solar 10 kW -> {bank.apply_limit(10.0):.2f} kW, 20 kW -> {bank.apply_limit(20.0):.2f} kW (clipped)")
+bank._failing[1] = True
+bank._refresh()
+print(f"One unit down: 10 kW -> {bank.apply_limit(10.0):.2f} kW, 20 kW -> {bank.apply_limit(20.0):.2f} kW "
+      f"(capacity {bank.get_capacity():.1f} kW, operational: {bank.is_operational()})")
+mixed = InverterBank(unit_max_output_kw=[2.0, 6.0], failure_rate=0.0)
+mixed._failing[1] = True
+mixed._refresh()
+print(f"Units of 2 and 6 kW, 6 kW unit down: 10 kW -> {mixed.apply_limit(10.0):.2f} kW")
+for kwargs in [{'unit_max_output_kw': 4.0, 'count': 0}, {'unit_max_output_kw': [4.0, -1.0]},
+               {'unit_max_output_kw': 4.0, 'sampling_failure_rate': 1.5}]:
+    try:
+        InverterBank(**kwargs)
+    except ValueError as e:
+        print(f"Error: {e}")
+
+print("\n=== Test Failure statistics match the merged Inverter ===")
+# Per unit, the bulk-sampled timeline must behave like Inverter's daily draws
+random.seed(1)
+single = [run_days(Inverter(max_output_kw=1.0, failure_rate=0.05), 2000) for _ in range(4)]
+random.seed(2)
+bank = InverterBank(unit_max_output_kw=1.0, count=200, failure_rate=0.05)
+per_unit = run_days(bank, 2000) * bank.count
+print(f"Availability, Inverter: {sum(single) / len(single):.3f}, InverterBank unit: {per_unit / bank.count:.3f}")
+results = bank.results()
+# A failed unit draws again from the first day it is repaired: cycle = days down + 1 / rate - 1
+days_down = sum(math.ceil(hours / 24) for hours in range(4, 73)) / 69
+print(f"Unit failures: {results['unit_failures']} (renewal estimate ~{200 * 2000 / (days_down + 1 / 0.05 - 1):.0f})")
+print(f"Capacity availability: {results['capacity_availability_percent']:.2f}%, "
+      f"unit downtime: {results['unit_downtime_hours']:,.0f} h")
+
+print("\n=== Test Importance sampling weights ===")
+weights = []
+outages = []
+for seed in range(4000):
+    bank = InverterBank(unit_max_output_kw=1.0, count=4, failure_rate=0.01, rng=random.Random(seed),
+                        sampling_failure_rate=0.05)
+    run_days(bank, 10)
+    weights.append(bank.get_likelihood_ratio())
+    outages.append(bank.unit_failures > 0)
+weighted = sum(w * outage for w, outage in zip(weights, outages)) / len(weights)
+print(f"Mean likelihood ratio over 4000 runs: {sum(weights) / len(weights):.3f} (expected ~1)")
+print(f"Weighted P(any unit failure): {weighted:.3f} (exact {1 - 0.99 ** 40:.3f}, "
+      f"{sum(outages)} runs with failures)")
+
+print("\n=== Test Hundreds of units stay O(1) per step ===")
+for count in [1, 100, 1000]:
+    bank = InverterBank(unit_max_output_kw=4.0, count=count, failure_rate=0.005, rng=random.Random(7))
+    start = time.perf_counter()
+    run_days(bank, 365, steps_per_day=96)
+    elapsed = time.perf_counter() - start
+    print(f"  {count:>5} units: 365 days at 15 min in {elapsed * 1000:.0f} ms, "
+          f"{bank.unit_failures} unit failures")
+
+print("\n=== Test Simulation with individual units ===")
+base = run_site()
+results = run_site(count=8, unit_max_output_kw=0.5, individual_units=True, failure_rate=0.02)
+reliability = results['reliability']
+print(f"Unit failures: {reliability['unit_failures']}, failure events: {reliability['inverter_failures']}, "
+      f"units: {reliability['inverter_units']}")
+print(f"Capacity availability: {reliability['capacity_availability_percent']:.2f}%, "
+      f"site-wide downtime: {reliability['inverter_downtime_hours']:.1f} h")
+print(f"Self-sufficiency: {results['summary']['self_sufficiency_percent']:.2f}% "
+      f"(merged default: {base['summary']['self_sufficiency_percent']:.2f}%)")
+merged = run_site(individual_units=False)
+print(f"individual_units false leaves results unchanged: {merged['summary'] == base['summary']}")
+print(f"No unit statistics when merged: {'unit_failures' not in merged['reliability']}")
@@ -0,0 +1,125 @@
+import sys
+import os
+import json
+import random
+import time
+import contextlib
+import io
+from datetime import datetime
+
+import numpy as np
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.CloudCoverage import CloudCoverage
+from src.MarkovCloudCoverage import MarkovCloudCoverage
+from src.Simulation import Simulation
+
+with open(os.path.join(os.path.dirname(__file__), '..', 'config.json'), 'r') as f:
+    config = json.load(f)
+config['simulation'].update(random_seed=42, duration_days=30, time_step_minutes=15)
+
+def with_clouds(clouds, **simulation):
+    """Copy of config with the given 'clouds' section and simulation settings."""
+    run_config = json.loads(json.dumps(config))
+    run_config['clouds'] = clouds
+    run_config['simulation'].update(simulation)
+    return run_config
+
+print("=== Test Vectorized sampling matches a step-by-step chain ===")
+model = MarkovCloudCoverage(season='fall', rng=random.Random(1))
+model._level = 1
+uniforms = np.random.default_rng(3).random(50000)
+levels = model._sample_levels(np.full(uniforms.size, model.seasons.index('fall')), uniforms)
+level = 1
+sequential = []
+for u in uniforms:
+    level = int(np.searchsorted(model._cumulative[2][level], u, side='right'))
+    sequential.append(level)
+print(f"Identical levels over 50000 periods: {levels.tolist() == sequential}")
+
+print("\n=== Test Long-run statistics ===")
+for season in ['spring', 'summer', 'fall', 'winter']:
+    model = MarkovCloudCoverage(season=season, rng=random.Random(2))
+    series = np.array(model.generate(96 * 365 * 2))
+    level_of = np.searchsorted([0.2, 0.6, 0.8], series, side='right')
+    shares = np.bincount(level_of, minlength=4) / series.size
+    changes = np.count_nonzero(np.diff(level_of))
+    print(f"  {season:<7} mean {series.mean():.3f} (daily model {CloudCoverage(season).get_expected_coverage():.3f}), "
+          f"levels {np.round(shares, 3).tolist()} vs {CloudCoverage.PROBABILITIES[season]}, "
+          f"{changes / 730:.1f} level changes/day")
+
+print("\n=== Test Continuation, seasons and custom matrices ===")
+model = MarkovCloudCoverage(season='winter', rng=random.Random(4))
+first = model.generate(96)
+second = model.generate(96)
+print(f"Chain continues across calls: {len(first) + len(second)} periods, last level kept: {model._level is not None}")
+calendar = model.generate_days(datetime(2024, 2, 27), 6, auto_season=True)
+print(f"Six days across Feb/Mar with season 'auto': {len(calendar)} periods")
+sticky = MarkovCloudCoverage(season='summer', rng=random.Random(5), transition_matrices={
+    'summer': [[0.99, 0.01, 0, 0], [0.01, 0.98, 0.01, 0], [0, 0.01, 0.98, 0.01], [0, 0, 0.01, 0.99]]
+})
+print(f"Custom summer matrix stationary mix: {np.round(sticky.stationary_distribution(), 3).tolist()}, "
+      f"expected coverage {sticky.get_expected_coverage():.3f}")
+print(f"Daily model still available: {0.0 <= sticky.get_daily_coverage() <= 0.9}")
+for kwargs in [{'resolution_minutes': 7}, {'persistence_hours': 0},
+               {'transition_matrices': {'fall': [[1, 0], [0, 1]]}},
+               {'transition_matrices': {'fall': [[0.5, 0.6, 0, 0]] * 4}}]:
+    try:
+        MarkovCloudCoverage(**kwargs)
+    except ValueError as e:
+        print(f"Error: {e}")
+
+print("\n=== Test Generation speed on multi-year horizons ===")
+for years in [1, 10]:
+    model = MarkovCloudCoverage(season='spring', rng=random.Random(6))
+    start = time.perf_counter()
+    series = model.generate(96 * 365 * years)
+    elapsed = time.perf_counter() - start
+    print(f"  {years:>2} years at 15 min: {len(series):,} periods in {elapsed * 1000:.0f} ms")
+
+print("\n=== Test Simulation with the Markov model ===")
+output = io.StringIO()
+with contextlib.redirect_stdout(output):
+    daily = Simulation(config=with_clouds({'model': 'daily'})).run()
+for label, overrides in [('markov', {}), ('markov, synchronized', {'random_streams': 'synchronized'}),
+                         ('markov, season auto', {'season': 'auto', 'start_date': '2024-05-20'})]:
+    with contextlib.redirect_stdout(output):
+        results = Simulation(config=with_clouds({'model': 'markov'}, **overrides)).run()
+    steps = results['data']['hourly_data']
+    day = [step['cloud_coverage'] for step in steps[:96]]
+    print(f"  {label:<22} self-sufficiency {results['summary']['self_sufficiency_percent']:6.2f}%, "
+          f"first day coverage {min(day):.2f}-{max(day):.2f}, "
+          f"{len(set(step['cloud_coverage'] for step in steps))} distinct values")
+steps = daily['data']['hourly_data']
+print(f"  {'daily':<22} self-sufficiency {daily['summary']['self_sufficiency_percent']:6.2f}%, "
+      f"{len(set(step['cloud_coverage'] for step in steps))} distinct values")
+try:
+    with contextlib.redirect_stdout(output):
+        Simulation(config=with_clouds({'model': 'weekly'}))
+except ValueError as e:
+    print(f"Error: {e}")
+
+print("\n=== Test Known means under a custom matrix ===")
+from src.Ensemble import Ensemble
+from src.ModelPredictiveController import ModelPredictiveController
+run_config = with_clouds({'model': 'markov', 'transition_matrices': {
+    'summer': [[0.6, 0, 0, 0.4], [0, 0.6, 0, 0.4], [0, 0, 0.6, 0.4], [0.02, 0.02, 0.06, 0.9]]
+}}, duration_days=10)
+stationary = MarkovCloudCoverage.from_config(run_config['clouds'], 'summer').get_expected_coverage()
+print(f"Summer coverage: matrix {stationary:.3f}, daily model {CloudCoverage('summer').get_expected_coverage():.3f}")
+controller = ModelPredictiveController.from_config(run_config)
+print(f"MPC forecasts the matrix's coverage: {abs(controller._expected_cloud[0] - stationary) < 1e-9}")
+estimates = {}
+for control_variate in (True, False):
+    ensemble = Ensemble(run_config, runs=20, control_variate=control_variate)
+    with contextlib.redirect_stdout(io.StringIO()):
+        summary = ensemble.run()
+    estimates[control_variate] = summary['estimates'][config['energy_management']['strategy']]['self_sufficiency_percent']
+observed = np.mean([sample['solar_available_kwh'] for sample in summary['samples'][config['energy_management']['strategy']]])
+print(f"Control variate mean {Ensemble.expected_solar_available_kwh(run_config):.1f} kWh, "
+      f"observed {observed:.1f} kWh over 20 runs")
+for control_variate, estimate in estimates.items():
+    print(f"  Self-sufficiency {'with' if control_variate else 'without'} control variate: "
+          f"{estimate['mean']:.2f} +/- {estimate['std_error']:.2f}% (should agree)")
@@ -0,0 +1,85 @@
+import sys
+import os
+import json
+import random
+import contextlib
+import io
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.ModelPredictiveController import ModelPredictiveController
+from src.EnergyManagementSystem import EnergyManagementSystem
+from src.CloudCoverage import CloudCoverage
+from src.Load import Load
+from src.Simulation import Simulation
+from src.OptimalDispatch import optimal_results
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), '..', 'config.json')
+with open(CONFIG_PATH, 'r') as f:
+    config = json.load(f)
+config['simulation']['duration_days'] = 30
+config['tariff'] = {
+    'name': 'TOU test',
+    'import': {'default_rate': 0.10, 'periods': [{'name': 'peak', 'rate': 0.30, 'start_hour': 17, 'end_hour': 22}]},
+    'export': {'default_rate': 0.04}
+}
+
+print("=== Test Forecast helpers ===")
+cloud = CloudCoverage(season='summer')
+random.seed(1)
+sampled = sum(cloud.get_daily_coverage() for _ in range(20000)) / 20000
+print(f"Expected summer coverage: {cloud.get_expected_coverage():.3f} (sampled mean {sampled:.3f})")
+load = Load(base_load_kw=0.5, peak_hours_max_kw=3.0, peak_hours_start=18, peak_hours_end=21)
+sampled = sum(load.generate(6) for _ in range(20000)) / 20000
+print(f"Expected load at 6:00: {load.expected_demand(6):.3f} kW (sampled mean {sampled:.3f})")
+
+print("\n=== Test MPC requires a controller ===")
+try:
+    EnergyManagementSystem(strategy='MPC')
+except ValueError as e:
+    print(f"Error: {e}")
+
+print("\n=== Test MPC vs heuristics and optimum (30 days, TOU) ===")
+costs = {}
+for strategy in ['LOAD_PRIORITY', 'CHARGE_PRIORITY', 'PRODUCE_PRIORITY', 'MPC']:
+    config['energy_management']['strategy'] = strategy
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = Simulation(config=config).run()
+    costs[strategy] = results['financial']['net_cost']
+    if strategy == 'LOAD_PRIORITY':
+        costs['OPTIMAL'] = optimal_results(results, config)['financial']['net_cost']
+    if strategy == 'MPC':
+        mpc_results = results
+for strategy, cost in costs.items():
+    print(f"{strategy:<18} ${cost:>8.2f}")
+print(f"MPC beats every heuristic: {costs['MPC'] < min(costs[s] for s in ['LOAD_PRIORITY', 'CHARGE_PRIORITY', 'PRODUCE_PRIORITY'])}")
+print(f"MPC not below optimum: {costs['MPC'] >= costs['OPTIMAL']}")
+
+steps = mpc_results['data']['hourly_data']
+balanced = all(abs(s['solar_to_load'] + s['battery_to_load'] + s['grid_to_load'] - s['load_demand_kw']) < 1e-5
+               for s in steps)
+print(f"Load balanced every step: {balanced}")
+print(f"SoC within limits: {all(4.99 <= s['battery_soc'] <= 100.0 for s in steps)}")
+
+print("\n=== Test Planner statistics ===")
+stats = mpc_results['mpc']
+print(f"Decisions: {stats['decisions']} (expected {len(steps)})")
+print(f"Replans: {stats['replans']} = {stats['solves']} solved + {stats['cache_hits']} cached")
+print(f"Forecast-triggered replans: {stats['forecast_replans']}")
+print(f"Latency mean {stats['latency_ms']['mean']:.3f} ms, p95 {stats['latency_ms']['p95']:.3f} ms")
+
+print("\n=== Test Warm start and cache (15-minute steps, 2-hour replans) ===")
+config['simulation']['time_step_minutes'] = 15
+config['mpc'] = {'replan_interval_minutes': 120}
+with contextlib.redirect_stdout(io.StringIO()):
+    stats = Simulation(config=config).run()['mpc']
+print(f"Decisions: {stats['decisions']}, served by an existing plan: {stats['warm_start_decisions']}")
+print(f"Cache hit rate: {stats['cache_hit_rate'] * 100:.1f}% ({stats['solves']} solves)")
+
+print("\n=== Test Invalid settings ===")
+config['mpc'] = {'horizon_hours': 1, 'replan_interval_minutes': 120}
+try:
+    ModelPredictiveController.from_config(config)
+except ValueError as e:
+    print(f"Error: {e}")
@@ -0,0 +1,81 @@
+import sys
+import os
+import json
+import itertools
+import time
+import contextlib
+import io
+
+import numpy as np
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.OptimalDispatch import OptimalDispatch, optimal_results
+from src.Simulation import Simulation
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), '..', 'config.json')
+with open(CONFIG_PATH, 'r') as f:
+    config = json.load(f)
+config['simulation']['duration_days'] = 30
+config['tariff'] = {
+    'name': 'TOU test',
+    'import': {'default_rate': 0.10, 'periods': [{'name': 'peak', 'rate': 0.30, 'start_hour': 17, 'end_hour': 22}]},
+    'export': {'default_rate': 0.04}
+}
+
+print("=== Test DP - Matches exhaustive search on a tiny problem ===")
+optimizer = OptimalDispatch(capacity_kwh=4.0, efficiency=0.9, min_soc=0.0, export_limit_kw=1.0, soc_levels=5)
+solar = np.array([3.0, 2.5, 0.0, 0.2, 0.0, 1.5])
+load = np.array([0.5, 0.8, 1.5, 2.0, 1.0, 0.5])
+import_rate = np.array([0.1, 0.1, 0.3, 0.3, 0.1, 0.1])
+export_rate = np.full(6, 0.05)
+solution = optimizer.solve(solar, load, import_rate, export_rate, 1.0)
+
+best = np.inf
+for path in itertools.product(range(5), repeat=6):
+    levels = np.array((optimizer.initial_level,) + path)
+    shifts = np.diff(levels)
+    _, flows = optimizer._step_flows(shifts, solar, load, 1.0, import_rate, export_rate)
+    # Infeasible: charging more than solar or discharging more than load
+    if np.any(flows['solar_to_battery'] > solar + 1e-9) or np.any(flows['battery_to_load'] > load + 1e-9):
+        continue
+    best = min(best, float(np.sum(flows['grid_to_load'] * import_rate - flows['solar_to_grid'] * export_rate)))
+print(f"DP cost: {solution['energy_cost']:.6f}")
+print(f"Exhaustive cost: {best:.6f}")
+print(f"Match: {abs(solution['energy_cost'] - best) < 1e-6}")
+
+print("\n=== Test Energy balance ===")
+flows = solution['flows']
+solar_balance = flows['solar_to_load'] + flows['solar_to_battery'] + flows['solar_to_grid'] + flows['curtailed']
+load_balance = flows['solar_to_load'] + flows['battery_to_load'] + flows['grid_to_load']
+print(f"Solar balanced: {np.allclose(solar_balance, solar)}")
+print(f"Load balanced: {np.allclose(load_balance, load)}")
+print(f"Export within limit: {bool(np.all(flows['solar_to_grid'] <= 1.0 + 1e-9))}")
+
+print("\n=== Test Optimal vs heuristics (30 days, TOU) ===")
+heuristics = {}
+for strategy in ['LOAD_PRIORITY', 'CHARGE_PRIORITY', 'PRODUCE_PRIORITY']:
+    config['energy_management']['strategy'] = strategy
+    with contextlib.redirect_stdout(io.StringIO()):
+        heuristics[strategy] = Simulation(config=config).run()
+start = time.perf_counter()
+optimal = optimal_results(heuristics['LOAD_PRIORITY'], config)
+elapsed = time.perf_counter() - start
+optimal_cost = optimal['financial']['net_cost']
+print(f"Solved {len(optimal['data']['hourly_data'])} steps in {elapsed:.2f} s")
+for strategy, results in heuristics.items():
+    cost = results['financial']['net_cost']
+    print(f"{strategy:<18} ${cost:>8.2f}  gap ${cost - optimal_cost:>7.2f} (expected >= 0)")
+print(f"{'OPTIMAL':<18} ${optimal_cost:>8.2f}")
+record = optimal['data']['hourly_data'][12]
+print(f"Step record has heuristic keys: "
+      f"{set(heuristics['LOAD_PRIORITY']['data']['hourly_data'][12]) <= set(record)}")
+
+print("\n=== Test Terminal SoC ===")
+config['optimal_dispatch'] = {'terminal_soc': 0.5}
+with contextlib.redirect_stdout(io.StringIO()):
+    constrained = optimal_results(heuristics['LOAD_PRIORITY'], config)
+print(f"Final SoC free: {optimal['battery']['final_soc_percent']:.1f}%, "
+      f"with terminal_soc 0.5: {constrained['battery']['final_soc_percent']:.1f}% (expected >= 50)")
+print(f"Cost with terminal constraint is higher: {constrained['financial']['net_cost'] >= optimal_cost}")
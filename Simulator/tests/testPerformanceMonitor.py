@@ -0,0 +1,52 @@
+import sys
+import os
+import json
+import pstats
+import tempfile
+import contextlib
+import io
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.Simulation import Simulation
+from src.DataLogger import DataLogger
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), '..', 'config.json')
+with open(CONFIG_PATH, 'r') as f:
+    config = json.load(f)
+config['simulation']['duration_days'] = 7
+config['simulation']['time_step_minutes'] = 15
+
+print("=== Test Instrumentation - Disabled by default ===")
+with contextlib.redirect_stdout(io.StringIO()):
+    results = Simulation(config=config).run()
+print(f"'perf' in results: {'perf' in results} (expected False)")
+
+print("\n=== Test Instrumentation - Per-phase timers ===")
+with contextlib.redirect_stdout(io.StringIO()):
+    results = Simulation(config=config, instrument=True).run()
+perf = results['perf']
+print(f"Steps: {perf['steps']} (expected {7 * 24 * 4})")
+print(f"Run time: {perf['run_seconds']*1000:.1f} ms ({perf['steps_per_second']:,.0f} steps/s)")
+for phase, stats in perf['phases'].items():
+    print(f"  {phase:<18} calls={stats['calls']:>5}  mean={stats['mean_microseconds']:>7.2f} us  "
+          f"share={stats['share_percent']:>5.1f}%")
+print(f"Day boundary calls: {perf['phases']['day_boundary']['calls']} (expected 7)")
+
+print("\n=== Test Instrumentation - cProfile dump ===")
+with tempfile.TemporaryDirectory() as tmp:
+    profile_path = os.path.join(tmp, 'run.pstats')
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = Simulation(config=config, profile_path=profile_path).run()
+    stats = pstats.Stats(profile_path)
+    print(f"Profile written: {os.path.exists(profile_path)}")
+    print(f"Profiled functions: {len(stats.stats)}")
+
+    print("\n=== Test Instrumentation - DataLogger export ===")
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = Simulation(config=config, instrument=True).run()
+        saved = DataLogger(results, config, output_dir=tmp).save_all()
+    print(f"perf.json saved: {os.path.basename(saved['perf_json'])}")
+    with open(saved['perf_json'], 'r') as f:
+        print(f"Phases in file: {len(json.load(f)['phases'])} (expected 7)")
@@ -0,0 +1,51 @@
+import sys
+import os
+import time
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.ReportStatistics import ReportStatistics
+
+# Small hand-made dataset (1-hour steps, min_soc = 5%)
+hourly_data = [
+    {'battery_soc': 100.0, 'cloud_coverage': 0.2, 'load_demand_kw': 1.0, 'inverter_operational': True, 'unmet_load': 0.0},
+    {'battery_soc': 60.0, 'cloud_coverage': 0.4, 'load_demand_kw': 3.5, 'inverter_operational': True, 'unmet_load': 0.0},
+    {'battery_soc': 5.0, 'cloud_coverage': 0.6, 'load_demand_kw': 2.0, 'inverter_operational': False, 'unmet_load': 1.2},
+    {'battery_soc': 5.05, 'cloud_coverage': 0.8, 'load_demand_kw': 0.5, 'inverter_operational': False, 'unmet_load': 0.3},
+]
+
+print("=== Test ReportStatistics - List of step records ===")
+stats = ReportStatistics.compute(hourly_data, min_soc=0.05, time_step_minutes=60)
+print(f"Average SoC: {stats['average_soc_percent']:.2f}% (expected 42.51%)")
+print(f"Full count: {stats['full_count']} (expected 1)")
+print(f"Empty count: {stats['empty_count']} (expected 2)")
+print(f"Inverter downtime: {stats['inverter_downtime_hours']:.1f} h (expected 2.0)")
+print(f"Unmet load hours: {stats['unmet_load_hours']:.1f} h (expected 2.0)")
+print(f"Average cloud: {stats['average_cloud_coverage']:.2f} (expected 0.50)")
+print(f"Peak load: {stats['peak_load_kw']:.2f} kW (expected 3.50)")
+
+print("\n=== Test ReportStatistics - Column input gives same result ===")
+columns = {name: [h[name] for h in hourly_data] for name in ReportStatistics.COLUMNS}
+stats_columns = ReportStatistics.compute(columns, min_soc=0.05, time_step_minutes=60)
+print(f"Identical: {stats == stats_columns}")
+
+print("\n=== Test ReportStatistics - Reuse of precomputed aggregates ===")
+results = {'statistics': {'average_cloud_coverage': 0.123}, 'data': {'hourly_data': hourly_data}}
+config = {'battery': {'min_soc': 0.05}, 'simulation': {'time_step_minutes': 60}}
+cached = ReportStatistics.from_results(results, config)
+print(f"Average cloud from cache: {cached['average_cloud_coverage']} (expected 0.123)")
+
+print("\n=== Test ReportStatistics - 1 year at 1-minute resolution ===")
+big = hourly_data * (365 * 24 * 60 // len(hourly_data))
+start = time.perf_counter()
+stats_big = ReportStatistics.compute(big, min_soc=0.05, time_step_minutes=1)
+elapsed = time.perf_counter() - start
+print(f"Steps: {stats_big['total_steps']}")
+print(f"Compute time: {elapsed*1000:.1f} ms (one pass)")
+
+results_big = {'statistics': stats_big, 'data': {'hourly_data': big}}
+start = time.perf_counter()
+ReportStatistics.from_results(results_big, config)
+elapsed = time.perf_counter() - start
+print(f"Reuse time: {elapsed*1000:.3f} ms (precomputed)")
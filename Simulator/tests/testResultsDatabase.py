@@ -0,0 +1,95 @@
+import sys
+import os
+import json
+import time
+import contextlib
+import io
+import tempfile
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.Simulation import Simulation
+from src.DataLogger import DataLogger
+from src.Ensemble import Ensemble
+from src.ResultsDatabase import ResultsDatabase
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), '..', 'config.json')
+with open(CONFIG_PATH, 'r') as f:
+    config = json.load(f)
+
+workdir = tempfile.mkdtemp()
+path = os.path.join(workdir, 'runs.sqlite')
+
+def run(season, strategy, seed, battery_count=1, start_date='2024-06-01'):
+    run_config = json.loads(json.dumps(config))
+    run_config['simulation'].update(season=season, random_seed=seed, duration_days=10, start_date=start_date)
+    run_config['energy_management']['strategy'] = strategy
+    run_config['battery']['count'] = battery_count
+    with contextlib.redirect_stdout(io.StringIO()):
+        simulation = Simulation(config=run_config)
+        return simulation.run(), simulation.config
+
+print("=== Test Insert one run ===")
+results, run_config = run('summer', 'LOAD_PRIORITY', 7)
+with ResultsDatabase(path) as db:
+    run_id = db.insert_run(results, run_config)
+    stored = db.get_run(run_id)
+print(f"Run {run_id}: {stored['strategy']} {stored['season']} seed {stored['seed']}, "
+      f"self-sufficiency {stored['self_sufficiency_percent']:.2f}% "
+      f"(results {results['summary']['self_sufficiency_percent']:.2f}%)")
+print(f"Config and results round-trip: {stored['config'] == run_config}, "
+      f"{stored['results']['financial']['net_cost'] == results['financial']['net_cost']}")
+print(f"Daily summaries: {len(stored['daily_summaries'])}, seasons: {[s['season'] for s in stored['seasons']]}")
+
+print("\n=== Test Bulk insert (batched) ===")
+records = []
+start = time.perf_counter()
+for season in ['summer', 'winter']:
+    for strategy in ['LOAD_PRIORITY', 'CHARGE_PRIORITY']:
+        for battery_count in [1, 4]:
+            for seed in range(3):
+                results, run_config = run(season, strategy, seed, battery_count)
+                records.append(ResultsDatabase.record(results, run_config, include_daily=False, label='sweep'))
+print(f"Simulated {len(records)} runs in {time.perf_counter() - start:.2f} s")
+start = time.perf_counter()
+with ResultsDatabase(path) as db:
+    ids = db.insert_records(records, batch_size=10)
+    print(f"Inserted run ids {ids[0]}-{ids[-1]} in {(time.perf_counter() - start) * 1000:.1f} ms, "
+          f"{db.count_runs()} runs stored")
+    print(f"Journal mode: {db.query('PRAGMA journal_mode')[0]['journal_mode']}")
+
+print("\n=== Test Indexed queries ===")
+with ResultsDatabase(path) as db:
+    best = db.find_runs(season='winter', min_self_sufficiency=20, limit=3)
+    print(f"Winter runs above 20% self-sufficiency: "
+          f"{[(r['id'], r['strategy'], r['battery_count'], round(r['self_sufficiency_percent'], 1)) for r in best]}")
+    averages = db.query(
+        "SELECT strategy, battery_count, COUNT(*) AS runs, AVG(net_cost) AS cost FROM runs "
+        "WHERE label = ? GROUP BY strategy, battery_count ORDER BY strategy, battery_count", ('sweep',))
+    for row in averages:
+        print(f"  {row['strategy']:<16} {row['battery_count']} batteries: {row['runs']} runs, mean cost ${row['cost']:.2f}")
+    plan = db.query("EXPLAIN QUERY PLAN SELECT id FROM runs WHERE strategy = ? AND season = ?",
+                    ('LOAD_PRIORITY', 'winter'))
+    print(f"Query plan: {plan[0]['detail']}")
+
+print("\n=== Test Season 'auto' run and DataLogger ===")
+results, run_config = run('auto', 'LOAD_PRIORITY', 3, start_date='2024-05-27')
+run_config['results_database'] = {'path': path, 'label': 'main'}
+with contextlib.redirect_stdout(io.StringIO()):
+    saved = DataLogger(results, run_config, output_dir=workdir).save_all()
+with ResultsDatabase(path) as db:
+    seasons = db.query("SELECT s.season, s.days FROM run_seasons s JOIN runs r ON r.id = s.run_id WHERE r.label = 'main'")
+print(f"DataLogger stored into {os.path.basename(saved['database'])}: {[(s['season'], s['days']) for s in seasons]}")
+
+print("\n=== Test Ensemble stores every run ===")
+ensemble_config = json.loads(json.dumps(config))
+ensemble_config['simulation'].update(duration_days=5, random_seed=1)
+ensemble_config['results_database'] = {'batch_size': 4, 'daily_summaries': False}
+with contextlib.redirect_stdout(io.StringIO()):
+    summary = Ensemble(ensemble_config, runs=6, strategies=['LOAD_PRIORITY', 'PRODUCE_PRIORITY'],
+                       database=path, workers=2).run()
+with ResultsDatabase(path) as db:
+    stored = db.find_runs(label=summary['database']['label'], order_by='net_cost')
+print(f"Stored {summary['database']['runs_stored']} ensemble runs, found {len(stored)} by label")
+print(f"Samples keep no database rows: {all('record' not in s for runs in summary['samples'].values() for s in runs)}")
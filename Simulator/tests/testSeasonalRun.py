@@ -0,0 +1,78 @@
+import sys
+import os
+import json
+import time
+import contextlib
+import io
+from datetime import date
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.CloudCoverage import CloudCoverage
+from src.Simulation import Simulation
+from src.FleetSimulation import FleetSimulation
+from src.Ensemble import Ensemble
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), '..', 'config.json')
+with open(CONFIG_PATH, 'r') as f:
+    config = json.load(f)
+
+print("=== Test Season of a date ===")
+for day in [date(2024, 1, 15), date(2024, 3, 1), date(2024, 5, 31), date(2024, 6, 1), date(2024, 11, 30), date(2024, 12, 1)]:
+    print(f"{day}: {CloudCoverage.season_for_date(day)}")
+print(f"Fixed season wins over the date: {CloudCoverage.resolve_season('summer', date(2024, 1, 15))}")
+try:
+    CloudCoverage.resolve_season('monsoon', date(2024, 1, 15))
+except ValueError as e:
+    print(f"Error: {e}")
+
+print("\n=== Test Full year with automatic seasons (one run) ===")
+config['simulation'].update(season='auto', start_date='2024-03-01', duration_days=365, random_seed=11)
+start = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    results = Simulation(config=config).run()
+print(f"Simulated 365 days in {time.perf_counter() - start:.2f} s")
+
+seasons = results['seasons']
+print(f"{'Season':<8} {'Days':>5} {'Cloud':>7} {'Expected':>9} {'Solar kWh':>10} {'Self-suff %':>12} {'Net $':>8}")
+for season, breakdown in seasons.items():
+    expected = CloudCoverage(season=season).get_expected_coverage()
+    print(f"{season:<8} {breakdown['days']:>5} {breakdown['statistics']['average_cloud_coverage']:>7.3f} "
+          f"{expected:>9.3f} {breakdown['summary']['total_solar_generated_kwh']:>10.1f} "
+          f"{breakdown['summary']['self_sufficiency_percent']:>12.1f} {breakdown['financial']['net_cost']:>8.2f}")
+
+for key in ['total_solar_generated_kwh', 'total_load_consumed_kwh', 'total_grid_imported_kwh', 'total_grid_exported_kwh']:
+    total = sum(breakdown['summary'][key] for breakdown in seasons.values())
+    print(f"Seasons add up to the annual {key}: {abs(total - results['summary'][key]) < 1e-6}")
+total_cost = sum(breakdown['financial']['net_cost'] for breakdown in seasons.values())
+print(f"Seasons add up to the annual net cost: {abs(total_cost - results['financial']['net_cost']) < 1e-6}")
+failures = sum(breakdown['reliability']['inverter_failures'] for breakdown in seasons.values())
+print(f"Inverter failures: {failures} by season, {results['reliability']['inverter_failures']} in total")
+
+steps = results['data']['hourly_data']
+boundary = next(i for i, step in enumerate(steps) if step['timestamp'].startswith('2024-06-01'))
+print(f"Battery carries over into summer: {steps[boundary - 1]['battery_soc']:.2f}% -> "
+      f"{steps[boundary]['battery_soc']:.2f}% (end of spring {seasons['spring']['battery']['final_soc_percent']:.2f}%)")
+
+print("\n=== Test Automatic seasons in MPC, fleet and ensemble ===")
+config['simulation'].update(start_date='2024-05-27', duration_days=10)
+config['energy_management']['strategy'] = 'MPC'
+with contextlib.redirect_stdout(io.StringIO()):
+    mpc_results = Simulation(config=config).run()
+print(f"MPC across the spring/summer boundary: {list(mpc_results['seasons'])}, "
+      f"{mpc_results['mpc']['solves']} plans solved")
+config['energy_management']['strategy'] = 'LOAD_PRIORITY'
+
+config['fleet'] = {'homes': 20}
+with contextlib.redirect_stdout(io.StringIO()):
+    fleet_results = FleetSimulation(config=config).run()
+print(f"Fleet with season 'auto': {fleet_results['summary']['total_solar_generated_kwh']:.1f} kWh solar")
+
+expected = Ensemble.expected_solar_available_kwh(config)
+config['simulation']['season'] = 'spring'
+spring = Ensemble.expected_solar_available_kwh(config)
+config['simulation']['season'] = 'summer'
+summer = Ensemble.expected_solar_available_kwh(config)
+print(f"Expected solar (5 spring + 5 summer days): {expected:.2f} kWh = mean of {spring:.2f} and {summer:.2f}: "
+      f"{abs(expected - (spring + summer) / 2) < 1e-9}")
@@ -0,0 +1,117 @@
+import sys
+import os
+import json
+import time
+import contextlib
+import io
+import socket
+import subprocess
+import tempfile
+import threading
+import http.client
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.Simulation import Simulation
+from src.SimulationService import SimulationService, make_server, merge_config
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), '..', 'config.json')
+with open(CONFIG_PATH, 'r') as f:
+    config = json.load(f)
+config['simulation']['random_seed'] = 42
+
+def post(port, path, body):
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    connection.request('POST', path, json.dumps(body), {'Content-Type': 'application/json'})
+    response = connection.getresponse()
+    return response.status, response
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path):
+        super().__init__('localhost')
+        self.unix_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.unix_path)
+
+print("=== Test Merge partial configs ===")
+merged = merge_config(config, {'simulation': {'season': 'winter'}, 'battery': {'count': 2}})
+print(f"Season {merged['simulation']['season']}, duration kept {merged['simulation']['duration_days']}, "
+      f"batteries {merged['battery']['count']}, base unchanged: {config['simulation']['season']}")
+
+print("\n=== Test Service over HTTP ===")
+service = SimulationService(config, workers=2, max_concurrent=1, max_queue=2)
+print(f"Workers warmed up in {service.start():.2f} s")
+server = make_server(service, port=0, verbose=False)
+port = server.server_address[1]
+threading.Thread(target=server.serve_forever, daemon=True).start()
+
+request = {'config': {'simulation': {'duration_days': 10}}}
+status, response = post(port, '/simulate', request)
+body = json.loads(response.read())
+with contextlib.redirect_stdout(io.StringIO()):
+    direct = Simulation(config=merge_config(config, request['config'])).run()
+print(f"Status {status}, self-sufficiency {body['results']['summary']['self_sufficiency_percent']:.4f}% "
+      f"(direct run {direct['summary']['self_sufficiency_percent']:.4f}%), seed {body['results']['seed']}")
+print(f"No raw data unless requested: {'data' not in body['results']}")
+latency = body['latency']
+print(f"Latency: queued {latency['queued_ms']:.1f} ms, run {latency['run_ms']:.1f} ms, total {latency['total_ms']:.1f} ms")
+
+status, response = post(port, '/simulate', dict(request, include=['daily_summaries']))
+print(f"With daily summaries: {len(json.loads(response.read())['results']['data']['daily_summaries'])} days")
+
+print("\n=== Test Warm service vs new process ===")
+script = ("import json; from src.Simulation import Simulation; "
+          f"config = json.load(open({CONFIG_PATH!r})); config['simulation']['duration_days'] = 10; "
+          "Simulation(config=config).run()")
+start = time.perf_counter()
+subprocess.run([sys.executable, '-c', script], check=True, stdout=subprocess.DEVNULL,
+               cwd=os.path.join(os.path.dirname(__file__), '..'))
+cold = time.perf_counter() - start
+start = time.perf_counter()
+for _ in range(5):
+    post(port, '/simulate', request)[1].read()
+warm = (time.perf_counter() - start) / 5
+print(f"New process: {cold * 1000:.0f} ms, warm service: {warm * 1000:.0f} ms per request")
+
+print("\n=== Test Streaming ===")
+status, response = post(port, '/simulate/stream', {'config': {'simulation': {'duration_days': 5}}})
+lines = [json.loads(line) for line in response]
+print(f"Status {status}, {response.getheader('Transfer-Encoding')}: "
+      f"days {[line['day'] for line in lines[:-1]]}, {len(lines[0]['steps'])} steps in the first day")
+print(f"Last line has the results: {sorted(lines[-1])}")
+
+print("\n=== Test Queueing with a concurrency limit ===")
+with ThreadPoolExecutor(max_workers=5) as pool:
+    responses = list(pool.map(lambda _: post(port, '/simulate', request), range(5)))
+statuses = sorted(status for status, _ in responses)
+queued = sorted(json.loads(r.read())['latency']['queued_ms'] for s, r in responses if s == 200)
+print(f"Statuses: {statuses} (1 running + 2 queued accepted at a time)")
+print(f"Queue waits: {[round(q) for q in queued]} ms")
+connection = http.client.HTTPConnection('127.0.0.1', port)
+connection.request('GET', '/stats')
+stats = json.loads(connection.getresponse().read())
+print(f"Stats: {stats['completed']} completed, {stats['rejected']} rejected, "
+      f"total p50 {stats['latency_ms']['total_ms']['p50']:.1f} ms, p95 {stats['latency_ms']['total_ms']['p95']:.1f} ms")
+
+print("\n=== Test Invalid requests ===")
+for body in [{'config': {'energy_management': {'strategy': 'RANDOM'}}}, {'include': ['battery']}, {'seed': 1}]:
+    status, response = post(port, '/simulate', body)
+    print(f"{status}: {json.loads(response.read())['error']}")
+server.shutdown()
+server.server_close()
+
+print("\n=== Test Unix socket ===")
+socket_path = os.path.join(tempfile.mkdtemp(), 'service.sock')
+server = make_server(service, unix_socket=socket_path, verbose=False)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+connection = UnixHTTPConnection(socket_path)
+connection.request('POST', '/simulate', json.dumps(request))
+body = json.loads(connection.getresponse().read())
+print(f"Self-sufficiency over the socket: {body['results']['summary']['self_sufficiency_percent']:.4f}%")
+server.shutdown()
+server.server_close()
+service.close()
@@ -0,0 +1,50 @@
+import sys
+import os
+import json
+import contextlib
+import io
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.Simulation import Simulation
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), '..', 'config.json')
+with open(CONFIG_PATH, 'r') as f:
+    config = json.load(f)
+config['simulation']['duration_days'] = 3
+config['simulation']['time_step_minutes'] = 30
+
+print("=== Test iter_steps - Lazy step records ===")
+with contextlib.redirect_stdout(io.StringIO()):
+    sim = Simulation(config=config)
+    steps = sim.iter_steps()
+    first = next(steps)
+print(f"First record: {first['timestamp']} step={first['step']} SoC={first['battery_soc']:.1f}%")
+print(f"Simulated so far: step {first['step']} of {3 * 48} (nothing else computed yet)")
+
+with contextlib.redirect_stdout(io.StringIO()):
+    streamed = [first] + list(steps)
+print(f"Records streamed: {len(streamed)} (expected {3 * 48})")
+print(f"Records retained by simulation: {len(sim.hourly_data)} (expected 0)")
+print(f"Daily summaries collected: {len(sim.daily_summaries)} (expected 3)")
+
+print("\n=== Test run() - Same data as streaming ===")
+with contextlib.redirect_stdout(io.StringIO()):
+    results = Simulation(config=config).run()
+print(f"Identical records: {results['data']['hourly_data'] == streamed}")
+
+print("\n=== Test iter_days - Daily chunks ===")
+with contextlib.redirect_stdout(io.StringIO()):
+    days = list(Simulation(config=config).iter_days())
+for chunk in days:
+    print(f"Day {chunk['day']}: {len(chunk['steps'])} steps, "
+          f"solar {chunk['summary']['solar_generated_kwh']:.2f} kWh, "
+          f"SoC end {chunk['summary']['battery_soc_end']:.1f}%")
+print(f"Daily summaries match run(): {[d['summary'] for d in days] == results['data']['daily_summaries']}")
+
+print("\n=== Test iter_steps - Single use ===")
+try:
+    list(sim.iter_steps())
+except RuntimeError as e:
+    print(f"RuntimeError raised: {e}")
@@ -0,0 +1,142 @@
+import sys
+import os
+import json
+import time
+import signal
+import contextlib
+import io
+import socket
+import subprocess
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.ConfigSchema import ConfigError
+from src.Simulation import Simulation
+from src.SimulationService import merge_config
+from src.SweepCoordinator import SweepCoordinator, read_message, send_message
+from src.SweepWorker import SweepWorker
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), '..', 'config.json')
+SWEEP_SCRIPT = os.path.join(os.path.dirname(__file__), '..', 'sweep.py')
+with open(CONFIG_PATH, 'r') as f:
+    config = json.load(f)
+config['simulation']['random_seed'] = 5
+
+def start_workers(coordinator, count):
+    port = coordinator.address[1]
+    return [subprocess.Popen([sys.executable, SWEEP_SCRIPT, 'worker', '--coordinator', f"127.0.0.1:{port}",
+                              '--connect-timeout', '3'], stdout=subprocess.DEVNULL)
+            for _ in range(count)]
+
+def wait_for_lease(coordinator):
+    while not coordinator.status()['leases']:
+        time.sleep(0.01)
+    return next(iter(coordinator.status()['leases'].values()))
+
+print("=== Test Expand sweep parameters ===")
+runs = SweepCoordinator.expand({'battery.count': [1, 2], 'energy_management.strategy': ['LOAD_PRIORITY', 'CHARGE_PRIORITY'],
+                                'simulation.season': ['summer', 'winter']})
+print(f"{len(runs)} runs, first {runs[0]}, last {runs[-1]}")
+
+print("\n=== Test Sweep with 3 local worker processes ===")
+coordinator = SweepCoordinator(config, runs, chunk_size=3)
+coordinator.start()
+workers = start_workers(coordinator, 3)
+print(f"Finished: {coordinator.wait(timeout=60)}")
+coordinator.close()
+print(f"Worker exit codes: {[worker.wait() for worker in workers]}")
+results = coordinator.results()
+print(f"{results['completed_runs']}/{results['runs']} runs from {len(results['workers'])} workers, "
+      f"chunks per worker {sorted(w['chunks'] for w in results['workers'].values())}")
+record = results['records'][5]
+with contextlib.redirect_stdout(io.StringIO()):
+    direct = Simulation(config=merge_config(config, runs[5])).run()
+print(f"Run 5 {record['overrides']}: {record['self_sufficiency_percent']:.4f}% "
+      f"(direct run {direct['summary']['self_sufficiency_percent']:.4f}%)")
+print(f"Record fields: {sorted(record)}")
+
+print("\n=== Test Chunk of a killed worker is retried ===")
+config['simulation']['duration_days'] = 60
+coordinator = SweepCoordinator(config, SweepCoordinator.expand({'simulation.random_seed': list(range(24))}),
+                               chunk_size=4)
+coordinator.start()
+victim = start_workers(coordinator, 1)[0]
+wait_for_lease(coordinator)
+victim.send_signal(signal.SIGKILL)
+victim.wait()
+time.sleep(0.2)
+status = coordinator.status()
+print(f"After SIGKILL: requeued {status['requeued']}, {status['pending']} chunks pending, {status['done']} done")
+workers = start_workers(coordinator, 2)
+print(f"Finished: {coordinator.wait(timeout=60)}")
+coordinator.close()
+[worker.wait() for worker in workers]
+results = coordinator.results()
+print(f"{results['completed_runs']}/{results['runs']} runs, seeds complete: "
+      f"{sorted(r['seed'] for r in results['records']) == list(range(24))}")
+print(f"Lost chunks per worker: {sorted(w['lost_chunks'] for w in results['workers'].values())}")
+
+print("\n=== Test Lease timeout for a hung worker ===")
+coordinator = SweepCoordinator(config, SweepCoordinator.expand({'simulation.random_seed': list(range(12))}),
+                               chunk_size=4, lease_timeout=1.0)
+coordinator.start()
+hung = start_workers(coordinator, 1)[0]
+wait_for_lease(coordinator)
+hung.send_signal(signal.SIGSTOP)
+workers = start_workers(coordinator, 2)
+finished = coordinator.wait(timeout=60)
+hung.send_signal(signal.SIGCONT)
+time.sleep(0.5)  # The hung worker's late result arrives
+coordinator.close()
+[worker.wait() for worker in workers + [hung]]
+results = coordinator.results()
+print(f"Finished: {finished}, {results['completed_runs']}/{results['runs']} runs, "
+      f"requeued {results['requeued_chunks']}, duplicates ignored {results['duplicate_results']}")
+
+print("\n=== Test Reconnect under the same name before the old connection drops ===")
+coordinator = SweepCoordinator(config, SweepCoordinator.expand({'simulation.random_seed': list(range(4))}),
+                               chunk_size=2, max_attempts=1)
+coordinator.start()
+connections = []
+for _ in range(2):
+    stream = socket.create_connection(coordinator.address).makefile('rwb')
+    send_message(stream, {'type': 'hello', 'worker': 'host:1234'})
+    read_message(stream)
+    send_message(stream, {'type': 'request'})
+    connections.append((stream, read_message(stream)['chunk']))
+(old, old_chunk), (new, new_chunk) = connections
+old.close()  # The half-dead connection only now sees EOF
+time.sleep(0.2)
+status = coordinator.status()
+print(f"Leases after the old connection closed: {status['leases']} (chunk {new_chunk} kept), "
+      f"requeued {status['requeued']}, connected {status['workers']['host:1234']['connected']}")
+send_message(new, {'type': 'result', 'chunk': new_chunk,
+                   'records': [{'index': index, 'overrides': {}} for index in coordinator.chunks[new_chunk]]})
+print(f"Live connection's result accepted: {read_message(new)['type']}, "
+      f"duplicates {coordinator.status()['duplicates']}, failed chunks {coordinator.results()['failed_chunks']}")
+new.close()
+coordinator.close()
+
+print("\n=== Test Invalid configurations fail before any worker and unreachable coordinator ===")
+runs = SweepCoordinator.expand({'energy_management.strategy': ['LOAD_PRIORITY', 'RANDOM'],
+                                'battery.unit_capacity_kwh': [13.5, -5], 'simulation.duration_day': [7]})
+try:
+    SweepCoordinator(config, runs * 10, chunk_size=2)
+except ConfigError as e:
+    for problem in e.problems:
+        print(f"  - {problem}")
+coordinator = SweepCoordinator(config, [{'simulation': {'duration_days': 2}}, {}], chunk_size=2)
+coordinator.start()
+worker = SweepWorker(*coordinator.address, name='in-process')
+counters = worker.run()
+coordinator.close()
+records = coordinator.results()['records']
+print(f"Worker counters: {counters}")
+print(f"Records: {[record.get('error', 'ok') for record in records]}")
+print(f"Invalid run in a worker: {worker.run_one(config, 0, {'clouds': {'model': 'weekly'}})['error']}")
+print(f"Unreachable: {SweepWorker('127.0.0.1', coordinator.address[1], connect_timeout=0.5).run()}")
+try:
+    SweepCoordinator(config, [], chunk_size=2)
+except ValueError as e:
+    print(f"Error: {e}")
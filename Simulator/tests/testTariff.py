@@ -0,0 +1,144 @@
+import sys
+import os
+import json
+import time
+import contextlib
+import io
+from datetime import datetime, timedelta
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.Tariff import Tariff, bill_many, bill_results
+from src.Simulation import Simulation
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), '..', 'config.json')
+with open(CONFIG_PATH, 'r') as f:
+    config = json.load(f)
+config['simulation']['duration_days'] = 45  # June 1 (Saturday) -> July 15
+config['simulation']['time_step_minutes'] = 15
+
+TOU = {
+    'name': 'TOU test',
+    'import': {
+        'default_rate': 0.10,
+        'periods': [
+            {'name': 'peak', 'rate': 0.30, 'start_hour': 18, 'end_hour': 22, 'days': 'weekday'},
+            {'name': 'night', 'rate': 0.05, 'start_hour': 22, 'end_hour': 6}
+        ],
+        'tiers': [
+            {'up_to_kwh': 100, 'adder': 0.0},
+            {'up_to_kwh': 200, 'adder': 0.02},
+            {'up_to_kwh': None, 'adder': 0.05}
+        ]
+    },
+    'export': {'default_rate': 0.04, 'periods': [{'name': 'summer', 'rate': 0.08, 'months': [7]}]},
+    'demand_charges': [{'name': 'evening', 'rate_per_kw': 2.0, 'start_hour': 18, 'end_hour': 22}],
+    'fixed_monthly': 5.0
+}
+
+
+def brute_force_bill(tariff_config, import_kw, export_kw, start, minutes):
+    """Step-by-step reference implementation of the tariff rules."""
+    def in_window(window, t):
+        hour = t.hour + t.minute / 60.0
+        start_hour, end_hour = window.get('start_hour'), window.get('end_hour')
+        if start_hour is not None:
+            inside = start_hour <= hour < end_hour if start_hour <= end_hour else (hour >= start_hour or hour < end_hour)
+            if not inside:
+                return False
+        days = window.get('days', 'all')
+        if (days == 'weekday' and t.weekday() >= 5) or (days == 'weekend' and t.weekday() < 5):
+            return False
+        return not window.get('months') or t.month in window['months']
+
+    def rate(side, t):
+        for period in tariff_config[side].get('periods', []):
+            if in_window(period, t):
+                return period['rate']
+        return tariff_config[side]['default_rate']
+
+    total = 0.0
+    monthly_import = {}
+    peaks = {}
+    hours = minutes / 60.0
+    for i, (imp, exp) in enumerate(zip(import_kw, export_kw)):
+        t = start + timedelta(minutes=i * minutes)
+        key = (t.year, t.month)
+        total += imp * hours * rate('import', t) - exp * hours * rate('export', t)
+        # Tiers: split the step's energy over the monthly blocks
+        before = monthly_import.get(key, 0.0)
+        energy = imp * hours
+        lower = 0.0
+        for tier in tariff_config['import']['tiers']:
+            upper = float('inf') if tier['up_to_kwh'] is None else tier['up_to_kwh']
+            overlap = max(0.0, min(before + energy, upper) - max(before, lower))
+            total += overlap * tier['adder']
+            lower = upper
+        monthly_import[key] = before + energy
+        for charge in tariff_config['demand_charges']:
+            if in_window(charge, t):
+                peaks[(key, charge['name'])] = max(peaks.get((key, charge['name']), 0.0), imp)
+        peaks.setdefault((key, None), 0.0)
+    demand = sum(peak * 2.0 for (key, name), peak in peaks.items() if name)
+    months = len({key for key, _ in peaks})
+    return total + demand + tariff_config['fixed_monthly'] * months
+
+
+print("=== Test Flat Tariff - Matches grid rates ===")
+with contextlib.redirect_stdout(io.StringIO()):
+    results = Simulation(config=config).run()
+financial = results['financial']
+flat_import = results['summary']['total_grid_imported_kwh'] * config['grid']['import_cost_per_kwh']
+print(f"Tariff: {financial['tariff']} (expected flat)")
+print(f"Import cost: {financial['total_import_cost']:.6f} (grid totals: {flat_import:.6f})")
+print(f"Months billed: {[m['month'] for m in financial['monthly']]} (expected 2024-06, 2024-07)")
+
+print("\n=== Test Calendar ===")
+calendar = Tariff.calendar('2024-06-01', 15, 4 * 48)
+print(f"First step weekday: {calendar['weekday'][0]} (expected 5 = Saturday)")
+print(f"Step 75 hour: {calendar['hour'][75]} (expected 18.75)")
+print(f"Day 3 weekday: {calendar['weekday'][4 * 48 - 1]} (expected 6 = Sunday)")
+
+print("\n=== Test TOU + Tiers + Demand - Matches brute force ===")
+import_kw, export_kw = Tariff.flows_from_steps(results['data']['hourly_data'])
+calendar = Tariff.calendar(config['simulation']['start_date'], 15, len(import_kw))
+bill = Tariff(TOU).bill(import_kw, export_kw, calendar, 0.25)
+reference = brute_force_bill(TOU, import_kw, export_kw, datetime(2024, 6, 1), 15)
+print(f"Vectorized net cost: {bill['net_cost']:.6f}")
+print(f"Brute-force net cost: {reference:.6f}")
+print(f"Match: {abs(bill['net_cost'] - reference) < 1e-6}")
+print(f"Import by period: " + ", ".join(f"{name} {p['energy_kwh']:.1f} kWh" for name, p in bill['by_period']['import'].items()))
+print(f"Evening demand peaks (kW): {[round(p, 2) for p in bill['demand']['evening']['peak_kw']]}")
+print(f"Fixed charges: {bill['fixed_charges']} (expected 10.0 for 2 months)")
+
+print("\n=== Test Tariff in config -> results['financial'] ===")
+config['tariff'] = TOU
+with contextlib.redirect_stdout(io.StringIO()):
+    tou_results = Simulation(config=config).run()
+print(f"Tariff: {tou_results['financial']['tariff']}, net cost matches bill: "
+      f"{abs(tou_results['financial']['net_cost'] - bill['net_cost']) < 1e-9}")
+del config['tariff']
+
+print("\n=== Test Re-billing under 50 tariffs ===")
+candidates = []
+for i in range(50):
+    candidate = json.loads(json.dumps(TOU))
+    candidate['name'] = f"candidate {i}"
+    candidate['import']['periods'][0]['rate'] = 0.20 + i * 0.005
+    candidates.append(candidate)
+start = time.perf_counter()
+bills = bill_results(candidates, results, config)
+elapsed = time.perf_counter() - start
+print(f"Billed {len(bills)} tariffs in {elapsed * 1000:.1f} ms")
+print(f"Net cost rises with peak rate: {all(a['net_cost'] < b['net_cost'] for a, b in zip(bills, bills[1:]))}")
+again = bill_many([Tariff(candidates[0])], import_kw, export_kw, calendar, 0.25)[0]
+print(f"bill_many == bill_results: {again['net_cost'] == bills[0]['net_cost']}")
+
+print("\n=== Test Invalid tariff ===")
+for broken in ({'import': {'tiers': [{'up_to_kwh': 200}, {'up_to_kwh': 100}]}},
+               {'import': {'periods': [{'rate': 0.1, 'days': 'holiday'}]}}):
+    try:
+        Tariff(broken)
+    except ValueError as e:
+        print(f"Error: {e}")
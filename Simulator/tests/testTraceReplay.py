@@ -0,0 +1,84 @@
+import sys
+import os
+import csv
+import json
+import math
+import tempfile
+import contextlib
+import io
+from datetime import datetime, timedelta
+
+# Add the src directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.TraceReplay import TraceReplay, convert_csv_to_binary
+from src.Simulation import Simulation
+
+tmp = tempfile.mkdtemp(prefix='greengrid_trace_')
+csv_path = os.path.join(tmp, 'measured.csv')
+bin_path = os.path.join(tmp, 'measured.bin')
+
+# 3 days of 1-minute "metered" data starting 2024-06-01
+start = datetime(2024, 6, 1)
+with open(csv_path, 'w', newline='') as f:
+    writer = csv.writer(f)
+    writer.writerow(['timestamp', 'solar_kw', 'load_kw'])
+    for minute in range(3 * 24 * 60):
+        hour = (minute % 1440) / 60.0
+        solar = max(0.0, 4.0 * math.sin((hour - 6) * math.pi / 12)) if 6 <= hour < 18 else 0.0
+        load = 0.5 + (1.5 if 18 <= hour < 21 else 0.0)
+        writer.writerow([(start + timedelta(minutes=minute)).strftime('%Y-%m-%d %H:%M:%S'),
+                         f"{solar:.4f}", f"{load:.4f}"])
+
+print("=== Test CSV -> binary conversion ===")
+metadata = convert_csv_to_binary(csv_path, bin_path, chunk_rows=1000)
+print(f"Rows: {metadata['rows']} (expected {3 * 1440})")
+print(f"Interval: {metadata['interval_minutes']} min (expected 1)")
+print(f"Binary size: {os.path.getsize(bin_path)} bytes (expected {3 * 1440 * 2 * 4})")
+
+print("\n=== Test resampling (1-minute trace -> 60-minute steps) ===")
+csv_trace = TraceReplay(csv_path, chunk_rows=1000)
+bin_trace = TraceReplay(bin_path, chunk_rows=1000)
+csv_steps = list(csv_trace.iter_steps(start, 60, 72))
+bin_steps = list(bin_trace.iter_steps(start, 60, 72))
+print(f"Noon (hour 12) solar: {csv_steps[12][0]:.3f} kW (mean of the hour)")
+print(f"Peak hour (19) load: {csv_steps[19][1]:.3f} kW (expected 2.000)")
+max_diff = max(abs(a - b) for x, y in zip(csv_steps, bin_steps) for a, b in zip(x, y))
+print(f"CSV vs binary max difference: {max_diff:.2e} (float32 storage)")
+
+print("\n=== Test resampling (60-minute steps -> 15-minute hold) and alignment ===")
+hourly_csv = os.path.join(tmp, 'hourly.csv')
+with open(hourly_csv, 'w', newline='') as f:
+    writer = csv.writer(f)
+    writer.writerow(['timestamp', 'solar_kw', 'load_kw'])
+    for hour in range(48):
+        writer.writerow([(start + timedelta(hours=hour)).isoformat(), hour, 1.0])
+held = list(TraceReplay(hourly_csv).iter_steps(start + timedelta(days=1), 15, 8))
+print(f"Day 2 first 8 quarter-hours solar: {[s for s, _ in held]} (expected 24,24,24,24,25,25,25,25)")
+
+print("\n=== Test errors ===")
+try:
+    list(TraceReplay(hourly_csv).iter_steps(start, 15, 10000))
+except ValueError as e:
+    print(f"Too short: {e}")
+try:
+    list(TraceReplay(hourly_csv).iter_steps(start + timedelta(minutes=30), 15, 4))
+except ValueError as e:
+    print(f"Misaligned: {e}")
+
+print("\n=== Test Simulation replay ===")
+config_path = os.path.join(os.path.dirname(__file__), '..', 'config.json')
+with open(config_path, 'r') as f:
+    config = json.load(f)
+config['simulation']['duration_days'] = 3
+config['simulation']['time_step_minutes'] = 15
+config['inverter']['failure_rate'] = 0.0
+config['replay'] = {'path': bin_path}
+with contextlib.redirect_stdout(io.StringIO()):
+    results = Simulation(config=config).run()
+trace_solar = sum(s for s, _ in bin_trace.iter_steps(start, 15, 288)) * 0.25
+trace_load = sum(l for _, l in bin_trace.iter_steps(start, 15, 288)) * 0.25
+print(f"Load consumed: {results['summary']['total_load_consumed_kwh']:.3f} kWh (trace: {trace_load:.3f})")
+print(f"Solar used + curtailed: {results['summary']['total_solar_generated_kwh'] + results['summary']['total_curtailed_kwh']:.3f} kWh "
+      f"(trace: {trace_solar:.3f})")
+print(f"Cloud coverage: {results['data']['hourly_data'][0]['cloud_coverage']} (unknown for measured data)")